@@ -0,0 +1,32 @@
+"""Add batch discovery job kind
+
+Revision ID: e7a3c9f1b4d8
+Revises: d5f9b2e6a3c7
+Create Date: 2026-10-19 19:24:51.308217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3c9f1b4d8'
+down_revision: Union[str, Sequence[str], None] = 'd5f9b2e6a3c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TYPE jobkind_enum ADD VALUE IF NOT EXISTS 'batch_discovery'")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Postgres cannot drop an enum value: recreate the type without it
+    op.execute("DELETE FROM agentjob WHERE kind = 'batch_discovery'")
+    op.execute("ALTER TYPE jobkind_enum RENAME TO jobkind_enum_old")
+    op.execute("CREATE TYPE jobkind_enum AS ENUM ('discovery', 'analytics', 'builder')")
+    op.execute("ALTER TABLE agentjob ALTER COLUMN kind TYPE jobkind_enum USING kind::text::jobkind_enum")
+    op.execute("DROP TYPE jobkind_enum_old")
@@ -0,0 +1,139 @@
+"""
+End-to-end latency of the discovery agent (/farms/discover): the old
+sequential graph (search_usda -> enrich -> audit -> market_gap -> generate_seo)
+vs the fan-out graph in src/agents/discovery.py, where the SEO branch runs
+alongside the competitor pipeline and the market gap analysis reuses its
+artifacts.
+
+External calls are replaced by sleeps of realistic duration (overridable with
+the --*-ms flags), so the comparison measures graph topology only and needs no
+API keys or network access.
+
+Usage:
+    uv run python -m scripts.benchmark_discovery_latency
+    uv run python -m scripts.benchmark_discovery_latency --competitors 12 --runs 5
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from contextlib import ExitStack
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from langgraph.graph import END, StateGraph
+
+from src.agents import discovery
+from src.schemas.agent_discovery import DiscoveryState
+from src.schemas.google_places import NearbyBusiness, PlacesSearchResult
+from src.schemas.usda import FarmersMarketListing, FarmersMarketSearchResult
+
+
+def build_sequential_graph():
+    """The discovery graph before the market gap and SEO branches were parallelized."""
+    workflow = StateGraph(DiscoveryState)
+    # search_usda -> enrich -> audit, with the same per-item fan-outs as the real graph
+    workflow.add_node("competitors", discovery.build_competitor_pipeline())
+    workflow.add_node("market_gap", discovery.market_gap_node)
+    workflow.add_node("generate_seo", discovery.generate_seo_node)
+    workflow.set_entry_point("competitors")
+    workflow.add_edge("competitors", "market_gap")
+    workflow.add_edge("market_gap", "generate_seo")
+    workflow.add_edge("generate_seo", END)
+    return workflow.compile()
+
+
+def _simulated_tools(args) -> dict:
+    async def sleep(ms: float):
+        await asyncio.sleep(ms / 1000)
+
+    async def usda(_):
+        await sleep(args.usda_ms)
+        listings = [FarmersMarketListing(listing_name=f"Market {i}") for i in range(args.competitors)]
+        return {"farmersmarket": FarmersMarketSearchResult(listings=listings)}
+
+    async def places(payload):
+        await sleep(args.places_ms)
+        business = NearbyBusiness(
+            name=payload["query"], address="", place_id=payload["query"], latitude=40.0, longitude=-75.0,
+            website=f"https://example.com/{abs(hash(payload['query']))}",
+        )
+        return PlacesSearchResult(
+            query=payload["query"], location_input=payload["location"], radius_meters=payload["radius_meters"],
+            businesses=[business], total_found=1,
+        )
+
+    async def visuals(_):
+        await sleep(args.visual_ms)
+        return "Clean layout, slow hero image."
+
+    async def gap(*_):
+        await sleep(args.gap_ms)
+        return {"market_gaps": ["No online ordering nearby"], "positioning_recommendations": []}
+
+    async def seo(_):
+        await sleep(args.seo_ms)
+        return json.dumps({"keywords": ["local eggs"]})
+
+    async def score(messages, config=None):
+        await sleep(args.llm_ms)
+        count = messages[0].content.count('"visual_analysis"')
+        return SimpleNamespace(content=json.dumps([{"id": i, "score": 60, "summary": "ok"} for i in range(count)]))
+
+    return {
+        "search_all_local_food": SimpleNamespace(ainvoke=usda),
+        "search_nearby_businesses": SimpleNamespace(ainvoke=places),
+        "analyze_website_visuals": SimpleNamespace(ainvoke=visuals),
+        "generate_gap_report": gap,
+        "fetch_local_seo_keywords": SimpleNamespace(ainvoke=seo),
+        "get_llm_for_task": lambda task: SimpleNamespace(ainvoke=score),
+    }
+
+
+async def _time_runs(graph, runs: int) -> list[float]:
+    state = {
+        "search_criteria": {
+            "zip_code": "19103", "state": "PA", "farm_name": "Oak Creek Farm", "farm_offerings": "Eggs, honey, tomatoes",
+        },
+    }
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await graph.ainvoke(state)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--competitors", type=int, default=8)
+    parser.add_argument("--usda-ms", type=float, default=600)
+    parser.add_argument("--places-ms", type=float, default=250)
+    parser.add_argument("--visual-ms", type=float, default=1500)
+    parser.add_argument("--llm-ms", type=float, default=2500)
+    parser.add_argument("--gap-ms", type=float, default=2500)
+    parser.add_argument("--seo-ms", type=float, default=2000)
+    args = parser.parse_args()
+
+    with ExitStack() as stack:
+        for name, fake in _simulated_tools(args).items():
+            stack.enter_context(patch.object(discovery, name, fake))
+
+        results = {
+            "sequential": await _time_runs(build_sequential_graph(), args.runs),
+            "fan-out": await _time_runs(discovery.build_discovery_graph(), args.runs),
+        }
+
+    print(f"{args.competitors} competitors, {args.runs} runs (simulated external latency)")
+    print(f"{'graph':<12}{'median ms':>12}{'min ms':>10}")
+    for name, timings in results.items():
+        print(f"{name:<12}{statistics.median(timings):>12.0f}{min(timings):>10.0f}")
+    before, after = statistics.median(results["sequential"]), statistics.median(results["fan-out"])
+    print(f"\nEnd-to-end: {before:.0f} ms -> {after:.0f} ms ({(1 - after / before) * 100:.0f}% faster)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
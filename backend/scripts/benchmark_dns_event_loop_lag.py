@@ -0,0 +1,87 @@
+"""
+Event-loop lag while checking domain availability: the old blocking
+``socket.gethostbyname`` loop vs the async ``DomainResolver``
+(src/services/domain_dns.py).
+
+A monitor task wakes every 10 ms and records how late it wakes up; a
+blocked event loop shows up as large lag. Uses real DNS, so results vary
+with the network. Unregistered names make the resolver wait the longest.
+
+Usage:
+    uv run python -m scripts.benchmark_dns_event_loop_lag --domains 20
+"""
+
+import argparse
+import asyncio
+import socket
+import statistics
+import time
+import uuid
+
+from src.core.config import settings
+from src.services.domain_dns import DomainResolver
+
+TICK_SECONDS = 0.01
+
+
+async def _monitor(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        expected = time.perf_counter() + TICK_SECONDS
+        await asyncio.sleep(TICK_SECONDS)
+        lags.append(max(0.0, time.perf_counter() - expected) * 1000)
+
+
+async def _measure(name: str, check) -> None:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(_monitor(lags, stop))
+    await asyncio.sleep(TICK_SECONDS * 2)
+
+    started = time.perf_counter()
+    await check()
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await monitor
+    lags.sort()
+    p95 = lags[min(len(lags) - 1, int(0.95 * len(lags)))] if lags else 0.0
+    print(f"{name:>9}: wall {elapsed:6.2f}s | loop lag p95 {p95:8.1f} ms | max {lags[-1] if lags else 0:8.1f} ms "
+          f"| median {statistics.median(lags) if lags else 0:6.1f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--domains", type=int, default=20)
+    args = parser.parse_args()
+
+    # Mix of registered names and random (almost certainly unregistered) ones
+    domains = ["google.com", "wikipedia.org", "usda.gov"] + [
+        f"sprout-{uuid.uuid4().hex[:10]}.com" for _ in range(args.domains - 3)
+    ]
+
+    async def blocking():
+        for domain in domains:
+            try:
+                socket.gethostbyname(domain)
+            except socket.gaierror:
+                pass
+
+    resolver = DomainResolver(
+        timeout_seconds=settings.DOMAIN_DNS_TIMEOUT_SECONDS,
+        ttl_seconds=settings.DOMAIN_DNS_CACHE_TTL_SECONDS,
+        negative_ttl_seconds=settings.DOMAIN_DNS_NEGATIVE_CACHE_TTL_SECONDS,
+        max_entries=settings.DOMAIN_DNS_CACHE_MAX_ENTRIES,
+        max_concurrency=settings.DOMAIN_DNS_MAX_CONCURRENCY,
+    )
+
+    async def non_blocking():
+        await resolver.check_many(domains)
+
+    print(f"Checking {len(domains)} domains...")
+    await _measure("blocking", blocking)
+    await _measure("async", non_blocking)
+    await _measure("cached", non_blocking)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
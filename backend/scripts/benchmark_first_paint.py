@@ -0,0 +1,89 @@
+"""
+Page weight and first paint of a generated landing page: Tailwind Play CDN
+vs the server-side compiled stylesheet (src/services/tailwind_compiler.py).
+
+Renders a template page (or loads --html, e.g. a page saved from the "llm"
+mode), then loads both versions in headless Chromium --runs times and reports
+the median first-contentful-paint and load times from the Paint and
+Navigation Timing APIs. The CDN version needs network access.
+
+Usage:
+    uv run python -m scripts.benchmark_first_paint --runs 5
+    uv run python -m scripts.benchmark_first_paint --html generated.html --style modern
+"""
+
+import argparse
+import asyncio
+import gzip
+import statistics
+import tempfile
+from pathlib import Path
+
+from playwright.async_api import async_playwright
+
+from src.schemas.agent_builder import WebsiteCopy
+from src.services.site_templates import render_site
+from src.services.tailwind_compiler import compile_page
+
+TIMINGS_JS = """() => {
+    const paint = performance.getEntriesByName('first-contentful-paint')[0];
+    const nav = performance.getEntriesByType('navigation')[0];
+    return {fcp: paint ? paint.startTime : null, load: nav ? nav.loadEventEnd : null};
+}"""
+
+
+def _sample_page(style: str) -> str:
+    copy = WebsiteCopy(
+        headline="Eggs worth waking up for",
+        subheadline="Pasture-raised eggs and raw honey from Oak Creek.",
+        about_text="Four generations of our family have worked this land. We raise hens on open pasture "
+                   "and keep bees in the creek-side meadows.",
+    )
+    return render_site("Oak Creek Farm", copy, "Eggs, raw honey, heirloom tomatoes, kale, sourdough", style)
+
+
+async def _measure(browser, path: Path, runs: int) -> tuple[float, float]:
+    fcps, loads = [], []
+    for _ in range(runs):
+        context = await browser.new_context()  # fresh cache every run
+        page = await context.new_page()
+        await page.goto(path.as_uri(), wait_until="load", timeout=30000)
+        await page.wait_for_timeout(100)  # let the paint entry land
+        timings = await page.evaluate(TIMINGS_JS)
+        await context.close()
+        if timings["fcp"] is not None:
+            fcps.append(timings["fcp"])
+        loads.append(timings["load"] or 0.0)
+    return (statistics.median(fcps) if fcps else float("nan")), statistics.median(loads)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--html", type=Path, help="Generated page to measure instead of a template page")
+    parser.add_argument("--style", default="rustic", help="Template style when --html is not given")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    source = args.html.read_text() if args.html else _sample_page(args.style)
+    compiled, weight = compile_page(source)
+
+    print(f"Classes: {weight.class_count} | unresolved: {weight.unresolved_classes or 'none'}")
+    print(f"{'':>9}  {'html':>9}  {'gzip':>9}")
+    print(f"{'cdn':>9}  {weight.source_bytes:>8}B  {len(gzip.compress(source.encode())):>8}B  (+ the CDN script)")
+    print(f"{'compiled':>9}  {weight.html_bytes:>8}B  {weight.gzip_bytes:>8}B  (css {weight.css_bytes}B)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pages = {"cdn": Path(tmp) / "cdn.html", "compiled": Path(tmp) / "compiled.html"}
+        pages["cdn"].write_text(source)
+        pages["compiled"].write_text(compiled)
+
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            for name, path in pages.items():
+                fcp, load = await _measure(browser, path, args.runs)
+                print(f"{name:>9}: first paint {fcp:7.1f} ms | load {load:7.1f} ms (median of {args.runs})")
+            await browser.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
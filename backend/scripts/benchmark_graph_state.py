@@ -0,0 +1,151 @@
+"""
+Peak memory and per-step overhead of the discovery agent's graph state on a
+large run (500 competitors by default).
+
+External calls return at once with canned results, so the timings are the
+graph's own overhead: reducers merging node updates, pydantic state
+validation and (with --checkpoint) checkpoint serialization, with the bytes
+written to the checkpointer. Peak memory is measured with tracemalloc over
+one more run. Wall times vary by about 150 ms between identical runs, so
+compare medians over several runs.
+
+Usage:
+    uv run python -m scripts.benchmark_graph_state
+    uv run python -m scripts.benchmark_graph_state --competitors 1000 --checkpoint
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import tracemalloc
+from contextlib import ExitStack
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from langgraph.checkpoint.memory import InMemorySaver
+
+from src.agents import discovery
+from src.core.llm_metrics import agent_run_config
+from src.schemas.google_places import NearbyBusiness, PlacesSearchResult
+from src.schemas.usda import CSAListing, CSASearchResult, FarmersMarketListing, FarmersMarketSearchResult
+
+# A realistic visual analysis is a few KB of text
+ANALYSIS = "Dated layout, no online ordering, slow hero image. " * 40
+
+
+def _instant_tools(competitors: int) -> dict:
+    async def usda(_):
+        half = competitors // 2
+        return {
+            "farmersmarket": FarmersMarketSearchResult(
+                listings=[FarmersMarketListing(listing_name=f"Market {i}") for i in range(half)]
+            ),
+            "csa": CSASearchResult(listings=[CSAListing(listing_name=f"CSA {i}") for i in range(competitors - half)]),
+        }
+
+    async def places(payload):
+        business = NearbyBusiness(
+            name=payload["query"], address="1 Farm Rd", place_id=payload["query"], latitude=40.0, longitude=-75.0,
+            website=f"https://example.com/{payload['query'].replace(' ', '-').lower()}",
+        )
+        return PlacesSearchResult(
+            query=payload["query"], location_input=payload["location"], radius_meters=payload["radius_meters"],
+            businesses=[business], total_found=1,
+        )
+
+    async def visuals(_):
+        return ANALYSIS
+
+    async def gap(*_):
+        return {"market_gaps": ["No online ordering nearby"], "positioning_recommendations": []}
+
+    async def seo(_):
+        return json.dumps({"keywords": ["local eggs"]})
+
+    async def score(messages, config=None):
+        count = messages[0].content.count('"visual_analysis"')
+        return SimpleNamespace(content=json.dumps([{"id": i, "score": 60, "summary": "ok"} for i in range(count)]))
+
+    return {
+        "search_all_local_food": SimpleNamespace(ainvoke=usda),
+        "search_nearby_businesses": SimpleNamespace(ainvoke=places),
+        "analyze_website_visuals": SimpleNamespace(ainvoke=visuals),
+        "generate_gap_report": gap,
+        "fetch_local_seo_keywords": SimpleNamespace(ainvoke=seo),
+        "get_llm_for_task": lambda task: SimpleNamespace(ainvoke=score),
+    }
+
+
+def _checkpoint_bytes(saver: InMemorySaver) -> int:
+    """Serialized channel values and task writes held by the saver."""
+    blobs = sum(len(data) for _, data in saver.blobs.values())
+    writes = sum(len(value[1]) for task_writes in saver.writes.values() for _, _, value, _ in task_writes.values())
+    return blobs + writes
+
+
+async def _measure_run(checkpoint: bool, run: int, trace_memory: bool) -> dict:
+    saver = InMemorySaver() if checkpoint else None
+    graph = discovery.build_discovery_graph(saver)
+    state = {
+        "search_criteria": {
+            "zip_code": "19103", "state": "PA", "farm_name": "Oak Creek Farm", "farm_offerings": "Eggs, honey",
+        },
+    }
+    tasks = 0
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    async for namespace, mode, chunk in graph.astream(
+            state, config=agent_run_config("discovery", f"benchmark-{run}"),
+            stream_mode=["tasks", "values"], subgraphs=True,
+    ):
+        if mode == "tasks" and "result" in chunk:
+            tasks += 1
+        elif mode == "values" and not namespace:
+            final_state = chunk
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    peak = 0
+    if trace_memory:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return {
+        "elapsed_ms": elapsed_ms,
+        "peak_mb": peak / 2 ** 20,
+        "tasks": tasks,
+        "checkpoint_mb": _checkpoint_bytes(saver) / 2 ** 20 if saver else 0.0,
+        "audited": len(final_state["audited_competitors"]),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--competitors", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--checkpoint", action="store_true", help="checkpoint every step in memory")
+    args = parser.parse_args()
+
+    with ExitStack() as stack:
+        for name, fake in _instant_tools(args.competitors).items():
+            stack.enter_context(patch.object(discovery, name, fake))
+        # tracemalloc slows the run down, so memory is measured in a separate run
+        results = [await _measure_run(args.checkpoint, run, trace_memory=False) for run in range(args.runs)]
+        peak = (await _measure_run(args.checkpoint, args.runs, trace_memory=True))["peak_mb"]
+
+    tasks = results[0]["tasks"]
+    elapsed = statistics.median(r["elapsed_ms"] for r in results)
+    print(
+        f"{args.competitors} competitors ({results[0]['audited']} audited), {args.runs} runs, "
+        f"checkpoints {'on' if args.checkpoint else 'off'}"
+    )
+    print(f"{'median run ms':<24}{elapsed:>10.0f}")
+    print(f"{'tasks per run':<24}{tasks:>10}")
+    print(f"{'overhead per task ms':<24}{elapsed / tasks:>10.2f}")
+    print(f"{'peak memory MB':<24}{peak:>10.1f}")
+    if args.checkpoint:
+        print(f"{'checkpoint MB written':<24}{results[0]['checkpoint_mb']:>10.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,142 @@
+"""
+Measures prompt compaction on the analytics insight prompt: raw (indented JSON,
+3-hourly weather, full event list) vs compacted (src/services/prompt_compaction.py).
+
+Without flags only prompt sizes are compared. With --llm each variant is sent
+to the "market_insights" route --runs times and the script reports latency,
+billed prompt tokens and a quality-parity proxy: the share of predicted prices
+and interval bounds the insights quote.
+
+Usage:
+    uv run python -m scripts.benchmark_prompt_compaction
+    OPENROUTER_API_KEY=... uv run python -m scripts.benchmark_prompt_compaction --llm --runs 3
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from langchain_core.messages import HumanMessage
+
+from src.core.config import settings
+from src.services.prompt_compaction import (
+    compact_events,
+    compact_json,
+    compact_prompt,
+    estimate_tokens,
+    rollup_weather,
+)
+
+INSTRUCTIONS = """
+    Create a list of 2-3 plain-language, highly actionable insights. Use the exact statistical data provided.
+    Incorporate upcoming weather (if adverse) or local events (if they represent demand opportunities) into your reasoning.
+    Return the result as a raw JSON list of strings (no markdown wrapping).
+"""
+
+
+def sample_context() -> tuple[list[dict], dict, dict]:
+    predictions = [
+        {"crop_name": crop, "current_average_price": base, "trend_slope": 0.01,
+         "predicted_next_price": round(base * 1.12, 2), "pi_low": round(base * 1.02, 2),
+         "pi_high": round(base * 1.22, 2), "data_points_analyzed": 60,
+         "moving_averages": [round(base + i * 0.01, 2) for i in range(58)]}
+        for crop, base in (("Tomatoes", 3.0), ("Zucchini", 2.5), ("Bell Peppers", 3.5))
+    ]
+    weather = {
+        "current_temp": 71.2, "location": "Portland", "zip_code": "97201",
+        "forecast": [
+            {"temperature_min": 55 + h / 3, "temperature_max": 62 + h / 3, "precipitation_mm": 0.4 if d == 3 else 0.0,
+             "humidity": 60 + d, "description": "light rain" if d == 3 else "clear sky",
+             "date": f"2025-07-0{d} {h:02d}:00:00"}
+            for d in range(1, 6) for h in range(0, 24, 3)
+        ],
+    }
+    events = {
+        "events": [
+            {"title": f"Saturday Farmers Market #{i}", "date": "Sat, Jul 5", "location": "SW Park Ave, Portland",
+             "description": "Weekly market with over 100 local vendors selling produce, baked goods and flowers. "
+                            "Live music, kids activities and cooking demos every week.",
+             "link": f"https://example.com/events/{i}", "venue": "Portland State University"}
+            for i in range(15)
+        ],
+        "count": 15, "query_location": "97201, United States", "query_zip": "97201",
+    }
+    return predictions, weather, events
+
+
+def raw_prompt(predictions, weather, events) -> str:
+    return f"""
+    You are an Agricultural Market Analyst providing actionable insights for a local farmer.
+
+    STATISTICAL PREDICTIONS (95% Confidence Intervals):
+    {json.dumps(predictions, indent=2)}
+
+    LOCAL WEATHER TRENDS:
+    {json.dumps(weather)}
+
+    LOCAL EVENTS/FESTIVALS:
+    {json.dumps(events)}
+    {INSTRUCTIONS}
+    """
+
+
+def compacted_prompt(predictions, weather, events) -> str:
+    events_summary = compact_events(events, settings.PROMPT_MAX_EVENTS, settings.PROMPT_EVENT_DESCRIPTION_TOKENS)
+    return compact_prompt(f"""
+    You are an Agricultural Market Analyst providing actionable insights for a local farmer.
+
+    STATISTICAL PREDICTIONS (95% Confidence Intervals):
+    {compact_json(predictions)}
+
+    LOCAL WEATHER TRENDS:
+    {compact_json(rollup_weather(weather))}
+
+    LOCAL EVENTS/FESTIVALS:
+    {compact_json(events_summary)}
+    {INSTRUCTIONS}
+    """)
+
+
+def figures_quoted(text: str, predictions: list[dict]) -> float:
+    figures = [f"{p[key]:.2f}" for p in predictions for key in ("predicted_next_price", "pi_low", "pi_high")]
+    return sum(1 for figure in figures if figure in text) / len(figures)
+
+
+async def run_llm(name: str, prompt: str, predictions: list[dict], runs: int) -> None:
+    from src.core.llm_routing import get_llm_for_task
+
+    llm = get_llm_for_task("market_insights")
+    latencies, prompt_tokens, parity = [], [], []
+    for _ in range(runs):
+        started = time.perf_counter()
+        response = await llm.ainvoke([HumanMessage(content=prompt)])
+        latencies.append(time.perf_counter() - started)
+        prompt_tokens.append((response.usage_metadata or {}).get("input_tokens", 0))
+        parity.append(figures_quoted(str(response.content), predictions))
+
+    print(f"{name:>10}: median latency {statistics.median(latencies):.2f}s | "
+          f"prompt tokens {statistics.mean(prompt_tokens):.0f} | "
+          f"figures quoted {statistics.mean(parity):.0%}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--llm", action="store_true", help="Also call the LLM with both prompts")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    predictions, weather, events = sample_context()
+    raw = raw_prompt(predictions, weather, events)
+    compacted = compacted_prompt(predictions, weather, events)
+    print(f"Estimated prompt tokens: raw {estimate_tokens(raw)} -> compacted {estimate_tokens(compacted)} "
+          f"({1 - len(compacted) / len(raw):.0%} smaller)")
+
+    if args.llm:
+        await run_llm("raw", raw, predictions, args.runs)
+        await run_llm("compacted", compacted, predictions, args.runs)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
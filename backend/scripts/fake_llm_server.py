@@ -0,0 +1,110 @@
+"""
+Fake OpenAI-compatible chat completions server for exercising model routing,
+hedging and failover (src/core/llm_routing.py) without calling OpenRouter.
+
+Each model answers after a configurable delay, or fails with a 500.
+
+Usage:
+    uv run python -m scripts.fake_llm_server --port 8900 \
+        --latency google/gemini-2.0-flash-001=8 --latency openai/gpt-4o-mini=0.5 \
+        --fail anthropic/claude-sonnet-4
+
+    # then, for the API:
+    OPENROUTER_BASE_URL=http://localhost:8900 OPENROUTER_API_KEY=fake uv run fastapi dev src/__init__.py
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from typing import Dict, Iterable
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+def fake_reply(model: str) -> str:
+    """The canned answer for a model, so callers can tell which model won."""
+    return f"Reply from {model}"
+
+
+def create_app(
+        latencies: Dict[str, float] | None = None,
+        default_latency: float = 0.0,
+        failing_models: Iterable[str] = (),
+) -> FastAPI:
+    """Builds the fake server. Latencies are in seconds, keyed by model name."""
+    latencies = latencies or {}
+    failing = set(failing_models)
+    app = FastAPI(title="Fake LLM server")
+
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "unknown")
+        await asyncio.sleep(latencies.get(model, default_latency))
+
+        if model in failing:
+            return JSONResponse(
+                status_code=500,
+                content={"error": {"message": f"{model} is unavailable", "type": "server_error"}},
+            )
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        content = fake_reply(model)
+        usage = {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+
+        if not body.get("stream"):
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": usage,
+            }
+
+        async def stream():
+            base = {"id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model}
+            for word in content.split(" "):
+                delta = {"role": "assistant", "content": word + " "}
+                yield f"data: {json.dumps({**base, 'choices': [{'index': 0, 'delta': delta, 'finish_reason': None}]})}\n\n"
+            yield f"data: {json.dumps({**base, 'choices': [{'index': 0, 'delta': {}, 'finish_reason': 'stop'}]})}\n\n"
+            if (body.get("stream_options") or {}).get("include_usage"):
+                yield f"data: {json.dumps({**base, 'choices': [], 'usage': usage})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    return app
+
+
+def _parse_latency(value: str) -> tuple[str, float]:
+    model, _, seconds = value.rpartition("=")
+    return model, float(seconds)
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", action="append", type=_parse_latency, default=[],
+                        metavar="MODEL=SECONDS", help="Response delay for a model (repeatable)")
+    parser.add_argument("--default-latency", type=float, default=0.5)
+    parser.add_argument("--fail", action="append", default=[], metavar="MODEL",
+                        help="Model that always answers with HTTP 500 (repeatable)")
+    args = parser.parse_args()
+
+    app = create_app(dict(args.latency), args.default_latency, args.fail)
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
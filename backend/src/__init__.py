@@ -1,10 +1,30 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from src.core.checkpointing import close_checkpointer, init_checkpointer
 from src.core.config import settings
+from src.core.llm import close_llm_clients, init_llm_clients
 from src.api.v1.api import api_router
+from src.services.job_worker import JobWorkerPool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_llm_clients()
+    await init_checkpointer()
+    job_workers = JobWorkerPool(settings.JOB_WORKER_CONCURRENCY) if settings.JOB_WORKERS_IN_API else None
+    if job_workers:
+        await job_workers.start()
+    yield
+    if job_workers:
+        await job_workers.stop()
+    await close_checkpointer()
+    await close_llm_clients()
+
 
-app = FastAPI(title=settings.PROJECT_NAME)
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
 # CORS setup for frontend
 app.add_middleware(
@@ -1,16 +1,19 @@
 import json
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from langchain_core.messages import HumanMessage
-from langchain_openai import ChatOpenAI
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, END
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from src.core.checkpointing import agent_checkpointer
 from src.core.config import settings
+from src.core.llm_routing import get_llm_for_task
 from src.db.session import engine
 from src.schemas.agent_analytics import AnalyticsState, AnalyticsSearchCriteria, CropPrediction
 from src.services.predictive_pricing import PricingAnalyticsService
+from src.services.prompt_compaction import compact_events, compact_json, compact_prompt, rollup_weather
 from src.schemas.pricing_analytics import PricingAnalyticsResult
 from src.tools.weather import fetch_agricultural_weather
 from src.tools.events import search_local_food_events
@@ -110,26 +113,24 @@ async def insight_generation_node(state: AnalyticsState) -> Dict[str, Any]:
     weather = state.weather_data
     events = state.event_data
     
-    llm = ChatOpenAI(
-        model=settings.OPENROUTER_DEFAULT_MODEL,
-        temperature=0.3,
-        openai_api_key=settings.OPENROUTER_API_KEY,
-        base_url=settings.OPENROUTER_BASE_URL
-    )
+    llm = get_llm_for_task("market_insights")
     
-    preds_str = json.dumps([p.model_dump() for p in predictions], indent=2)
+    preds_str = compact_json([p.model_dump() for p in predictions])
+    # Daily rollups instead of 3-hourly forecast entries; a handful of events without links
+    weather_summary = rollup_weather(weather)
+    events_summary = compact_events(events, settings.PROMPT_MAX_EVENTS, settings.PROMPT_EVENT_DESCRIPTION_TOKENS)
     
-    prompt = f"""
+    prompt = compact_prompt(f"""
     You are an Agricultural Market Analyst providing actionable insights for a local farmer.
     
     STATISTICAL PREDICTIONS (95% Confidence Intervals):
     {preds_str}
     
     LOCAL WEATHER TRENDS:
-    {json.dumps(weather) if weather else "N/A"}
+    {compact_json(weather_summary) if weather_summary else "N/A"}
     
     LOCAL EVENTS/FESTIVALS:
-    {json.dumps(events) if events else "N/A"}
+    {compact_json(events_summary) if events_summary else "N/A"}
     
     Create a list of 2-3 plain-language, highly actionable insights. Use the exact statistical data provided.
     For example: "There is a 95% probability that organic zucchini prices will rise by 12% in the next three weeks based on local scarcity."
@@ -141,7 +142,7 @@ async def insight_generation_node(state: AnalyticsState) -> Dict[str, Any]:
       "Insight 1 text...",
       "Insight 2 text..."
     ]
-    """
+    """)
     
     insights = []
     try:
@@ -159,7 +160,7 @@ async def insight_generation_node(state: AnalyticsState) -> Dict[str, Any]:
 
 # --- Graph Construction ---
 
-def build_analytics_graph():
+def build_analytics_graph(checkpointer: Optional[BaseCheckpointSaver] = None):
     workflow = StateGraph(AnalyticsState)
     
     workflow.add_node("start", start_node)
@@ -177,7 +178,7 @@ def build_analytics_graph():
     
     workflow.add_edge("insight_generation", END)
     
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
 
 
-analytics_agent = build_analytics_graph()
+analytics_agent = build_analytics_graph(agent_checkpointer)
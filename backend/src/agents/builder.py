@@ -1,30 +1,49 @@
 import json
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 from langchain_core.messages import HumanMessage
-from langchain_openai import ChatOpenAI
+from langchain_core.runnables.config import ensure_config, merge_configs
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, END
+from langgraph.types import Send
 
+from src.core.checkpointing import agent_checkpointer
 from src.core.config import settings
-from src.schemas.agent_builder import BuilderState, BrandPersona
+from src.core.llm_routing import get_llm_for_task
+from src.schemas.agent_builder import BuilderState, BrandPersona, WebsiteCopy, WebsiteLayout, WebsiteVariantTask
+from src.services.site_templates import PALETTE_COLORS, default_copy, render_site
+from src.services.tailwind_compiler import compile_page
 from src.tools.domain_availability import check_domain_availability
 
 logger = logging.getLogger(__name__)
 
+# Design directions for the parallel layout variants, as (style, direction)
+LAYOUT_STYLES = [
+    ("rustic", "Rustic and warm: earthy palette (greens, browns, cream), serif headings, hand-crafted feel."),
+    ("modern", "Clean and modern: generous whitespace, bold sans-serif type, minimal neutral palette with one accent color."),
+    ("vibrant", "Bold and vibrant: saturated produce-inspired colors, large imagery, playful rounded shapes."),
+]
+
+# Metadata key carried on each variant's LLM call so streamed tokens can be attributed
+LAYOUT_VARIANT_METADATA_KEY = "layout_variant"
+
+
+async def start_node(state: BuilderState) -> Dict[str, Any]:
+    """
+    Dummy entry point to fork parallel execution.
+    """
+    return {}
+
 
 async def generate_persona_node(state: BuilderState) -> Dict[str, Any]:
     """
-    Generates a brand persona based on the farm's story and inventory.
+    Generates a brand persona based on the farm's story and inventory, plus the
+    copy and accent color the template-based landing pages are filled with.
     """
     logger.info("Executing generate_persona_node...")
 
-    llm = ChatOpenAI(
-        model=settings.OPENROUTER_DEFAULT_MODEL,
-        temperature=0.7,
-        openai_api_key=settings.OPENROUTER_API_KEY,
-        base_url=settings.OPENROUTER_BASE_URL
-    )
+    llm = get_llm_for_task("persona")
 
     prompt = f"""
     You are an expert agricultural marketing consultant.
@@ -40,6 +59,9 @@ async def generate_persona_node(state: BuilderState) -> Dict[str, Any]:
     3. Who this farm should be marketing to (target_audience).
     4. The recommended marketing voice, e.g., 'Warm, family-oriented' (tone_and_voice).
     5. A list of 2-3 marketing channels to focus on (recommended_channels).
+    6. Landing page copy in that voice (website_copy): a hero headline of at most 8 words, a one-sentence
+       subheadline, section headings, 2-4 sentences of story text, a 2-4 word call-to-action button label,
+       and an accent color, one of: {", ".join(PALETTE_COLORS)}.
 
     Return ONLY a valid JSON object matching this schema:
     {{
@@ -47,7 +69,16 @@ async def generate_persona_node(state: BuilderState) -> Dict[str, Any]:
         "tagline": "string",
         "target_audience": "string",
         "tone_and_voice": "string",
-        "recommended_channels": ["string", "string"]
+        "recommended_channels": ["string", "string"],
+        "website_copy": {{
+            "headline": "string",
+            "subheadline": "string",
+            "about_heading": "string",
+            "about_text": "string",
+            "products_heading": "string",
+            "call_to_action": "string",
+            "accent_color": "string"
+        }}
     }}
     """
 
@@ -55,8 +86,14 @@ async def generate_persona_node(state: BuilderState) -> Dict[str, Any]:
         response = await llm.ainvoke([HumanMessage(content=prompt)])
         content = response.content.replace("```json", "").replace("```", "").strip()
         persona_dict = json.loads(content)
+        copy_dict = persona_dict.pop("website_copy", None)
         persona = BrandPersona(**persona_dict)
-        return {"brand_persona": persona}
+        try:
+            website_copy = WebsiteCopy(**copy_dict)
+        except (TypeError, ValueError):
+            logger.warning("Persona response had no usable website_copy; deriving it from the persona")
+            website_copy = default_copy(state.farm_name, persona, state.farm_story)
+        return {"brand_persona": persona, "website_copy": website_copy}
     except Exception as e:
         logger.error(f"Error generating persona: {e}")
         # Return a fallback persona
@@ -67,16 +104,17 @@ async def generate_persona_node(state: BuilderState) -> Dict[str, Any]:
             tone_and_voice="Friendly and authentic",
             recommended_channels=["Local Farmers Market"]
         )
-        return {"brand_persona": fallback}
+        return {"brand_persona": fallback, "website_copy": default_copy(state.farm_name, fallback, state.farm_story)}
 
 
 async def propose_domains_node(state: BuilderState) -> Dict[str, Any]:
     """
-    Suggests available domain names based on the farm name and tagline.
+    Suggests available domain names based on the farm name and what it sells.
+    Runs in parallel with generate_persona, so it cannot use the tagline.
     """
     logger.info("Executing propose_domains_node...")
     
-    farm_desc = state.brand_persona.tagline if state.brand_persona else "Local farm"
+    farm_desc = state.inventory_data or "Local farm"
     
     # Tool returns a JSON string
     result_str = await check_domain_availability.ainvoke({
@@ -108,18 +146,56 @@ async def propose_domains_node(state: BuilderState) -> Dict[str, Any]:
     return {"suggested_domains": suggested}
 
 
-async def generate_website_node(state: BuilderState) -> Dict[str, Any]:
+def fan_out_layouts(state: BuilderState) -> List[Send]:
+    """
+    Sends one generate_website task per design variant once the persona is ready.
+    """
+    return [
+        Send("generate_website", WebsiteVariantTask(
+            farm_name=state.farm_name,
+            farm_story=state.farm_story,
+            inventory_data=state.inventory_data,
+            brand_persona=state.brand_persona,
+            website_copy=state.website_copy,
+            website_mode=state.website_mode,
+            variant=i,
+            style=LAYOUT_STYLES[i % len(LAYOUT_STYLES)][0],
+            style_direction=LAYOUT_STYLES[i % len(LAYOUT_STYLES)][1],
+        ))
+        for i in range(max(1, settings.BUILDER_LAYOUT_VARIANTS))
+    ]
+
+
+def _layout(state: WebsiteVariantTask, mode: str, html: str) -> WebsiteLayout:
     """
-    Generates a complete HTML + Tailwind CSS landing page for the farm.
+    Wraps a generated page, replacing the Tailwind CDN script with a compiled stylesheet.
     """
-    logger.info("Executing generate_website_node...")
+    page_weight = None
+    if settings.BUILDER_COMPILE_TAILWIND:
+        html, page_weight = compile_page(html)
+        if page_weight.unresolved_classes:
+            logger.warning(
+                f"Variant {state.variant}: kept the Tailwind CDN, no CSS for classes {page_weight.unresolved_classes}"
+            )
+    return WebsiteLayout(variant=state.variant, style=state.style, mode=mode, html=html, page_weight=page_weight)
 
-    llm = ChatOpenAI(
-        model="anthropic/claude-sonnet-4",
-        temperature=0.2, # Lower temperature for code generation
-        openai_api_key=settings.OPENROUTER_API_KEY,
-        base_url=settings.OPENROUTER_BASE_URL
-    )
+
+async def generate_website_node(state: WebsiteVariantTask) -> Dict[str, Any]:
+    """
+    Generates one complete HTML + Tailwind CSS landing page design variant for the farm.
+
+    In "template" mode the page is rendered locally from pre-built sections and
+    the persona's copy; "llm" mode (premium) has the LLM write the whole page.
+    """
+    logger.info(f"Executing generate_website_node (variant {state.variant}: {state.style}, {state.website_mode})...")
+
+    if state.website_mode == "template":
+        website_copy = state.website_copy or default_copy(state.farm_name, state.brand_persona, state.farm_story)
+        tagline = state.brand_persona.tagline if state.brand_persona else ""
+        html = render_site(state.farm_name, website_copy, state.inventory_data, state.style, tagline)
+        return {"website_layouts": [_layout(state, "template", html)]}
+
+    llm = get_llm_for_task("website_generation")
 
     persona = state.brand_persona
 
@@ -139,14 +215,19 @@ async def generate_website_node(state: BuilderState) -> Dict[str, Any]:
     2. Include the Tailwind CSS CDN via <script src="https://cdn.tailwindcss.com"></script> in the <head>.
     3. Create a beautiful, modern, responsive landing page using only plain HTML and Tailwind CSS classes.
     4. Include sections for: Hero, About Us (Story), Our Inventory (Products), and a Contact/Footer.
+       Mark each one's outermost element with data-section="hero", "story", "inventory" or "contact" so it can be edited on its own.
     5. Use placeholder images via `https://placehold.co/600x400` or similar reliable services, styled beautifully.
     6. Use inline SVG icons where needed. Do NOT use any JavaScript frameworks or external libraries besides Tailwind.
-    7. Ensure the design matches the requested "Voice/Tone" (e.g. rustic, modern, boutique).
+    7. Ensure the design matches the requested "Voice/Tone" and this design direction: {state.style_direction}
     8. Return ONLY the raw HTML. Do NOT wrap it in markdown code fences.
     """
 
     try:
-        response = await llm.ainvoke([HumanMessage(content=prompt)])
+        response = await llm.ainvoke(
+            [HumanMessage(content=prompt)],
+            # Merged into the run's config: its priority, farm and run ID still apply
+            config=merge_configs(ensure_config(), {"metadata": {LAYOUT_VARIANT_METADATA_KEY: state.variant}}),
+        )
         # Clean up any markdown formatting just in case the LLM ignores instructions
         content = response.content
         if content.startswith("```"):
@@ -157,33 +238,40 @@ async def generate_website_node(state: BuilderState) -> Dict[str, Any]:
                 lines = lines[:-1]
             content = "\n".join(lines)
 
-        return {"website_layouts": [content]}
+        return {"website_layouts": [_layout(state, "llm", content)]}
     except Exception as e:
-        logger.error(f"Error generating website: {e}")
+        logger.error(f"Error generating website variant {state.variant}: {e}")
         # Minimal fallback
         fallback = """<!DOCTYPE html>
 <html><head><meta charset="UTF-8"><script src="https://cdn.tailwindcss.com"></script></head>
 <body><div class="p-8 text-center text-red-500">Error generating layout. Please try again.</div></body></html>"""
-        return {"website_layouts": [fallback]}
+        return {"website_layouts": [_layout(state, "llm", fallback)]}
 
 
 # --- Graph Construction ---
 
-def build_builder_graph():
+def build_builder_graph(checkpointer: Optional[BaseCheckpointSaver] = None):
     workflow = StateGraph(BuilderState)
 
+    workflow.add_node("start", start_node)
     workflow.add_node("generate_persona", generate_persona_node)
     workflow.add_node("propose_domains", propose_domains_node)
-    workflow.add_node("generate_website", generate_website_node)
+    workflow.add_node("generate_website", generate_website_node, input_schema=WebsiteVariantTask)
+
+    workflow.set_entry_point("start")
+
+    # Domains only need the farm name, so they overlap with persona generation
+    workflow.add_edge("start", "generate_persona")
+    workflow.add_edge("start", "propose_domains")
 
-    workflow.set_entry_point("generate_persona")
+    # N layout variants are generated concurrently once the persona is ready
+    workflow.add_conditional_edges("generate_persona", fan_out_layouts, ["generate_website"])
 
-    workflow.add_edge("generate_persona", "propose_domains")
-    workflow.add_edge("propose_domains", "generate_website")
+    workflow.add_edge("propose_domains", END)
     workflow.add_edge("generate_website", END)
 
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
 
 
 # For easy import and running
-builder_agent = build_builder_graph()
+builder_agent = build_builder_graph(agent_checkpointer)
@@ -9,14 +9,16 @@ Pipeline:
 
 import logging
 from datetime import date
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict, Field
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, END
 from sqlalchemy import text
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from src.core.checkpointing import agent_checkpointer
 from src.db.session import engine
 from src.schemas.market_news import MarketPriceResult
 from src.tools.market_news import fetch_usda_ams_pricing
@@ -155,7 +157,7 @@ async def trigger_analytics_node(state: IngestionState) -> Dict[str, Any]:
 
 # --- Graph Construction ---
 
-def build_ingestion_graph():
+def build_ingestion_graph(checkpointer: Optional[BaseCheckpointSaver] = None):
     workflow = StateGraph(IngestionState)
 
     workflow.add_node("fetch_pricing", fetch_pricing_node)
@@ -167,7 +169,7 @@ def build_ingestion_graph():
     workflow.add_edge("persist_pricing", "trigger_analytics")
     workflow.add_edge("trigger_analytics", END)
 
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
 
 
-data_ingestion_agent = build_ingestion_graph()
+data_ingestion_agent = build_ingestion_graph(agent_checkpointer)
@@ -1,24 +1,84 @@
+import asyncio
 import json
 import logging
-from typing import List, Dict, Any
+import re
+import weakref
+from typing import List, Dict, Any, Optional, Union
 
 from langchain_core.messages import HumanMessage
-from langchain_openai import ChatOpenAI
+from langchain_core.runnables import Runnable
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.config import get_stream_writer
 from langgraph.graph import StateGraph, END
+from langgraph.types import Send
 
+from src.core.checkpointing import agent_checkpointer
 from src.core.config import settings
-from src.schemas.agent_discovery import DiscoveryState, CompetitorFarm, DiscoverySearchCriteria
+from src.core.deadline import BudgetExhausted, run_deadline, within_budget
+from src.core.llm_routing import get_llm_for_task
+from src.schemas.agent_discovery import (
+    CompetitorFarm,
+    CompetitorPipelineInput,
+    CompetitorPipelineOutput,
+    DiscoveryArtifacts,
+    DiscoverySearchCriteria,
+    DiscoveryState,
+    PlaceLookupTask,
+    ScoringBatchTask,
+    SiteAuditTask,
+    places_key,
+)
+from src.schemas.google_places import NearbyBusiness
 from src.tools.google_places_api import search_nearby_businesses
 from src.tools.usda_api import search_all_local_food, FarmersMarketSearchResult, CSASearchResult
 from src.tools.web_scraper import analyze_website_visuals
-from src.tools.competitor_analysis import analyze_competitor_gap
+from src.tools.competitor_analysis import MAX_GAP_COMPETITORS, competitor_profile, gap_report_result, generate_gap_report
 from src.tools.seo_tools import fetch_local_seo_keywords
 
 logger = logging.getLogger(__name__)
 
 
+def _emit(event: str, **data: Any) -> None:
+    """
+    Progress event for clients streaming the run ("custom" stream mode, see
+    ``src.services.agent_runs.stream_discovery``); a no-op otherwise.
+    """
+    get_stream_writer()({"event": event, **data})
+
+
+# Per event loop: asyncio primitives must not be shared across loops
+_audit_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+_lookup_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def _audit_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    if loop not in _audit_slots:
+        _audit_slots[loop] = asyncio.Semaphore(settings.DISCOVERY_MAX_CONCURRENT_AUDITS)
+    return _audit_slots[loop]
+
+
+def _lookup_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    if loop not in _lookup_slots:
+        _lookup_slots[loop] = asyncio.Semaphore(settings.DISCOVERY_MAX_CONCURRENT_LOOKUPS)
+    return _lookup_slots[loop]
+
+
+def is_own_listing(farm_name: str, listing_name: str) -> bool:
+    """Whether a listing is the searching farm's own; an empty farm name (a regional search) owns none."""
+    return bool(farm_name) and farm_name.lower() in listing_name.lower()
+
+
 # --- Nodes ---
 
+async def start_discovery_node(state: DiscoveryState) -> Dict[str, Any]:
+    """
+    Dummy entry point to fork the competitor pipeline and the SEO report.
+    """
+    return {}
+
+
 async def search_usda_node(state: DiscoveryState) -> Dict[str, Any]:
     """
     Queries the USDA API to find local farms to treat as competitors.
@@ -41,7 +101,7 @@ async def search_usda_node(state: DiscoveryState) -> Dict[str, Any]:
     results = await search_all_local_food.ainvoke({
         "zip_code": zip_code,
         "state": state_code,
-        "radius_miles": 20
+        "radius_miles": criteria.radius_miles
     })
 
     raw_competitors: List[CompetitorFarm] = []
@@ -51,7 +111,7 @@ async def search_usda_node(state: DiscoveryState) -> Dict[str, Any]:
     if isinstance(fm_result, FarmersMarketSearchResult):
         for listing in fm_result.listings:
             name = listing.listing_name or "Unknown"
-            if farm_name.lower() not in name.lower():
+            if not is_own_listing(farm_name, name):
                 raw_competitors.append(CompetitorFarm(
                     farm_name=name,
                     location_state=state_code or "Unknown", 
@@ -64,7 +124,7 @@ async def search_usda_node(state: DiscoveryState) -> Dict[str, Any]:
     if isinstance(csa_result, CSASearchResult):
         for listing in csa_result.listings:
             name = listing.listing_name or "Unknown"
-            if farm_name.lower() not in name.lower():
+            if not is_own_listing(farm_name, name):
                 raw_competitors.append(CompetitorFarm(
                     farm_name=name,
                     location_state=state_code or "Unknown",
@@ -73,116 +133,315 @@ async def search_usda_node(state: DiscoveryState) -> Dict[str, Any]:
                 ))
 
     logger.info(f"Found {len(raw_competitors)} raw competitors from USDA.")
+    _emit("competitors_found", count=len(raw_competitors))
     return {"raw_competitors": raw_competitors}
 
 
-async def enrich_competitors_node(state: DiscoveryState) -> Dict[str, Any]:
-    """
-    Query Google Places to find the competitor's official business listing and website.
-    """
-    logger.info("Executing enrich_competitors_node...")
-    raw_competitors = state.raw_competitors
-    enriched_competitors: List[CompetitorFarm] = []
+def places_location(comp: CompetitorFarm) -> str:
+    return comp.location_zip if comp.location_zip != "Unknown" else f"{comp.location_state}, USA"
 
-    for comp in raw_competitors:
-        query = comp.farm_name
-        location = comp.location_zip if comp.location_zip != "Unknown" else f"{comp.location_state}, USA"
 
-        try:
+def fan_out_place_lookups(state: DiscoveryState) -> Union[List[Send], str]:
+    """
+    Sends one lookup_place task per distinct Places query not already in the
+    run's artifacts. Each lookup is checkpointed as it completes, so a resumed
+    run only repeats the lookups that had not finished.
+    """
+    tasks: Dict[str, PlaceLookupTask] = {}
+    for comp in state.raw_competitors:
+        location = places_location(comp)
+        key = places_key(comp.farm_name, location)
+        if key not in state.artifacts.places and key not in tasks:
+            tasks[key] = PlaceLookupTask(query=comp.farm_name, location=location)
+    if not tasks:
+        return "enrich_competitors"
+    return [Send("lookup_place", task) for task in tasks.values()]
+
+
+async def lookup_place_node(task: PlaceLookupTask) -> Dict[str, Any]:
+    """
+    Query Google Places to find one competitor's official business listing and website.
+    Lookups run concurrently, capped at DISCOVERY_MAX_CONCURRENT_LOOKUPS per process.
+    """
+    try:
+        async with _lookup_semaphore():
             result = await search_nearby_businesses.ainvoke({
-                "location": location,
-                "query": query,
+                "location": task.location,
+                "query": task.query,
                 "radius_meters": 5000, 
                 "max_results": 1
             })
+    except Exception as e:
+        logger.error(f"Error enriching competitor {task.query}: {e}")
+        return {}
 
-            if result.businesses:
-                match = result.businesses[0]
-                comp.google_places_id = match.place_id
-                comp.website_url = match.website
-                logger.info(f"Matched competitor '{comp.farm_name}' to '{match.name}'")
-            else:
-                logger.info(f"No Google Place found for '{comp.farm_name}'")
+    match = result.businesses[0] if result.businesses else None
+    return {"artifacts": DiscoveryArtifacts(places={places_key(task.query, task.location): match})}
 
-        except Exception as e:
-            logger.error(f"Error enriching competitor {comp.farm_name}: {e}")
+
+async def enrich_competitors_node(state: DiscoveryState) -> Dict[str, Any]:
+    """
+    Attach the Places listings (recorded in the run's artifacts for the market
+    gap analysis) to copies of the raw competitors.
+    """
+    logger.info("Executing enrich_competitors_node...")
+    enriched_competitors: List[CompetitorFarm] = []
+
+    for comp in state.raw_competitors:
+        match = state.artifacts.places.get(places_key(comp.farm_name, places_location(comp)))
+        if match:
+            comp = comp.model_copy(update={"google_places_id": match.place_id, "website_url": match.website})
+            logger.info(f"Matched competitor '{comp.farm_name}' to '{match.name}'")
+        else:
+            logger.info(f"No Google Place found for '{comp.farm_name}'")
 
         enriched_competitors.append(comp)
+        _emit("competitor", competitor=comp.model_dump())
 
     return {"enriched_competitors": enriched_competitors}
 
 
-async def audit_competitors_node(state: DiscoveryState) -> Dict[str, Any]:
+def _clean_llm_json(content: str) -> str:
+    return content.replace("```json", "").replace("```", "").strip()
+
+
+def _coerce_score(item: Any) -> tuple[int, str] | None:
+    """Validates one {"score", "summary"} object from the LLM; None if unusable."""
+    if not isinstance(item, dict):
+        return None
+    try:
+        score = int(item["score"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    return max(0, min(100, score)), str(item.get("summary") or "Analyzed via AI.")
+
+
+def _parse_batch_scores(content: str) -> Dict[int, tuple[int, str]]:
     """
-    Perform a visual/technical audit to assign a health score to the competitors.
+    Parses a batch scoring response into {competitor id: (score, summary)}.
+    Falls back to salvaging individual objects when the array as a whole is malformed,
+    so one bad entry does not discard the rest of the batch.
     """
-    logger.info("Executing audit_competitors_node...")
-    enriched_competitors = state.enriched_competitors
-    audited_competitors: List[CompetitorFarm] = []
+    try:
+        parsed = json.loads(content)
+        items = parsed if isinstance(parsed, list) else [parsed]
+    except json.JSONDecodeError:
+        items = []
+        for fragment in re.findall(r"\{[^{}]*\}", content):
+            try:
+                items.append(json.loads(fragment))
+            except json.JSONDecodeError:
+                continue
+
+    scores: Dict[int, tuple[int, str]] = {}
+    for item in items:
+        coerced = _coerce_score(item)
+        if coerced is None:
+            continue
+        try:
+            scores[int(item["id"])] = coerced
+        except (KeyError, TypeError, ValueError):
+            continue
+    return scores
+
+
+async def _score_competitor(llm: Runnable, analysis_result: str) -> tuple[int, str]:
+    """Scores a single competitor; used as the per-item fallback for batch scoring."""
+    scoring_prompt = f"""
+    You are a Digital Health Auditor analyzing a competitor farm's website.
+    
+    Visual Analysis:
+    "{analysis_result}"
+    
+    Assign a "Digital Health Score" from 0 to 100 for this competitor.
+    - 90-100: Excellent, modern, mobile-responsive, clear CTA.
+    - 50-89: Functional but dated or minor issues.
+    - 0-49: Broken, non-responsive, missing critical info, or extremely ugly.
+    
+    Return ONLY a valid JSON object:
+    {{
+        "score": <int>,
+        "summary": "<one sentence summary of the competitor's web presence>"
+    }}
+    """
+
+    try:
+        response = await llm.ainvoke([HumanMessage(content=scoring_prompt)])
+        coerced = _coerce_score(json.loads(_clean_llm_json(response.content)))
+    except BudgetExhausted:
+        raise
+    except Exception as e:
+        logger.warning(f"Single competitor scoring failed: {e}")
+        coerced = None
+
+    return coerced or (50, "Error parsing AI score.")
 
-    llm = ChatOpenAI(
-        model=settings.OPENROUTER_DEFAULT_MODEL,
-        temperature=0,
-        openai_api_key=settings.OPENROUTER_API_KEY,
-        base_url=settings.OPENROUTER_BASE_URL
+
+async def _score_competitors_batch(llm: Runnable, analyses: List[str]) -> List[tuple[int, str]]:
+    """
+    Scores many competitors in one structured LLM call. Entries missing from
+    (or unparseable in) the response are re-scored individually.
+    """
+    competitors_block = "\n".join(
+        f'{{"id": {i}, "visual_analysis": {json.dumps(analysis)}}}' for i, analysis in enumerate(analyses)
     )
+    batch_prompt = f"""
+    You are a Digital Health Auditor analyzing competitor farm websites.
+    
+    Competitors (one JSON object per line):
+    {competitors_block}
+    
+    Assign each competitor a "Digital Health Score" from 0 to 100.
+    - 90-100: Excellent, modern, mobile-responsive, clear CTA.
+    - 50-89: Functional but dated or minor issues.
+    - 0-49: Broken, non-responsive, missing critical info, or extremely ugly.
+    
+    Return ONLY a valid JSON array with exactly one object per competitor id:
+    [
+        {{"id": <int>, "score": <int>, "summary": "<one sentence summary of the competitor's web presence>"}}
+    ]
+    """
 
-    for comp in enriched_competitors:
-        url = comp.website_url
+    scores: Dict[int, tuple[int, str]] = {}
+    try:
+        response = await llm.ainvoke([HumanMessage(content=batch_prompt)])
+        scores = _parse_batch_scores(_clean_llm_json(response.content))
+    except BudgetExhausted:
+        raise
+    except Exception as e:
+        logger.error(f"Batch competitor scoring failed: {e}")
 
-        if not url:
-            comp.digital_health_score = 10
-            comp.audit_notes = "No website detected. Strong opportunity to outcompete digitally."
-            audited_competitors.append(comp)
-            continue
+    missing = [i for i in range(len(analyses)) if i not in scores]
+    if missing:
+        logger.info(f"Re-scoring {len(missing)}/{len(analyses)} competitors individually.")
+        for i in missing:
+            scores[i] = await _score_competitor(llm, analyses[i])
 
-        try:
-            analysis_result = await analyze_website_visuals.ainvoke({"url": url})
-
-            scoring_prompt = f"""
-            You are a Digital Health Auditor analyzing a competitor farm's website.
-            
-            Visual Analysis:
-            "{analysis_result}"
-            
-            Assign a "Digital Health Score" from 0 to 100 for this competitor.
-            - 90-100: Excellent, modern, mobile-responsive, clear CTA.
-            - 50-89: Functional but dated or minor issues.
-            - 0-49: Broken, non-responsive, missing critical info, or extremely ugly.
-            
-            Return ONLY a valid JSON object:
-            {{
-                "score": <int>,
-                "summary": "<one sentence summary of the competitor's web presence>"
-            }}
-            """
-
-            response = await llm.ainvoke([HumanMessage(content=scoring_prompt)])
-            content = response.content.replace("```json", "").replace("```", "").strip()
+    return [scores[i] for i in range(len(analyses))]
 
-            try:
-                score_data = json.loads(content)
-                comp.digital_health_score = score_data.get("score", 50)
-                comp.audit_notes = score_data.get("summary", "Analyzed via AI.")
-            except json.JSONDecodeError:
-                comp.digital_health_score = 50 
-                comp.audit_notes = "Error parsing AI score."
 
-        except Exception as e:
-            logger.error(f"Error auditing {url}: {e}")
-            comp.digital_health_score = 20 
-            comp.audit_notes = f"Audit failed: {str(e)}"
+def fan_out_site_audits(state: DiscoveryState) -> Union[List[Send], str]:
+    """
+    Sends one audit_site task per competitor website not analyzed yet; listings
+    sharing a site share the analysis.
+    """
+    artifacts = state.artifacts
+    urls = dict.fromkeys(
+        comp.website_url for comp in state.enriched_competitors
+        if comp.website_url
+        and comp.website_url not in artifacts.visual_analyses
+        and comp.website_url not in artifacts.audit_failures
+    )
+    if not urls:
+        return "collect_audits"
+    return [Send("audit_site", SiteAuditTask(url=url)) for url in urls]
+
+
+async def audit_site_node(task: SiteAuditTask) -> Dict[str, Any]:
+    """
+    Visual analysis of one competitor website's screenshot, within
+    DISCOVERY_SITE_AUDIT_DEADLINE_SECONDS and the run's time budget: a site
+    that hangs is skipped rather than holding up the run. Audits run
+    concurrently, capped at DISCOVERY_MAX_CONCURRENT_AUDITS per process; a
+    site's deadline starts once it has a slot.
+    """
+    try:
+        async with _audit_semaphore():
+            with run_deadline(settings.DISCOVERY_SITE_AUDIT_DEADLINE_SECONDS):
+                analysis = await within_budget(analyze_website_visuals.ainvoke({"url": task.url}))
+    except BudgetExhausted as e:
+        logger.warning(f"Skipped audit of {task.url}: {e}")
+        _emit("site_audit_skipped", url=task.url, reason=str(e))
+        return {"artifacts": DiscoveryArtifacts(skipped_audits={task.url: str(e)})}
+    except Exception as e:
+        logger.error(f"Error auditing {task.url}: {e}")
+        _emit("site_audit_failed", url=task.url, error=str(e))
+        return {"artifacts": DiscoveryArtifacts(audit_failures={task.url: str(e)})}
+    return {"artifacts": DiscoveryArtifacts(visual_analyses={task.url: analysis})}
+
+
+async def collect_audits_node(state: DiscoveryState) -> Dict[str, Any]:
+    """
+    Join point: runs once every audit_site branch is done.
+    """
+    return {}
+
+
+def fan_out_scoring(state: DiscoveryState) -> Union[List[Send], str]:
+    """
+    Sends the analyzed websites not scored yet to score_batch, in batches of
+    DISCOVERY_SCORING_BATCH_SIZE per LLM call.
+    """
+    artifacts = state.artifacts
+    urls = [url for url in artifacts.visual_analyses if url not in artifacts.site_scores]
+    if not urls:
+        return "audit_competitors"
+    batch_size = max(1, settings.DISCOVERY_SCORING_BATCH_SIZE)
+    return [
+        Send("score_batch", ScoringBatchTask(
+            urls=urls[start:start + batch_size],
+            analyses=[artifacts.visual_analyses[url] for url in urls[start:start + batch_size]],
+        ))
+        for start in range(0, len(urls), batch_size)
+    ]
+
+
+async def score_batch_node(task: ScoringBatchTask) -> Dict[str, Any]:
+    """
+    Scores one batch of visual analyses in a single LLM round trip.
+    """
+    llm = get_llm_for_task("competitor_scoring")
+    try:
+        results = await _score_competitors_batch(llm, task.analyses)
+    except BudgetExhausted as e:
+        logger.warning(f"Skipped scoring of {len(task.urls)} websites: {e}")
+        for url in task.urls:
+            _emit("site_audit_skipped", url=url, reason=str(e))
+        return {"artifacts": DiscoveryArtifacts(skipped_audits={url: str(e) for url in task.urls})}
+    for url, (score, summary) in zip(task.urls, results):
+        _emit("site_scored", url=url, digital_health_score=score, audit_notes=summary)
+    return {"artifacts": DiscoveryArtifacts(site_scores=dict(zip(task.urls, results)))}
+
+
+def _audit(comp: CompetitorFarm, score: Optional[int], notes: str) -> CompetitorFarm:
+    return comp.model_copy(update={"digital_health_score": score, "audit_notes": notes})
+
+
+async def audit_competitors_node(state: DiscoveryState) -> Dict[str, Any]:
+    """
+    Assign each competitor (a copy) the digital health score of its website.
+    """
+    logger.info("Executing audit_competitors_node...")
+    artifacts = state.artifacts
+    audited_competitors: List[CompetitorFarm] = []
+    skipped = set()
+
+    for comp in state.enriched_competitors:
+        url = comp.website_url
 
+        if not url:
+            comp = _audit(comp, 10, "No website detected. Strong opportunity to outcompete digitally.")
+        elif url in artifacts.site_scores:
+            comp = _audit(comp, *artifacts.site_scores[url])
+        elif url in artifacts.skipped_audits:
+            # Unscored rather than scored as broken: the site may be fine
+            comp = _audit(comp, None, "Audit skipped: ran out of time.")
+            skipped.add(url)
+        else:
+            comp = _audit(comp, 20, f"Audit failed: {artifacts.audit_failures.get(url, 'no analysis')}")
         audited_competitors.append(comp)
 
-    return {"audited_competitors": audited_competitors}
+    update: Dict[str, Any] = {"audited_competitors": audited_competitors}
+    if skipped:
+        update["errors"] = [f"Audit skipped for {len(skipped)} websites: out of time"]
+    return update
 
 
 async def market_gap_node(state: DiscoveryState) -> Dict[str, Any]:
     """
-    Executes the analyze_competitor_gap tool to find positioning advantages.
-    Requires lat/long, which we'll derive from the farmer's zip or Google Places.
-    For simplicity in this node, we use a central zip-based approximation.
+    Finds positioning advantages against the audited competitors. Reuses the
+    Places listings and website analyses the competitor pipeline stored in the
+    run's artifacts instead of searching and scraping again.
     """
     logger.info("Executing market_gap_node...")
     criteria_input = state.search_criteria
@@ -190,43 +449,35 @@ async def market_gap_node(state: DiscoveryState) -> Dict[str, Any]:
         criteria = DiscoverySearchCriteria(**criteria_input)
     else:
         criteria = criteria_input
-        
-    # In a fully complete system, we might Geocode the zip code first.
-    # For now, we will pass approximate coordinates or rely on the tool's 
-    # internal handling (if it supports text search). The competitor tool 
-    # currently takes strict lat/long. 
-    # We will query Google Places once to get the user's lat/long based on their zip code.
-    
-    lat, lng = 0.0, 0.0
+
+    artifacts = state.artifacts
+    profiles = []
+    seen_places = set()
+    for comp in state.audited_competitors:
+        business = artifacts.places.get(places_key(comp.farm_name, places_location(comp)))
+        if business is None or business.place_id in seen_places or criteria.farm_name.lower() in business.name.lower():
+            continue
+        seen_places.add(business.place_id)
+        profile = competitor_profile(
+            business, criteria.farm_offerings, artifacts.visual_analyses.get(comp.website_url or "")
+        )
+        if comp.digital_health_score is not None:
+            profile["digital_health_score"] = comp.digital_health_score
+            profile["audit_notes"] = comp.audit_notes
+        profiles.append(profile)
+        if len(profiles) == MAX_GAP_COMPETITORS:
+            break
+
+    if not profiles:
+        return {"market_gap_report": {"status": "success", "message": "No other local competitors found."}}
+
     try:
-        # HACK: Use our own Google places tool to geocode the zip code
-        zip_res = await search_nearby_businesses.ainvoke({
-            "location": f"{criteria.zip_code} USA",
-            "query": "center",
-            "radius_meters": 1000,
-            "max_results": 1
-        })
-        if zip_res.businesses and zip_res.businesses[0].location:
-            loc = zip_res.businesses[0].location
-            lat = loc.get("lat", 0.0)
-            lng = loc.get("lng", 0.0)
+        report = await generate_gap_report(criteria.farm_name, criteria.farm_offerings, profiles)
     except Exception as e:
-        logger.warning(f"Failed to geocode zip code for market gap analysis: {e}")
-    
-    gap_report = None
-    if lat and lng:
-        try:
-            report_raw = await analyze_competitor_gap.ainvoke({
-                "latitude": lat,
-                "longitude": lng,
-                "farm_name": criteria.farm_name,
-                "farm_offerings": criteria.farm_offerings
-            })
-            gap_report = json.loads(report_raw)
-        except Exception as e:
-            logger.error(f"Market gap analysis failed: {e}")
-            
-    return {"market_gap_report": gap_report}
+        logger.error(f"Market gap analysis failed: {e}")
+        return {"market_gap_report": None, "errors": [f"Market gap analysis failed: {e}"]}
+
+    return {"market_gap_report": json.loads(gap_report_result(criteria.farm_name, profiles, report))}
 
 
 async def generate_seo_node(state: DiscoveryState) -> Dict[str, Any]:
@@ -243,38 +494,95 @@ async def generate_seo_node(state: DiscoveryState) -> Dict[str, Any]:
     seo_report = None
     try:
         seo_raw = await fetch_local_seo_keywords.ainvoke({
-            "zip_code": criteria.zip_code,
+            # A state-wide search has no zip code: localize to the state
+            "zip_code": criteria.zip_code or criteria.state,
             "farm_type": criteria.farm_offerings
         })
         seo_report = json.loads(seo_raw)
     except Exception as e:
         logger.error(f"SEO Generation failed: {e}")
+        return {"seo_report": None, "errors": [f"SEO generation failed: {e}"]}
 
     return {"seo_report": seo_report}
 
 
-# --- Graph Construction ---
+async def finish_discovery_node(state: DiscoveryState) -> Dict[str, Any]:
+    """
+    Join point: runs once the competitor pipeline and both reports are done.
+    """
+    logger.info(
+        f"Discovery finished: {len(state.audited_competitors)} audited competitors, "
+        f"{len(state.errors)} errors."
+    )
+    return {}
 
-def build_discovery_graph():
-    workflow = StateGraph(DiscoveryState)
 
-    workflow.add_node("search_usda", search_usda_node)
+# --- Graph Construction ---
+
+def add_audit_steps(workflow: StateGraph, after: str) -> None:
+    """
+    Adds the steps from the raw competitors, written by node ``after``, to
+    the audited ones: Places lookups, site audits and scoring batches, fanned
+    out as one task each (with a checkpointer, a resumed run keeps the
+    finished ones), ending at audit_competitors.
+    """
+    workflow.add_node("lookup_place", lookup_place_node, input_schema=PlaceLookupTask)
     workflow.add_node("enrich_competitors", enrich_competitors_node)
+    workflow.add_node("audit_site", audit_site_node, input_schema=SiteAuditTask)
+    workflow.add_node("collect_audits", collect_audits_node)
+    workflow.add_node("score_batch", score_batch_node, input_schema=ScoringBatchTask)
     workflow.add_node("audit_competitors", audit_competitors_node)
+
+    workflow.add_conditional_edges(after, fan_out_place_lookups, ["lookup_place", "enrich_competitors"])
+    workflow.add_edge("lookup_place", "enrich_competitors")
+    workflow.add_conditional_edges("enrich_competitors", fan_out_site_audits, ["audit_site", "collect_audits"])
+    workflow.add_edge("audit_site", "collect_audits")
+    workflow.add_conditional_edges("collect_audits", fan_out_scoring, ["score_batch", "audit_competitors"])
+    workflow.add_edge("score_batch", "audit_competitors")
+
+
+def build_competitor_pipeline():
+    """
+    search_usda -> enrich -> audit as one subgraph, so the whole chain runs as
+    a single branch of the discovery graph. As separate nodes of the outer
+    graph, each step would wait for the slowest parallel report at every
+    superstep boundary.
+    """
+    workflow = StateGraph(
+        DiscoveryState, input_schema=CompetitorPipelineInput, output_schema=CompetitorPipelineOutput
+    )
+
+    workflow.add_node("search_usda", search_usda_node)
+    workflow.set_entry_point("search_usda")
+    add_audit_steps(workflow, after="search_usda")
+    workflow.add_edge("audit_competitors", END)
+
+    # Inherits the discovery graph's checkpointer
+    return workflow.compile()
+
+
+def build_discovery_graph(checkpointer: Optional[BaseCheckpointSaver] = None):
+    workflow = StateGraph(DiscoveryState)
+
+    workflow.add_node("start", start_discovery_node)
+    workflow.add_node("competitors", build_competitor_pipeline())
     workflow.add_node("market_gap", market_gap_node)
     workflow.add_node("generate_seo", generate_seo_node)
+    workflow.add_node("finish", finish_discovery_node)
 
-    workflow.set_entry_point("search_usda")
+    workflow.set_entry_point("start")
 
-    workflow.add_edge("search_usda", "enrich_competitors")
-    workflow.add_edge("enrich_competitors", "audit_competitors")
-    
-    # We can run these in sequence after the audit
-    workflow.add_edge("audit_competitors", "market_gap")
-    workflow.add_edge("market_gap", "generate_seo")
-    workflow.add_edge("generate_seo", END)
+    # SEO only needs the search criteria, so it runs alongside the competitor
+    # pipeline. The market gap analysis reuses the pipeline's artifacts.
+    workflow.add_edge("start", "competitors")
+    workflow.add_edge("start", "generate_seo")
+    workflow.add_edge("competitors", "market_gap")
 
-    return workflow.compile()
+    # Wait for both branches
+    workflow.add_edge(["market_gap", "generate_seo"], "finish")
+    workflow.add_edge("finish", END)
+
+    return workflow.compile(checkpointer=checkpointer)
 
 
-discovery_agent = build_discovery_graph()
+discovery_agent = build_discovery_graph(agent_checkpointer)
@@ -0,0 +1,246 @@
+"""
+Batch discovery for many farms at once, e.g. a county onboarded together.
+
+Farms are grouped into regions by (zip code, state, radius): each region's
+USDA listings are searched once, for all its farms. The listings of every
+region are pooled, so a competitor found by several regions is looked up in
+Places, screenshotted and scored once, by the same audit steps as single-farm
+discovery. Each farm's leads and market gap report are then computed from
+its region's share of the pool, and SEO reports once per distinct (zip code,
+or state without one, offerings), alongside the competitor pipeline. The work grows with the number
+of unique competitors rather than the number of farms.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.graph import StateGraph, START, END
+from langgraph.types import Send
+
+from src.agents.discovery import (
+    add_audit_steps,
+    generate_seo_node,
+    is_own_listing,
+    market_gap_node,
+    places_location,
+    search_usda_node,
+    start_discovery_node,
+)
+from src.core.checkpointing import agent_checkpointer
+from src.schemas.agent_discovery import (
+    CompetitorFarm,
+    DiscoveryArtifacts,
+    DiscoverySearchCriteria,
+    DiscoveryState,
+    FarmDiscoveryView,
+    FarmViewTask,
+    RegionSearchTask,
+    RegionalDiscoveryState,
+    RegionalPipelineInput,
+    RegionalPipelineOutput,
+    SeoResult,
+    SeoTask,
+    places_key,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize(value: str) -> str:
+    return " ".join((value or "").lower().split())
+
+
+def region_key(criteria: DiscoverySearchCriteria) -> str:
+    """Farms with the same key share one USDA search."""
+    return f"{_normalize(criteria.zip_code)}|{_normalize(criteria.state)}|{criteria.radius_miles}"
+
+
+def seo_key(criteria: DiscoverySearchCriteria) -> str:
+    """
+    Farms with the same key share one SEO report, which depends only on these:
+    it is localized to the zip code, or the state without one.
+    """
+    return f"{_normalize(criteria.zip_code or criteria.state)}|{_normalize(criteria.farm_offerings)}"
+
+
+def _competitor_key(comp: CompetitorFarm) -> Tuple[str, str, str]:
+    # Regions report a listing under their own search zip, so it is not part of
+    # the identity, unless the state is unknown (a zip-only search): same-named
+    # listings of different zips are then different competitors
+    state = _normalize(comp.location_state)
+    if state and state != "unknown":
+        return _normalize(comp.farm_name), comp.source, state
+    return _normalize(comp.farm_name), comp.source, f"zip {_normalize(comp.location_zip)}"
+
+
+# --- Nodes ---
+
+def fan_out_region_searches(state: RegionalDiscoveryState) -> List[Send]:
+    """
+    Sends one search_region task per distinct region of the batch's farms.
+    """
+    regions: Dict[str, DiscoverySearchCriteria] = {}
+    for farm in state.farms:
+        regions.setdefault(region_key(farm), DiscoverySearchCriteria(
+            # No farm name: the listings of every farm in the region are kept,
+            # each farm's own is dropped from its view
+            farm_name="", farm_offerings="",
+            zip_code=farm.zip_code, state=farm.state, radius_miles=farm.radius_miles,
+        ))
+    logger.info(f"Batch discovery: {len(state.farms)} farms in {len(regions)} regions.")
+    return [
+        Send("search_region", RegionSearchTask(region_key=key, search_criteria=criteria))
+        for key, criteria in regions.items()
+    ]
+
+
+async def search_region_node(task: RegionSearchTask) -> Dict[str, Any]:
+    """
+    The USDA search of one region.
+    """
+    result = await search_usda_node(DiscoveryState(search_criteria=task.search_criteria))
+    return {
+        "region_competitors": {task.region_key: result.get("raw_competitors", [])},
+        "errors": result.get("errors", []),
+    }
+
+
+async def pool_competitors_node(state: RegionalDiscoveryState) -> Dict[str, Any]:
+    """
+    Merges the listings of every region into the raw competitors, once each,
+    for the audit steps.
+    """
+    pooled: Dict[Tuple[str, str, str], CompetitorFarm] = {}
+    found = 0
+    for competitors in state.region_competitors.values():
+        found += len(competitors)
+        for comp in competitors:
+            pooled.setdefault(_competitor_key(comp), comp)
+
+    logger.info(f"Pooled {found} regional listings into {len(pooled)} unique competitors.")
+    return {"raw_competitors": list(pooled.values())}
+
+
+def fan_out_seo(state: RegionalDiscoveryState) -> List[Send]:
+    """
+    Sends one generate_seo task per distinct seo_key: (zip code, or state
+    without one, offerings).
+    """
+    tasks = {seo_key(farm): SeoTask(seo_key=seo_key(farm), search_criteria=farm) for farm in state.farms}
+    return [Send("generate_seo", task) for task in tasks.values()]
+
+
+async def regional_seo_node(task: SeoTask) -> Dict[str, Any]:
+    """
+    The SEO report shared by the farms of one seo key.
+    """
+    result = await generate_seo_node(DiscoveryState(search_criteria=task.search_criteria))
+    errors = result.get("errors", [])
+    return {
+        "seo_reports": {task.seo_key: SeoResult(report=result.get("seo_report"), errors=errors)},
+        "errors": errors,
+    }
+
+
+def fan_out_farm_views(state: RegionalDiscoveryState) -> List[Send]:
+    """
+    Sends one farm_view task per farm, with the audited competitors of its
+    region (except its own listing) and only their artifacts.
+    """
+    audited = {_competitor_key(comp): comp for comp in state.audited_competitors}
+    artifacts = state.artifacts
+
+    sends = []
+    for index, farm in enumerate(state.farms):
+        key = region_key(farm)
+        listings = [
+            comp for comp in state.region_competitors.get(key, [])
+            if not is_own_listing(farm.farm_name, comp.farm_name)
+        ]
+        competitors = [
+            audited[comp_key]
+            for comp_key in dict.fromkeys(_competitor_key(comp) for comp in listings)
+            if comp_key in audited
+        ]
+        place_keys = {places_key(comp.farm_name, places_location(comp)) for comp in competitors}
+        urls = {comp.website_url for comp in competitors if comp.website_url}
+        sends.append(Send("farm_view", FarmViewTask(
+            farm_index=index,
+            search_criteria=farm,
+            region_key=key,
+            total_found=len(listings),
+            competitors=competitors,
+            artifacts=DiscoveryArtifacts(
+                places={k: v for k, v in artifacts.places.items() if k in place_keys},
+                visual_analyses={url: a for url, a in artifacts.visual_analyses.items() if url in urls},
+            ),
+        )))
+    return sends
+
+
+async def farm_view_node(task: FarmViewTask) -> Dict[str, Any]:
+    """
+    One farm's leads and market gap report, from its region's pooled competitors.
+    """
+    result = await market_gap_node(DiscoveryState(
+        search_criteria=task.search_criteria,
+        audited_competitors=task.competitors,
+        artifacts=task.artifacts,
+    ))
+    errors = result.get("errors", [])
+    return {
+        "farm_views": [FarmDiscoveryView(
+            farm_index=task.farm_index,
+            region_key=task.region_key,
+            total_found=task.total_found,
+            leads=task.competitors,
+            market_gap_report=result.get("market_gap_report"),
+            errors=errors,
+        )],
+        "errors": errors,
+    }
+
+
+# --- Graph Construction ---
+
+def build_regional_pipeline():
+    """
+    search_region (per region) -> pool -> enrich -> audit as one subgraph,
+    running alongside the SEO reports.
+    """
+    workflow = StateGraph(
+        RegionalDiscoveryState, input_schema=RegionalPipelineInput, output_schema=RegionalPipelineOutput
+    )
+
+    workflow.add_node("search_region", search_region_node, input_schema=RegionSearchTask)
+    workflow.add_node("pool_competitors", pool_competitors_node)
+
+    workflow.add_conditional_edges(START, fan_out_region_searches, ["search_region"])
+    workflow.add_edge("search_region", "pool_competitors")
+    add_audit_steps(workflow, after="pool_competitors")
+    workflow.add_edge("audit_competitors", END)
+
+    # Inherits the batch graph's checkpointer
+    return workflow.compile()
+
+
+def build_regional_discovery_graph(checkpointer: Optional[BaseCheckpointSaver] = None):
+    workflow = StateGraph(RegionalDiscoveryState)
+
+    workflow.add_node("start", start_discovery_node)
+    workflow.add_node("competitors", build_regional_pipeline())
+    workflow.add_node("generate_seo", regional_seo_node, input_schema=SeoTask)
+    workflow.add_node("farm_view", farm_view_node, input_schema=FarmViewTask)
+
+    workflow.set_entry_point("start")
+    workflow.add_edge("start", "competitors")
+    workflow.add_conditional_edges("start", fan_out_seo, ["generate_seo"])
+    workflow.add_conditional_edges("competitors", fan_out_farm_views, ["farm_view"])
+    workflow.add_edge("generate_seo", END)
+    workflow.add_edge("farm_view", END)
+
+    return workflow.compile(checkpointer=checkpointer)
+
+
+regional_discovery_agent = build_regional_discovery_graph(agent_checkpointer)
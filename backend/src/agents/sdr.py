@@ -1,19 +1,25 @@
+import asyncio
 import json
 import logging
-from typing import Dict, Any
+import weakref
+from typing import Dict, Any, List, Optional, Union
 
 from langchain_core.messages import HumanMessage
-from langchain_openai import ChatOpenAI
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, END
+from langgraph.types import Send
 from sqlmodel import select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from src.core.checkpointing import agent_checkpointer
 from src.core.config import settings
+from src.core.llm_routing import get_llm_for_task
 from src.db.session import engine
 from src.models.farm import Farm
 from src.models.inventory import FarmInventory
 from src.models.outreach import OutreachEmail, OutreachStatus
-from src.schemas.agent_sdr import SDRState, RestaurantLead
+from src.schemas.agent_sdr import LeadDraftTask, LeadMatchTask, OutreachDraft, SDRState, RestaurantLead
+from src.services.prompt_compaction import compact_prompt, compact_text
 from src.tools.email_finder import find_decision_maker_email
 from src.tools.google_places_api import search_nearby_businesses
 from src.tools.review_analyzer import analyze_restaurant_reviews
@@ -73,7 +79,7 @@ async def search_restaurants_node(state: SDRState) -> Dict[str, Any]:
             leads.append(RestaurantLead(
                 place_id=b.place_id,
                 name=b.name,
-                location=b.vicinity,
+                location=b.address,
                 website_url=b.website
             ))
 
@@ -84,163 +90,221 @@ async def search_restaurants_node(state: SDRState) -> Dict[str, Any]:
         return {"errors": [f"Restaurant search failed: {str(e)}"]}
 
 
-async def scrape_and_match_node(state: SDRState) -> Dict[str, Any]:
+def fan_out_matching(state: SDRState) -> Union[List[Send], str]:
     """
-    Analyzes restaurants by scraping their site and analyzing reviews 
-    to see if they match the farmer's inventory keywords.
+    Sends one match_lead task per restaurant found. Each lead is checkpointed
+    as it completes, so a resumed run only re-scrapes the unfinished ones.
     """
-    logger.info("Executing scrape_and_match_node...")
-    if state.errors:
-        return {}
+    if state.errors or not state.raw_restaurants:
+        return END
+    return [
+        Send("match_lead", LeadMatchTask(lead=lead, farm_inventory=state.farm_inventory))
+        for lead in state.raw_restaurants
+    ]
 
-    raw_leads = state.raw_restaurants
-    inventory_keywords = state.farm_inventory
-    matched_leads = []
 
-    for lead in raw_leads:
-        matched_words = []
+async def match_lead_node(task: LeadMatchTask) -> Dict[str, Any]:
+    """
+    Analyzes a restaurant by scraping its site and analyzing reviews 
+    to see if it matches the farmer's inventory keywords.
+    """
+    # A copy: the task's lead is the one in raw_restaurants
+    lead = task.lead.model_copy(deep=True)
+    inventory_keywords = task.farm_inventory
+    matched_words = []
 
-        # 1. Analyze Reviews for localization intent
+    # 1. Analyze Reviews for localization intent
+    try:
+        review_results = await analyze_restaurant_reviews.ainvoke({"place_id": lead.place_id})
+        for rv in review_results.reviews:
+            if rv.highlighted:
+                lead.relevant_reviews.append(rv.text)
+                if "local" not in matched_words: matched_words.append("local_sourcing")
+    except Exception as e:
+        logger.error(f"Error analyzing reviews for {lead.name}: {e}")
+
+    # 2. Scrape Website/Menu to find inventory keywords
+    if lead.website_url:
         try:
-            review_results = await analyze_restaurant_reviews.ainvoke({"place_id": lead.place_id})
-            for rv in review_results.reviews:
-                if rv.highlighted:
-                    lead.relevant_reviews.append(rv.text)
-                    if "local" not in matched_words: matched_words.append("local_sourcing")
+            website_data = await scrape_website_content.ainvoke({"url": lead.website_url})
+            if isinstance(website_data, str) and not website_data.startswith('{"error"'):
+                try:
+                    menu_text = json.loads(website_data).get("extracted_text", "")
+                except json.JSONDecodeError:
+                    menu_text = website_data
+                # Keep a short excerpt focused on the farm's crops rather than the raw page
+                lead.menu_text = compact_text(
+                    menu_text, settings.PROMPT_MENU_TEXT_TOKENS, query=" ".join(inventory_keywords)
+                )
+
+                # Simple keyword matching on scraped text
+                website_lower = website_data.lower()
+                for crop in inventory_keywords:
+                    if crop in website_lower and crop not in matched_words:
+                        matched_words.append(crop)
         except Exception as e:
-            logger.error(f"Error analyzing reviews for {lead.name}: {e}")
+            logger.error(f"Error scraping site for {lead.name}: {e}")
 
-        # 2. Scrape Website/Menu to find inventory keywords
-        if lead.website_url:
-            try:
-                website_data = await scrape_website_content.ainvoke({"url": lead.website_url})
-                if isinstance(website_data, str) and not website_data.startswith('{"error"'):
-                    lead.menu_text = website_data[:2000]  # store some context
-
-                    # Simple keyword matching on scraped text
-                    website_lower = website_data.lower()
-                    for crop in inventory_keywords:
-                        if crop in website_lower and crop not in matched_words:
-                            matched_words.append(crop)
-            except Exception as e:
-                logger.error(f"Error scraping site for {lead.name}: {e}")
+    if not matched_words:
+        return {}
 
-        if len(matched_words) > 0:
-            lead.matched_keywords = matched_words
-            lead.match_score = min(100.0, len(matched_words) * 20.0)  # crude scoring
-            matched_leads.append(lead)
+    lead.matched_keywords = matched_words
+    lead.match_score = min(100.0, len(matched_words) * 20.0)  # crude scoring
+    return {"matched_restaurants": [lead]}
 
-    return {"matched_restaurants": matched_leads}
 
+async def collect_matches_node(state: SDRState) -> Dict[str, Any]:
+    """Join point: runs once every match_lead branch is done."""
+    logger.info(f"Matched {len(state.matched_restaurants)}/{len(state.raw_restaurants)} restaurants.")
+    return {}
 
-async def draft_emails_node(state: SDRState) -> Dict[str, Any]:
-    """
-    Finds decision maker contact info and drafts the outreach email via LLM. 
-    Saves the drafted email to db to await human approval.
-    """
-    logger.info("Executing draft_emails_node...")
-    if state.errors or not state.matched_restaurants:
-        return {}
 
-    matched_leads = state.matched_restaurants
+def fan_out_drafts(state: SDRState) -> Union[List[Send], str]:
+    """Sends one draft_email task per matched restaurant."""
+    if not state.matched_restaurants:
+        return END
+    return [
+        Send("draft_email", LeadDraftTask(lead=lead, farm_name=state.farm_name))
+        for lead in state.matched_restaurants
+    ]
 
-    llm = ChatOpenAI(
-        model=settings.OPENROUTER_DEFAULT_MODEL,
-        temperature=0.7,
-        openai_api_key=settings.OPENROUTER_API_KEY,
-        base_url=settings.OPENROUTER_BASE_URL
-    )
 
-    async with AsyncSession(engine) as session:
-        for lead in matched_leads:
-            # 1. Find Decision Maker Email
-            if lead.website_url:
-                try:
-                    email_result = await find_decision_maker_email.ainvoke({"domain": lead.website_url})
-                    if email_result.contacts:
-                        best_contact = email_result.contacts[0]  # taking highest confidence usually
-                        lead.decision_maker_email = best_contact.email
-                        lead.decision_maker_name = f"{best_contact.first_name} {best_contact.last_name}"
-                except Exception as e:
-                    logger.warning(f"Failed to find email for {lead.name}: {e}")
-
-            # 2. Look up LinkedIn (Optional context for LLM)
-            # if lead.decision_maker_name:
-            #     try:
-            #         li_result = await search_linkedin_profiles.ainvoke({
-            #             "name": lead.decision_maker_name, 
-            #             "company": lead.name
-            #         })
-            #         if li_result.profiles:
-            #             lead.decision_maker_linkedin = li_result.profiles[0].link
-            #     except Exception as e:
-            #         pass
-
-            # If no email is found, we might skip drafting or draft for 'chef@' 
-            recipient_email = lead.decision_maker_email or "info@restaurant.com"
-            recipient_name = lead.decision_maker_name or "Chef / Procurement Manager"
-
-            # 3. Use LLM to Draft Email
-            prompt = f"""
-            You are drafting an outreach email for a local farm ({state.farm_name}) to a restaurant ({lead.name}).
-            The restaurant's menu / reviews indicate interest in these farm items: {lead.matched_keywords}.
-            
-            Write a concise, personalized B2B cold email to {recipient_name} at {lead.name}.
-            Offer a sample drop-off of the matching items.
-            Return ONLY a valid JSON object:
-            {{
-                "subject": "The email subject line",
-                "body": "The plain text email body"
-            }}
-            """
+# Per event loop: asyncio primitives must not be shared across loops
+_draft_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
 
-            try:
-                response = await llm.ainvoke([HumanMessage(content=prompt)])
-                content = response.content.replace("```json", "").replace("```", "").strip()
-                email_data = json.loads(content)
-
-                # 4. Save to Database as Draft
-                outreach_email = OutreachEmail(
-                    farm_id=state.search_criteria.farm_id,
-                    recipient_email=recipient_email,
-                    subject=email_data.get("subject", "Local Farm Partnership"),
-                    body=email_data.get("body", ""),
-                    restaurant_name=lead.name,
-                    restaurant_location=lead.location,
-                    match_score=lead.match_score,
-                    status=OutreachStatus.drafted,
-                    menu_keywords_matched=",".join(lead.matched_keywords)
-                )
 
-                session.add(outreach_email)
-                logger.info(f"Drafted SDR email to {lead.name} ({recipient_email}).")
+def _draft_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    if loop not in _draft_slots:
+        _draft_slots[loop] = asyncio.Semaphore(settings.SDR_MAX_CONCURRENT_DRAFTS)
+    return _draft_slots[loop]
+
 
+async def draft_email_node(task: LeadDraftTask) -> Dict[str, Any]:
+    """
+    Finds the decision maker for a single lead and drafts its outreach email via LLM.
+    Drafts run concurrently, capped at SDR_MAX_CONCURRENT_DRAFTS per process.
+    """
+    # A copy: the task's lead is the one in matched_restaurants
+    lead = task.lead.model_copy(deep=True)
+    llm = get_llm_for_task("outreach_email")
+
+    async with _draft_semaphore():
+        # 1. Find Decision Maker Email
+        if lead.website_url:
+            try:
+                email_result = await find_decision_maker_email.ainvoke({"domain": lead.website_url})
+                if email_result.contacts:
+                    best_contact = email_result.contacts[0]  # taking highest confidence usually
+                    lead.decision_maker_email = best_contact.email
+                    lead.decision_maker_name = f"{best_contact.first_name} {best_contact.last_name}"
             except Exception as e:
-                logger.error(f"Failed to draft email for {lead.name}: {e}")
+                logger.warning(f"Failed to find email for {lead.name}: {e}")
+
+        # 2. Look up LinkedIn (Optional context for LLM)
+        # if lead.decision_maker_name:
+        #     try:
+        #         li_result = await search_linkedin_profiles.ainvoke({
+        #             "name": lead.decision_maker_name, 
+        #             "company": lead.name
+        #         })
+        #         if li_result.profiles:
+        #             lead.decision_maker_linkedin = li_result.profiles[0].link
+        #     except Exception as e:
+        #         pass
+
+        # If no email is found, we might skip drafting or draft for 'chef@' 
+        recipient_email = lead.decision_maker_email or "info@restaurant.com"
+        recipient_name = lead.decision_maker_name or "Chef / Procurement Manager"
+
+        # 3. Use LLM to Draft Email
+        prompt = compact_prompt(f"""
+        You are drafting an outreach email for a local farm ({task.farm_name}) to a restaurant ({lead.name}).
+        The restaurant's menu / reviews indicate interest in these farm items: {lead.matched_keywords}.
+        
+        Write a concise, personalized B2B cold email to {recipient_name} at {lead.name}.
+        Offer a sample drop-off of the matching items.
+        Return ONLY a valid JSON object:
+        {{
+            "subject": "The email subject line",
+            "body": "The plain text email body"
+        }}
+        """)
+
+        try:
+            response = await llm.ainvoke([HumanMessage(content=prompt)])
+            content = response.content.replace("```json", "").replace("```", "").strip()
+            email_data = json.loads(content)
+        except Exception as e:
+            logger.error(f"Failed to draft email for {lead.name}: {e}")
+            return {}
+
+    logger.info(f"Drafted SDR email to {lead.name} ({recipient_email}).")
+    return {
+        # Replaces the matched lead with the one carrying its decision maker
+        "matched_restaurants": [lead],
+        "email_drafts": [OutreachDraft(
+            recipient_email=recipient_email,
+            subject=email_data.get("subject", "Local Farm Partnership"),
+            body=email_data.get("body", ""),
+            restaurant_name=lead.name,
+            restaurant_location=lead.location,
+            match_score=lead.match_score,
+            menu_keywords_matched=lead.matched_keywords,
+        )],
+    }
+
+
+async def save_emails_node(state: SDRState) -> Dict[str, Any]:
+    """
+    Saves all drafts to the Database in one round trip, to await human approval.
+    """
+    logger.info("Executing save_emails_node...")
+    if not state.email_drafts:
+        return {}
 
+    async with AsyncSession(engine) as session:
+        session.add_all([
+            OutreachEmail(
+                farm_id=state.search_criteria.farm_id,
+                recipient_email=draft.recipient_email,
+                subject=draft.subject,
+                body=draft.body,
+                restaurant_name=draft.restaurant_name,
+                restaurant_location=draft.restaurant_location,
+                match_score=draft.match_score,
+                status=OutreachStatus.drafted,
+                menu_keywords_matched=",".join(draft.menu_keywords_matched)
+            )
+            for draft in state.email_drafts
+        ])
         await session.commit()
 
-    return {"matched_restaurants": matched_leads}  # update state
+    return {}
 
 
 # --- Graph Construction ---
 
-def build_sdr_graph():
+def build_sdr_graph(checkpointer: Optional[BaseCheckpointSaver] = None):
     workflow = StateGraph(SDRState)
 
     workflow.add_node("fetch_farm_context", fetch_farm_context_node)
     workflow.add_node("search_restaurants", search_restaurants_node)
-    workflow.add_node("scrape_and_match", scrape_and_match_node)
-    workflow.add_node("draft_emails", draft_emails_node)
+    workflow.add_node("match_lead", match_lead_node, input_schema=LeadMatchTask)
+    workflow.add_node("collect_matches", collect_matches_node)
+    workflow.add_node("draft_email", draft_email_node, input_schema=LeadDraftTask)
+    workflow.add_node("save_emails", save_emails_node)
 
     workflow.set_entry_point("fetch_farm_context")
 
     workflow.add_edge("fetch_farm_context", "search_restaurants")
-    workflow.add_edge("search_restaurants", "scrape_and_match")
-    workflow.add_edge("scrape_and_match", "draft_emails")
-    workflow.add_edge("draft_emails", END)
+    workflow.add_conditional_edges("search_restaurants", fan_out_matching, ["match_lead", END])
+    workflow.add_edge("match_lead", "collect_matches")
+    workflow.add_conditional_edges("collect_matches", fan_out_drafts, ["draft_email", END])
+    workflow.add_edge("draft_email", "save_emails")
+    workflow.add_edge("save_emails", END)
 
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
 
 
-sdr_agent = build_sdr_graph()
+sdr_agent = build_sdr_graph(agent_checkpointer)
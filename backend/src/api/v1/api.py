@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from src.api.v1.endpoints import farms, builder, inventory, pricing, transactions, outreach, analytics
+from src.api.v1.endpoints import farms, builder, inventory, pricing, transactions, outreach, analytics, metrics, jobs
 
 api_router = APIRouter()
 api_router.include_router(farms.router, prefix="/farms", tags=["farms"])
@@ -10,3 +10,5 @@ api_router.include_router(pricing.router, prefix="/pricing", tags=["pricing"])
 api_router.include_router(transactions.router, prefix="/transactions", tags=["transactions"])
 api_router.include_router(outreach.router, prefix="/outreach", tags=["outreach"])
 api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
@@ -1,32 +1,20 @@
 import uuid
-from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from pydantic import BaseModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from src import crud
+from src.core.config import settings
 from src.db.session import get_session
-from src.schemas.analytics import PricePredictionResponse
+from src.models.agent_job import AgentJobRead, JobKind
+from src.schemas.analytics import AnalyticsPipelineRequest, AnalyticsPipelineResponse, PricePredictionResponse
 from src.schemas.pricing_analytics import InsufficientDataResult
+from src.services.agent_runs import run_analytics_pipeline as run_pipeline
 from src.services.predictive_pricing import PricingAnalyticsService
 
 router = APIRouter()
 
 
-class AnalyticsPipelineRequest(BaseModel):
-    farm_id: uuid.UUID
-    county: str
-    zip_code: str
-    target_crops: List[str]
-
-
-class AnalyticsPipelineResponse(BaseModel):
-    predictions: List[dict] = []
-    insights: List[str] = []
-    persisted_count: int = 0
-    errors: List[str] = []
-
-
 @router.get("/predictive-pricing", response_model=PricePredictionResponse)
 async def predictive_pricing(
         crop_name: str,
@@ -82,18 +70,16 @@ async def run_analytics_pipeline(body: AnalyticsPipelineRequest):
 
     Returns predictions, insights, and any errors.
     """
-    from src.agents.data_ingestion import data_ingestion_agent
+    return await run_pipeline(body, str(uuid.uuid4()))
 
-    result = await data_ingestion_agent.ainvoke({
-        "farm_id": body.farm_id,
-        "target_crops": body.target_crops,
-        "county": body.county,
-        "zip_code": body.zip_code,
-    })
 
-    return AnalyticsPipelineResponse(
-        predictions=result.get("analytics_predictions", []),
-        insights=result.get("analytics_insights", []),
-        persisted_count=result.get("persisted_count", 0),
-        errors=result.get("errors", []),
+@router.post("/run/jobs", response_model=AgentJobRead, status_code=202)
+async def submit_analytics_job(body: AnalyticsPipelineRequest, session: AsyncSession = Depends(get_session)):
+    """
+    Queues an analytics pipeline run for the job workers and returns at once.
+    Poll /jobs/{id} for progress; on success its `result` is the /run response.
+    """
+    return await crud.create_job(
+        session, kind=JobKind.analytics, payload=body.model_dump(mode="json"), farm_id=str(body.farm_id),
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
     )
@@ -1,61 +1,322 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Dict, Any
+import gzip
+import json
+import uuid
+from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi.responses import Response
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import AsyncIterator, Dict, Any, List, Optional
 
-from src.agents.builder import builder_agent
-from src.schemas.agent_builder import BuilderState
+from src import crud
+from src.agents.builder import LAYOUT_VARIANT_METADATA_KEY, builder_agent
+from src.api.v1.sse import sse_event, sse_response
+from src.core.checkpointing import discard_checkpoints
+from src.core.config import settings
+from src.core.deadline import run_budget_seconds, run_deadline
+from src.core.llm_metrics import agent_run_config
+from src.core.llm_scheduler import LLMPriority
+from src.db.session import get_session
+from src.models.agent_job import AgentJobRead, JobKind
+from src.models.website_artifact import ArtifactBlob, ArtifactKind, WebsiteArtifact, WebsiteArtifactRead
+from src.schemas.agent_builder import BuilderState, SectionEditRequest
+from src.services.agent_runs import artifact_url, build_result, run_builder, save_site_version
+from src.services.artifact_storage import (
+    HTML_CONTENT_TYPE,
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    etag,
+    etag_matches,
+    select_encoding,
+)
+from src.services.site_sections import regenerate_section, replace_section, split_sections
+from src.services.tailwind_compiler import compile_page
 
 router = APIRouter()
 
-@router.post("/build/{farm_id}", response_model=Dict[str, Any])
-async def build_farm_website(farm_id: str, request: dict):
-    """
-    Triggers the LangGraph Phase 2 Asset Generation pipeline for a specific farm.
-    Generates a Brand Persona, proposes domains, and generates a prototype React SPA layout.
-    
-    Request body must contain:
-    - farm_name (str)
-    - farm_story (str)
-    - inventory_data (str)
-    """
+
+def _initial_state(farm_id: str, request: dict) -> Dict[str, Any]:
+    """Validates the build request body and returns the initial LangGraph state."""
     farm_name = request.get("farm_name")
     farm_story = request.get("farm_story")
     inventory_data = request.get("inventory_data")
-    
+
     if not farm_name or not farm_story or not inventory_data:
         raise HTTPException(
-            status_code=400, 
+            status_code=400,
             detail="farm_name, farm_story, and inventory_data are required fields."
         )
-    
-    # Initialize the LangGraph state
-    initial_state: BuilderState = {
+
+    website_mode = request.get("website_mode") or settings.BUILDER_WEBSITE_MODE
+    if website_mode not in ("template", "llm"):
+        raise HTTPException(status_code=400, detail="website_mode must be 'template' or 'llm'.")
+
+    return {
         "farm_id": farm_id,
         "farm_name": farm_name,
         "farm_story": farm_story,
         "inventory_data": inventory_data,
+        "website_mode": website_mode,
         "brand_persona": None,
+        "website_copy": None,
         "suggested_domains": [],
         "website_layouts": []
     }
-    
+
+
+@router.post("/build/{farm_id}", response_model=Dict[str, Any])
+async def build_farm_website(farm_id: str, request: dict):
+    """
+    Triggers the LangGraph Phase 2 Asset Generation pipeline for a specific farm.
+    Generates a Brand Persona and proposes domains in parallel, then generates
+    BUILDER_LAYOUT_VARIANTS landing page designs concurrently. The outputs are
+    stored as the farm's next site version; `artifacts` lists their URLs.
+
+    Request body must contain:
+    - farm_name (str)
+    - farm_story (str)
+    - inventory_data (str)
+
+    Optional:
+    - website_mode (str): "template" (default, pages rendered from pre-built
+      sections in milliseconds) or "llm" (premium, the LLM writes each page)
+    """
+    # Initialize the LangGraph state
+    initial_state: BuilderState = _initial_state(farm_id, request)
+
     try:
         # Run the agent pipeline
-        final_state = await builder_agent.ainvoke(initial_state)
-        
-        # Serialize the BrandPersona Pydantic model for JSON response
-        persona_dump = final_state.get("brand_persona")
-        if persona_dump:
-             persona_dump = persona_dump.model_dump()
-        
-        return {
-            "status": "success",
-            "data": {
-                "farm_id": final_state.get("farm_id"),
-                "farm_name": final_state.get("farm_name"),
-                "brand_persona": persona_dump,
-                "suggested_domains": final_state.get("suggested_domains", []),
-                "website_layout": final_state.get("website_layouts", [""])[0] 
-            }
-        }
+        return await run_builder(farm_id, initial_state, str(uuid.uuid4()))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/build/{farm_id}/jobs", response_model=AgentJobRead, status_code=202)
+async def submit_build_job(farm_id: str, request: dict, session: AsyncSession = Depends(get_session)):
+    """
+    Queues a build for the job workers and returns at once. Request body is
+    the same as /build/{farm_id}. Poll /jobs/{id} for progress; on success its
+    `result` is the /build/{farm_id} response.
+    """
+    initial_state = _initial_state(farm_id, request)
+    return await crud.create_job(
+        session, kind=JobKind.builder, payload={"farm_id": farm_id, "initial_state": initial_state},
+        farm_id=farm_id, max_attempts=settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+@router.post("/build/{farm_id}/stream")
+async def stream_farm_website(farm_id: str, request: dict):
+    """
+    Streaming variant of /build/{farm_id} using Server-Sent Events.
+
+    Emits `run` first and `complete` (or `error`) last; the others arrive as
+    soon as the work behind them finishes, so their order varies:
+    - `run`      – `{"run_id": "..."}` for looking up LLM usage at /metrics/llm/runs/{run_id}
+    - `persona`  – the BrandPersona as soon as generate_persona finishes
+    - `domains`  – the suggested domain list
+    - `html`     – `{"variant": 0, "delta": "..."}` chunks of each design as the LLM writes it
+                   ("llm" mode only; template pages arrive whole as `layout`)
+    - `layout`   – `{"variant": 0, "style": "...", "mode": "...", "html": "...", "page_weight": {...}}`
+                   as each design completes, with its Tailwind CSS compiled and inlined
+    - `complete` – the same payload as the non-streaming endpoint's `data`
+    - `error`    – `{"detail": "..."}` if the pipeline fails mid-stream
+
+    Request body is the same as /build/{farm_id}.
+    """
+    initial_state = _initial_state(farm_id, request)
+    run_id = str(uuid.uuid4())
+
+    async def event_stream() -> AsyncIterator[str]:
+        final_state: Dict[str, Any] = dict(initial_state)
+        layouts = []
+        yield sse_event("run", {"run_id": run_id})
+        try:
+            with run_deadline(run_budget_seconds("builder")):
+                async for mode, chunk in builder_agent.astream(
+                        initial_state,
+                        config=agent_run_config("builder", run_id, LLMPriority.interactive, farm_id),
+                        stream_mode=["updates", "messages"],
+                ):
+                    if mode == "messages":
+                        message, metadata = chunk
+                        if metadata.get("langgraph_node") == "generate_website" and message.content:
+                            yield sse_event("html", {
+                                "variant": metadata.get(LAYOUT_VARIANT_METADATA_KEY, 0),
+                                "delta": message.content,
+                            })
+                        continue
+
+                    for node_name, update in chunk.items():
+                        if not update:
+                            continue
+                        if node_name == "generate_website":
+                            # One update per variant; website_layouts is an append-only list
+                            for layout in update.get("website_layouts", []):
+                                layouts.append(layout)
+                                yield sse_event("layout", layout.model_dump())
+                            continue
+                        final_state.update(update)
+                        if node_name == "generate_persona" and update.get("brand_persona"):
+                            yield sse_event("persona", update["brand_persona"].model_dump())
+                        elif node_name == "propose_domains":
+                            yield sse_event("domains", update.get("suggested_domains", []))
+
+            final_state["website_layouts"] = layouts
+            artifacts = await save_site_version(farm_id, run_id, final_state)
+            yield sse_event("complete", build_result(final_state, artifacts))
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+        finally:
+            # Streams are not resumable: the client already saw the partial output
+            await discard_checkpoints(run_id)
+
+    return sse_response(event_stream())
+
+
+def _artifact_response(
+        blob: ArtifactBlob, cache_control: str, if_none_match: Optional[str], accept_encoding: Optional[str]
+) -> Response:
+    """Serves a stored artifact precompressed, answering conditional requests with 304."""
+    headers = {"ETag": etag(blob), "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if etag_matches(if_none_match, blob):
+        return Response(status_code=304, headers=headers)
+
+    encoding, body = select_encoding(accept_encoding, blob)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=blob.content_type, headers=headers)
+
+
+@router.get("/artifacts/{content_hash}")
+async def read_artifact(
+        content_hash: str,
+        session: AsyncSession = Depends(get_session),
+        if_none_match: Optional[str] = Header(default=None),
+        accept_encoding: Optional[str] = Header(default=None),
+):
+    """
+    Serves a stored persona, domain list or layout by content hash.
+    The content behind a hash never changes, so responses are cacheable for a year.
+    """
+    blob = await crud.get_artifact_blob(session, content_hash.lower())
+    if not blob:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    return _artifact_response(blob, IMMUTABLE_CACHE_CONTROL, if_none_match, accept_encoding)
+
+
+@router.get("/sites/{farm_id}/versions", response_model=List[WebsiteArtifactRead])
+async def read_site_versions(
+        farm_id: str,
+        session: AsyncSession = Depends(get_session),
+        version: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 100,
+):
+    """Lists a farm's stored artifacts, newest version first."""
+    return await crud.get_site_artifacts(session, farm_id=farm_id, version=version, offset=offset, limit=limit)
+
+
+@router.get("/sites/{farm_id}/latest/{kind}")
+async def read_latest_artifact(
+        farm_id: str,
+        kind: ArtifactKind,
+        session: AsyncSession = Depends(get_session),
+        variant: int = 0,
+        if_none_match: Optional[str] = Header(default=None),
+        accept_encoding: Optional[str] = Header(default=None),
+):
+    """
+    Serves the newest stored artifact of a kind (e.g. layout variant 0) without
+    regenerating it. Clients revalidate with the ETag on every use.
+    """
+    artifact = await crud.get_latest_artifact(session, farm_id=farm_id, kind=kind, variant=variant)
+    blob = await crud.get_artifact_blob(session, artifact.content_hash) if artifact else None
+    if not blob:
+        raise HTTPException(status_code=404, detail="No stored artifact for this farm")
+    return _artifact_response(blob, REVALIDATE_CACHE_CONTROL, if_none_match, accept_encoding)
+
+
+async def _latest_layout(session: AsyncSession, farm_id: str, variant: int) -> tuple[WebsiteArtifact, str]:
+    """Returns the newest stored layout variant and its HTML, or raises 404."""
+    layout = await crud.get_latest_artifact(session, farm_id=farm_id, kind=ArtifactKind.layout, variant=variant)
+    blob = await crud.get_artifact_blob(session, layout.content_hash) if layout else None
+    if not blob:
+        raise HTTPException(status_code=404, detail="No stored layout for this farm")
+    return layout, gzip.decompress(blob.gzip_content).decode()
+
+
+@router.get("/sites/{farm_id}/sections")
+async def read_site_sections(farm_id: str, session: AsyncSession = Depends(get_session), variant: int = 0):
+    """Lists the editable sections of the newest stored layout."""
+    layout, html = await _latest_layout(session, farm_id, variant)
+    return {
+        "version": layout.version,
+        "variant": variant,
+        "sections": [{"name": section.name, "bytes": len(section.html.encode())} for section in split_sections(html)],
+    }
+
+
+@router.post("/sites/{farm_id}/sections/{section_name}")
+async def regenerate_site_section(
+        farm_id: str,
+        section_name: str,
+        body: SectionEditRequest,
+        session: AsyncSession = Depends(get_session),
+):
+    """
+    Regenerates one section (e.g. "hero" or "inventory") of the newest stored
+    layout with a prompt containing only that section, splices it into the
+    page and stores the result as a new site version. The persona, domains and
+    other layout variants carry over unchanged.
+    """
+    layout, html = await _latest_layout(session, farm_id, body.variant)
+    sections = split_sections(html)
+    section = next((s for s in sections if s.name == section_name), None)
+    if section is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Section '{section_name}' not found; available: {[s.name for s in sections]}"
+        )
+
+    persona = None
+    persona_artifact = await crud.get_latest_artifact(session, farm_id=farm_id, kind=ArtifactKind.persona)
+    persona_blob = await crud.get_artifact_blob(session, persona_artifact.content_hash) if persona_artifact else None
+    if persona_blob:
+        persona = json.loads(gzip.decompress(persona_blob.gzip_content))
+
+    run_id = str(uuid.uuid4())
+    try:
+        new_section = await regenerate_section(
+            section, body.instruction, body.farm_name, persona,
+            config=agent_run_config("builder_section", run_id, LLMPriority.interactive, farm_id),
+        )
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Section regeneration failed: {e}")
+    if new_section is None:
+        raise HTTPException(status_code=502, detail="The model returned no usable HTML for this section")
+
+    new_html = replace_section(html, section, new_section)
+    page_weight = None
+    if settings.BUILDER_COMPILE_TAILWIND:
+        new_html, page_weight = compile_page(new_html)
+
+    base = await crud.get_site_artifacts(session, farm_id=farm_id, version=layout.version)
+    rows = await crud.create_site_version(
+        session, farm_id=farm_id, run_id=run_id,
+        artifacts=[(ArtifactKind.layout, body.variant, layout.style, new_html.encode(), HTML_CONTENT_TYPE)],
+        carry_over=[a for a in base if not (a.kind == ArtifactKind.layout and a.variant == body.variant)],
+    )
+    edited = rows[0]
+
+    return {
+        "status": "success",
+        "run_id": run_id,
+        "data": {
+            "version": edited.version,
+            "variant": body.variant,
+            "section": section_name,
+            "section_html": new_section,
+            "content_hash": edited.content_hash,
+            "url": artifact_url(edited.content_hash),
+            "page_weight": page_weight.model_dump() if page_weight else None,
+        }
+    }
@@ -1,68 +1,137 @@
 import uuid
-from typing import List, Optional
+from typing import AsyncIterator, List
 
 from fastapi import APIRouter, Depends, HTTPException, Body
-from pydantic import BaseModel
 from sqlmodel.ext.asyncio.session import AsyncSession
 
 from src import crud
-from src.agents.discovery import discovery_agent
+from src.api.v1.sse import sse_event, sse_response
+from src.core.config import settings
 from src.db.session import get_session
+from src.models.agent_job import AgentJobRead, JobKind
+from src.schemas.agent_discovery import BatchDiscoverRequest, DiscoverRequest
 from src.schemas.farm import FarmCreate, FarmRead
+from src.services.agent_runs import run_batch_discovery, run_discovery, stream_discovery
+from src.services.discovery_cache import CacheStatus, cached_discovery
 
 router = APIRouter()
 
 
-class DiscoverRequest(BaseModel):
-    farm_name: str = "My Farm"
-    farm_offerings: str = "organic produce"
-    zip_code: Optional[str] = None
-    state: Optional[str] = None
-
-
 @router.post("/discover", response_model=dict)
-async def discover_farms(body: DiscoverRequest):
+async def discover_farms(body: DiscoverRequest, session: AsyncSession = Depends(get_session)):
     """
     Trigger the autonomous Discovery Agent to find farms in a specific location.
     This process:
     1. Queries USDA databases (Farmers Markets & CSAs).
     2. Enriches data with Google Places (Business info, Websites).
     3. Audits digital presence (Score < 50 = Target Lead).
-    4. Analyzes market gaps and generates SEO keywords.
+    4. Analyzes market gaps from the audited competitors.
+    5. Generates SEO keywords, in parallel with steps 1-3.
+
+    `duration_ms` reports the end-to-end agent run time.
+
+    Results are cached per (zip_code, state, radius_miles, farm profile).
+    `cache.status` is "fresh" for a cached result within its TTL, "stale" for
+    an older one served while a background job refreshes it
+    (`cache.refreshing`), and "miss" for a new run.
     """
     if not body.zip_code and not body.state:
         raise HTTPException(status_code=400, detail="Must provide zip_code or state.")
 
-    initial_state = {
-        "search_criteria": {
-            "farm_name": body.farm_name,
-            "farm_offerings": body.farm_offerings,
-            "zip_code": body.zip_code,
-            "state": body.state,
-        },
-        "raw_competitors": [],
-        "enriched_competitors": [],
-        "audited_competitors": [],
-        "errors": []
-    }
-
-    # Run the LangGraph agent
-    final_state = await discovery_agent.ainvoke(initial_state)
-
-    # Ensure we're working with a dict
-    if hasattr(final_state, "model_dump"):
-        final_state_dict = final_state.model_dump()
-    else:
-        final_state_dict = final_state
-
-    return {
-        "message": "Discovery complete",
-        "total_found": len(final_state_dict.get("raw_competitors", [])),
-        "audited": len(final_state_dict.get("audited_competitors", [])),
-        "leads": final_state_dict.get("audited_competitors", []),
-        "market_gap_report": final_state_dict.get("market_gap_report"),
-        "seo_report": final_state_dict.get("seo_report"),
-    }
+    cached = await cached_discovery(session, body)
+    if cached is not None:
+        return cached
+    response = await run_discovery(body, str(uuid.uuid4()))
+    return {**response, "cache": {"status": CacheStatus.miss.value, "refreshing": False}}
+
+
+@router.post("/discover/stream")
+async def stream_discover_farms(body: DiscoverRequest):
+    """
+    Streaming variant of /discover using Server-Sent Events, so results can be
+    rendered as they arrive instead of after the whole run.
+
+    Emits `run` first and `complete` (or `error`) last:
+    - `run`               – `{"run_id": "..."}`
+    - `node_start`        – `{"node": "competitors/audit_site", "task_id": "...", "elapsed_ms": 812}`
+                            for every node and per-item task (one audit_site per website)
+    - `node_end`          – the same plus `duration_ms` and `error` (null on success)
+    - `competitors_found` – `{"count": 12}` once the USDA search returns
+    - `competitor`        – `{"competitor": {...}}` each competitor, with its website, once enriched
+    - `site_scored`       – `{"url": "...", "digital_health_score": 42, "audit_notes": "..."}`
+                            for each website as its scoring batch finishes
+    - `site_audit_failed` – `{"url": "...", "error": "..."}`
+    - `site_audit_skipped` – `{"url": "...", "reason": "..."}` for a website whose audit or scoring
+                            ran out of time (the run is bounded by AGENT_RUN_DEADLINE_SECONDS)
+    - `report`            – `{"kind": "market_gap" | "generate_seo", "report": {...}}`
+    - `complete`          – the same payload as /discover
+    - `error`             – `{"detail": "..."}` if the pipeline fails mid-stream
+    """
+    if not body.zip_code and not body.state:
+        raise HTTPException(status_code=400, detail="Must provide zip_code or state.")
+    run_id = str(uuid.uuid4())
+
+    async def event_stream() -> AsyncIterator[str]:
+        yield sse_event("run", {"run_id": run_id})
+        try:
+            async for event, data in stream_discovery(body, run_id):
+                yield sse_event(event, data)
+        except Exception as e:
+            yield sse_event("error", {"detail": str(e)})
+
+    return sse_response(event_stream())
+
+
+@router.post("/discover/jobs", response_model=AgentJobRead, status_code=202)
+async def submit_discovery_job(body: DiscoverRequest, session: AsyncSession = Depends(get_session)):
+    """
+    Queues a discovery run for the job workers and returns at once.
+    Poll /jobs/{id} for progress; on success its `result` is the /discover response.
+    """
+    if not body.zip_code and not body.state:
+        raise HTTPException(status_code=400, detail="Must provide zip_code or state.")
+
+    return await crud.create_job(
+        session, kind=JobKind.discovery, payload=body.model_dump(), max_attempts=settings.JOB_MAX_ATTEMPTS
+    )
+
+
+def _validate_batch(body: BatchDiscoverRequest) -> None:
+    if len(body.farms) > settings.DISCOVERY_BATCH_MAX_FARMS:
+        raise HTTPException(
+            status_code=400, detail=f"At most {settings.DISCOVERY_BATCH_MAX_FARMS} farms per batch."
+        )
+    for index, farm in enumerate(body.farms):
+        if not farm.zip_code and not farm.state:
+            raise HTTPException(status_code=400, detail=f"Farm {index}: must provide zip_code or state.")
+
+
+@router.post("/discover/batch", response_model=dict)
+async def discover_farms_batch(body: BatchDiscoverRequest):
+    """
+    Discovery for many farms at once, e.g. every farm of a county being onboarded.
+
+    Farms are grouped by (zip_code, state, radius_miles): each group's USDA
+    listings are searched once, and every competitor found across all groups
+    is looked up and audited once. `farms` holds each farm's /discover
+    response, in request order, computed from that shared pool; each is also
+    cached as the farm's /discover result. `unique_competitors` is the number
+    of competitors audited for the whole batch.
+    """
+    _validate_batch(body)
+    return await run_batch_discovery(body, str(uuid.uuid4()))
+
+
+@router.post("/discover/batch/jobs", response_model=AgentJobRead, status_code=202)
+async def submit_batch_discovery_job(body: BatchDiscoverRequest, session: AsyncSession = Depends(get_session)):
+    """
+    Queues a batch discovery run for the job workers and returns at once.
+    Poll /jobs/{id} for progress; on success its `result` is the /discover/batch response.
+    """
+    _validate_batch(body)
+    return await crud.create_job(
+        session, kind=JobKind.batch_discovery, payload=body.model_dump(), max_attempts=settings.JOB_MAX_ATTEMPTS
+    )
 
 
 @router.post("/", response_model=FarmRead)
@@ -0,0 +1,36 @@
+import uuid
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src import crud
+from src.db.session import get_session
+from src.models.agent_job import AgentJobRead, JobStatus
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[AgentJobRead])
+async def read_jobs(
+        session: AsyncSession = Depends(get_session),
+        farm_id: Optional[str] = None,
+        status: Optional[JobStatus] = None,
+        offset: int = 0,
+        limit: int = 100,
+):
+    """Agent jobs, newest first."""
+    return await crud.get_jobs(session, farm_id=farm_id, status=status, offset=offset, limit=limit)
+
+
+@router.get("/{job_id}", response_model=AgentJobRead)
+async def read_job(job_id: uuid.UUID, session: AsyncSession = Depends(get_session)):
+    """
+    Status of a queued agent run. `progress` is the last pipeline step
+    completed; `result` holds the pipeline's response once `status` is
+    "succeeded", `error` the last failure (retried until `max_attempts`).
+    """
+    job = await crud.get_job(session, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
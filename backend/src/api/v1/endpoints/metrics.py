@@ -0,0 +1,47 @@
+from typing import List
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from src.core.llm_metrics import LLMCallRecord, LLMUsageSummary, RunUsageSummary, llm_metrics
+from src.core.llm_scheduler import LLMSchedulerClassStats, llm_scheduler
+
+router = APIRouter()
+
+
+class LLMMetricsResponse(BaseModel):
+    totals: LLMUsageSummary
+    by_node: List[LLMUsageSummary]
+    recent_calls: List[LLMCallRecord]
+    scheduler: List[LLMSchedulerClassStats]
+
+
+@router.get("/llm", response_model=LLMMetricsResponse)
+async def read_llm_metrics(recent: int = 50):
+    """
+    Aggregated LLM usage since process start, broken down by
+    (graph, node, model): calls, errors, retries, tokens, latency and
+    estimated cost. Also returns the most recent individual calls and the
+    LLM scheduler's queue depth and wait times per priority class.
+    """
+    by_node = llm_metrics.aggregates()
+    totals = LLMUsageSummary()
+    for summary in by_node:
+        totals.merge(summary)
+
+    by_node.sort(key=lambda s: s.cost_usd, reverse=True)
+    return LLMMetricsResponse(
+        totals=totals,
+        by_node=by_node,
+        recent_calls=llm_metrics.recent(recent),
+        scheduler=llm_scheduler.stats(),
+    )
+
+
+@router.get("/llm/runs/{run_id}", response_model=RunUsageSummary)
+async def read_llm_run_summary(run_id: str):
+    """Per-run LLM usage summary for a run ID returned by an agent endpoint."""
+    summary = llm_metrics.run_summary(run_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="No LLM calls recorded for this run")
+    return summary
@@ -0,0 +1,21 @@
+"""
+Server-Sent Events helpers shared by the streaming endpoints.
+"""
+
+import json
+from typing import Any, AsyncIterator
+
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_jsonable_python
+
+# Disables proxy buffering (nginx) so events reach the client as they are sent
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Formats a single Server-Sent Event frame; pydantic models are serialized too."""
+    return f"event: {event}\ndata: {json.dumps(to_jsonable_python(data))}\n\n"
+
+
+def sse_response(frames: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(frames, media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,165 @@
+"""
+Durable LangGraph checkpoints in Postgres.
+
+Every agent graph is compiled with ``agent_checkpointer``, and
+``agent_run_config`` uses the run ID as the LangGraph thread ID. LangGraph
+then saves the run's state after every completed node, and the writes of
+every completed ``Send`` task (one per competitor site, lead or layout
+variant), as they finish. Invoking the graph again with the same run ID
+and no input (``resume_input``) continues from the last checkpoint:
+finished nodes and fan-out items are not run again.
+
+Checkpoints are kept for unfinished runs only; ``discard_checkpoints``
+deletes them once a run completes. Until ``init_checkpointer`` has opened
+the connection pool (or with AGENT_CHECKPOINTS_ENABLED off) checkpoints are
+not stored and runs simply cannot be resumed.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, AsyncIterator, Collection, Optional, Sequence
+
+from langchain_core.runnables import Runnable, RunnableConfig
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class DurableCheckpointer(BaseCheckpointSaver):
+    """
+    Delegates to the Postgres saver once it is open; until then checkpoints
+    are dropped. Agents are compiled at import time, before the pool exists.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.saver: Optional[BaseCheckpointSaver] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.saver is not None
+
+    def __bool__(self) -> bool:
+        # LangGraph requires a thread_id only when the checkpointer is truthy,
+        # so graphs invoked without agent_run_config keep working until it is open
+        return self.enabled
+
+    def with_allowlist(self, extra_allowlist: Collection[tuple[str, ...]]) -> BaseCheckpointSaver:
+        if self.saver is None:
+            return self
+        clone = DurableCheckpointer()
+        clone.saver = self.saver.with_allowlist(extra_allowlist)
+        return clone
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        if self.saver is None:
+            return None
+        return await self.saver.aget_tuple(config)
+
+    async def alist(
+            self, config: Optional[RunnableConfig], *, filter: Optional[dict[str, Any]] = None,
+            before: Optional[RunnableConfig] = None, limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        if self.saver is None:
+            return
+        async for checkpoint in self.saver.alist(config, filter=filter, before=before, limit=limit):
+            yield checkpoint
+
+    async def aput(
+            self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata,
+            new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        if self.saver is None:
+            return {"configurable": {**config["configurable"], "checkpoint_id": checkpoint["id"]}}
+        return await self.saver.aput(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+            self, config: RunnableConfig, writes: Sequence[tuple[str, Any]], task_id: str, task_path: str = "",
+    ) -> None:
+        if self.saver is not None:
+            await self.saver.aput_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        if self.saver is not None:
+            await self.saver.adelete_thread(thread_id)
+
+    def get_next_version(self, current: Any, channel: None) -> Any:
+        if self.saver is not None:
+            return self.saver.get_next_version(current, channel)
+        return super().get_next_version(current, channel)
+
+
+agent_checkpointer = DurableCheckpointer()
+_pool = None
+
+
+async def init_checkpointer() -> None:
+    """Opens the Postgres pool and creates the checkpoint tables if needed."""
+    global _pool
+    if not settings.AGENT_CHECKPOINTS_ENABLED or agent_checkpointer.enabled:
+        return
+
+    from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+    from psycopg.rows import dict_row
+    from psycopg_pool import AsyncConnectionPool
+
+    pool = AsyncConnectionPool(
+        settings.DATABASE_URL.replace("postgresql+psycopg://", "postgresql://", 1),
+        max_size=settings.AGENT_CHECKPOINT_POOL_SIZE,
+        kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+        open=False,
+    )
+    try:
+        await pool.open(wait=True, timeout=10)
+        saver = AsyncPostgresSaver(pool)
+        # Idempotent; the saver versions its own tables
+        await saver.setup()
+    except Exception as e:
+        logger.error(f"Agent checkpoints disabled, Postgres unavailable: {e}")
+        await pool.close()
+        return
+
+    _pool = pool
+    agent_checkpointer.saver = saver
+    logger.info("Agent checkpoints stored in Postgres")
+
+
+async def close_checkpointer() -> None:
+    global _pool
+    agent_checkpointer.saver = None
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+async def resume_input(agent: Runnable, state: Any, config: RunnableConfig) -> Any:
+    """
+    The input to invoke ``agent`` with: None (resume) if this run ID already
+    has an unfinished checkpoint, otherwise ``state`` (fresh run).
+    """
+    if getattr(agent, "checkpointer", None) is not agent_checkpointer or not agent_checkpointer.enabled:
+        return state
+    if "thread_id" not in config.get("configurable", {}):
+        return state
+    snapshot = await agent.aget_state(config)
+    if snapshot.next:
+        logger.info(f"Resuming run {config['configurable']['thread_id']} at {', '.join(snapshot.next)}")
+        return None
+    return state
+
+
+async def discard_checkpoints(thread_id: str) -> None:
+    """Deletes a finished run's checkpoints; failures are logged, not raised."""
+    try:
+        await agent_checkpointer.adelete_thread(thread_id)
+    except Exception as e:
+        logger.warning(f"Failed to delete checkpoints of run {thread_id}: {e}")
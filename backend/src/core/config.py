@@ -1,4 +1,5 @@
 import os
+from typing import Any, Dict, Tuple
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -28,6 +29,109 @@ class Settings(BaseSettings):
     OPENROUTER_API_KEY: str | None = None
     OPENROUTER_BASE_URL: str = "https://openrouter.ai/api/v1"
     OPENROUTER_DEFAULT_MODEL: str = "google/gemini-2.0-flash-001"
+    # Secondary model for routed tasks (hedging and failover); empty disables it
+    OPENROUTER_FALLBACK_MODEL: str = "openai/gpt-4o-mini"
+
+    # Shared LLM client pool (see src/core/llm.py)
+    LLM_REQUEST_TIMEOUT: float = 120.0  # seconds; full-page website generation is slow
+    LLM_MAX_RETRIES: int = 2
+    LLM_MAX_CONNECTIONS: int = 20
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 10
+
+    # Exact-match LLM response cache (see src/core/llm_cache.py)
+    LLM_CACHE_BACKEND: str = "memory"  # "memory" | "postgres" | "none"
+    LLM_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+    LLM_CACHE_MAX_ENTRIES: int = 1000
+    # Postgres backend: each worker deletes expired and over-capacity rows at most this often
+    LLM_CACHE_TRIM_INTERVAL_SECONDS: int = 60
+    # Prompts at or below this temperature are treated as idempotent and cached by default
+    LLM_CACHE_MAX_TEMPERATURE: float = 0.2
+
+    # LLM observability (see src/core/llm_metrics.py)
+    LLM_METRICS_MAX_RECORDS: int = 5000  # recent call records kept in memory
+    LLM_METRICS_MAX_RUNS: int = 500  # recent runs kept for per-run summaries
+    # USD per 1M (prompt, completion) tokens, used for cost estimates
+    LLM_PRICING_PER_MILLION_TOKENS: Dict[str, Tuple[float, float]] = {
+        "google/gemini-2.0-flash-001": (0.10, 0.40),
+        "google/gemini-2.5-flash": (0.30, 2.50),
+        "anthropic/claude-sonnet-4": (3.00, 15.00),
+        "openai/gpt-4o-mini": (0.15, 0.60),
+    }
+
+    # LLM call scheduling (see src/core/llm_scheduler.py); keep below LLM_MAX_CONNECTIONS
+    LLM_SCHEDULER_MAX_CONCURRENCY: int = 16
+    LLM_SCHEDULER_INTERACTIVE_LIMIT: int = 16
+    LLM_SCHEDULER_BATCH_LIMIT: int = 10  # leaves headroom for interactive calls
+
+    # Task -> model routing and hedged requests (see src/core/llm_routing.py)
+    # Per-task overrides of DEFAULT_LLM_ROUTES, e.g. {"persona": {"primary": "openai/gpt-4o"}}
+    LLM_ROUTE_OVERRIDES: Dict[str, Dict[str, Any]] = {}
+    LLM_HEDGING_ENABLED: bool = True
+    LLM_HEDGE_BUDGET_PER_RUN: int = 3  # max hedged (duplicate) requests per agent run
+    LLM_HEDGE_PERCENTILE: float = 0.95  # hedge once the primary exceeds this latency percentile
+    LLM_HEDGE_MIN_SAMPLES: int = 20  # calls observed before the percentile is trusted
+    LLM_HEDGE_DEFAULT_DELAY_SECONDS: float = 15.0  # hedge delay until then
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 1.0  # floor; cache hits skew observed latencies low
+
+    # Discovery agent: competitors scored per batched LLM call
+    DISCOVERY_SCORING_BATCH_SIZE: int = 10
+    DISCOVERY_SITE_AUDIT_DEADLINE_SECONDS: float = 90.0  # per website: screenshot and visual analysis
+    # Caps per worker process, across runs: each audit drives a headless browser
+    DISCOVERY_MAX_CONCURRENT_AUDITS: int = 4
+    DISCOVERY_MAX_CONCURRENT_LOOKUPS: int = 10  # Google Places searches
+    DISCOVERY_BATCH_MAX_FARMS: int = 200  # per /farms/discover/batch request or job
+    # Discovery result cache (src/services/discovery_cache.py)
+    DISCOVERY_CACHE_ENABLED: bool = True
+    DISCOVERY_CACHE_TTL_SECONDS: int = 24 * 60 * 60  # served as is
+    DISCOVERY_CACHE_MAX_STALE_SECONDS: int = 7 * 24 * 60 * 60  # served while refreshed in the background
+    DISCOVERY_CACHE_MAX_AUDIT_AGE_SECONDS: int = 30 * 24 * 60 * 60  # website audits reused by refreshes
+    DISCOVERY_CACHE_REFRESH_LEASE_SECONDS: int = 15 * 60  # a refresh not done by then can be queued again
+
+    # Builder agent: landing page design variants generated in parallel (max 3 distinct styles)
+    BUILDER_LAYOUT_VARIANTS: int = 3
+    # Default page generation mode: "template" (local sections, src/services/site_templates.py)
+    # or "llm" (premium: full page written by the website_generation model)
+    BUILDER_WEBSITE_MODE: str = "template"
+    # Replace the Tailwind Play CDN script with a compiled, inlined stylesheet (src/services/tailwind_compiler.py)
+    BUILDER_COMPILE_TAILWIND: bool = True
+    # Persist each build's persona, domains and layouts as a site version (src/crud/website_artifact.py)
+    BUILDER_STORE_ARTIFACTS: bool = True
+
+    # Prompt compaction budgets (see src/services/prompt_compaction.py)
+    PROMPT_SCRAPED_TEXT_TOKENS: int = 150  # per competitor website in the gap analysis
+    PROMPT_MENU_TEXT_TOKENS: int = 120  # restaurant menu excerpt in SDR emails
+    PROMPT_MAX_EVENTS: int = 8
+    PROMPT_EVENT_DESCRIPTION_TOKENS: int = 30
+
+    # Domain availability: local candidates checked before asking the LLM (src/services/domain_candidates.py)
+    DOMAIN_LOCAL_CANDIDATES: int = 30
+    # Domain availability DNS checks (see src/services/domain_dns.py)
+    DOMAIN_DNS_TIMEOUT_SECONDS: float = 2.0
+    DOMAIN_DNS_MAX_CONCURRENCY: int = 20
+    DOMAIN_DNS_CACHE_TTL_SECONDS: int = 6 * 60 * 60  # registered domains
+    DOMAIN_DNS_NEGATIVE_CACHE_TTL_SECONDS: int = 5 * 60  # domains with no DNS records
+    DOMAIN_DNS_CACHE_MAX_ENTRIES: int = 5000
+    # Also look up apex NS/SOA records (needs dnspython) to catch parked domains
+    DOMAIN_DNS_CHECK_NAMESERVERS: bool = False
+
+    # SDR agent: cap on concurrent lead drafts (email lookup + LLM call)
+    SDR_MAX_CONCURRENT_DRAFTS: int = 5
+
+    # Agent job queue (src/services/job_worker.py)
+    JOB_WORKER_CONCURRENCY: int = 2  # jobs run at once per worker process
+    # Run a worker pool inside the API process too; disable when running `python -m src.worker` separately
+    JOB_WORKERS_IN_API: bool = True
+    JOB_POLL_INTERVAL_SECONDS: float = 2.0  # idle workers check the queue this often
+    JOB_LEASE_SECONDS: int = 120  # a running job without a heartbeat for this long is requeued
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_BACKOFF_SECONDS: float = 30.0  # doubled on each further attempt
+
+    # Durable agent checkpoints (src/core/checkpointing.py): retried runs resume from the last completed step
+    AGENT_CHECKPOINTS_ENABLED: bool = True
+    AGENT_CHECKPOINT_POOL_SIZE: int = 5
+    # Run-wide time budget of agent graph runs (src/core/deadline.py); 0 = unlimited
+    AGENT_RUN_DEADLINE_SECONDS: float = 300.0
+    AGENT_RUN_DEADLINE_OVERRIDES: Dict[str, float] = {"builder": 600.0, "regional_discovery": 3600.0}
 
     # USDA Local Food Directories API
     # Base URL for the USDA Local Food Portal (no trailing slash).
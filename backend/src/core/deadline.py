@@ -0,0 +1,107 @@
+"""
+Run-wide time budgets for agent graphs.
+
+Every agent run gets a deadline (``AGENT_RUN_DEADLINE_SECONDS``, per graph
+in ``AGENT_RUN_DEADLINE_OVERRIDES``), held in a context variable: it is set
+around the graph invocation and inherited by every node, fan-out task and
+tool call of the run. A node can narrow it for its own work with a nested
+``run_deadline`` (e.g. one website audit); a nested deadline never extends
+the one around it.
+
+Calls with their own timeout take ``budget_timeout(timeout)``, the smaller
+of it and the time left, and ``within_budget`` bounds an awaitable by the
+time left. Both raise ``BudgetExhausted`` once the deadline has passed, so
+the node can degrade (skip the item) instead of stalling the run. Outside a
+run, with no deadline set, they change nothing.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Iterator, Optional, TypeVar
+
+from src.core.config import settings
+
+T = TypeVar("T")
+
+# time.monotonic() by which the current run must finish
+_deadline: ContextVar[Optional[float]] = ContextVar("agent_run_deadline", default=None)
+
+
+class BudgetExhausted(TimeoutError):
+    """The run's (or node's) deadline passed before the call could finish."""
+
+
+def run_budget_seconds(graph_name: str) -> Optional[float]:
+    """The configured budget of a graph's runs; None if unlimited."""
+    seconds = settings.AGENT_RUN_DEADLINE_OVERRIDES.get(graph_name, settings.AGENT_RUN_DEADLINE_SECONDS)
+    return seconds if seconds and seconds > 0 else None
+
+
+@contextmanager
+def run_deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Runs the block with at most ``seconds`` left; None keeps the current deadline."""
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        try:
+            _deadline.reset(token)
+        except ValueError:
+            # Closed from another context: an abandoned streaming generator
+            pass
+
+
+def time_left() -> Optional[float]:
+    """Seconds until the current deadline (negative once passed); None without one."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def budget_exhausted() -> bool:
+    left = time_left()
+    return left is not None and left <= 0
+
+
+def budget_timeout(timeout: float) -> float:
+    """
+    ``timeout`` capped by the time left.
+
+    Raises:
+        BudgetExhausted: If the deadline has already passed.
+    """
+    left = time_left()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise BudgetExhausted("Run time budget exhausted")
+    return min(timeout, left)
+
+
+async def within_budget(awaitable: Awaitable[T]) -> T:
+    """
+    Awaits ``awaitable``, cancelling it if the deadline passes first.
+
+    Raises:
+        BudgetExhausted: If the deadline passed before or while awaiting.
+    """
+    left = time_left()
+    if left is None:
+        return await awaitable
+    if left <= 0:
+        # Close the coroutine so it is not reported as never awaited
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()
+        raise BudgetExhausted("Run time budget exhausted")
+    try:
+        return await asyncio.wait_for(awaitable, timeout=left)
+    except asyncio.TimeoutError as e:
+        raise BudgetExhausted(f"Run time budget exhausted after waiting {left:.1f}s") from e
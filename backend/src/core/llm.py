@@ -0,0 +1,120 @@
+"""
+Shared LLM client provider.
+
+Every chat model is obtained from ``get_llm`` instead of constructing a
+``ChatOpenAI`` per invocation; agent nodes and tools reach it through the
+task routing table in ``src.core.llm_routing``. Clients are pooled per
+(model, temperature) and all share one ``httpx.AsyncClient``, so TCP/TLS
+connections to OpenRouter are reused across calls.
+
+This module is the single place that configures:
+- Request timeouts and connection-pool limits (``LLM_*`` settings)
+- Retries with exponential backoff on transient provider errors
+- Per-call token, latency, retry and cost accounting (``src.core.llm_metrics``)
+- Exact-match response caching for low-temperature prompts (``src.core.llm_cache``)
+"""
+
+from __future__ import annotations
+
+import logging
+
+import httpx
+import openai
+from langchain_core.runnables import Runnable
+from langchain_openai import ChatOpenAI
+
+from src.core.config import settings
+from src.core.llm_cache import get_llm_response_cache
+from src.core.llm_metrics import LLMMetricsCallbackHandler, llm_metrics
+
+logger = logging.getLogger(__name__)
+
+# Transient provider errors worth retrying; 4xx client errors are not retried.
+_RETRYABLE_ERRORS: tuple[type[BaseException], ...] = (
+    openai.APIConnectionError,  # includes APITimeoutError
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+_metrics_handler = LLMMetricsCallbackHandler(llm_metrics)
+
+
+# ---------------------------------------------------------------------------
+# Client pool
+# ---------------------------------------------------------------------------
+
+_http_client: httpx.AsyncClient | None = None
+_clients: dict[tuple[str, float, bool], Runnable] = {}
+
+
+def init_llm_clients() -> None:
+    """Creates the shared HTTP connection pool. Called once at app startup."""
+    global _http_client
+    if _http_client is not None:
+        return
+
+    _http_client = httpx.AsyncClient(
+        timeout=settings.LLM_REQUEST_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+    )
+    logger.info("Initialized shared LLM HTTP client pool.")
+
+
+async def close_llm_clients() -> None:
+    """Drops pooled clients and closes the shared HTTP pool on shutdown."""
+    global _http_client
+    _clients.clear()
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+def get_llm(model: str | None = None, temperature: float = 0.0, cache: bool | None = None) -> Runnable:
+    """
+    Returns the pooled chat model for (model, temperature), creating it on first use.
+
+    Args:
+        model: OpenRouter model name. Defaults to OPENROUTER_DEFAULT_MODEL.
+        temperature: Sampling temperature.
+        cache: Whether to serve identical prompts from the response cache.
+            Defaults to True for temperature <= LLM_CACHE_MAX_TEMPERATURE.
+
+    Returns:
+        Runnable: A chat model wrapped with retry-on-transient-error behaviour.
+        Use it exactly like a ChatOpenAI instance (``await llm.ainvoke(messages)``).
+    """
+    model = model or settings.OPENROUTER_DEFAULT_MODEL
+    if cache is None:
+        cache = temperature <= settings.LLM_CACHE_MAX_TEMPERATURE
+    key = (model, float(temperature), cache)
+
+    client = _clients.get(key)
+    if client is None:
+        # Lazily create the pool for scripts/workers that bypass the app lifespan
+        init_llm_clients()
+
+        chat_model = ChatOpenAI(
+            model=model,
+            temperature=temperature,
+            openai_api_key=settings.OPENROUTER_API_KEY,
+            base_url=settings.OPENROUTER_BASE_URL,
+            timeout=settings.LLM_REQUEST_TIMEOUT,
+            max_retries=0,  # retries are handled below so they are visible to callbacks
+            http_async_client=_http_client,
+            stream_usage=True,  # report token usage for streamed calls too
+            callbacks=[_metrics_handler],
+            # False (not None) so LangChain never falls back to a global cache
+            cache=(get_llm_response_cache() or False) if cache else False,
+        )
+        client = chat_model.with_retry(
+            retry_if_exception_type=_RETRYABLE_ERRORS,
+            stop_after_attempt=settings.LLM_MAX_RETRIES + 1,
+        )
+        _clients[key] = client
+
+    return client
+
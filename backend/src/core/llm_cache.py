@@ -0,0 +1,288 @@
+"""
+Deterministic LLM response cache.
+
+Exact-match cache for idempotent (low-temperature) prompts. Plugs into
+LangChain's ``BaseCache`` interface so pooled chat models from
+``src.core.llm`` consult it transparently on every ``ainvoke``.
+
+Keys are ``sha256(llm_string + normalized prompt)``. The ``llm_string`` is
+LangChain's serialization of the model's invocation params (model name,
+temperature, stop tokens, ...), so a hit requires the same model *and*
+the same settings. Prompt normalization collapses whitespace so the
+indentation of our triple-quoted f-string prompts does not affect keys.
+
+Backends (``LLM_CACHE_BACKEND``):
+- ``memory``   – per-process LRU dict with TTL
+- ``postgres`` – shared ``llmcacheentry`` table with TTL and periodic LRU trimming
+- ``none``     – caching disabled
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Sequence
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, Generation
+from sqlalchemy import text
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# ---------------------------------------------------------------------------
+# Key & value helpers
+# ---------------------------------------------------------------------------
+
+def _normalize_prompt(prompt: str) -> str:
+    """Collapses all whitespace runs (including JSON-escaped newlines/tabs)."""
+    prompt = prompt.replace("\\n", " ").replace("\\t", " ")
+    return " ".join(prompt.split())
+
+
+def make_cache_key(prompt: str, llm_string: str) -> str:
+    """Builds the cache key from the model params string and the normalized prompt."""
+    digest = hashlib.sha256()
+    digest.update(llm_string.encode("utf-8"))
+    digest.update(b"\x00")
+    digest.update(_normalize_prompt(prompt).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _serialize_generations(generations: Sequence[Generation]) -> str:
+    items = []
+    for gen in generations:
+        message = getattr(gen, "message", None)
+        metadata = dict(message.response_metadata) if message is not None else {}
+        # Token usage belongs to the original call; a cache hit spends none
+        metadata.pop("token_usage", None)
+        items.append({
+            "content": message.content if message is not None else gen.text,
+            "response_metadata": metadata,
+        })
+    return json.dumps(items)
+
+
+def _deserialize_generations(raw: str) -> list[Generation]:
+    return [
+        ChatGeneration(message=AIMessage(content=item["content"], response_metadata=item["response_metadata"]))
+        for item in json.loads(raw)
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+class LLMCacheBackend(ABC):
+    """Async key/value store for serialized LLM responses."""
+
+    @abstractmethod
+    async def get(self, key: str) -> str | None:
+        """Returns the stored value, or None on a miss or expired entry."""
+
+    @abstractmethod
+    async def set(self, key: str, value: str) -> None:
+        """Stores a value, evicting least-recently-used entries past capacity."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Removes every entry."""
+
+
+class InMemoryLLMCacheBackend(LLMCacheBackend):
+    """Per-process LRU cache with a fixed TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int) -> None:
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    async def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        self._entries[key] = (time.monotonic() + self._ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class PostgresLLMCacheBackend(LLMCacheBackend):
+    """
+    Cache shared across workers, stored in the ``llmcacheentry`` table.
+
+    Trimming sorts the whole table, so it runs at most once per
+    ``trim_interval_seconds`` per process rather than on every insert; the
+    table may briefly hold more than ``max_entries`` rows in between.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, trim_interval_seconds: int) -> None:
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._trim_interval_seconds = trim_interval_seconds
+        self._next_trim_at = 0.0
+
+    async def get(self, key: str) -> str | None:
+        # Imported lazily so the in-memory backend never touches the DB engine
+        from src.db.session import engine
+        from src.models.llm_cache import LLMCacheEntry
+
+        now = datetime.now(timezone.utc)
+        async with AsyncSession(engine) as session:
+            result = await session.exec(
+                select(LLMCacheEntry.value)
+                .where(LLMCacheEntry.key == key)
+                .where(LLMCacheEntry.expires_at > now)
+            )
+            value = result.first()
+            if value is not None:
+                await session.exec(
+                    text("UPDATE llmcacheentry SET last_accessed_at = :now WHERE key = :key"),
+                    params={"now": now, "key": key},
+                )
+                await session.commit()
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        from src.db.session import engine
+
+        now = datetime.now(timezone.utc)
+        async with AsyncSession(engine) as session:
+            await session.exec(
+                text("""
+                    INSERT INTO llmcacheentry (key, value, created_at, expires_at, last_accessed_at)
+                    VALUES (:key, :value, :now, :expires_at, :now)
+                    ON CONFLICT (key) DO UPDATE
+                    SET value = EXCLUDED.value,
+                        expires_at = EXCLUDED.expires_at,
+                        last_accessed_at = EXCLUDED.last_accessed_at
+                """),
+                params={
+                    "key": key,
+                    "value": value,
+                    "now": now,
+                    "expires_at": now + timedelta(seconds=self._ttl_seconds),
+                },
+            )
+            if time.monotonic() >= self._next_trim_at:
+                self._next_trim_at = time.monotonic() + self._trim_interval_seconds
+                # Drop expired rows and trim the least-recently-used tail past capacity
+                await session.exec(
+                    text("""
+                        DELETE FROM llmcacheentry
+                        WHERE expires_at <= :now
+                           OR key IN (
+                               SELECT key FROM llmcacheentry
+                               ORDER BY last_accessed_at DESC
+                               OFFSET :max_entries
+                           )
+                    """),
+                    params={"now": now, "max_entries": self._max_entries},
+                )
+            await session.commit()
+
+    async def clear(self) -> None:
+        from src.db.session import engine
+
+        async with AsyncSession(engine) as session:
+            await session.exec(text("DELETE FROM llmcacheentry"))
+            await session.commit()
+
+
+# ---------------------------------------------------------------------------
+# LangChain cache adapter
+# ---------------------------------------------------------------------------
+
+class LLMResponseCache(BaseCache):
+    """
+    LangChain ``BaseCache`` backed by an async ``LLMCacheBackend``.
+
+    Only the async interface is served; every call site in this codebase
+    uses ``ainvoke``. Sync invocations bypass the cache.
+    """
+
+    def __init__(self, backend: LLMCacheBackend) -> None:
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        return None
+
+    def clear(self, **kwargs: Any) -> None:
+        return None
+
+    async def alookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        try:
+            raw = await self.backend.get(make_cache_key(prompt, llm_string))
+        except Exception as e:
+            # A broken cache must never fail the LLM call itself
+            logger.warning(f"LLM cache lookup failed: {e}")
+            raw = None
+
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _deserialize_generations(raw)
+
+    async def aupdate(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        try:
+            await self.backend.set(make_cache_key(prompt, llm_string), _serialize_generations(return_val))
+        except Exception as e:
+            logger.warning(f"LLM cache update failed: {e}")
+
+    async def aclear(self, **kwargs: Any) -> None:
+        await self.backend.clear()
+
+
+_response_cache: LLMResponseCache | None = None
+
+
+def get_llm_response_cache() -> LLMResponseCache | None:
+    """Returns the process-wide response cache configured by LLM_CACHE_BACKEND."""
+    global _response_cache
+    if _response_cache is not None:
+        return _response_cache
+
+    backend_name = settings.LLM_CACHE_BACKEND.lower()
+    if backend_name == "memory":
+        backend: LLMCacheBackend = InMemoryLLMCacheBackend(
+            settings.LLM_CACHE_MAX_ENTRIES, settings.LLM_CACHE_TTL_SECONDS
+        )
+    elif backend_name == "postgres":
+        backend = PostgresLLMCacheBackend(
+            settings.LLM_CACHE_MAX_ENTRIES, settings.LLM_CACHE_TTL_SECONDS, settings.LLM_CACHE_TRIM_INTERVAL_SECONDS
+        )
+    elif backend_name == "none":
+        return None
+    else:
+        raise ValueError(f"Unknown LLM_CACHE_BACKEND '{settings.LLM_CACHE_BACKEND}'")
+
+    _response_cache = LLMResponseCache(backend)
+    return _response_cache
@@ -0,0 +1,296 @@
+"""
+LLM observability: per-call token, latency, retry and cost accounting.
+
+A single ``LLMMetricsCallbackHandler`` is attached to every pooled chat
+model in ``src.core.llm``. Each LLM call becomes an ``LLMCallRecord``
+tagged with the graph name and run ID (from ``agent_run_config``) and
+the LangGraph node that made it (``langgraph_node`` metadata, which
+LangGraph propagates to every nested LLM/tool call).
+
+Records are aggregated in memory by (graph, node, model) and kept per
+run for the most recent runs. Exposed via ``/api/v1/metrics/llm``.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Any, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables import RunnableConfig
+from pydantic import BaseModel, Field, computed_field
+
+from src.core.config import settings
+from src.core.llm_scheduler import LLMPriority
+
+logger = logging.getLogger(__name__)
+
+# Metadata keys set by agent_run_config and read back by the callback handler
+GRAPH_METADATA_KEY = "sprout_graph"
+RUN_ID_METADATA_KEY = "sprout_run_id"
+# Read by RoutedLLM to schedule the call (src.core.llm_scheduler)
+PRIORITY_METADATA_KEY = "sprout_llm_priority"
+FARM_ID_METADATA_KEY = "sprout_farm_id"
+# Set by RoutedLLM (src.core.llm_routing) on every routed call
+TASK_METADATA_KEY = "sprout_llm_task"
+HEDGE_TAG = "llm:hedge"
+
+_RETRY_TAG_PREFIX = "retry:attempt:"  # set by Runnable.with_retry on attempts >= 2
+
+
+class LLMCallRecord(BaseModel):
+    """One LLM call (one attempt) as seen by the callback handler."""
+    graph: str = "unknown"
+    node: str = "unknown"
+    run_id: Optional[str] = None
+    model: str = "unknown"
+    task: Optional[str] = None
+    hedge: bool = False  # duplicate request fired by the hedging policy
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_ms: float = 0.0
+    retries: int = 0
+    cost_usd: float = 0.0
+    error: Optional[str] = None
+    started_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class LLMUsageSummary(BaseModel):
+    """Aggregated usage for a group of LLM calls."""
+    graph: Optional[str] = None
+    node: Optional[str] = None
+    model: Optional[str] = None
+    calls: int = 0
+    errors: int = 0
+    retries: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_latency_ms: float = 0.0
+    max_latency_ms: float = 0.0
+    cost_usd: float = 0.0
+
+    @computed_field
+    @property
+    def avg_latency_ms(self) -> float:
+        return self.total_latency_ms / self.calls if self.calls else 0.0
+
+    def add(self, record: LLMCallRecord) -> None:
+        self.calls += 1
+        self.errors += 1 if record.error else 0
+        self.retries += record.retries
+        self.prompt_tokens += record.prompt_tokens
+        self.completion_tokens += record.completion_tokens
+        self.total_latency_ms += record.latency_ms
+        self.max_latency_ms = max(self.max_latency_ms, record.latency_ms)
+        self.cost_usd += record.cost_usd
+
+    def merge(self, other: "LLMUsageSummary") -> None:
+        self.calls += other.calls
+        self.errors += other.errors
+        self.retries += other.retries
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.total_latency_ms += other.total_latency_ms
+        self.max_latency_ms = max(self.max_latency_ms, other.max_latency_ms)
+        self.cost_usd += other.cost_usd
+
+
+class RunUsageSummary(BaseModel):
+    """Per-run view: totals plus a breakdown by node and the raw call records."""
+    run_id: str
+    graph: str
+    totals: LLMUsageSummary
+    by_node: list[LLMUsageSummary]
+    calls: list[LLMCallRecord]
+
+
+def estimate_cost_usd(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Estimates call cost from LLM_PRICING_PER_MILLION_TOKENS (0.0 for unknown models)."""
+    pricing = settings.LLM_PRICING_PER_MILLION_TOKENS.get(model)
+    if not pricing:
+        return 0.0
+    prompt_price, completion_price = pricing
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+class LLMMetricsRegistry:
+    """In-memory aggregation of LLM call records."""
+
+    def __init__(self, max_records: int, max_runs: int) -> None:
+        self._lock = threading.Lock()
+        self._recent: deque[LLMCallRecord] = deque(maxlen=max_records)
+        self._aggregates: dict[tuple[str, str, str], LLMUsageSummary] = {}
+        self._runs: OrderedDict[str, list[LLMCallRecord]] = OrderedDict()
+        self._max_runs = max_runs
+
+    def record(self, record: LLMCallRecord) -> None:
+        with self._lock:
+            self._recent.append(record)
+            key = (record.graph, record.node, record.model)
+            summary = self._aggregates.get(key)
+            if summary is None:
+                summary = self._aggregates[key] = LLMUsageSummary(
+                    graph=record.graph, node=record.node, model=record.model
+                )
+            summary.add(record)
+
+            if record.run_id:
+                self._runs.setdefault(record.run_id, []).append(record)
+                self._runs.move_to_end(record.run_id)
+                while len(self._runs) > self._max_runs:
+                    self._runs.popitem(last=False)
+
+    def aggregates(self) -> list[LLMUsageSummary]:
+        with self._lock:
+            return [summary.model_copy() for summary in self._aggregates.values()]
+
+    def recent(self, limit: int = 100) -> list[LLMCallRecord]:
+        with self._lock:
+            return list(self._recent)[-limit:]
+
+    def latency_quantile(self, task: str, model: str, quantile: float, min_samples: int) -> float | None:
+        """
+        Returns the given latency quantile (in ms) of recent successful calls for
+        (task, model), or None if fewer than ``min_samples`` calls were observed.
+        """
+        with self._lock:
+            latencies = sorted(
+                record.latency_ms for record in self._recent
+                if record.task == task and record.model == model and not record.error
+            )
+        if not latencies or len(latencies) < min_samples:
+            return None
+        index = min(len(latencies) - 1, int(quantile * len(latencies)))
+        return latencies[index]
+
+    def run_summary(self, run_id: str) -> RunUsageSummary | None:
+        with self._lock:
+            records = list(self._runs.get(run_id, []))
+        if not records:
+            return None
+
+        totals = LLMUsageSummary(graph=records[0].graph)
+        by_node: dict[str, LLMUsageSummary] = {}
+        for record in records:
+            totals.add(record)
+            by_node.setdefault(record.node, LLMUsageSummary(graph=record.graph, node=record.node)).add(record)
+
+        return RunUsageSummary(
+            run_id=run_id,
+            graph=records[0].graph,
+            totals=totals,
+            by_node=list(by_node.values()),
+            calls=records,
+        )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._recent.clear()
+            self._aggregates.clear()
+            self._runs.clear()
+
+
+llm_metrics = LLMMetricsRegistry(settings.LLM_METRICS_MAX_RECORDS, settings.LLM_METRICS_MAX_RUNS)
+
+
+# ---------------------------------------------------------------------------
+# Callback handler
+# ---------------------------------------------------------------------------
+
+class LLMMetricsCallbackHandler(BaseCallbackHandler):
+    """Turns chat model start/end/error callbacks into LLMCallRecords."""
+
+    run_inline = True  # cheap bookkeeping; avoid a thread-pool hop per callback
+
+    def __init__(self, registry: LLMMetricsRegistry) -> None:
+        self._registry = registry
+        self._pending: dict[UUID, tuple[LLMCallRecord, float]] = {}
+
+    def on_chat_model_start(
+            self, serialized: dict[str, Any], messages: Any, *, run_id: UUID,
+            tags: list[str] | None = None, metadata: dict[str, Any] | None = None, **kwargs: Any,
+    ) -> None:
+        metadata = metadata or {}
+        retries = 0
+        for tag in tags or []:
+            if tag.startswith(_RETRY_TAG_PREFIX):
+                retries = max(retries, int(tag[len(_RETRY_TAG_PREFIX):]) - 1)
+
+        record = LLMCallRecord(
+            graph=metadata.get(GRAPH_METADATA_KEY, "unknown"),
+            node=metadata.get("langgraph_node", "unknown"),
+            run_id=metadata.get(RUN_ID_METADATA_KEY),
+            model=metadata.get("ls_model_name", "unknown"),
+            task=metadata.get(TASK_METADATA_KEY),
+            hedge=HEDGE_TAG in (tags or []),
+            retries=retries,
+        )
+        self._pending[run_id] = (record, time.perf_counter())
+
+    def _finish(self, run_id: UUID) -> LLMCallRecord | None:
+        pending = self._pending.pop(run_id, None)
+        if pending is None:
+            return None
+        record, started = pending
+        record.latency_ms = (time.perf_counter() - started) * 1000
+        return record
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        record = self._finish(run_id)
+        if record is None:
+            return
+
+        usage = None
+        if response.generations and response.generations[0]:
+            message = getattr(response.generations[0][0], "message", None)
+            usage = getattr(message, "usage_metadata", None)
+        if usage:
+            record.prompt_tokens = usage.get("input_tokens", 0)
+            record.completion_tokens = usage.get("output_tokens", 0)
+        else:
+            token_usage = (response.llm_output or {}).get("token_usage") or {}
+            record.prompt_tokens = token_usage.get("prompt_tokens", 0)
+            record.completion_tokens = token_usage.get("completion_tokens", 0)
+
+        record.cost_usd = estimate_cost_usd(record.model, record.prompt_tokens, record.completion_tokens)
+        self._registry.record(record)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        record = self._finish(run_id)
+        if record is None:
+            return
+        record.error = f"{type(error).__name__}: {error}"
+        self._registry.record(record)
+
+
+def agent_run_config(
+        graph_name: str,
+        run_id: str,
+        priority: LLMPriority = LLMPriority.batch,
+        farm_id: Optional[str] = None,
+) -> RunnableConfig:
+    """
+    Builds the RunnableConfig to pass to ``agent.ainvoke``/``astream`` so every
+    LLM call in the run is tagged with the graph name and run ID, and scheduled
+    in the given priority class with fair sharing by farm. The run ID is also
+    the LangGraph thread ID, under which the run is checkpointed
+    (``src.core.checkpointing``).
+    """
+    metadata: dict[str, Any] = {
+        GRAPH_METADATA_KEY: graph_name,
+        RUN_ID_METADATA_KEY: run_id,
+        PRIORITY_METADATA_KEY: priority.value,
+    }
+    if farm_id:
+        metadata[FARM_ID_METADATA_KEY] = farm_id
+    return {"run_name": graph_name, "metadata": metadata, "configurable": {"thread_id": run_id}}
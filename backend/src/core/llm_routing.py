@@ -0,0 +1,257 @@
+"""
+Task-based model routing with hedged requests.
+
+Agent nodes and tools ask for a model by *task* (``get_llm_for_task("persona")``)
+rather than by model name. ``DEFAULT_LLM_ROUTES`` maps each task to a primary
+and a fallback model; ``LLM_ROUTE_OVERRIDES`` can change any of them per
+deployment without touching code.
+
+The returned ``RoutedLLM`` calls the primary model and:
+- **Hedges**: if the primary has not answered by its observed latency
+  percentile (``LLM_HEDGE_PERCENTILE`` of recent calls for the same task,
+  from ``src.core.llm_metrics``), fires the same request at the fallback and
+  returns whichever finishes first, cancelling the other. Hedging is capped
+  at ``LLM_HEDGE_BUDGET_PER_RUN`` duplicate requests per agent run, and only
+  applies to calls made inside a run started with ``agent_run_config``.
+- **Fails over**: if the primary raises (after its own retries), retries the
+  request once on the fallback model.
+
+Each model call first waits for a slot in ``src.core.llm_scheduler``. The
+whole call, hedges and failover included, is cancelled with
+``BudgetExhausted`` once the run's time budget (``src.core.deadline``) is spent.
+
+To exercise hedging locally, point ``OPENROUTER_BASE_URL`` at
+``scripts/fake_llm_server.py``, which answers with per-model latencies.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Optional
+
+from langchain_core.language_models import LanguageModelInput
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import Runnable, RunnableConfig
+from langchain_core.runnables.config import ensure_config, merge_configs
+from pydantic import BaseModel
+
+from src.core.config import settings
+from src.core.deadline import within_budget
+from src.core.llm import get_llm
+from src.core.llm_metrics import (
+    FARM_ID_METADATA_KEY,
+    HEDGE_TAG,
+    PRIORITY_METADATA_KEY,
+    RUN_ID_METADATA_KEY,
+    TASK_METADATA_KEY,
+    llm_metrics,
+)
+from src.core.llm_scheduler import LLMPriority, llm_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+class LLMRoute(BaseModel):
+    """Models and sampling settings for one task."""
+    primary: Optional[str] = None  # None -> OPENROUTER_DEFAULT_MODEL
+    fallback: Optional[str] = None  # None -> OPENROUTER_FALLBACK_MODEL
+    temperature: float = 0.0
+    # None -> cached when temperature <= LLM_CACHE_MAX_TEMPERATURE (see src.core.llm_cache)
+    cache: Optional[bool] = None
+    # Streamed tasks should not hedge: two concurrent generations would
+    # interleave their tokens in the stream.
+    hedge: bool = True
+
+
+DEFAULT_LLM_ROUTES: dict[str, LLMRoute] = {
+    # Builder agent
+    "persona": LLMRoute(temperature=0.7),
+    "domain_names": LLMRoute(temperature=0.7),
+    "website_generation": LLMRoute(
+        primary="anthropic/claude-sonnet-4",
+        fallback="google/gemini-2.5-flash",
+        temperature=0.2,  # Lower temperature for code generation
+        cache=False,  # regenerating a site should produce a new one
+        hedge=False,  # streamed to the client token by token
+    ),
+    "website_section": LLMRoute(
+        primary="anthropic/claude-sonnet-4",
+        fallback="google/gemini-2.5-flash",
+        temperature=0.2,
+        cache=False,
+    ),
+    # Discovery agent
+    "visual_analysis": LLMRoute(temperature=0.2),
+    "competitor_scoring": LLMRoute(temperature=0.0),
+    "competitor_gap": LLMRoute(temperature=0.2),
+    "seo_keywords": LLMRoute(temperature=0.4),
+    # Analytics agent
+    "market_insights": LLMRoute(temperature=0.3),
+    # SDR agent
+    "outreach_email": LLMRoute(temperature=0.7),
+}
+
+
+def resolve_route(task: str) -> LLMRoute:
+    """Returns the route for ``task`` with LLM_ROUTE_OVERRIDES applied."""
+    overrides = settings.LLM_ROUTE_OVERRIDES.get(task, {})
+    route = DEFAULT_LLM_ROUTES.get(task)
+    if route is None:
+        if not overrides:
+            raise ValueError(f"Unknown LLM task '{task}'")
+        route = LLMRoute()
+    route = route.model_validate({**route.model_dump(), **overrides})
+
+    return route.model_copy(update={
+        "primary": route.primary or settings.OPENROUTER_DEFAULT_MODEL,
+        "fallback": route.fallback or settings.OPENROUTER_FALLBACK_MODEL or None,
+    })
+
+
+# ---------------------------------------------------------------------------
+# Per-run hedge budget
+# ---------------------------------------------------------------------------
+
+class HedgeBudget:
+    """Counts hedged requests per run so a slow provider cannot double a run's cost."""
+
+    def __init__(self, max_runs: int) -> None:
+        self._used: OrderedDict[str, int] = OrderedDict()
+        self._max_runs = max_runs
+
+    def remaining(self, run_id: str) -> int:
+        return max(0, settings.LLM_HEDGE_BUDGET_PER_RUN - self._used.get(run_id, 0))
+
+    def try_consume(self, run_id: str) -> bool:
+        if self.remaining(run_id) <= 0:
+            return False
+        self._used[run_id] = self._used.get(run_id, 0) + 1
+        self._used.move_to_end(run_id)
+        while len(self._used) > self._max_runs:
+            self._used.popitem(last=False)
+        return True
+
+    def reset(self) -> None:
+        self._used.clear()
+
+
+hedge_budget = HedgeBudget(settings.LLM_METRICS_MAX_RUNS)
+
+
+# ---------------------------------------------------------------------------
+# Routed model
+# ---------------------------------------------------------------------------
+
+async def _first_success(primary: asyncio.Future, secondary: asyncio.Future) -> Any:
+    """Returns the first successful result; raises the primary's error if both fail."""
+    pending = {primary, secondary}
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if task.exception() is None:
+                return task.result()
+    raise primary.exception()
+
+
+class RoutedLLM(Runnable[LanguageModelInput, BaseMessage]):
+    """
+    Chat model for one task: the primary model with hedging and failover to
+    the fallback. Use it exactly like a chat model (``await llm.ainvoke(messages)``).
+    """
+
+    def __init__(self, task: str, route: LLMRoute) -> None:
+        self.task = task
+        self.route = route
+        self.primary = get_llm(route.primary, temperature=route.temperature, cache=route.cache)
+        self.fallback = (
+            get_llm(route.fallback, temperature=route.temperature, cache=route.cache) if route.fallback else None
+        )
+
+    def _config(self, config: RunnableConfig, hedge: bool = False) -> RunnableConfig:
+        return merge_configs(config, {
+            "metadata": {TASK_METADATA_KEY: self.task},
+            "tags": [HEDGE_TAG] if hedge else [],
+        })
+
+    async def _call(self, llm: Runnable, input: LanguageModelInput, config: RunnableConfig, **kwargs: Any) -> BaseMessage:
+        """One model call, admitted by the LLM scheduler."""
+        metadata = config.get("metadata", {})
+        priority = LLMPriority(metadata.get(PRIORITY_METADATA_KEY, LLMPriority.batch))
+        farm_key = metadata.get(FARM_ID_METADATA_KEY) or metadata.get(RUN_ID_METADATA_KEY) or "default"
+        async with llm_scheduler.slot(priority, farm_key):
+            return await llm.ainvoke(input, config, **kwargs)
+
+    def _hedge_delay(self, run_id: str | None) -> float | None:
+        """Seconds to wait on the primary before hedging, or None to never hedge."""
+        if (
+            not settings.LLM_HEDGING_ENABLED
+            or not self.route.hedge
+            or self.fallback is None
+            or run_id is None
+            or hedge_budget.remaining(run_id) <= 0
+        ):
+            return None
+
+        latency_ms = llm_metrics.latency_quantile(
+            self.task, self.route.primary, settings.LLM_HEDGE_PERCENTILE, settings.LLM_HEDGE_MIN_SAMPLES
+        )
+        delay = latency_ms / 1000 if latency_ms is not None else settings.LLM_HEDGE_DEFAULT_DELAY_SECONDS
+        return max(delay, settings.LLM_HEDGE_MIN_DELAY_SECONDS)
+
+    def invoke(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None, **kwargs: Any) -> BaseMessage:
+        config = self._config(ensure_config(config))
+        try:
+            return self.primary.invoke(input, config, **kwargs)
+        except Exception as e:
+            if self.fallback is None:
+                raise
+            logger.warning(f"LLM task '{self.task}' failed on {self.route.primary} ({e}); retrying on {self.route.fallback}.")
+            return self.fallback.invoke(input, config, **kwargs)
+
+    async def ainvoke(self, input: LanguageModelInput, config: Optional[RunnableConfig] = None, **kwargs: Any) -> BaseMessage:
+        return await within_budget(self._ainvoke(input, config, **kwargs))
+
+    async def _ainvoke(self, input: LanguageModelInput, config: Optional[RunnableConfig], **kwargs: Any) -> BaseMessage:
+        config = ensure_config(config)
+        run_id = config.get("metadata", {}).get(RUN_ID_METADATA_KEY)
+
+        primary = asyncio.ensure_future(self._call(self.primary, input, self._config(config), **kwargs))
+        secondary = None
+        try:
+            delay = self._hedge_delay(run_id)
+            if delay is not None:
+                done, _ = await asyncio.wait({primary}, timeout=delay)
+                if not done and hedge_budget.try_consume(run_id):
+                    logger.info(
+                        f"LLM task '{self.task}': {self.route.primary} slower than {delay:.1f}s, "
+                        f"hedging with {self.route.fallback}."
+                    )
+                    secondary = asyncio.ensure_future(
+                        self._call(self.fallback, input, self._config(config, hedge=True), **kwargs)
+                    )
+                    return await _first_success(primary, secondary)
+
+            try:
+                return await primary
+            except Exception as e:
+                if self.fallback is None:
+                    raise
+                logger.warning(f"LLM task '{self.task}' failed on {self.route.primary} ({e}); retrying on {self.route.fallback}.")
+                return await self._call(self.fallback, input, self._config(config), **kwargs)
+        finally:
+            # Cancel the losing (or orphaned) request so it stops consuming tokens
+            for task in (primary, secondary):
+                if task is not None and not task.done():
+                    task.cancel()
+
+
+def get_llm_for_task(task: str) -> RoutedLLM:
+    """
+    Returns the routed chat model for a task in DEFAULT_LLM_ROUTES.
+
+    Raises:
+        ValueError: If the task has no default route and no override.
+    """
+    return RoutedLLM(task, resolve_route(task))
@@ -0,0 +1,179 @@
+"""
+Process-wide scheduler for outbound LLM calls.
+
+Every routed LLM call (``src.core.llm_routing.RoutedLLM``) waits for a slot
+here before it is sent to OpenRouter, so interactive requests and
+background work share provider capacity predictably:
+
+- Two priority classes. ``interactive`` (a user waiting on the response,
+  e.g. the website builder) and ``batch`` (SDR drafting, discovery audits,
+  data ingestion). When a slot frees up, queued interactive calls always go
+  before queued batch calls.
+- Per-class concurrency caps on top of a global cap. ``batch`` is capped
+  below the global limit so interactive calls always find headroom.
+- Fair sharing within a class. Waiters are queued per farm (or per run when
+  no farm is known). The farm with the fewest calls in flight goes next,
+  ties going to the farm served least recently, so one farm's 200-lead SDR
+  run cannot starve another's.
+
+A call's class and farm come from the run config built by
+``agent_run_config``; calls outside an agent run default to ``batch``.
+Queue depth and wait times are exported at ``/api/v1/metrics/llm``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from enum import Enum
+from typing import AsyncIterator
+
+from pydantic import BaseModel
+
+from src.core.config import settings
+
+
+class LLMPriority(str, Enum):
+    """Scheduling class of an LLM call, in dispatch order."""
+    interactive = "interactive"
+    batch = "batch"
+
+
+class LLMSchedulerClassStats(BaseModel):
+    """Queue and wait-time snapshot for one priority class."""
+    priority: LLMPriority
+    limit: int
+    running: int
+    queued: int
+    granted: int
+    avg_wait_ms: float
+    p95_wait_ms: float
+    max_wait_ms: float
+
+
+class LLMScheduler:
+    """Priority + fair-share admission control for LLM calls."""
+
+    def __init__(self, max_concurrency: int, limits: dict[LLMPriority, int], wait_samples: int = 1000) -> None:
+        self._max_concurrency = max_concurrency
+        self._limits = limits
+        self._running = {priority: 0 for priority in LLMPriority}
+        self._granted = {priority: 0 for priority in LLMPriority}
+        # Fair-share bookkeeping, dropped once a farm has nothing running or queued
+        self._running_by_farm: dict[str, int] = {}
+        self._last_grant: dict[str, int] = {}
+        self._grant_seq = 0
+        # priority -> farm key -> waiters, farms in arrival order
+        self._queues: dict[LLMPriority, OrderedDict[str, deque[asyncio.Future]]] = {
+            priority: OrderedDict() for priority in LLMPriority
+        }
+        self._waits: dict[LLMPriority, deque[float]] = {
+            priority: deque(maxlen=wait_samples) for priority in LLMPriority
+        }
+
+    def _can_start(self, priority: LLMPriority) -> bool:
+        return (
+            sum(self._running.values()) < self._max_concurrency
+            and self._running[priority] < self._limits[priority]
+        )
+
+    def _fair_share_key(self, farm_key: str) -> tuple[int, int]:
+        return self._running_by_farm.get(farm_key, 0), self._last_grant.get(farm_key, 0)
+
+    def _forget_idle_farm(self, farm_key: str) -> None:
+        if farm_key not in self._running_by_farm and not any(farm_key in q for q in self._queues.values()):
+            self._last_grant.pop(farm_key, None)
+
+    def _dispatch(self) -> None:
+        """Grants free slots to waiters: interactive first, then the least-served farm."""
+        for priority in LLMPriority:
+            queues = self._queues[priority]
+            while queues and self._can_start(priority):
+                farm_key = min(queues, key=self._fair_share_key)
+                waiters = queues[farm_key]
+                future = waiters.popleft()
+                if not waiters:
+                    del queues[farm_key]
+                self._running[priority] += 1
+                self._running_by_farm[farm_key] = self._running_by_farm.get(farm_key, 0) + 1
+                self._grant_seq += 1
+                self._last_grant[farm_key] = self._grant_seq
+                self._granted[priority] += 1
+                future.set_result(None)
+
+    def _remove_waiter(self, priority: LLMPriority, farm_key: str, future: asyncio.Future) -> None:
+        waiters = self._queues[priority].get(farm_key)
+        if waiters is None:
+            return
+        try:
+            waiters.remove(future)
+        except ValueError:
+            pass
+        if not waiters:
+            del self._queues[priority][farm_key]
+            self._forget_idle_farm(farm_key)
+
+    async def acquire(self, priority: LLMPriority, farm_key: str) -> None:
+        """Waits until the call may start. Pair every acquire with a ``release``."""
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        self._queues[priority].setdefault(farm_key, deque()).append(future)
+        self._dispatch()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted right before the caller was cancelled: hand the slot back
+                self.release(priority, farm_key)
+            else:
+                self._remove_waiter(priority, farm_key, future)
+            raise
+
+        self._waits[priority].append((time.monotonic() - started) * 1000)
+
+    def release(self, priority: LLMPriority, farm_key: str) -> None:
+        self._running[priority] -= 1
+        remaining = self._running_by_farm.get(farm_key, 0) - 1
+        if remaining > 0:
+            self._running_by_farm[farm_key] = remaining
+        else:
+            self._running_by_farm.pop(farm_key, None)
+        self._dispatch()
+        self._forget_idle_farm(farm_key)
+
+    @asynccontextmanager
+    async def slot(self, priority: LLMPriority, farm_key: str) -> AsyncIterator[None]:
+        """``async with scheduler.slot(priority, farm_key):`` around one LLM call."""
+        await self.acquire(priority, farm_key)
+        try:
+            yield
+        finally:
+            self.release(priority, farm_key)
+
+    def stats(self) -> list[LLMSchedulerClassStats]:
+        snapshot = []
+        for priority in LLMPriority:
+            waits = sorted(self._waits[priority])
+            snapshot.append(LLMSchedulerClassStats(
+                priority=priority,
+                limit=self._limits[priority],
+                running=self._running[priority],
+                queued=sum(len(waiters) for waiters in self._queues[priority].values()),
+                granted=self._granted[priority],
+                avg_wait_ms=sum(waits) / len(waits) if waits else 0.0,
+                p95_wait_ms=waits[min(len(waits) - 1, int(0.95 * len(waits)))] if waits else 0.0,
+                max_wait_ms=waits[-1] if waits else 0.0,
+            ))
+        return snapshot
+
+
+llm_scheduler = LLMScheduler(
+    settings.LLM_SCHEDULER_MAX_CONCURRENCY,
+    {
+        LLMPriority.interactive: settings.LLM_SCHEDULER_INTERACTIVE_LIMIT,
+        LLMPriority.batch: settings.LLM_SCHEDULER_BATCH_LIMIT,
+    },
+)
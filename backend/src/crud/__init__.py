@@ -3,3 +3,22 @@ from .inventory import create_inventory, get_inventory, get_inventories, update_
 from .outreach import create_outreach_email, get_outreach_email, get_outreach_emails, update_outreach_status
 from .pricing import create_pricing, get_pricing, get_pricings
 from .transaction import create_transaction, get_transaction, get_transactions
+from .website_artifact import create_site_version, get_artifact_blob, get_site_artifacts, get_latest_artifact
+from .agent_job import (
+    claim_next_job,
+    complete_job,
+    create_job,
+    fail_job,
+    get_job,
+    get_jobs,
+    heartbeat_job,
+    record_job_progress,
+    release_job,
+    requeue_expired_jobs,
+)
+from .discovery_cache import (
+    claim_discovery_refresh,
+    get_discovery_cache,
+    release_discovery_refresh,
+    save_discovery_cache,
+)
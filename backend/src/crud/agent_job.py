@@ -0,0 +1,151 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.models.agent_job import AgentJob, JobKind, JobStatus
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def claimable_jobs_query(now: datetime, kinds: Optional[List[JobKind]] = None):
+    """
+    Oldest due job, row-locked. SKIP LOCKED makes concurrent workers (in any
+    process or host) pass over rows another transaction is claiming instead
+    of blocking on them.
+    """
+    query = select(AgentJob).where(AgentJob.status == JobStatus.queued, AgentJob.available_at <= now)
+    if kinds:
+        query = query.where(AgentJob.kind.in_(kinds))
+    return query.order_by(AgentJob.available_at).limit(1).with_for_update(skip_locked=True)
+
+
+async def create_job(
+        session: AsyncSession, *, kind: JobKind, payload: Dict[str, Any],
+        farm_id: Optional[str] = None, max_attempts: int = 3,
+) -> AgentJob:
+    job = AgentJob(kind=kind, payload=payload, farm_id=farm_id, max_attempts=max_attempts)
+    session.add(job)
+    await session.commit()
+    await session.refresh(job)
+    return job
+
+
+async def get_job(session: AsyncSession, job_id: uuid.UUID) -> Optional[AgentJob]:
+    return await session.get(AgentJob, job_id)
+
+
+async def get_jobs(
+        session: AsyncSession, *, farm_id: Optional[str] = None, status: Optional[JobStatus] = None,
+        offset: int = 0, limit: int = 100,
+) -> List[AgentJob]:
+    query = select(AgentJob)
+    if farm_id is not None:
+        query = query.where(AgentJob.farm_id == farm_id)
+    if status is not None:
+        query = query.where(AgentJob.status == status)
+    result = await session.exec(query.order_by(AgentJob.created_at.desc()).offset(offset).limit(limit))
+    return result.all()
+
+
+async def claim_next_job(
+        session: AsyncSession, *, worker_id: str, kinds: Optional[List[JobKind]] = None
+) -> Optional[AgentJob]:
+    """Marks the oldest due job as running for ``worker_id``; None if the queue is empty."""
+    now = _now()
+    job = (await session.exec(claimable_jobs_query(now, kinds))).first()
+    if job is None:
+        await session.rollback()
+        return None
+
+    job.status = JobStatus.running
+    job.attempts += 1
+    job.worker_id = worker_id
+    job.error = None
+    job.started_at = now
+    job.heartbeat_at = now
+    session.add(job)
+    await session.commit()
+    await session.refresh(job)
+    return job
+
+
+async def _update_owned(session: AsyncSession, job_id: uuid.UUID, owner: str, **values: Any) -> bool:
+    """Updates a running job only while ``owner`` still holds it; False if the lease was lost."""
+    result = await session.execute(
+        update(AgentJob)
+        .where(AgentJob.id == job_id, AgentJob.worker_id == owner, AgentJob.status == JobStatus.running)
+        .values(updated_at=_now(), **values)
+    )
+    await session.commit()
+    return result.rowcount == 1
+
+
+async def heartbeat_job(session: AsyncSession, job_id: uuid.UUID, *, worker_id: str) -> bool:
+    return await _update_owned(session, job_id, worker_id, heartbeat_at=_now())
+
+
+async def record_job_progress(
+        session: AsyncSession, job_id: uuid.UUID, *, worker_id: str, step: str
+) -> bool:
+    return await _update_owned(
+        session, job_id, worker_id,
+        progress=step, steps_completed=AgentJob.steps_completed + 1, heartbeat_at=_now(),
+    )
+
+
+async def complete_job(
+        session: AsyncSession, job_id: uuid.UUID, *, worker_id: str, result: Dict[str, Any]
+) -> bool:
+    return await _update_owned(
+        session, job_id, worker_id, status=JobStatus.succeeded, result=result, finished_at=_now(),
+    )
+
+
+async def fail_job(
+        session: AsyncSession, job_id: uuid.UUID, *, worker_id: str, error: str, retry_delay_seconds: float
+) -> bool:
+    """Requeues the job after ``retry_delay_seconds``, or fails it once its attempts are used up."""
+    job = await session.get(AgentJob, job_id)
+    if job is None:
+        return False
+    if job.attempts < job.max_attempts:
+        return await _update_owned(
+            session, job_id, worker_id, status=JobStatus.queued, error=error, worker_id=None,
+            available_at=_now() + timedelta(seconds=retry_delay_seconds),
+        )
+    return await _update_owned(session, job_id, worker_id, status=JobStatus.failed, error=error, finished_at=_now())
+
+
+async def release_job(session: AsyncSession, job_id: uuid.UUID, *, worker_id: str) -> bool:
+    """Puts an interrupted job (e.g. on worker shutdown) back in the queue without using up an attempt."""
+    return await _update_owned(
+        session, job_id, worker_id,
+        status=JobStatus.queued, worker_id=None, attempts=AgentJob.attempts - 1, available_at=_now(),
+    )
+
+
+async def requeue_expired_jobs(session: AsyncSession, *, lease_seconds: float) -> int:
+    """
+    Requeues running jobs whose worker stopped sending heartbeats (crashed,
+    killed or partitioned). Jobs that used up their attempts are failed instead.
+    """
+    expired = _now() - timedelta(seconds=lease_seconds)
+    stale = (AgentJob.status == JobStatus.running, AgentJob.heartbeat_at < expired)
+    failed = await session.execute(
+        update(AgentJob)
+        .where(*stale, AgentJob.attempts >= AgentJob.max_attempts)
+        .values(status=JobStatus.failed, error="Worker stopped responding.", finished_at=_now(), updated_at=_now())
+    )
+    requeued = await session.execute(
+        update(AgentJob)
+        .where(*stale)
+        .values(status=JobStatus.queued, worker_id=None, available_at=_now(), updated_at=_now())
+    )
+    await session.commit()
+    return failed.rowcount + requeued.rowcount
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import or_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.models.discovery_cache import DiscoveryCacheEntry
+
+
+async def get_discovery_cache(session: AsyncSession, key: str) -> Optional[DiscoveryCacheEntry]:
+    return await session.get(DiscoveryCacheEntry, key)
+
+
+async def save_discovery_cache(
+        session: AsyncSession, *, key: str, zip_code: Optional[str], state: Optional[str], radius_miles: int,
+        profile_hash: str, result: Dict[str, Any], artifacts: Dict[str, Any],
+) -> None:
+    """Stores (or replaces) the search's result and ends any refresh in progress."""
+    values = dict(
+        key=key, zip_code=zip_code, state=state, radius_miles=radius_miles, profile_hash=profile_hash,
+        result=result, artifacts=artifacts, refreshed_at=datetime.now(timezone.utc), refresh_started_at=None,
+    )
+    await session.execute(
+        insert(DiscoveryCacheEntry)
+        .values(**values)
+        .on_conflict_do_update(index_elements=["key"], set_={k: v for k, v in values.items() if k != "key"})
+    )
+    await session.commit()
+
+
+async def claim_discovery_refresh(session: AsyncSession, key: str, *, lease_seconds: float) -> bool:
+    """
+    Marks the entry as being refreshed; False if another refresh started less
+    than ``lease_seconds`` ago, so concurrent stale hits queue a single refresh.
+    """
+    now = datetime.now(timezone.utc)
+    result = await session.execute(
+        update(DiscoveryCacheEntry)
+        .where(
+            DiscoveryCacheEntry.key == key,
+            or_(
+                DiscoveryCacheEntry.refresh_started_at.is_(None),
+                DiscoveryCacheEntry.refresh_started_at < now - timedelta(seconds=lease_seconds),
+            ),
+        )
+        .values(refresh_started_at=now)
+    )
+    await session.commit()
+    return result.rowcount == 1
+
+
+async def release_discovery_refresh(session: AsyncSession, key: str) -> None:
+    """Ends a refresh that produced no result, so the next stale hit can retry it."""
+    await session.execute(
+        update(DiscoveryCacheEntry).where(DiscoveryCacheEntry.key == key).values(refresh_started_at=None)
+    )
+    await session.commit()
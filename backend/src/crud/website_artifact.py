@@ -0,0 +1,100 @@
+from typing import List, Optional, Sequence
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src.models.website_artifact import ArtifactBlob, ArtifactKind, WebsiteArtifact
+from src.services.artifact_storage import build_blob
+
+# Concurrent builds for the same farm race for the next version number
+_VERSION_RETRIES = 3
+
+
+async def _insert_blobs(session: AsyncSession, blobs: List[ArtifactBlob]) -> None:
+    for blob in {blob.content_hash: blob for blob in blobs}.values():
+        await session.execute(
+            insert(ArtifactBlob)
+            .values(**blob.model_dump())
+            .on_conflict_do_nothing(index_elements=["content_hash"])
+        )
+
+
+async def create_site_version(
+        session: AsyncSession, *, farm_id: str, run_id: Optional[str],
+        artifacts: List[tuple[ArtifactKind, int, Optional[str], bytes, str]],
+        carry_over: Sequence[WebsiteArtifact] = (),
+) -> List[WebsiteArtifact]:
+    """
+    Stores one builder run's outputs as the farm's next version.
+
+    Args:
+        artifacts: (kind, variant, style, content, content_type) per output.
+            Content already stored (by any farm or version) is not stored again.
+        carry_over: Artifacts of an earlier version to include unchanged
+            (by content hash), e.g. everything but an edited layout.
+    """
+    blobs = [build_blob(content, content_type) for _, _, _, content, content_type in artifacts]
+    # Read before any rollback expires the instances
+    carried = [(a.kind, a.variant, a.style, a.content_hash, a.run_id) for a in carry_over]
+
+    for attempt in range(_VERSION_RETRIES):
+        await _insert_blobs(session, blobs)
+        latest = (await session.exec(
+            select(func.max(WebsiteArtifact.version)).where(WebsiteArtifact.farm_id == farm_id)
+        )).one()
+        rows = [
+            WebsiteArtifact(
+                farm_id=farm_id, version=(latest or 0) + 1, kind=kind, variant=variant, style=style,
+                content_hash=blob.content_hash, run_id=run_id,
+            )
+            for (kind, variant, style, _, _), blob in zip(artifacts, blobs)
+        ] + [
+            WebsiteArtifact(
+                farm_id=farm_id, version=(latest or 0) + 1, kind=kind, variant=variant, style=style,
+                content_hash=content_hash, run_id=carried_run_id,
+            )
+            for kind, variant, style, content_hash, carried_run_id in carried
+        ]
+        session.add_all(rows)
+        try:
+            await session.commit()
+        except IntegrityError:
+            await session.rollback()
+            if attempt == _VERSION_RETRIES - 1:
+                raise
+            continue
+        for row in rows:
+            await session.refresh(row)
+        return rows
+    return []
+
+
+async def get_artifact_blob(session: AsyncSession, content_hash: str) -> Optional[ArtifactBlob]:
+    return await session.get(ArtifactBlob, content_hash)
+
+
+async def get_site_artifacts(
+        session: AsyncSession, *, farm_id: str, version: Optional[int] = None, offset: int = 0, limit: int = 100
+) -> List[WebsiteArtifact]:
+    """Artifacts of a farm, newest version first; all versions unless ``version`` is given."""
+    query = select(WebsiteArtifact).where(WebsiteArtifact.farm_id == farm_id)
+    if version is not None:
+        query = query.where(WebsiteArtifact.version == version)
+    query = query.order_by(WebsiteArtifact.version.desc(), WebsiteArtifact.kind, WebsiteArtifact.variant)
+    result = await session.exec(query.offset(offset).limit(limit))
+    return result.all()
+
+
+async def get_latest_artifact(
+        session: AsyncSession, *, farm_id: str, kind: ArtifactKind, variant: int = 0
+) -> Optional[WebsiteArtifact]:
+    result = await session.exec(
+        select(WebsiteArtifact)
+        .where(WebsiteArtifact.farm_id == farm_id, WebsiteArtifact.kind == kind, WebsiteArtifact.variant == variant)
+        .order_by(WebsiteArtifact.version.desc())
+        .limit(1)
+    )
+    return result.first()
@@ -3,3 +3,7 @@ from .inventory import FarmInventory, FarmInventoryCreate, FarmInventoryRead
 from .outreach import OutreachEmail, OutreachEmailCreate, OutreachEmailRead, OutreachStatus
 from .pricing import CommodityPricing, CommodityPricingCreate, CommodityPricingRead
 from .transaction import Transaction, TransactionCreate, TransactionRead
+from .llm_cache import LLMCacheEntry
+from .website_artifact import ArtifactBlob, ArtifactKind, WebsiteArtifact, WebsiteArtifactRead
+from .agent_job import AgentJob, AgentJobRead, JobKind, JobStatus
+from .discovery_cache import DiscoveryCacheEntry
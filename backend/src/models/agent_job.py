@@ -0,0 +1,72 @@
+import enum
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Column, DateTime, Index
+from sqlalchemy.dialects.postgresql import ENUM, JSONB
+from sqlmodel import Field, SQLModel
+
+
+class JobKind(str, enum.Enum):
+    discovery = "discovery"
+    analytics = "analytics"
+    builder = "builder"
+    batch_discovery = "batch_discovery"
+
+
+class JobStatus(str, enum.Enum):
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
+class AgentJobBase(SQLModel):
+    kind: JobKind = Field(sa_column=Column(ENUM(JobKind, name="jobkind_enum", create_type=True), nullable=False))
+    farm_id: Optional[str] = Field(default=None, index=True, max_length=64)
+    status: JobStatus = Field(
+        default=JobStatus.queued,
+        sa_column=Column(ENUM(JobStatus, name="jobstatus_enum", create_type=True), nullable=False)
+    )
+    # Last pipeline step (LangGraph node) completed, and how many have completed
+    progress: Optional[str] = None
+    steps_completed: int = Field(default=0, ge=0)
+    attempts: int = Field(default=0, ge=0)
+    max_attempts: int = Field(default=3, ge=1)
+    run_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    result: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSONB, nullable=True))
+    error: Optional[str] = None
+
+
+class AgentJob(AgentJobBase, table=True):
+    """One queued agent pipeline run, claimed by workers with SELECT ... FOR UPDATE SKIP LOCKED."""
+    __table_args__ = (Index("ix_agentjob_claim", "status", "available_at"),)
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    payload: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSONB, nullable=False))
+    worker_id: Optional[str] = None
+    # Not claimed before this time (retry backoff)
+    available_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc), sa_type=DateTime(timezone=True)
+    )
+    # Refreshed while running; a stale heartbeat means the worker died and the job is requeued
+    heartbeat_at: Optional[datetime] = Field(default=None, sa_type=DateTime(timezone=True))
+    started_at: Optional[datetime] = Field(default=None, sa_type=DateTime(timezone=True))
+    finished_at: Optional[datetime] = Field(default=None, sa_type=DateTime(timezone=True))
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc), sa_type=DateTime(timezone=True)
+    )
+    updated_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        sa_type=DateTime(timezone=True),
+        sa_column_kwargs={"onupdate": lambda: datetime.now(timezone.utc)}
+    )
+
+
+class AgentJobRead(AgentJobBase):
+    id: uuid.UUID
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
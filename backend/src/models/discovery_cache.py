@@ -0,0 +1,27 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Column, DateTime
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlmodel import Field, SQLModel
+
+
+class DiscoveryCacheEntry(SQLModel, table=True):
+    """
+    The latest /discover result for one search, keyed by a hash of
+    (zip code, state, radius, farm profile). See src/services/discovery_cache.py.
+    """
+    key: str = Field(primary_key=True, max_length=64)
+    zip_code: Optional[str] = None
+    state: Optional[str] = None
+    radius_miles: int = Field(ge=1)
+    # sha256 of the normalized farm name and offerings
+    profile_hash: str = Field(max_length=64)
+    result: Dict[str, Any] = Field(sa_column=Column(JSONB, nullable=False))
+    # Website analyses and scores (DiscoveryArtifacts) reused by the next refresh
+    artifacts: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSONB, nullable=False))
+    refreshed_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc), index=True, sa_type=DateTime(timezone=True)
+    )
+    # Set while a background refresh is queued or running
+    refresh_started_at: Optional[datetime] = Field(default=None, sa_type=DateTime(timezone=True))
@@ -0,0 +1,17 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime
+from sqlmodel import Field, SQLModel
+
+
+class LLMCacheEntry(SQLModel, table=True):
+    """A cached LLM response, keyed by a hash of (model params, normalized prompt)."""
+    key: str = Field(primary_key=True, max_length=64)
+    value: str  # JSON-serialized generations
+    created_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc), sa_type=DateTime(timezone=True)
+    )
+    expires_at: datetime = Field(index=True, sa_type=DateTime(timezone=True))
+    last_accessed_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc), index=True, sa_type=DateTime(timezone=True)
+    )
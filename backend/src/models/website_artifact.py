@@ -0,0 +1,50 @@
+import enum
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import Column, LargeBinary, UniqueConstraint
+from sqlalchemy.dialects.postgresql import ENUM
+from sqlmodel import Field, SQLModel
+
+
+class ArtifactKind(str, enum.Enum):
+    persona = "persona"
+    domains = "domains"
+    layout = "layout"
+
+
+class ArtifactBlob(SQLModel, table=True):
+    """Generated content, stored once per sha256 and precompressed for serving."""
+    content_hash: str = Field(primary_key=True, max_length=64)
+    content_type: str
+    size_bytes: int = Field(ge=0)
+    gzip_content: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+    # Only set when the optional `brotli` package is installed
+    brotli_content: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary, nullable=True))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class WebsiteArtifactBase(SQLModel):
+    farm_id: str = Field(index=True, max_length=64)
+    version: int = Field(ge=1)
+    kind: ArtifactKind = Field(
+        sa_column=Column(ENUM(ArtifactKind, name="artifactkind_enum", create_type=True), nullable=False)
+    )
+    variant: int = Field(default=0, ge=0)
+    style: Optional[str] = None
+    content_hash: str = Field(foreign_key="artifactblob.content_hash", index=True, max_length=64)
+    run_id: Optional[str] = None
+
+
+class WebsiteArtifact(WebsiteArtifactBase, table=True):
+    """One generated output (persona, domain list or layout) of one builder run for a farm."""
+    __table_args__ = (UniqueConstraint("farm_id", "version", "kind", "variant", name="uq_websiteartifact_version"),)
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True)
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class WebsiteArtifactRead(WebsiteArtifactBase):
+    id: uuid.UUID
+    created_at: datetime
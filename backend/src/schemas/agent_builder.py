@@ -1,4 +1,5 @@
-from typing import List, Optional
+import operator
+from typing import Annotated, List, Literal, Optional
 from pydantic import BaseModel, Field
 
 
@@ -13,6 +14,62 @@ class BrandPersona(BaseModel):
     recommended_channels: List[str] = Field(description="A list of marketing channels to focus on.")
 
 
+class WebsiteCopy(BaseModel):
+    """
+    Marketing copy and style tokens for the template-based landing page.
+    Written by the LLM alongside the persona; the HTML itself comes from
+    src/services/site_templates.py.
+    """
+    headline: str = Field(description="Hero headline, at most ~8 words.")
+    subheadline: str = Field(description="One sentence under the headline.")
+    about_heading: str = Field(default="Our Story", description="Heading of the story section.")
+    about_text: str = Field(description="2-4 sentences telling the farm's story.")
+    products_heading: str = Field(default="What We Grow", description="Heading of the inventory section.")
+    call_to_action: str = Field(default="Get in Touch", description="Button label, 2-4 words.")
+    accent_color: Optional[str] = Field(default=None, description="Tailwind color name for buttons and highlights (e.g., 'amber').")
+
+
+class PageWeight(BaseModel):
+    """
+    Size report for a page after server-side Tailwind compilation.
+    """
+    source_bytes: int = Field(description="HTML size before compilation (excludes the CDN script it loaded).")
+    html_bytes: int = Field(description="Compiled HTML size, stylesheet inlined.")
+    css_bytes: int = Field(description="Size of the inlined stylesheet.")
+    gzip_bytes: int = Field(description="Compiled HTML size over the wire with gzip.")
+    class_count: int = Field(description="Distinct class names used in the page.")
+    unresolved_classes: List[str] = Field(
+        default=[], description="Classes the compiler emitted no CSS for; the CDN script is kept to style them."
+    )
+    cdn_removed: bool = Field(description="Whether a Tailwind CDN script was replaced.")
+
+
+class WebsiteLayout(BaseModel):
+    """
+    One generated landing page design.
+    """
+    variant: int = Field(description="0-based index of the design variant.")
+    style: str = Field(description="Short name of the design direction (e.g., 'rustic').")
+    mode: Literal["template", "llm"] = Field(default="template", description="How the HTML was produced.")
+    html: str = Field(description="Complete HTML + Tailwind CSS document.")
+    page_weight: Optional[PageWeight] = Field(default=None, description="Set when the Tailwind CSS was compiled server-side.")
+
+
+class WebsiteVariantTask(BaseModel):
+    """
+    Input for one generate_website branch, fanned out per design variant.
+    """
+    farm_name: str
+    farm_story: str
+    inventory_data: str
+    brand_persona: Optional[BrandPersona] = None
+    website_copy: Optional[WebsiteCopy] = None
+    website_mode: Literal["template", "llm"] = "template"
+    variant: int
+    style: str
+    style_direction: str
+
+
 class BuilderState(BaseModel):
     """
     The state for the Builder LangGraph agent.
@@ -21,10 +78,22 @@ class BuilderState(BaseModel):
     farm_name: str
     farm_story: str
     inventory_data: str
+    # "template" fills pre-built sections locally; "llm" (premium) has the LLM write the whole page
+    website_mode: Literal["template", "llm"] = "template"
     
     # Internal agent data passed between nodes
     brand_persona: Optional[BrandPersona] = None
+    website_copy: Optional[WebsiteCopy] = None
     suggested_domains: List[str] = []
     
-    # Final generated React SPA component code
-    website_layouts: List[str] = []
+    # Generated landing page variants, appended as each parallel branch finishes
+    website_layouts: Annotated[List[WebsiteLayout], operator.add] = []
+
+
+class SectionEditRequest(BaseModel):
+    """
+    Request to regenerate one section of a farm's stored landing page.
+    """
+    instruction: str = Field(min_length=1, max_length=1000, description="What to change, e.g. 'Mention our new goat cheese'.")
+    variant: int = Field(default=0, ge=0, description="Layout variant to edit.")
+    farm_name: Optional[str] = Field(default=None, description="Farm name for the prompt.")
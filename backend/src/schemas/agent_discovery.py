@@ -1,7 +1,10 @@
-from typing import List, Optional, Union, Dict, Any
+import operator
+from typing import Annotated, List, Optional, Tuple, Union, Dict, Any
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from src.schemas.google_places import NearbyBusiness
+
 
 class CompetitorFarm(BaseModel):
     """
@@ -23,8 +26,88 @@ class DiscoverySearchCriteria(BaseModel):
     """
     farm_name: str
     farm_offerings: str
-    zip_code: str
-    state: str
+    # At least one of them is set
+    zip_code: Optional[str] = None
+    state: Optional[str] = None
+    radius_miles: int = 20
+
+
+class DiscoverRequest(BaseModel):
+    """
+    Request body of /farms/discover and discovery jobs.
+    """
+    farm_name: str = "My Farm"
+    farm_offerings: str = "organic produce"
+    zip_code: Optional[str] = None
+    state: Optional[str] = None
+    radius_miles: int = Field(default=20, ge=1, le=100)
+
+
+class BatchDiscoverRequest(BaseModel):
+    """
+    Request body of /farms/discover/batch and batch discovery jobs.
+    """
+    farms: List[DiscoverRequest] = Field(min_length=1)
+
+
+class DiscoveryArtifacts(BaseModel):
+    """
+    Data fetched once per discovery run, reused by later nodes instead of
+    being fetched again.
+    """
+    # places_key(query, location) -> matched listing, None if Places had no match
+    places: Dict[str, Optional[NearbyBusiness]] = Field(default_factory=dict)
+    # website url -> visual analysis of its screenshot
+    visual_analyses: Dict[str, str] = Field(default_factory=dict)
+    # website url -> error, for sites whose visual analysis failed
+    audit_failures: Dict[str, str] = Field(default_factory=dict)
+    # website url -> (digital health score, summary) of its visual analysis
+    site_scores: Dict[str, Tuple[int, str]] = Field(default_factory=dict)
+    # website url -> why it was not audited: its audit or scoring ran out of time
+    skipped_audits: Dict[str, str] = Field(default_factory=dict)
+
+
+def places_key(query: str, location: str) -> str:
+    return f"{query.strip().lower()}|{location.strip().lower()}"
+
+
+def merge_artifacts(
+        left: Union[DiscoveryArtifacts, dict, None], right: Union[DiscoveryArtifacts, dict, None]
+) -> DiscoveryArtifacts:
+    """
+    State reducer: nodes return only what they fetched, keyed entries are
+    merged. Only the fields an update touches are copied, and the merged
+    entries are not validated again.
+    """
+    left = DiscoveryArtifacts.model_validate(left or {})
+    right = DiscoveryArtifacts.model_validate(right or {})
+    return DiscoveryArtifacts.model_construct(**{
+        field: {**getattr(left, field), **getattr(right, field)} if getattr(right, field) else getattr(left, field)
+        for field in DiscoveryArtifacts.model_fields
+    })
+
+
+class PlaceLookupTask(BaseModel):
+    """
+    Input for one lookup_place branch, fanned out per distinct Places query.
+    """
+    query: str
+    location: str
+
+
+class SiteAuditTask(BaseModel):
+    """
+    Input for one audit_site branch, fanned out per competitor website.
+    """
+    url: str
+
+
+class ScoringBatchTask(BaseModel):
+    """
+    Input for one score_batch branch: up to DISCOVERY_SCORING_BATCH_SIZE analyzed websites.
+    """
+    urls: List[str]
+    analyses: List[str]
 
 
 class DiscoveryState(BaseModel):
@@ -33,14 +116,124 @@ class DiscoveryState(BaseModel):
     """
     search_criteria: Union[DiscoverySearchCriteria, dict] = Field(default_factory=dict)
 
-    raw_competitors: List[CompetitorFarm] = Field(default_factory=list)
-    enriched_competitors: List[CompetitorFarm] = Field(default_factory=list)
-    audited_competitors: List[CompetitorFarm] = Field(default_factory=list)
+    # Append-only: each list is built once, from copies, so a later step never
+    # changes the competitors an earlier step (or checkpoint) holds. The node
+    # joining a fan-out writes the whole list; per-branch writes would be
+    # checkpointed as task writes on top of the branches' Send payloads.
+    raw_competitors: Annotated[List[CompetitorFarm], operator.add] = Field(default_factory=list)
+    enriched_competitors: Annotated[List[CompetitorFarm], operator.add] = Field(default_factory=list)
+    audited_competitors: Annotated[List[CompetitorFarm], operator.add] = Field(default_factory=list)
+
+    # Run-scoped cache of Places results and website audits
+    artifacts: Annotated[DiscoveryArtifacts, merge_artifacts] = Field(default_factory=DiscoveryArtifacts)
 
     # Reports
     market_gap_report: Optional[Dict[str, Any]] = None
     seo_report: Optional[Dict[str, Any]] = None
 
-    errors: List[str] = Field(default_factory=list)
+    # Appended to by branches that run in parallel
+    errors: Annotated[List[str], operator.add] = Field(default_factory=list)
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
+
+
+class CompetitorPipelineInput(BaseModel):
+    """
+    What the competitor pipeline subgraph reads from the discovery state.
+    """
+    search_criteria: Union[DiscoverySearchCriteria, dict] = Field(default_factory=dict)
+    # Website audits seeded from the cached result of the same search
+    artifacts: DiscoveryArtifacts = Field(default_factory=DiscoveryArtifacts)
+
+
+class CompetitorPipelineOutput(BaseModel):
+    """
+    What the competitor pipeline subgraph writes back, so it never overwrites
+    the reports produced by the branches running alongside it.
+    """
+    raw_competitors: List[CompetitorFarm] = Field(default_factory=list)
+    enriched_competitors: List[CompetitorFarm] = Field(default_factory=list)
+    audited_competitors: List[CompetitorFarm] = Field(default_factory=list)
+    artifacts: DiscoveryArtifacts = Field(default_factory=DiscoveryArtifacts)
+    errors: List[str] = Field(default_factory=list)
+
+
+class RegionSearchTask(BaseModel):
+    """
+    Input for one search_region branch of batch discovery: the USDA search
+    shared by every farm in the region.
+    """
+    region_key: str
+    search_criteria: DiscoverySearchCriteria
+
+
+class SeoTask(BaseModel):
+    """
+    Input for one generate_seo branch of batch discovery, fanned out per
+    distinct (zip code, or state without one, offerings).
+    """
+    seo_key: str
+    search_criteria: DiscoverySearchCriteria
+
+
+class SeoResult(BaseModel):
+    """
+    The SEO report of one SeoTask, or the errors that prevented it.
+    """
+    report: Optional[Dict[str, Any]] = None
+    errors: List[str] = Field(default_factory=list)
+
+
+class FarmViewTask(BaseModel):
+    """
+    Input for one farm_view branch of batch discovery: a farm and the pooled
+    competitors (and their artifacts) of its region.
+    """
+    farm_index: int
+    search_criteria: DiscoverySearchCriteria
+    region_key: str
+    # USDA listings of the region other than the farm's own
+    total_found: int
+    competitors: List[CompetitorFarm]
+    artifacts: DiscoveryArtifacts
+
+
+class FarmDiscoveryView(BaseModel):
+    """
+    One farm's share of a batch discovery run.
+    """
+    farm_index: int
+    region_key: str
+    total_found: int = 0
+    leads: List[CompetitorFarm] = Field(default_factory=list)
+    market_gap_report: Optional[Dict[str, Any]] = None
+    errors: List[str] = Field(default_factory=list)
+
+
+class RegionalDiscoveryState(DiscoveryState):
+    """
+    State of batch discovery: the discovery state of the pooled competitors of
+    every region, plus each farm's view of its region.
+    """
+    farms: List[DiscoverySearchCriteria] = Field(default_factory=list)
+
+    # region key -> the USDA listings found for that region
+    region_competitors: Annotated[Dict[str, List[CompetitorFarm]], operator.or_] = Field(default_factory=dict)
+    # seo key -> SEO report shared by the farms with that zip code and offerings
+    seo_reports: Annotated[Dict[str, SeoResult], operator.or_] = Field(default_factory=dict)
+    farm_views: Annotated[List[FarmDiscoveryView], operator.add] = Field(default_factory=list)
+
+
+class RegionalPipelineInput(BaseModel):
+    """
+    What the regional competitor pipeline subgraph reads from the batch state.
+    """
+    farms: List[DiscoverySearchCriteria] = Field(default_factory=list)
+    artifacts: DiscoveryArtifacts = Field(default_factory=DiscoveryArtifacts)
+
+
+class RegionalPipelineOutput(CompetitorPipelineOutput):
+    """
+    What the regional competitor pipeline subgraph writes back.
+    """
+    region_competitors: Dict[str, List[CompetitorFarm]] = Field(default_factory=dict)
@@ -1,4 +1,5 @@
-from typing import List, Optional
+import operator
+from typing import Annotated, Dict, List, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, ConfigDict
@@ -31,15 +32,50 @@ class RestaurantLead(BaseModel):
     relevant_reviews: List[str] = []
 
 
+class OutreachDraft(BaseModel):
+    """An outreach email drafted for one lead, saved as an OutreachEmail once all drafts are done."""
+    recipient_email: str
+    subject: str
+    body: str
+    restaurant_name: str
+    restaurant_location: str
+    match_score: float
+    menu_keywords_matched: List[str] = []
+
+
+class LeadMatchTask(BaseModel):
+    """Input for one match_lead branch, fanned out per restaurant found."""
+    lead: RestaurantLead
+    farm_inventory: List[str]
+
+
+class LeadDraftTask(BaseModel):
+    """Input for one draft_email branch, fanned out per matched restaurant."""
+    lead: RestaurantLead
+    farm_name: str
+
+
+def merge_leads(left: Optional[List[RestaurantLead]], right: Optional[List[RestaurantLead]]) -> List[RestaurantLead]:
+    """
+    State reducer: branches return only the leads they matched or updated; a
+    lead replaces the one with the same place_id, new leads are appended.
+    """
+    merged: Dict[str, RestaurantLead] = {lead.place_id: lead for lead in left or []}
+    merged.update((lead.place_id, lead) for lead in right or [])
+    return list(merged.values())
+
+
 class SDRState(BaseModel):
     search_criteria: SDRSearchCriteria
     farm_name: str = ""
     farm_inventory: List[str] = []
 
-    raw_restaurants: List[RestaurantLead] = []
-    matched_restaurants: List[RestaurantLead] = []
+    raw_restaurants: Annotated[List[RestaurantLead], operator.add] = []
+    # Written to by the per-lead match_lead / draft_email branches, one lead each
+    matched_restaurants: Annotated[List[RestaurantLead], merge_leads] = []
+    email_drafts: Annotated[List[OutreachDraft], operator.add] = []
 
     # This will allow us to track success/failures of step runs
-    errors: List[str] = []
+    errors: Annotated[List[str], operator.add] = []
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
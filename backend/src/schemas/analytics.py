@@ -1,3 +1,6 @@
+import uuid
+from typing import List, Optional
+
 from pydantic import BaseModel
 
 
@@ -11,3 +14,18 @@ class PricePredictionResponse(BaseModel):
     pi_low: float
     pi_high: float
     plain_language_insight: str
+
+
+class AnalyticsPipelineRequest(BaseModel):
+    farm_id: uuid.UUID
+    county: str
+    zip_code: str
+    target_crops: List[str]
+
+
+class AnalyticsPipelineResponse(BaseModel):
+    predictions: List[dict] = []
+    insights: List[str] = []
+    persisted_count: int = 0
+    errors: List[str] = []
+    run_id: Optional[str] = None
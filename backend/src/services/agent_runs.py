@@ -0,0 +1,352 @@
+"""
+Agent pipeline runs shared by the synchronous endpoints and the job workers.
+
+Each ``run_*`` function invokes one LangGraph agent and shapes its final
+state into the endpoint's response. Given an ``on_progress`` callback, the
+graph is streamed instead and the callback is awaited with the name of each
+node as it completes, which the job workers record as the job's progress.
+``stream_discovery`` streams a discovery run's progress events instead, for
+the SSE endpoint.
+
+Every run is bounded by its graph's time budget (``src.core.deadline``);
+work that runs out of time is skipped rather than holding up the run.
+
+Runs are checkpointed under their run ID (``src.core.checkpointing``). A job
+retried after a crash or failure keeps its run ID, so invoking the agent
+again resumes from the last completed node instead of starting over.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.runnables import Runnable, RunnableConfig
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src import crud
+from src.agents.builder import builder_agent
+from src.agents.discovery import discovery_agent
+from src.agents.regional_discovery import regional_discovery_agent, seo_key
+from src.core.checkpointing import discard_checkpoints, resume_input
+from src.core.config import settings
+from src.core.deadline import run_budget_seconds, run_deadline
+from src.core.llm_metrics import GRAPH_METADATA_KEY, agent_run_config
+from src.core.llm_scheduler import LLMPriority
+from src.db.session import engine
+from src.models.website_artifact import ArtifactKind, WebsiteArtifact
+from src.schemas.agent_discovery import BatchDiscoverRequest, DiscoverRequest, DiscoveryArtifacts, DiscoverySearchCriteria
+from src.schemas.analytics import AnalyticsPipelineRequest, AnalyticsPipelineResponse
+from src.services.discovery_cache import reusable_audits, store_discovery
+from src.services.artifact_storage import HTML_CONTENT_TYPE, JSON_CONTENT_TYPE, encode_json
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[str], Awaitable[None]]
+
+
+async def invoke_agent(
+        agent: Runnable, state: Dict[str, Any], config: RunnableConfig,
+        on_progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    """
+    ``agent.ainvoke`` within the graph's time budget, reporting each completed
+    node to ``on_progress`` if given. Resumes the run's checkpoint if it has
+    one, and discards it on success.
+    """
+    graph_input = await resume_input(agent, state, config)
+    graph_name = config.get("metadata", {}).get(GRAPH_METADATA_KEY, "")
+    with run_deadline(run_budget_seconds(graph_name)):
+        if on_progress is None:
+            final_state = await agent.ainvoke(graph_input, config=config)
+        else:
+            final_state = dict(state)
+            async for mode, chunk in agent.astream(graph_input, config=config, stream_mode=["updates", "values"]):
+                if mode == "values":
+                    final_state = chunk
+                    continue
+                for node_name in chunk:
+                    await on_progress(node_name)
+
+    thread_id = config.get("configurable", {}).get("thread_id")
+    if thread_id:
+        await discard_checkpoints(thread_id)
+    return final_state
+
+
+# --- Discovery ---
+
+# Discovery nodes whose result is a report, streamed as soon as the node finishes
+DISCOVERY_REPORTS = {"market_gap": "market_gap_report", "generate_seo": "seo_report"}
+
+
+def _search_criteria(body: DiscoverRequest) -> Dict[str, Any]:
+    return {
+        "farm_name": body.farm_name,
+        "farm_offerings": body.farm_offerings,
+        "zip_code": body.zip_code,
+        "state": body.state,
+        "radius_miles": body.radius_miles,
+    }
+
+
+def _discovery_input(body: DiscoverRequest, artifacts: DiscoveryArtifacts) -> Dict[str, Any]:
+    return {
+        "search_criteria": _search_criteria(body),
+        "raw_competitors": [],
+        "enriched_competitors": [],
+        "audited_competitors": [],
+        # Website audits reused from the cached result of the same search
+        "artifacts": artifacts,
+        "errors": []
+    }
+
+
+def _discovery_response(final_state: Any, run_id: str, duration_ms: int) -> Dict[str, Any]:
+    # Ensure we're working with a dict
+    if hasattr(final_state, "model_dump"):
+        final_state_dict = final_state.model_dump()
+    else:
+        final_state_dict = final_state
+
+    return {
+        "message": "Discovery complete",
+        "run_id": run_id,
+        "total_found": len(final_state_dict.get("raw_competitors", [])),
+        "audited": len(final_state_dict.get("audited_competitors", [])),
+        "leads": final_state_dict.get("audited_competitors", []),
+        "market_gap_report": final_state_dict.get("market_gap_report"),
+        "seo_report": final_state_dict.get("seo_report"),
+        "errors": final_state_dict.get("errors", []),
+        "duration_ms": duration_ms,
+    }
+
+
+async def run_discovery(
+        body: DiscoverRequest, run_id: str, on_progress: Optional[ProgressCallback] = None
+) -> Dict[str, Any]:
+    started = time.perf_counter()
+    artifacts, audited_at = await reusable_audits(body)
+    final_state = await invoke_agent(
+        discovery_agent, _discovery_input(body, artifacts), agent_run_config("discovery", run_id), on_progress
+    )
+    duration_ms = round((time.perf_counter() - started) * 1000)
+    logger.info(f"Discovery run {run_id} took {duration_ms} ms")
+    response = _discovery_response(final_state, run_id, duration_ms)
+    await store_discovery(body, response, final_state["artifacts"], audited_at)
+    return response
+
+
+async def stream_discovery(body: DiscoverRequest, run_id: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Runs discovery like ``run_discovery``, yielding ``(event, data)`` pairs as it goes:
+    - ``node_start`` / ``node_end`` for every node and fan-out task (``competitors/audit_site``
+      once per website), with ``duration_ms`` and the run's ``elapsed_ms``
+    - the progress events of the discovery nodes: ``competitors_found``, ``competitor``
+      (each enriched competitor), ``site_scored`` and ``site_audit_failed`` (per website)
+    - ``report`` with ``kind`` "market_gap" or "generate_seo" as each report is ready
+    - ``complete`` last, with the /discover response
+    """
+    started = time.perf_counter()
+    task_started: Dict[Tuple[Tuple[str, ...], str], float] = {}
+    artifacts, audited_at = await reusable_audits(body)
+    final_state: Any = _discovery_input(body, artifacts)
+
+    def elapsed_ms(since: float = started) -> int:
+        return round((time.perf_counter() - since) * 1000)
+
+    try:
+        with run_deadline(run_budget_seconds("discovery")):
+            async for namespace, mode, chunk in discovery_agent.astream(
+                    final_state, config=agent_run_config("discovery", run_id, LLMPriority.interactive),
+                    stream_mode=["tasks", "custom", "values"], subgraphs=True,
+            ):
+                if mode == "values":
+                    if not namespace:
+                        final_state = chunk
+                    continue
+                if mode == "custom":
+                    data = dict(chunk)
+                    yield data.pop("event"), data
+                    continue
+
+                # "tasks": one event when a node starts, one with its result when it finishes
+                node = "/".join([segment.split(":")[0] for segment in namespace] + [chunk["name"]])
+                key = (namespace, chunk["id"])
+                if "result" not in chunk:
+                    task_started[key] = time.perf_counter()
+                    yield "node_start", {"node": node, "task_id": chunk["id"], "elapsed_ms": elapsed_ms()}
+                    continue
+
+                yield "node_end", {
+                    "node": node,
+                    "task_id": chunk["id"],
+                    "duration_ms": elapsed_ms(task_started.pop(key, started)),
+                    "elapsed_ms": elapsed_ms(),
+                    "error": str(chunk["error"]) if chunk["error"] else None,
+                }
+                if not namespace and chunk["name"] in DISCOVERY_REPORTS and chunk["result"]:
+                    report = chunk["result"].get(DISCOVERY_REPORTS[chunk["name"]])
+                    yield "report", {"kind": chunk["name"], "report": report}
+    finally:
+        # Streams are not resumable: the client already saw the partial output
+        await discard_checkpoints(run_id)
+
+    duration_ms = elapsed_ms()
+    logger.info(f"Streamed discovery run {run_id} took {duration_ms} ms")
+    response = _discovery_response(final_state, run_id, duration_ms)
+    await store_discovery(body, response, final_state["artifacts"], audited_at)
+    yield "complete", response
+
+
+async def run_batch_discovery(
+        body: BatchDiscoverRequest, run_id: str, on_progress: Optional[ProgressCallback] = None
+) -> Dict[str, Any]:
+    """
+    Discovery for many farms in one run of the regional discovery agent, which
+    searches, looks up and audits each region's competitors once for all its
+    farms. ``farms`` holds one /discover response per farm, in request order;
+    each is also cached as that farm's /discover result.
+    """
+    started = time.perf_counter()
+    farms = [DiscoverySearchCriteria(**_search_criteria(farm)) for farm in body.farms]
+    final_state = await invoke_agent(
+        regional_discovery_agent, {"farms": farms}, agent_run_config("regional_discovery", run_id), on_progress
+    )
+    duration_ms = round((time.perf_counter() - started) * 1000)
+    logger.info(f"Batch discovery run {run_id} for {len(farms)} farms took {duration_ms} ms")
+
+    views = {view.farm_index: view for view in final_state.get("farm_views", [])}
+    seo_reports = final_state.get("seo_reports", {})
+    results = []
+    for index, (farm, criteria) in enumerate(zip(body.farms, farms)):
+        view = views[index]
+        seo = seo_reports.get(seo_key(criteria))
+        response = {
+            "message": "Discovery complete",
+            "run_id": run_id,
+            "farm_name": farm.farm_name,
+            "total_found": view.total_found,
+            "audited": len(view.leads),
+            "leads": view.leads,
+            "market_gap_report": view.market_gap_report,
+            "seo_report": seo.report if seo else None,
+            "errors": view.errors + (seo.errors if seo else []),
+            "duration_ms": duration_ms,
+        }
+        await store_discovery(farm, response, final_state["artifacts"], {})
+        results.append(response)
+
+    return {
+        "message": "Batch discovery complete",
+        "run_id": run_id,
+        "regions": len(final_state.get("region_competitors", {})),
+        "unique_competitors": len(final_state.get("audited_competitors", [])),
+        "farms": results,
+        "errors": final_state.get("errors", []),
+        "duration_ms": duration_ms,
+    }
+
+
+# --- Analytics ---
+
+async def run_analytics_pipeline(
+        body: AnalyticsPipelineRequest, run_id: str, on_progress: Optional[ProgressCallback] = None
+) -> AnalyticsPipelineResponse:
+    from src.agents.data_ingestion import data_ingestion_agent
+
+    result = await invoke_agent(data_ingestion_agent, {
+        "farm_id": body.farm_id,
+        "target_crops": body.target_crops,
+        "county": body.county,
+        "zip_code": body.zip_code,
+    }, agent_run_config("data_ingestion", run_id, farm_id=str(body.farm_id)), on_progress)
+
+    return AnalyticsPipelineResponse(
+        predictions=result.get("analytics_predictions", []),
+        insights=result.get("analytics_insights", []),
+        persisted_count=result.get("persisted_count", 0),
+        errors=result.get("errors", []),
+        run_id=run_id,
+    )
+
+
+# --- Builder ---
+
+def artifact_url(content_hash: str) -> str:
+    return f"{settings.API_V1_STR}/builder/artifacts/{content_hash}"
+
+
+async def save_site_version(farm_id: str, run_id: str, final_state: Dict[str, Any]) -> List[WebsiteArtifact]:
+    """
+    Persists the run's persona, domains and layouts as the farm's next site version.
+    Storage failures are logged, not raised: the caller still has the generated content.
+    """
+    if not settings.BUILDER_STORE_ARTIFACTS:
+        return []
+
+    artifacts = []
+    if final_state.get("brand_persona"):
+        persona = final_state["brand_persona"].model_dump()
+        artifacts.append((ArtifactKind.persona, 0, None, encode_json(persona), JSON_CONTENT_TYPE))
+    domains = final_state.get("suggested_domains", [])
+    artifacts.append((ArtifactKind.domains, 0, None, encode_json(domains), JSON_CONTENT_TYPE))
+    for layout in final_state.get("website_layouts") or []:
+        artifacts.append((ArtifactKind.layout, layout.variant, layout.style, layout.html.encode(), HTML_CONTENT_TYPE))
+
+    try:
+        # Own session: the streaming endpoint outlives request-scoped dependencies
+        async with AsyncSession(engine) as session:
+            return await crud.create_site_version(session, farm_id=farm_id, run_id=run_id, artifacts=artifacts)
+    except Exception as e:
+        logger.error(f"Failed to store site version for farm {farm_id}: {e}")
+        return []
+
+
+def build_result(final_state: Dict[str, Any], artifacts: List[WebsiteArtifact]) -> Dict[str, Any]:
+    """Serializes the final builder state for the JSON / SSE response."""
+    # Serialize the BrandPersona Pydantic model for JSON response
+    persona_dump = final_state.get("brand_persona")
+    if persona_dump:
+         persona_dump = persona_dump.model_dump()
+
+    layouts = sorted(final_state.get("website_layouts") or [], key=lambda layout: layout.variant)
+
+    return {
+        "farm_id": final_state.get("farm_id"),
+        "farm_name": final_state.get("farm_name"),
+        "brand_persona": persona_dump,
+        "suggested_domains": final_state.get("suggested_domains", []),
+        "website_mode": final_state.get("website_mode"),
+        # First variant, kept for clients that show a single design
+        "website_layout": layouts[0].html if layouts else "",
+        "website_layouts": [layout.model_dump() for layout in layouts],
+        # Stored copies; None / empty when storage is disabled or failed
+        "version": artifacts[0].version if artifacts else None,
+        "artifacts": [
+            {
+                "kind": artifact.kind.value,
+                "variant": artifact.variant,
+                "style": artifact.style,
+                "content_hash": artifact.content_hash,
+                "url": artifact_url(artifact.content_hash),
+            }
+            for artifact in artifacts
+        ],
+    }
+
+
+async def run_builder(
+        farm_id: str, initial_state: Dict[str, Any], run_id: str,
+        priority: LLMPriority = LLMPriority.interactive, on_progress: Optional[ProgressCallback] = None,
+) -> Dict[str, Any]:
+    final_state = await invoke_agent(
+        builder_agent, initial_state, agent_run_config("builder", run_id, priority, farm_id), on_progress
+    )
+    artifacts = await save_site_version(farm_id, run_id, final_state)
+    return {
+        "status": "success",
+        "run_id": run_id,
+        "data": build_result(final_state, artifacts)
+    }
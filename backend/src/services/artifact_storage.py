@@ -0,0 +1,89 @@
+"""
+Content-addressed storage helpers for generated website artifacts.
+
+Artifacts are keyed by the sha256 of their content, so a layout or persona
+that a later build reproduces byte-for-byte is stored once, and a hash URL
+never changes meaning; it can be cached by browsers and CDNs indefinitely.
+Content is compressed once at write time (gzip, plus brotli when the
+optional ``brotli`` package is installed) and served as stored.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from typing import Any, Optional
+
+from src.models.website_artifact import ArtifactBlob
+
+HTML_CONTENT_TYPE = "text/html; charset=utf-8"
+JSON_CONTENT_TYPE = "application/json"
+
+# Served for content-addressed URLs, which never change
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Served for "latest version" URLs: cache, but revalidate with the ETag every time
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def content_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+def encode_json(value: Any) -> bytes:
+    """Canonical JSON, so equal values hash equally."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":")).encode()
+
+
+def _brotli(content: bytes) -> Optional[bytes]:
+    try:
+        # Optional dependency, imported lazily
+        import brotli
+    except ImportError:
+        return None
+    return brotli.compress(content, quality=11)
+
+
+def build_blob(content: bytes, content_type: str) -> ArtifactBlob:
+    """Hashes and precompresses ``content``."""
+    return ArtifactBlob(
+        content_hash=content_hash(content),
+        content_type=content_type,
+        size_bytes=len(content),
+        gzip_content=gzip.compress(content, compresslevel=9, mtime=0),
+        brotli_content=_brotli(content),
+    )
+
+
+def etag(blob: ArtifactBlob) -> str:
+    return f'"{blob.content_hash}"'
+
+
+def etag_matches(if_none_match: Optional[str], blob: ArtifactBlob) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, per RFC 9110: W/"x" matches "x"
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag(blob) in candidates
+
+
+def select_encoding(accept_encoding: Optional[str], blob: ArtifactBlob) -> tuple[Optional[str], bytes]:
+    """
+    Picks the stored representation for an Accept-Encoding header.
+
+    Returns:
+        (Content-Encoding or None for identity, body)
+    """
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding and params.replace(" ", "") not in ("q=0", "q=0.0"):
+            accepted.add(coding.lower())
+
+    if blob.brotli_content is not None and "br" in accepted:
+        return "br", blob.brotli_content
+    if accepted & {"gzip", "*"}:
+        return "gzip", blob.gzip_content
+    return None, gzip.decompress(blob.gzip_content)
@@ -0,0 +1,191 @@
+"""
+Discovery result cache with stale-while-revalidate.
+
+/farms/discover results are stored per search: zip code, state, radius and
+farm profile (a hash of the normalized farm name and offerings, which the
+competitor filtering and market gap report depend on). A result younger than
+DISCOVERY_CACHE_TTL_SECONDS is served as is. One up to
+DISCOVERY_CACHE_MAX_STALE_SECONDS old is served at once while a discovery job
+refreshes it in the background; anything older is a miss.
+
+A refresh repeats the USDA and Places lookups, which are cheap and show what
+changed, but starts from the stored visual analysis and score of each
+competitor website audited within DISCOVERY_CACHE_MAX_AUDIT_AGE_SECONDS: only
+new or changed websites are screenshotted and scored again.
+
+Cache failures are logged, never raised: discovery then simply runs uncached.
+"""
+
+from __future__ import annotations
+
+import enum
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from pydantic_core import to_jsonable_python
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src import crud
+from src.core.config import settings
+from src.db.session import engine
+from src.models.agent_job import JobKind
+from src.models.discovery_cache import DiscoveryCacheEntry
+from src.schemas.agent_discovery import DiscoverRequest, DiscoveryArtifacts
+
+logger = logging.getLogger(__name__)
+
+
+class CacheStatus(str, enum.Enum):
+    fresh = "fresh"
+    stale = "stale"
+    miss = "miss"
+
+
+def _normalize(value: Optional[str]) -> str:
+    return " ".join((value or "").lower().split())
+
+
+def profile_hash(farm_name: str, farm_offerings: str) -> str:
+    return hashlib.sha256(f"{_normalize(farm_name)}\x00{_normalize(farm_offerings)}".encode()).hexdigest()
+
+
+def discovery_cache_key(body: DiscoverRequest) -> str:
+    parts = (
+        _normalize(body.zip_code), _normalize(body.state), str(body.radius_miles),
+        profile_hash(body.farm_name, body.farm_offerings),
+    )
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
+def _age(entry: DiscoveryCacheEntry) -> timedelta:
+    refreshed_at = entry.refreshed_at
+    if refreshed_at.tzinfo is None:
+        refreshed_at = refreshed_at.replace(tzinfo=timezone.utc)
+    return datetime.now(timezone.utc) - refreshed_at
+
+
+def cache_status(entry: Optional[DiscoveryCacheEntry]) -> CacheStatus:
+    if entry is None:
+        return CacheStatus.miss
+    age = _age(entry).total_seconds()
+    if age <= settings.DISCOVERY_CACHE_TTL_SECONDS:
+        return CacheStatus.fresh
+    if age <= settings.DISCOVERY_CACHE_MAX_STALE_SECONDS:
+        return CacheStatus.stale
+    return CacheStatus.miss
+
+
+async def cached_discovery(session: AsyncSession, body: DiscoverRequest) -> Optional[Dict[str, Any]]:
+    """
+    The stored /discover response, with a ``cache`` block describing it, or
+    None on a miss. Serving a stale response queues its refresh.
+    """
+    if not settings.DISCOVERY_CACHE_ENABLED:
+        return None
+
+    key = discovery_cache_key(body)
+    try:
+        entry = await crud.get_discovery_cache(session, key)
+        status = cache_status(entry)
+        if status == CacheStatus.miss:
+            return None
+        refreshing = entry.refresh_started_at is not None
+        if status == CacheStatus.stale:
+            refreshing = await queue_refresh(session, body, key) or refreshing
+    except Exception as e:
+        logger.error(f"Discovery cache lookup failed: {e}")
+        return None
+
+    return {
+        **entry.result,
+        "cache": {
+            "status": status.value,
+            "refreshed_at": entry.refreshed_at.isoformat(),
+            "age_seconds": round(_age(entry).total_seconds()),
+            "refreshing": refreshing,
+        },
+    }
+
+
+async def queue_refresh(session: AsyncSession, body: DiscoverRequest, key: str) -> bool:
+    """Queues a discovery job to refresh the entry, unless one is already under way."""
+    if not await crud.claim_discovery_refresh(
+            session, key, lease_seconds=settings.DISCOVERY_CACHE_REFRESH_LEASE_SECONDS
+    ):
+        return False
+    job = await crud.create_job(
+        session, kind=JobKind.discovery, payload=body.model_dump(), max_attempts=settings.JOB_MAX_ATTEMPTS
+    )
+    logger.info(f"Queued discovery job {job.id} to refresh stale cache entry {key}")
+    return True
+
+
+async def reusable_audits(body: DiscoverRequest) -> Tuple[DiscoveryArtifacts, Dict[str, str]]:
+    """
+    Website analyses and scores from the stored result that a new run can
+    reuse, and when each website was audited.
+    """
+    empty = (DiscoveryArtifacts(), {})
+    if not settings.DISCOVERY_CACHE_ENABLED:
+        return empty
+    try:
+        async with AsyncSession(engine) as session:
+            entry = await crud.get_discovery_cache(session, discovery_cache_key(body))
+    except Exception as e:
+        logger.error(f"Discovery cache lookup failed: {e}")
+        return empty
+    if entry is None or _age(entry).total_seconds() > settings.DISCOVERY_CACHE_MAX_STALE_SECONDS:
+        return empty
+
+    stored = DiscoveryArtifacts.model_validate(
+        {k: v for k, v in entry.artifacts.items() if k in ("visual_analyses", "site_scores")}
+    )
+    oldest = datetime.now(timezone.utc) - timedelta(seconds=settings.DISCOVERY_CACHE_MAX_AUDIT_AGE_SECONDS)
+    audited_at = {
+        url: at for url, at in entry.artifacts.get("audited_at", {}).items()
+        if url in stored.site_scores and url in stored.visual_analyses and datetime.fromisoformat(at) >= oldest
+    }
+    return DiscoveryArtifacts(
+        visual_analyses={url: stored.visual_analyses[url] for url in audited_at},
+        site_scores={url: stored.site_scores[url] for url in audited_at},
+    ), audited_at
+
+
+async def store_discovery(
+        body: DiscoverRequest, response: Dict[str, Any], artifacts: DiscoveryArtifacts,
+        audited_at: Dict[str, str],
+) -> None:
+    """
+    Caches a finished run's response and the audits of its competitors'
+    websites. Runs with errors are not cached; they end the refresh instead,
+    so the next stale hit retries it.
+    """
+    if not settings.DISCOVERY_CACHE_ENABLED:
+        return
+
+    key = discovery_cache_key(body)
+    try:
+        async with AsyncSession(engine) as session:
+            if response.get("errors"):
+                await crud.release_discovery_refresh(session, key)
+                return
+
+            result = to_jsonable_python(response)
+            now = datetime.now(timezone.utc).isoformat()
+            urls = {lead["website_url"] for lead in result["leads"] if lead.get("website_url")}
+            scored = [url for url in urls if url in artifacts.site_scores and url in artifacts.visual_analyses]
+            await crud.save_discovery_cache(
+                session, key=key, zip_code=body.zip_code, state=body.state, radius_miles=body.radius_miles,
+                profile_hash=profile_hash(body.farm_name, body.farm_offerings),
+                result=result,
+                artifacts=to_jsonable_python({
+                    "visual_analyses": {url: artifacts.visual_analyses[url] for url in scored},
+                    "site_scores": {url: artifacts.site_scores[url] for url in scored},
+                    # Reused audits keep their original time, so they expire
+                    "audited_at": {url: audited_at.get(url, now) for url in scored},
+                }),
+            )
+    except Exception as e:
+        logger.error(f"Failed to cache discovery result {key}: {e}")
@@ -0,0 +1,111 @@
+"""
+Local (LLM-free) domain name candidate generator.
+
+Builds ``.com`` candidates combinatorially from the farm name's tokens, the
+product keywords in its description and small prefix/suffix lexicons, then
+ranks them so the shortest, most pronounceable names are checked first.
+"""
+
+from __future__ import annotations
+
+import re
+
+PREFIXES = ("get", "eat", "shop", "fresh", "local", "the")
+SUFFIXES = ("farm", "farms", "fresh", "acres", "co", "market", "grown", "harvest", "produce")
+
+# Words that carry no brand value on their own
+_STOPWORDS = frozenset({
+    "a", "an", "and", "at", "by", "for", "from", "in", "of", "on", "or", "our", "the", "to", "we", "with",
+    "fresh", "local", "locally", "organic", "sustainable", "sustainably", "family", "seasonal", "raised",
+    "grown", "heirloom", "pasture", "free", "range", "raw", "csa", "csas", "sell", "sells", "selling",
+})
+# Name tokens that are dropped to form a shorter core ("Oak Creek Farm" -> "oakcreek")
+_GENERIC_NAME_TOKENS = frozenset({"farm", "farms", "ranch", "acres", "gardens", "garden", "orchard", "co", "company", "llc"})
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_VOWELS = set("aeiouy")
+_MIN_LABEL, _MAX_LABEL = 4, 20
+_UNBRANDED_PENALTY = 6.0
+
+
+def _tokens(text: str) -> list[str]:
+    return _TOKEN.findall(text.lower().replace("'", ""))
+
+
+def _product_keywords(description: str, limit: int = 3) -> list[str]:
+    keywords: list[str] = []
+    for token in _tokens(description):
+        if len(token) >= 3 and not token.isdigit() and token not in _STOPWORDS and token not in keywords:
+            keywords.append(token)
+    return keywords[:limit]
+
+
+def _max_run(label: str, vowels: bool) -> int:
+    longest = current = 0
+    for char in label:
+        if (char in _VOWELS) == vowels and char.isalpha():
+            current += 1
+            longest = max(longest, current)
+        else:
+            current = 0
+    return longest
+
+
+def pronounceability_penalty(label: str) -> float:
+    """0 for easy-to-say labels; grows with consonant/vowel clusters and odd vowel ratios."""
+    letters = [c for c in label if c.isalpha()]
+    if not letters:
+        return 10.0
+    vowel_ratio = sum(c in _VOWELS for c in letters) / len(letters)
+    penalty = 3.0 * max(0, _max_run(label, vowels=False) - 3)
+    penalty += 2.0 * max(0, _max_run(label, vowels=True) - 2)
+    penalty += 8.0 * max(0.0, abs(vowel_ratio - 0.4) - 0.15)
+    penalty += 2.0 * sum(1 for a, b in zip(label, label[1:]) if a == b and a.isalpha())
+    penalty += 2.0 * sum(c.isdigit() for c in label)
+    return penalty
+
+
+def rank_score(label: str) -> float:
+    """Lower is better: shorter and more pronounceable."""
+    return len(label) + pronounceability_penalty(label)
+
+
+def generate_domain_candidates(farm_name: str, description: str, limit: int) -> list[str]:
+    """
+    Returns up to ``limit`` ranked ``.com`` candidates for a farm.
+
+    Args:
+        farm_name: e.g. "Oak Creek Heritage Farm".
+        description: What the farm sells, e.g. "Organic heirloom tomatoes and eggs".
+        limit: Maximum number of candidates.
+    """
+    name_tokens = [t for t in _tokens(farm_name) if t not in {"the", "and", "of"}]
+    core_tokens = [t for t in name_tokens if t not in _GENERIC_NAME_TOKENS] or name_tokens
+    products = [p for p in _product_keywords(description) if p not in name_tokens]
+
+    # Brand "cores": full name, name without generic words, and its first two words
+    cores = {"".join(name_tokens), "".join(core_tokens), "".join(core_tokens[:2])}
+    cores.discard("")
+
+    labels: set[str] = set(cores)
+    for core in cores:
+        for suffix in SUFFIXES:
+            if suffix.rstrip("s") not in core:  # no "myfarmfarms"
+                labels.add(core + suffix)
+        for prefix in PREFIXES:
+            if not core.startswith(prefix):
+                labels.add(prefix + core)
+        for product in products:
+            labels.add(core + product)
+    for product in products:
+        for suffix in SUFFIXES:
+            if product != suffix:
+                labels.add(product + suffix)
+
+    def score(label: str) -> float:
+        # Names that carry the farm's own brand beat generic product names
+        return rank_score(label) + (0.0 if any(core in label for core in cores) else _UNBRANDED_PENALTY)
+
+    valid = [label for label in labels if _MIN_LABEL <= len(label) <= _MAX_LABEL]
+    ranked = sorted(valid, key=lambda label: (score(label), label))
+    return [f"{label}.com" for label in ranked[:limit]]
@@ -0,0 +1,162 @@
+"""
+Async, cached DNS checks for domain availability.
+
+``socket.gethostbyname`` blocks the event loop for as long as the DNS
+timeout. ``DomainResolver`` instead resolves through ``loop.getaddrinfo``
+(run in the default executor) with a per-lookup timeout, checks many
+candidates concurrently, and keeps a TTL cache of results.
+
+A domain counts as registered if it resolves to an address. With
+``DOMAIN_DNS_CHECK_NAMESERVERS`` enabled (requires ``dnspython``), a domain
+that does not resolve is also looked up for apex NS/SOA records, which
+catches registered domains that are parked without any A/AAAA record.
+
+Results are ``True`` (registered), ``False`` (no DNS records, likely
+available) or ``None`` (lookup timed out or failed, e.g. a temporary
+resolver error; not cached).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import socket
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# getaddrinfo errors that mean the name has no address records. Anything else
+# (EAI_AGAIN, EAI_FAIL, ...) is a resolver failure and says nothing about the domain.
+_NO_ADDRESS_ERRORS = frozenset(
+    code for code in (socket.EAI_NONAME, getattr(socket, "EAI_NODATA", None)) if code is not None
+)
+
+
+class DomainResolver:
+    """Concurrent DNS registration checks with a TTL cache."""
+
+    def __init__(
+            self,
+            timeout_seconds: float,
+            ttl_seconds: int,
+            negative_ttl_seconds: int,
+            max_entries: int,
+            max_concurrency: int,
+            check_nameservers: bool = False,
+    ) -> None:
+        self._timeout = timeout_seconds
+        self._ttl = ttl_seconds
+        self._negative_ttl = negative_ttl_seconds
+        self._max_entries = max_entries
+        self._max_concurrency = max_concurrency
+        self._check_nameservers = check_nameservers
+        self._cache: OrderedDict[str, tuple[float, bool]] = OrderedDict()
+
+    # -- cache ---------------------------------------------------------------
+
+    def _cached(self, domain: str) -> Optional[bool]:
+        entry = self._cache.get(domain)
+        if entry is None:
+            return None
+        expires_at, registered = entry
+        if expires_at <= time.monotonic():
+            del self._cache[domain]
+            return None
+        self._cache.move_to_end(domain)
+        return registered
+
+    def _store(self, domain: str, registered: bool) -> None:
+        # "Available" can change any minute; "registered" rarely does
+        ttl = self._ttl if registered else self._negative_ttl
+        self._cache[domain] = (time.monotonic() + ttl, registered)
+        self._cache.move_to_end(domain)
+        while len(self._cache) > self._max_entries:
+            self._cache.popitem(last=False)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    # -- lookups -------------------------------------------------------------
+
+    async def _resolves(self, domain: str) -> Optional[bool]:
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.wait_for(loop.getaddrinfo(domain, None), timeout=self._timeout)
+            return True
+        except socket.gaierror as e:
+            if e.errno in _NO_ADDRESS_ERRORS:
+                # Name or service not known: no address records
+                return False
+            logger.warning(f"DNS lookup for {domain} failed: {e!r}")
+            return None
+        except (asyncio.TimeoutError, OSError) as e:
+            logger.warning(f"DNS lookup for {domain} failed: {e!r}")
+            return None
+
+    async def _has_nameservers(self, domain: str) -> Optional[bool]:
+        try:
+            # Optional dependency, imported lazily
+            import dns.asyncresolver
+            import dns.exception
+            import dns.resolver
+        except ImportError:
+            logger.debug("dnspython not installed; skipping NS/SOA lookup.")
+            return None
+
+        resolver = dns.asyncresolver.Resolver()
+        for record_type in ("NS", "SOA"):
+            try:
+                await resolver.resolve(domain, record_type, lifetime=self._timeout)
+                return True
+            except dns.resolver.NXDOMAIN:
+                return False
+            except dns.resolver.NoAnswer:
+                # The name exists in the zone, just without this record type
+                continue
+            except dns.exception.DNSException as e:
+                logger.warning(f"{record_type} lookup for {domain} failed: {e!r}")
+                return None
+        return True
+
+    async def is_registered(self, domain: str) -> Optional[bool]:
+        """Returns whether ``domain`` is registered, or None if the lookup failed."""
+        domain = domain.strip().lower().rstrip(".")
+        cached = self._cached(domain)
+        if cached is not None:
+            return cached
+
+        registered = await self._resolves(domain)
+        if registered is not True and self._check_nameservers:
+            has_nameservers = await self._has_nameservers(domain)
+            if has_nameservers is not None:
+                registered = has_nameservers
+
+        if registered is not None:
+            self._store(domain, registered)
+        return registered
+
+    async def check_many(self, domains: Iterable[str]) -> dict[str, Optional[bool]]:
+        """Checks all domains concurrently (bounded by the concurrency limit)."""
+        domains = list(dict.fromkeys(domains))
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def _check(domain: str) -> Optional[bool]:
+            async with semaphore:
+                return await self.is_registered(domain)
+
+        results = await asyncio.gather(*(_check(d) for d in domains))
+        return dict(zip(domains, results))
+
+
+domain_resolver = DomainResolver(
+    timeout_seconds=settings.DOMAIN_DNS_TIMEOUT_SECONDS,
+    ttl_seconds=settings.DOMAIN_DNS_CACHE_TTL_SECONDS,
+    negative_ttl_seconds=settings.DOMAIN_DNS_NEGATIVE_CACHE_TTL_SECONDS,
+    max_entries=settings.DOMAIN_DNS_CACHE_MAX_ENTRIES,
+    max_concurrency=settings.DOMAIN_DNS_MAX_CONCURRENCY,
+    check_nameservers=settings.DOMAIN_DNS_CHECK_NAMESERVERS,
+)
@@ -0,0 +1,187 @@
+"""
+Worker pool for queued agent jobs (``AgentJob``).
+
+Each worker loops: claim the oldest due job with ``SELECT ... FOR UPDATE
+SKIP LOCKED``, run its pipeline through ``src.services.agent_runs`` and
+store the result. Claims never block each other, so any number of pools
+can share the queue: inside the API process (``JOB_WORKERS_IN_API``) and in
+dedicated ``python -m src.worker`` processes on any host.
+
+A running job's heartbeat is refreshed every third of ``JOB_LEASE_SECONDS``
+and on every completed pipeline step. Every pool also requeues jobs whose
+heartbeat has expired, so a job whose worker crashed is picked up again.
+Failed jobs are retried with exponential backoff up to their ``max_attempts``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import random
+import socket
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pydantic_core import to_jsonable_python
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from src import crud
+from src.core.config import settings
+from src.core.llm_scheduler import LLMPriority
+from src.db.session import engine
+from src.models.agent_job import AgentJob, JobKind
+from src.schemas.agent_discovery import BatchDiscoverRequest, DiscoverRequest
+from src.schemas.analytics import AnalyticsPipelineRequest
+from src.services.agent_runs import (
+    ProgressCallback,
+    run_analytics_pipeline,
+    run_batch_discovery,
+    run_builder,
+    run_discovery,
+)
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[Dict[str, Any], str, ProgressCallback], Awaitable[Any]]
+
+
+async def _discovery_job(payload: Dict[str, Any], run_id: str, on_progress: ProgressCallback) -> Any:
+    return await run_discovery(DiscoverRequest(**payload), run_id, on_progress)
+
+
+async def _batch_discovery_job(payload: Dict[str, Any], run_id: str, on_progress: ProgressCallback) -> Any:
+    return await run_batch_discovery(BatchDiscoverRequest(**payload), run_id, on_progress)
+
+
+async def _analytics_job(payload: Dict[str, Any], run_id: str, on_progress: ProgressCallback) -> Any:
+    return await run_analytics_pipeline(AnalyticsPipelineRequest(**payload), run_id, on_progress)
+
+
+async def _builder_job(payload: Dict[str, Any], run_id: str, on_progress: ProgressCallback) -> Any:
+    return await run_builder(
+        payload["farm_id"], payload["initial_state"], run_id, LLMPriority.batch, on_progress
+    )
+
+
+JOB_HANDLERS: Dict[JobKind, JobHandler] = {
+    JobKind.discovery: _discovery_job,
+    JobKind.analytics: _analytics_job,
+    JobKind.builder: _builder_job,
+    JobKind.batch_discovery: _batch_discovery_job,
+}
+
+
+def retry_delay_seconds(attempts: int) -> float:
+    """Exponential backoff after the ``attempts``-th failed attempt."""
+    return settings.JOB_RETRY_BACKOFF_SECONDS * 2 ** max(0, attempts - 1)
+
+
+class JobWorkerPool:
+    """``concurrency`` asyncio workers sharing the Postgres job queue."""
+
+    def __init__(
+            self, concurrency: int, *, kinds: Optional[List[JobKind]] = None,
+            poll_interval: Optional[float] = None, lease_seconds: Optional[float] = None,
+    ) -> None:
+        self.concurrency = max(1, concurrency)
+        self.kinds = kinds
+        self.poll_interval = poll_interval if poll_interval is not None else settings.JOB_POLL_INTERVAL_SECONDS
+        self.lease_seconds = lease_seconds if lease_seconds is not None else settings.JOB_LEASE_SECONDS
+        # Unique across hosts and processes; recorded on claimed jobs
+        self.name = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._tasks: List[asyncio.Task] = []
+        self._stopping = asyncio.Event()
+
+    async def start(self) -> None:
+        self._stopping.clear()
+        self._tasks = [
+            asyncio.create_task(self._worker_loop(f"{self.name}/{i}")) for i in range(self.concurrency)
+        ]
+        self._tasks.append(asyncio.create_task(self._reaper_loop()))
+        logger.info(f"Job worker pool {self.name} started with {self.concurrency} workers")
+
+    async def stop(self) -> None:
+        """Stops claiming; jobs still running are cancelled and released back to the queue."""
+        self._stopping.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        logger.info(f"Job worker pool {self.name} stopped")
+
+    async def _sleep(self, seconds: float) -> None:
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _worker_loop(self, worker_id: str) -> None:
+        while not self._stopping.is_set():
+            try:
+                async with AsyncSession(engine) as session:
+                    job = await crud.claim_next_job(session, worker_id=worker_id, kinds=self.kinds)
+            except Exception as e:
+                logger.error(f"Worker {worker_id} failed to claim a job: {e}")
+                job = None
+
+            if job is None:
+                # Jitter keeps idle workers across processes from polling in lockstep
+                await self._sleep(self.poll_interval * random.uniform(0.5, 1.5))
+                continue
+            await self.run_job(job, worker_id)
+
+    async def _reaper_loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                async with AsyncSession(engine) as session:
+                    requeued = await crud.requeue_expired_jobs(session, lease_seconds=self.lease_seconds)
+                if requeued:
+                    logger.warning(f"Recovered {requeued} jobs with expired leases")
+            except Exception as e:
+                logger.error(f"Failed to requeue expired jobs: {e}")
+            await self._sleep(self.lease_seconds / 2)
+
+    async def _heartbeat_loop(self, job_id: uuid.UUID, worker_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                async with AsyncSession(engine) as session:
+                    if not await crud.heartbeat_job(session, job_id, worker_id=worker_id):
+                        logger.warning(f"Worker {worker_id} lost the lease on job {job_id}")
+            except Exception as e:
+                logger.error(f"Heartbeat for job {job_id} failed: {e}")
+
+    async def run_job(self, job: AgentJob, worker_id: str) -> None:
+        """Runs one claimed job to completion, failure (with retry) or release on shutdown."""
+        job_id, kind, attempts = job.id, job.kind, job.attempts
+        logger.info(f"Worker {worker_id} running {kind.value} job {job_id} (attempt {attempts})")
+
+        async def on_progress(step: str) -> None:
+            try:
+                async with AsyncSession(engine) as session:
+                    await crud.record_job_progress(session, job_id, worker_id=worker_id, step=step)
+            except Exception as e:
+                logger.error(f"Failed to record progress of job {job_id}: {e}")
+
+        heartbeat = asyncio.create_task(self._heartbeat_loop(job_id, worker_id))
+        try:
+            result = await JOB_HANDLERS[kind](job.payload, job.run_id, on_progress)
+        except asyncio.CancelledError:
+            async with AsyncSession(engine) as session:
+                await crud.release_job(session, job_id, worker_id=worker_id)
+            raise
+        except Exception as e:
+            logger.error(f"{kind.value} job {job_id} failed: {e}")
+            async with AsyncSession(engine) as session:
+                await crud.fail_job(
+                    session, job_id, worker_id=worker_id, error=str(e),
+                    retry_delay_seconds=retry_delay_seconds(attempts),
+                )
+            return
+        finally:
+            heartbeat.cancel()
+
+        async with AsyncSession(engine) as session:
+            if not await crud.complete_job(session, job_id, worker_id=worker_id, result=to_jsonable_python(result)):
+                logger.warning(f"Result of job {job_id} discarded: the lease was lost")
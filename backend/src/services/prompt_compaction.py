@@ -0,0 +1,182 @@
+"""
+Prompt compaction: sizes contextual text to a token budget before it is
+inlined into an LLM prompt.
+
+- ``compact_text``: extractive summarization of scraped text. Sentences are
+  scored against the document centroid (TF-IDF, in numpy), boosted by overlap
+  with an optional query (e.g. the farm's offerings), and the best ones are
+  kept in their original order until the budget is reached.
+- ``compact_json``: JSON without indentation or spaces after separators.
+- ``rollup_weather``: daily min/max/precipitation rollups of 3-hourly forecasts.
+- ``compact_events``: the first few events with short descriptions and no links.
+- ``compact_prompt``: strips the indentation of triple-quoted prompts.
+
+Token counts are estimated at ~4 characters per token, which is close enough
+for budgeting and needs no tokenizer.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import re
+from collections import Counter
+from typing import Any, Optional
+
+CHARS_PER_TOKEN = 4
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+_WORD = re.compile(r"[a-z0-9][a-z0-9'-]+")
+_MAX_SENTENCE_WORDS = 40
+_QUERY_WEIGHT = 2.0
+
+_STOPWORDS = frozenset("""
+    a about above after again all also am an and any are as at be because been before being below
+    between both but by can could did do does doing down during each few for from further had has
+    have having he her here hers him his how i if in into is it its just me more most my no nor not
+    now of off on once only or other our ours out over own same she should so some such than that
+    the their theirs them then there these they this those through to too under until up very was
+    we were what when where which while who whom why will with you your yours
+""".split())
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting (~4 characters per token)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _split_sentences(text: str) -> list[str]:
+    """Splits on sentence punctuation and line breaks; breaks up run-on chunks."""
+    sentences: list[str] = []
+    seen: set[str] = set()
+    for raw in _SENTENCE_SPLIT.split(text):
+        words = raw.split()
+        for start in range(0, len(words), _MAX_SENTENCE_WORDS):
+            sentence = " ".join(words[start:start + _MAX_SENTENCE_WORDS])
+            key = sentence.lower()
+            # Navigation, cookie banners etc. repeat verbatim across a page
+            if sentence and key not in seen:
+                seen.add(key)
+                sentences.append(sentence)
+    return sentences
+
+
+def _terms(sentence: str) -> list[str]:
+    return [word for word in _WORD.findall(sentence.lower()) if word not in _STOPWORDS]
+
+
+def compact_text(text: str, max_tokens: int, query: Optional[str] = None) -> str:
+    """
+    Extractive summary of ``text`` that fits in ``max_tokens``.
+
+    Args:
+        text: Raw text, e.g. scraped website content.
+        max_tokens: Token budget for the result.
+        query: Optional focus; sentences sharing its terms are preferred.
+
+    Returns:
+        str: Whitespace-normalized text, unchanged if it already fits.
+    """
+    normalized = " ".join(text.split())
+    if estimate_tokens(normalized) <= max_tokens:
+        return normalized
+
+    sentences = _split_sentences(text)
+    if not sentences:
+        return ""
+
+    # Defer heavy imports to avoid penalising application cold-start
+    import numpy as np
+
+    sentence_terms = [_terms(s) for s in sentences]
+    vocabulary = {term: i for i, term in enumerate(sorted({t for terms in sentence_terms for t in terms}))}
+
+    counts = np.zeros((len(sentences), max(len(vocabulary), 1)), dtype=np.float64)
+    for row, terms in enumerate(sentence_terms):
+        for term, count in Counter(terms).items():
+            counts[row, vocabulary[term]] = count
+
+    # TF-IDF rows, scored by cosine similarity to the document centroid
+    document_frequency = (counts > 0).sum(axis=0)
+    tfidf = counts * np.log((1 + len(sentences)) / (1 + document_frequency))
+    norms = np.linalg.norm(tfidf, axis=1)
+    norms[norms == 0] = 1.0
+    tfidf /= norms[:, None]
+    centroid = tfidf.mean(axis=0)
+    scores = tfidf @ centroid
+
+    if query:
+        query_columns = [vocabulary[t] for t in set(_terms(query)) if t in vocabulary]
+        if query_columns:
+            overlap = (counts[:, query_columns] > 0).sum(axis=1) / len(query_columns)
+            scores = scores * (1 + _QUERY_WEIGHT * overlap) + overlap
+
+    # Greedily take the best sentences that still fit, then restore reading order
+    budget_chars = max_tokens * CHARS_PER_TOKEN
+    selected: list[int] = []
+    used = 0
+    for index in np.argsort(-scores, kind="stable"):
+        length = len(sentences[index]) + 1
+        if used + length <= budget_chars:
+            selected.append(int(index))
+            used += length
+
+    return " ".join(sentences[i] for i in sorted(selected))
+
+
+def compact_json(data: Any) -> str:
+    """Serializes JSON without indentation or separator whitespace."""
+    return json.dumps(data, separators=(",", ":"), default=str)
+
+
+def rollup_weather(weather: Optional[dict[str, Any]]) -> Optional[dict[str, Any]]:
+    """
+    Replaces the 3-hourly forecast of a ``WeatherResult`` dump with one entry
+    per day: min/max temperature, total precipitation, mean humidity and the
+    most frequent conditions.
+    """
+    if not weather:
+        return weather
+
+    days: dict[str, list[dict[str, Any]]] = {}
+    for entry in weather.get("forecast") or []:
+        days.setdefault(str(entry.get("date", ""))[:10], []).append(entry)
+
+    daily = []
+    for day, entries in days.items():
+        conditions = Counter(e.get("description") for e in entries if e.get("description"))
+        daily.append({
+            "date": day,
+            "temp_min_f": round(min(e["temperature_min"] for e in entries), 1),
+            "temp_max_f": round(max(e["temperature_max"] for e in entries), 1),
+            "precip_mm": round(sum(e.get("precipitation_mm") or 0.0 for e in entries), 1),
+            "humidity_pct": round(sum(e["humidity"] for e in entries) / len(entries)),
+            "conditions": conditions.most_common(1)[0][0] if conditions else None,
+        })
+
+    return {
+        "location": weather.get("location"),
+        "current_temp_f": weather.get("current_temp"),
+        "daily": daily,
+    }
+
+
+def compact_events(
+        events: Optional[dict[str, Any]], max_events: int, description_tokens: int
+) -> Optional[list[dict[str, Any]]]:
+    """Keeps the first ``max_events`` of an ``EventResult`` dump with shortened descriptions."""
+    if not events:
+        return None
+
+    compacted = []
+    for event in (events.get("events") or [])[:max_events]:
+        item = {key: event.get(key) for key in ("title", "date", "location") if event.get(key)}
+        if event.get("description"):
+            item["description"] = compact_text(event["description"], description_tokens)
+        compacted.append(item)
+    return compacted
+
+
+def compact_prompt(prompt: str) -> str:
+    """Strips indentation and blank lines from a triple-quoted f-string prompt."""
+    return "\n".join(line.strip() for line in prompt.splitlines() if line.strip())
@@ -0,0 +1,163 @@
+"""
+Section-level editing of generated landing pages.
+
+Pages mark their top-level sections with ``data-section`` attributes (the
+templates in ``site_templates`` always do; full-page LLM generation is asked
+to). ``split_sections`` locates them by source offset, so a regenerated
+section is spliced into the page without re-serializing the rest of the
+document. ``regenerate_section`` rewrites a single section with a prompt
+that contains only that section, which costs a small fraction of the tokens
+and time of regenerating the page.
+"""
+
+from __future__ import annotations
+
+import logging
+from html.parser import HTMLParser
+from typing import Any, Optional
+
+from bs4 import BeautifulSoup
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
+from pydantic import BaseModel
+
+from src.core.llm_routing import get_llm_for_task
+from src.services.prompt_compaction import compact_prompt
+
+logger = logging.getLogger(__name__)
+
+SECTION_ATTRIBUTE = "data-section"
+
+# Elements that never have an end tag
+_VOID_ELEMENTS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr",
+})
+
+
+class PageSection(BaseModel):
+    """One addressable section of a page, with its character offsets in the page."""
+    name: str
+    tag: str
+    start: int
+    end: int
+    html: str
+
+
+class _SectionLocator(HTMLParser):
+    """
+    Records the source span of every top-level element carrying ``data-section``.
+
+    A section ends at the end tag matching its start tag, found by counting
+    only the elements with the section's own tag name: other elements may
+    validly omit their end tags (``<li>``, ``<p>``, ...).
+    """
+
+    def __init__(self, source: str) -> None:
+        super().__init__(convert_charrefs=False)
+        # getpos() counts lines by "\n" only
+        self._line_offsets = [0]
+        for line in source.split("\n"):
+            self._line_offsets.append(self._line_offsets[-1] + len(line) + 1)
+        self._source = source
+        self._open: Optional[tuple[str, str, int]] = None  # (name, tag, start)
+        self._nesting = 0  # open elements with the open section's tag name
+        self.spans: list[tuple[str, str, int, int]] = []
+
+    def _offset(self) -> int:
+        line, column = self.getpos()
+        return self._line_offsets[line - 1] + column
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, Optional[str]]]) -> None:
+        if tag in _VOID_ELEMENTS:
+            return
+        if self._open is not None:
+            if tag == self._open[1]:
+                self._nesting += 1
+            return
+        name = dict(attrs).get(SECTION_ATTRIBUTE)
+        if name:
+            self._open = (name, tag, self._offset())
+            self._nesting = 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if self._open is None or tag != self._open[1]:
+            return
+        self._nesting -= 1
+        if self._nesting == 0:
+            end = self._source.index(">", self._offset()) + 1
+            self.spans.append((*self._open, end))
+            self._open = None
+
+
+def split_sections(html: str) -> list[PageSection]:
+    """Returns the page's ``data-section`` elements in document order."""
+    locator = _SectionLocator(html)
+    locator.feed(html)
+    locator.close()
+    return [
+        PageSection(name=name, tag=tag, start=start, end=end, html=html[start:end])
+        for name, tag, start, end in locator.spans
+    ]
+
+
+def replace_section(html: str, section: PageSection, new_section_html: str) -> str:
+    """Splices ``new_section_html`` over ``section``; the rest of the page is untouched."""
+    return html[:section.start] + new_section_html.strip() + html[section.end:]
+
+
+def clean_section_html(raw: str, name: str) -> Optional[str]:
+    """
+    Extracts the section element from an LLM reply, forcing its ``data-section``
+    name. Returns None when the reply has no element.
+    """
+    content = raw.strip()
+    if content.startswith("```"):
+        lines = content.splitlines()[1:]
+        if lines and lines[-1].startswith("```"):
+            lines = lines[:-1]
+        content = "\n".join(lines).strip()
+
+    root = BeautifulSoup(content, "html.parser").find(True)
+    if root is None:
+        return None
+    for script in root.find_all("script"):
+        script.decompose()
+    root[SECTION_ATTRIBUTE] = name
+    return str(root)
+
+
+async def regenerate_section(
+        section: PageSection,
+        instruction: str,
+        farm_name: Optional[str] = None,
+        persona: Optional[dict[str, Any]] = None,
+        config: Optional[RunnableConfig] = None,
+) -> Optional[str]:
+    """
+    Rewrites one section following the farmer's instruction.
+
+    Returns:
+        The new section HTML, or None if the model's reply was unusable.
+    """
+    llm = get_llm_for_task("website_section")
+    farm = f'the farm "{farm_name}"' if farm_name else "a farm"
+    voice = f"\nVoice/Tone: {persona.get('tone_and_voice')}\nTagline: {persona.get('tagline')}" if persona else ""
+
+    prompt = compact_prompt(f"""
+    You are editing one section of the landing page of {farm}.{voice}
+
+    Current section:
+    {section.html}
+
+    Change requested by the farmer: {instruction}
+
+    Rewrite ONLY this section. Keep the outer <{section.tag}> element and its data-section="{section.name}" attribute,
+    use only Tailwind CSS utility classes, keep the existing color palette unless asked otherwise, and do not add scripts.
+    Return ONLY the raw HTML of the section, no markdown fences.
+    """)
+
+    response = await llm.ainvoke([HumanMessage(content=prompt)], config=config)
+    new_html = clean_section_html(response.content, section.name)
+    if new_html is None:
+        logger.warning(f"Unusable regenerated '{section.name}' section: {response.content[:200]!r}")
+    return new_html
@@ -0,0 +1,168 @@
+"""
+Template-based landing pages: the fast path of the builder agent.
+
+A page is built from pre-designed Tailwind sections (hero, story, inventory
+grid, contact) filled with ``string.Template``. The only model output the
+page needs is a small ``WebsiteCopy`` (headline, story text, button label and
+an accent color), so rendering takes milliseconds instead of the tens of
+seconds a full-page LLM generation takes.
+
+Each section carries a ``data-section`` attribute so it can be located and
+replaced on its own later. All copy is HTML-escaped, and color tokens are
+checked against ``PALETTE_COLORS`` before they are turned into class names.
+"""
+
+from __future__ import annotations
+
+import html
+import re
+from string import Template
+from typing import Optional
+from urllib.parse import quote
+
+from src.schemas.agent_builder import BrandPersona, WebsiteCopy
+
+# Tailwind color names the LLM may pick as an accent
+PALETTE_COLORS = (
+    "red", "orange", "amber", "yellow", "lime", "green", "emerald", "teal",
+    "cyan", "sky", "blue", "indigo", "violet", "purple", "fuchsia", "pink", "rose",
+)
+
+# Design tokens per layout style (see LAYOUT_STYLES in src/agents/builder.py)
+STYLE_THEMES: dict[str, dict[str, str]] = {
+    "rustic": {
+        "primary": "green", "accent": "amber", "neutral": "stone",
+        "heading_font": "font-serif", "radius": "rounded-md",
+    },
+    "modern": {
+        "primary": "slate", "accent": "emerald", "neutral": "gray",
+        "heading_font": "font-sans tracking-tight", "radius": "rounded-none",
+    },
+    "vibrant": {
+        "primary": "fuchsia", "accent": "orange", "neutral": "amber",
+        "heading_font": "font-sans font-extrabold", "radius": "rounded-3xl",
+    },
+}
+DEFAULT_STYLE = "rustic"
+
+MAX_INVENTORY_ITEMS = 12
+
+_PAGE = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<title>$farm_name</title>
+<meta name="description" content="$subheadline">
+<script src="https://cdn.tailwindcss.com"></script>
+</head>
+<body class="bg-$neutral-50 text-$neutral-800 antialiased">
+$sections
+</body>
+</html>
+""")
+
+SECTION_TEMPLATES: dict[str, Template] = {
+    "hero": Template("""<section data-section="hero" class="bg-$primary-900 text-white">
+  <div class="max-w-5xl mx-auto px-6 py-24 text-center">
+    <p class="uppercase tracking-widest text-sm text-$accent-300 mb-4">$farm_name</p>
+    <h1 class="$heading_font text-4xl md:text-6xl font-bold mb-6">$headline</h1>
+    <p class="text-lg md:text-xl text-$primary-100 max-w-2xl mx-auto mb-10">$subheadline</p>
+    <a href="#contact" class="inline-block bg-$accent-500 hover:bg-$accent-600 text-white font-semibold px-8 py-3 $radius">$call_to_action</a>
+  </div>
+</section>"""),
+    "story": Template("""<section data-section="story" class="bg-white">
+  <div class="max-w-5xl mx-auto px-6 py-20 grid md:grid-cols-2 gap-12 items-center">
+    <img src="https://placehold.co/600x400?text=$image_text" alt="$farm_name" class="w-full $radius shadow-lg">
+    <div>
+      <h2 class="$heading_font text-3xl font-bold text-$primary-900 mb-4">$about_heading</h2>
+      <p class="text-lg leading-relaxed text-$neutral-700">$about_text</p>
+    </div>
+  </div>
+</section>"""),
+    "inventory": Template("""<section data-section="inventory" class="bg-$neutral-100">
+  <div class="max-w-5xl mx-auto px-6 py-20">
+    <h2 class="$heading_font text-3xl font-bold text-center text-$primary-900 mb-12">$products_heading</h2>
+    <div class="grid sm:grid-cols-2 lg:grid-cols-3 gap-8">
+$items
+    </div>
+  </div>
+</section>"""),
+    "contact": Template("""<section data-section="contact" id="contact" class="bg-$primary-900 text-$primary-100">
+  <div class="max-w-5xl mx-auto px-6 py-16 text-center">
+    <h2 class="$heading_font text-3xl font-bold text-white mb-4">$call_to_action</h2>
+    <p class="mb-8">$tagline</p>
+    <p class="text-sm text-$primary-300">&copy; $farm_name</p>
+  </div>
+</section>"""),
+}
+SECTION_ORDER = ("hero", "story", "inventory", "contact")
+
+_INVENTORY_ITEM = Template("""      <div class="bg-white $radius shadow overflow-hidden">
+        <img src="https://placehold.co/600x400?text=$image_text" alt="$name" class="w-full h-48 object-cover">
+        <div class="p-6"><h3 class="text-xl font-semibold text-$primary-800">$name</h3></div>
+      </div>""")
+
+_ITEM_SPLIT = re.compile(r"[,;\n]+|\band\b")
+
+
+def parse_inventory(inventory_data: str, limit: int = MAX_INVENTORY_ITEMS) -> list[str]:
+    """Splits free-text inventory ("Eggs, honey and kale") into display names."""
+    items: list[str] = []
+    for raw in _ITEM_SPLIT.split(inventory_data or ""):
+        name = raw.strip(" .-*\t").strip()
+        if name and name.lower() not in {i.lower() for i in items}:
+            items.append(name[:1].upper() + name[1:])
+    return items[:limit]
+
+
+def default_copy(farm_name: str, persona: Optional[BrandPersona], farm_story: str = "") -> WebsiteCopy:
+    """Copy derived from the persona alone, used when the LLM did not write any."""
+    return WebsiteCopy(
+        headline=persona.tagline if persona else f"Welcome to {farm_name}",
+        subheadline=f"Fresh, local food from {farm_name}.",
+        about_text=persona.farm_story_summary if persona else farm_story or f"{farm_name} grows fresh local food.",
+    )
+
+
+def theme_for(style: str, accent_color: Optional[str] = None) -> dict[str, str]:
+    """Design tokens for ``style``, with the accent replaced by a valid LLM-picked color."""
+    theme = dict(STYLE_THEMES.get(style, STYLE_THEMES[DEFAULT_STYLE]))
+    accent = (accent_color or "").strip().lower()
+    if accent in PALETTE_COLORS and accent != theme["primary"]:
+        theme["accent"] = accent
+    return theme
+
+
+def render_section(name: str, farm_name: str, copy: WebsiteCopy, inventory: list[str], theme: dict[str, str],
+                   tagline: str = "") -> str:
+    """Renders one section of the page by name (see ``SECTION_ORDER``)."""
+    values = {key: html.escape(str(value)) for key, value in copy.model_dump().items() if value is not None}
+    values.update(theme)
+    values.update(
+        farm_name=html.escape(farm_name),
+        tagline=html.escape(tagline or copy.subheadline),
+        image_text=quote(farm_name),
+        items="\n".join(
+            _INVENTORY_ITEM.substitute(theme, name=html.escape(item), image_text=quote(item))
+            for item in inventory
+        ),
+    )
+    return SECTION_TEMPLATES[name].substitute(values)
+
+
+def render_site(farm_name: str, copy: WebsiteCopy, inventory_data: str, style: str, tagline: str = "") -> str:
+    """Renders a complete landing page for one layout style."""
+    theme = theme_for(style, copy.accent_color)
+    inventory = parse_inventory(inventory_data)
+    sections = [
+        render_section(name, farm_name, copy, inventory, theme, tagline)
+        for name in SECTION_ORDER
+        if name != "inventory" or inventory
+    ]
+    return _PAGE.substitute(
+        theme,
+        farm_name=html.escape(farm_name),
+        subheadline=html.escape(copy.subheadline),
+        sections="\n".join(sections),
+    )
@@ -0,0 +1,501 @@
+"""
+Server-side Tailwind compilation for generated landing pages.
+
+Generated pages load the Tailwind Play CDN script, which downloads a JIT
+compiler and builds the stylesheet in every visitor's browser before the
+page can be styled. ``compile_page`` does that work once, on the server:
+
+1. extracts the class names used in the HTML,
+2. emits CSS for each one from the bundled theme tables in
+   ``src.services.tailwind_theme`` (plus a trimmed Preflight reset),
+3. inlines the stylesheet in ``<head>`` and removes the CDN script (and any
+   inline ``tailwind.config`` script), unless some classes were unresolved:
+   the CDN then stays to style those (and any custom theme keys), and the
+   inlined stylesheet only styles the first paint.
+
+The compiler covers the utilities landing pages actually use: layout,
+spacing, sizing, flex/grid, typography, colors with opacity modifiers,
+gradients, borders, radii, shadows, transitions, responsive (``md:``) and
+state (``hover:``, ``group-hover:``) variants, negative values and simple
+arbitrary values (``w-[300px]``). Anything else is reported in
+``PageWeight.unresolved_classes`` rather than guessed at.
+"""
+
+from __future__ import annotations
+
+import gzip
+import re
+from typing import Callable, Optional
+
+from bs4 import BeautifulSoup
+
+from src.schemas.agent_builder import PageWeight
+from src.services.tailwind_theme import (
+    BORDER_RADIUS,
+    BOX_SHADOWS,
+    BREAKPOINTS,
+    COLOR_KEYWORDS,
+    COLORS,
+    FONT_FAMILIES,
+    FONT_SIZES,
+    FONT_WEIGHTS,
+    FRACTIONS,
+    LETTER_SPACING,
+    LINE_HEIGHTS,
+    MAX_WIDTHS,
+    OPACITY_STEPS,
+    PREFLIGHT,
+    SPACING,
+)
+
+_CDN_SCRIPT = re.compile(r"""<script[^>]*\bsrc=["'][^"']*cdn\.tailwindcss\.com[^"']*["'][^>]*>\s*</script>\s*""", re.I)
+_CONFIG_SCRIPT = re.compile(r"<script[^>]*>\s*tailwind\.config\b.*?</script>\s*", re.I | re.S)
+_HEAD_CLOSE = re.compile(r"</head\s*>", re.I)
+# Marks the inlined stylesheet so a page can be recompiled after an edit
+COMPILED_STYLE_ATTRIBUTE = "data-tailwind-compiled"
+_COMPILED_STYLE = re.compile(rf"<style {COMPILED_STYLE_ATTRIBUTE}>.*?</style>\s*", re.S)
+
+STATE_VARIANTS = {
+    "hover": ":hover", "focus": ":focus", "focus-within": ":focus-within", "active": ":active",
+    "first": ":first-child", "last": ":last-child", "odd": ":nth-child(odd)", "even": ":nth-child(even)",
+}
+# Marker classes with no CSS of their own
+_MARKER_CLASSES = {"group", "peer"}
+_SPACE_BETWEEN = " > :not([hidden]) ~ :not([hidden])"
+
+# Simple utilities with fixed declarations, in cascade order
+_STATIC: dict[str, str] = {
+    "sr-only": "position:absolute;width:1px;height:1px;padding:0;margin:-1px;overflow:hidden;clip:rect(0,0,0,0);white-space:nowrap;border-width:0",
+    "pointer-events-none": "pointer-events:none", "visible": "visibility:visible", "invisible": "visibility:hidden",
+    "static": "position:static", "fixed": "position:fixed", "absolute": "position:absolute",
+    "relative": "position:relative", "sticky": "position:sticky",
+    "block": "display:block", "inline-block": "display:inline-block", "inline": "display:inline",
+    "flex": "display:flex", "inline-flex": "display:inline-flex", "grid": "display:grid",
+    "contents": "display:contents", "hidden": "display:none", "table": "display:table",
+    "aspect-square": "aspect-ratio:1 / 1", "aspect-video": "aspect-ratio:16 / 9",
+    "flex-1": "flex:1 1 0%", "flex-auto": "flex:1 1 auto", "flex-none": "flex:none",
+    "shrink-0": "flex-shrink:0", "grow": "flex-grow:1",
+    "cursor-pointer": "cursor:pointer",
+    "list-inside": "list-style-position:inside", "list-disc": "list-style-type:disc",
+    "list-decimal": "list-style-type:decimal", "list-none": "list-style-type:none",
+    "flex-row": "flex-direction:row", "flex-col": "flex-direction:column",
+    "flex-row-reverse": "flex-direction:row-reverse", "flex-col-reverse": "flex-direction:column-reverse",
+    "flex-wrap": "flex-wrap:wrap", "flex-nowrap": "flex-wrap:nowrap",
+    "items-start": "align-items:flex-start", "items-end": "align-items:flex-end",
+    "items-center": "align-items:center", "items-baseline": "align-items:baseline", "items-stretch": "align-items:stretch",
+    "justify-start": "justify-content:flex-start", "justify-end": "justify-content:flex-end",
+    "justify-center": "justify-content:center", "justify-between": "justify-content:space-between",
+    "justify-around": "justify-content:space-around", "justify-evenly": "justify-content:space-evenly",
+    "self-start": "align-self:flex-start", "self-center": "align-self:center", "self-end": "align-self:flex-end",
+    "overflow-hidden": "overflow:hidden", "overflow-auto": "overflow:auto", "overflow-x-auto": "overflow-x:auto",
+    "truncate": "overflow:hidden;text-overflow:ellipsis;white-space:nowrap",
+    "whitespace-nowrap": "white-space:nowrap",
+    "bg-cover": "background-size:cover", "bg-contain": "background-size:contain",
+    "bg-center": "background-position:center", "bg-no-repeat": "background-repeat:no-repeat",
+    "bg-fixed": "background-attachment:fixed",
+    "object-cover": "object-fit:cover", "object-contain": "object-fit:contain", "object-center": "object-position:center",
+    "text-left": "text-align:left", "text-center": "text-align:center",
+    "text-right": "text-align:right", "text-justify": "text-align:justify",
+}
+_STATIC_TYPE: dict[str, str] = {
+    "uppercase": "text-transform:uppercase", "lowercase": "text-transform:lowercase",
+    "capitalize": "text-transform:capitalize", "normal-case": "text-transform:none",
+    "italic": "font-style:italic", "not-italic": "font-style:normal",
+}
+_STATIC_DECORATION: dict[str, str] = {
+    "underline": "text-decoration-line:underline", "line-through": "text-decoration-line:line-through",
+    "no-underline": "text-decoration-line:none",
+    "antialiased": "-webkit-font-smoothing:antialiased;-moz-osx-font-smoothing:grayscale",
+    "transition": "transition-property:color,background-color,border-color,text-decoration-color,fill,stroke,opacity,box-shadow,transform,filter,backdrop-filter;"
+                  "transition-timing-function:cubic-bezier(0.4,0,0.2,1);transition-duration:150ms",
+    "transition-all": "transition-property:all;transition-timing-function:cubic-bezier(0.4,0,0.2,1);transition-duration:150ms",
+    "transition-colors": "transition-property:color,background-color,border-color,text-decoration-color,fill,stroke;"
+                         "transition-timing-function:cubic-bezier(0.4,0,0.2,1);transition-duration:150ms",
+    "transition-transform": "transition-property:transform;transition-timing-function:cubic-bezier(0.4,0,0.2,1);transition-duration:150ms",
+    "ease-in": "transition-timing-function:cubic-bezier(0.4,0,1,1)",
+    "ease-out": "transition-timing-function:cubic-bezier(0,0,0.2,1)",
+    "ease-in-out": "transition-timing-function:cubic-bezier(0.4,0,0.2,1)",
+}
+
+_SIDES = {"t": ("top",), "r": ("right",), "b": ("bottom",), "l": ("left",),
+          "x": ("left", "right"), "y": ("top", "bottom"), "": ("top", "right", "bottom", "left")}
+_CORNERS = {"t": ("top-left", "top-right"), "r": ("top-right", "bottom-right"),
+            "b": ("bottom-right", "bottom-left"), "l": ("top-left", "bottom-left"), "": None}
+_GRADIENT_DIRECTIONS = {"t": "top", "tr": "top right", "r": "right", "br": "bottom right",
+                        "b": "bottom", "bl": "bottom left", "l": "left", "tl": "top left"}
+
+
+# --- Value resolution -------------------------------------------------------
+
+def _arbitrary(value: str) -> Optional[str]:
+    if value.startswith("[") and value.endswith("]") and len(value) > 2:
+        return value[1:-1].replace("_", " ")
+    return None
+
+
+def _spacing(value: str, negative: bool = False) -> Optional[str]:
+    resolved = SPACING.get(value) or _arbitrary(value)
+    if resolved is None:
+        return None
+    if negative:
+        return f"calc({resolved} * -1)" if value.startswith("[") else f"-{resolved}"
+    return resolved
+
+
+def _size(value: str, axis: str) -> Optional[str]:
+    keywords = {"full": "100%", "auto": "auto", "min": "min-content", "max": "max-content",
+                "fit": "fit-content", "screen": "100vw" if axis == "w" else "100vh"}
+    return keywords.get(value) or FRACTIONS.get(value) or _spacing(value)
+
+
+def _margin(value: str, negative: bool) -> Optional[str]:
+    return "auto" if value == "auto" and not negative else _spacing(value, negative)
+
+
+def _color(value: str) -> Optional[str]:
+    base, _, alpha = value.partition("/")
+    if base in COLOR_KEYWORDS:
+        return None if alpha else COLOR_KEYWORDS[base]
+    color = COLORS.get(base) or _arbitrary(base)
+    if color is None or not color.startswith(("#", "rgb", "hsl")):
+        return None
+    if not alpha:
+        return color
+    hex_value = color
+    if not re.fullmatch(r"#[0-9a-fA-F]{6}", hex_value):
+        return None
+    opacity = f"{int(alpha) / 100:g}" if alpha in OPACITY_STEPS else _arbitrary(alpha)
+    if opacity is None:
+        return None
+    r, g, b = (int(hex_value[i:i + 2], 16) for i in (1, 3, 5))
+    return f"rgb({r} {g} {b} / {opacity})"
+
+
+# --- Utilities --------------------------------------------------------------
+# Each rule maps the match of its pattern to declarations, or to
+# (declarations, selector suffix). Rules are listed in cascade order, so a
+# later rule (px-6) overrides an earlier one (p-4) like in Tailwind.
+
+Declarations = Optional[str | tuple[str, str]]
+
+
+def _sides_rule(prop: str, resolve: Callable[[str, bool], Optional[str]]):
+    def rule(m: re.Match, negative: bool) -> Declarations:
+        value = resolve(m["value"], negative)
+        if value is None:
+            return None
+        if not m["side"]:
+            return f"{prop}:{value}"
+        return ";".join(f"{prop}-{side}:{value}" for side in _SIDES[m["side"]])
+    return rule
+
+
+def _inset(m: re.Match, negative: bool) -> Declarations:
+    value = _size(m["value"], "w") if not negative else _spacing(m["value"], True)
+    if value is None:
+        return None
+    props = {"inset": ("top", "right", "bottom", "left"), "inset-x": ("left", "right"),
+             "inset-y": ("top", "bottom")}.get(m["prop"], (m["prop"],))
+    return ";".join(f"{prop}:{value}" for prop in props)
+
+
+def _dimension(m: re.Match, negative: bool) -> Declarations:
+    prop = {"w": "width", "h": "height", "min-w": "min-width", "min-h": "min-height", "max-h": "max-height"}[m["prop"]]
+    value = _size(m["value"], m["prop"][-1])
+    if m["prop"] == "min-h" and m["value"] == "screen":
+        value = "100vh"
+    return f"{prop}:{value}" if value else None
+
+
+def _max_width(m: re.Match, negative: bool) -> Declarations:
+    value = MAX_WIDTHS.get(m["value"]) or _arbitrary(m["value"])
+    return f"max-width:{value}" if value else None
+
+
+def _grid(m: re.Match, negative: bool) -> Declarations:
+    if m["kind"] == "grid-cols":
+        return f"grid-template-columns:repeat({m['n']},minmax(0,1fr))"
+    if m["kind"] == "grid-rows":
+        return f"grid-template-rows:repeat({m['n']},minmax(0,1fr))"
+    return f"grid-column:span {m['n']} / span {m['n']}"
+
+
+def _gap(m: re.Match, negative: bool) -> Declarations:
+    value = _spacing(m["value"])
+    if value is None:
+        return None
+    prop = {"": "gap", "-x": "column-gap", "-y": "row-gap"}[m["axis"] or ""]
+    return f"{prop}:{value}"
+
+
+def _space_between(m: re.Match, negative: bool) -> Declarations:
+    value = _spacing(m["value"], negative)
+    if value is None:
+        return None
+    prop = "margin-left" if m["axis"] == "x" else "margin-top"
+    return f"{prop}:{value}", _SPACE_BETWEEN
+
+
+def _rounded(m: re.Match, negative: bool) -> Declarations:
+    value = BORDER_RADIUS.get(m["size"] or "")
+    if value is None:
+        return None
+    corners = _CORNERS[m["side"] or ""]
+    if corners is None:
+        return f"border-radius:{value}"
+    return ";".join(f"border-{corner}-radius:{value}" for corner in corners)
+
+
+def _border_width(m: re.Match, negative: bool) -> Declarations:
+    width = f"{m['width']}px" if m["width"] else "1px"
+    sides = _SIDES[m["side"] or ""]
+    if len(sides) == 4:
+        return f"border-width:{width}"
+    return ";".join(f"border-{side}-width:{width}" for side in sides)
+
+
+def _color_rule(prop: str):
+    def rule(m: re.Match, negative: bool) -> Declarations:
+        value = _color(m["value"])
+        return f"{prop}:{value}" if value else None
+    return rule
+
+
+def _gradient(m: re.Match, negative: bool) -> Declarations:
+    return f"background-image:linear-gradient(to {_GRADIENT_DIRECTIONS[m['dir']]},var(--tw-gradient-stops))"
+
+
+def _gradient_stop(m: re.Match, negative: bool) -> Declarations:
+    value = _color(m["value"])
+    if value is None:
+        return None
+    if m["stop"] == "from":
+        return (f"--tw-gradient-from:{value};--tw-gradient-to:transparent;"
+                "--tw-gradient-stops:var(--tw-gradient-from),var(--tw-gradient-to)")
+    if m["stop"] == "via":
+        return (f"--tw-gradient-to:transparent;"
+                f"--tw-gradient-stops:var(--tw-gradient-from),{value},var(--tw-gradient-to)")
+    return f"--tw-gradient-to:{value}"
+
+
+def _font(m: re.Match, negative: bool) -> Declarations:
+    if m["value"] in FONT_FAMILIES:
+        return f"font-family:{FONT_FAMILIES[m['value']]}"
+    if m["value"] in FONT_WEIGHTS:
+        return f"font-weight:{FONT_WEIGHTS[m['value']]}"
+    return None
+
+
+def _font_size(m: re.Match, negative: bool) -> Declarations:
+    size = FONT_SIZES.get(m["value"])
+    return f"font-size:{size[0]};line-height:{size[1]}" if size else None
+
+
+def _leading(m: re.Match, negative: bool) -> Declarations:
+    value = LINE_HEIGHTS.get(m["value"]) or _arbitrary(m["value"])
+    return f"line-height:{value}" if value else None
+
+
+def _tracking(m: re.Match, negative: bool) -> Declarations:
+    value = LETTER_SPACING.get(m["value"])
+    return f"letter-spacing:{value}" if value else None
+
+
+def _opacity(m: re.Match, negative: bool) -> Declarations:
+    return f"opacity:{int(m['value']) / 100:g}" if m["value"] in OPACITY_STEPS else None
+
+
+def _shadow(m: re.Match, negative: bool) -> Declarations:
+    value = BOX_SHADOWS.get(m["size"] or "")
+    return f"box-shadow:{value}" if value else None
+
+
+def _transform(m: re.Match, negative: bool) -> Declarations:
+    if m["kind"] == "scale":
+        return f"scale:{int(m['value']) / 100:g}"
+    value = _spacing(m["value"], negative) or FRACTIONS.get(m["value"])
+    if value is None:
+        return None
+    if negative and m["value"] in FRACTIONS:
+        value = f"-{value}"
+    axis = m["kind"][-1]
+    return (f"--tw-translate-{axis}:{value};"
+            "translate:var(--tw-translate-x,0) var(--tw-translate-y,0)")
+
+
+def _z_index(m: re.Match, negative: bool) -> Declarations:
+    return f"z-index:{m['value']}"
+
+
+def _duration(m: re.Match, negative: bool) -> Declarations:
+    return f"transition-duration:{m['value']}ms"
+
+
+def _static(table: dict[str, str]):
+    def rule(m: re.Match, negative: bool) -> Declarations:
+        return table.get(m[0])
+    return rule
+
+
+_VALUE = r"(?P<value>\[[^\]]+\]|[\w./-]+)"
+_RULES: list[tuple[re.Pattern, Callable[[re.Match, bool], Declarations], bool]] = [
+    # (pattern, handler, allows a leading "-")
+    (re.compile(r"[a-z-]+"), _static(_STATIC), False),
+    (re.compile(rf"(?P<prop>inset-x|inset-y|inset|top|right|bottom|left)-{_VALUE}"), _inset, True),
+    (re.compile(r"z-(?P<value>0|10|20|30|40|50)"), _z_index, False),
+    (re.compile(r"(?P<kind>col-span)-(?P<n>\d+)"), _grid, False),
+    (re.compile(rf"m(?P<side>)-{_VALUE}"), _sides_rule("margin", _margin), True),
+    (re.compile(rf"m(?P<side>[xy])-{_VALUE}"), _sides_rule("margin", _margin), True),
+    (re.compile(rf"m(?P<side>[trbl])-{_VALUE}"), _sides_rule("margin", _margin), True),
+    (re.compile(rf"(?P<prop>h|min-h|max-h)-{_VALUE}"), _dimension, False),
+    (re.compile(rf"(?P<prop>w|min-w)-{_VALUE}"), _dimension, False),
+    (re.compile(rf"max-w-{_VALUE}"), _max_width, False),
+    (re.compile(rf"(?P<kind>translate-x|translate-y)-{_VALUE}"), _transform, True),
+    (re.compile(r"(?P<kind>scale)-(?P<value>0|50|75|90|95|100|105|110|125|150)"), _transform, False),
+    (re.compile(r"(?P<kind>grid-cols|grid-rows)-(?P<n>\d+)"), _grid, False),
+    (re.compile(rf"gap(?P<axis>-[xy])?-{_VALUE}"), _gap, False),
+    (re.compile(rf"space-(?P<axis>[xy])-{_VALUE}"), _space_between, True),
+    (re.compile(r"rounded(?:-(?P<side>[trbl]))?(?:-(?P<size>none|sm|md|lg|xl|2xl|3xl|full))?"), _rounded, False),
+    (re.compile(r"border(?:-(?P<side>[trblxy]))?(?:-(?P<width>0|2|4|8))?"), _border_width, False),
+    (re.compile(rf"border-{_VALUE}"), _color_rule("border-color"), False),
+    (re.compile(rf"bg-{_VALUE}"), _color_rule("background-color"), False),
+    (re.compile(r"bg-gradient-to-(?P<dir>tr|tl|br|bl|t|r|b|l)"), _gradient, False),
+    (re.compile(rf"(?P<stop>from|via|to)-{_VALUE}"), _gradient_stop, False),
+    (re.compile(rf"p(?P<side>)-{_VALUE}"), _sides_rule("padding", lambda v, n: _spacing(v)), False),
+    (re.compile(rf"p(?P<side>[xy])-{_VALUE}"), _sides_rule("padding", lambda v, n: _spacing(v)), False),
+    (re.compile(rf"p(?P<side>[trbl])-{_VALUE}"), _sides_rule("padding", lambda v, n: _spacing(v)), False),
+    (re.compile(r"font-(?P<value>\w+)"), _font, False),
+    (re.compile(r"text-(?P<value>xs|sm|base|lg|[2-9]?xl)"), _font_size, False),
+    (re.compile(r"[a-z-]+"), _static(_STATIC_TYPE), False),
+    (re.compile(rf"leading-{_VALUE}"), _leading, False),
+    (re.compile(r"tracking-(?P<value>\w+)"), _tracking, False),
+    (re.compile(rf"text-{_VALUE}"), _color_rule("color"), False),
+    (re.compile(r"[a-z-]+"), _static(_STATIC_DECORATION), False),
+    (re.compile(r"opacity-(?P<value>\d+)"), _opacity, False),
+    (re.compile(r"shadow(?:-(?P<size>sm|md|lg|xl|2xl|inner|none))?"), _shadow, False),
+    (re.compile(r"duration-(?P<value>75|100|150|200|300|500|700|1000)"), _duration, False),
+]
+
+
+def _split_variants(class_name: str) -> list[str]:
+    """Splits "md:hover:bg-[#fff]" on colons outside square brackets."""
+    parts, depth, current = [], 0, ""
+    for char in class_name:
+        depth += char == "["
+        depth -= char == "]"
+        if char == ":" and depth == 0:
+            parts.append(current)
+            current = ""
+        else:
+            current += char
+    parts.append(current)
+    return parts
+
+
+def _escape(class_name: str) -> str:
+    escaped = re.sub(r"([^a-zA-Z0-9_-])", r"\\\1", class_name)
+    if escaped[:1].isdigit():
+        escaped = f"\\3{escaped[0]} {escaped[1:]}"
+    return escaped
+
+
+_STATIC_ORDER = {name: i for i, name in enumerate([*_STATIC, *_STATIC_TYPE, *_STATIC_DECORATION])}
+
+
+def _resolve(utility: str) -> Optional[tuple[tuple[int, int], str, str]]:
+    """Returns (cascade order, declarations, selector suffix) for a bare utility."""
+    negative = utility.startswith("-")
+    name = utility[1:] if negative else utility
+    for order, (pattern, handler, allows_negative) in enumerate(_RULES):
+        if negative and not allows_negative:
+            continue
+        match = pattern.fullmatch(name)
+        if match is None:
+            continue
+        declarations = handler(match, negative)
+        if declarations is None:
+            continue
+        position = (order, _STATIC_ORDER.get(name, 0))
+        if isinstance(declarations, tuple):
+            return position, declarations[0], declarations[1]
+        return position, declarations, ""
+    return None
+
+
+def compile_classes(class_names: set[str]) -> tuple[str, list[str]]:
+    """
+    Compiles utility classes to a minified stylesheet.
+
+    Returns:
+        (css, unresolved class names)
+    """
+    rules: dict[str, list[tuple[tuple[int, int], str, str]]] = {"": [], **{bp: [] for bp in BREAKPOINTS}}
+    unresolved: list[str] = []
+
+    for class_name in sorted(class_names):
+        if class_name in _MARKER_CLASSES:
+            continue
+        *variants, utility = _split_variants(class_name)
+        resolved = _resolve(utility)
+        breakpoints = [v for v in variants if v in BREAKPOINTS]
+        states = [v for v in variants if v not in BREAKPOINTS]
+        if (resolved is None or len(breakpoints) > 1
+                or any(s not in STATE_VARIANTS and s != "group-hover" for s in states)):
+            unresolved.append(class_name)
+            continue
+
+        order, declarations, suffix = resolved
+        selector = "." + _escape(class_name) + "".join(STATE_VARIANTS.get(s, "") for s in states) + suffix
+        if "group-hover" in states:
+            selector = f".group:hover {selector}"
+        rules[breakpoints[0] if breakpoints else ""].append((order, selector, declarations))
+
+    blocks = [PREFLIGHT]
+    for breakpoint, entries in rules.items():
+        if not entries:
+            continue
+        body = "\n".join(f"{selector}{{{declarations}}}" for _, selector, declarations in sorted(entries))
+        blocks.append(f"@media (min-width:{BREAKPOINTS[breakpoint]}){{\n{body}\n}}" if breakpoint else body)
+    return "\n".join(blocks), unresolved
+
+
+def extract_classes(html: str) -> set[str]:
+    """Returns every class name used in the document."""
+    soup = BeautifulSoup(html, "html.parser")
+    return {name for tag in soup.find_all(class_=True) for name in tag.get("class", [])}
+
+
+def compile_page(html: str) -> tuple[str, PageWeight]:
+    """
+    Replaces the Tailwind CDN script in ``html`` with an inlined, minimal stylesheet.
+    The CDN script and ``tailwind.config`` are kept if any class is unresolved.
+    A stylesheet inlined by an earlier compilation is replaced, so edited pages
+    can be recompiled.
+
+    Returns:
+        (compiled html, page weight report)
+    """
+    classes = extract_classes(html)
+    css, unresolved = compile_classes(classes)
+
+    remove_cdn = bool(_CDN_SCRIPT.search(html)) and not unresolved
+    body = _COMPILED_STYLE.sub("", html)
+    if remove_cdn:
+        body = _CONFIG_SCRIPT.sub("", _CDN_SCRIPT.sub("", body))
+    style = f"<style {COMPILED_STYLE_ATTRIBUTE}>\n{css}\n</style>\n"
+    head_close = _HEAD_CLOSE.search(body)
+    if head_close:
+        compiled = body[:head_close.start()] + style + body[head_close.start():]
+    else:
+        compiled = style + body
+
+    encoded = compiled.encode()
+    return compiled, PageWeight(
+        source_bytes=len(html.encode()),
+        html_bytes=len(encoded),
+        css_bytes=len(css.encode()),
+        gzip_bytes=len(gzip.compress(encoded)),
+        class_count=len(classes),
+        unresolved_classes=sorted(unresolved),
+        cdn_removed=remove_cdn,
+    )
@@ -1,13 +1,86 @@
 import json
+from typing import Any, List, Optional
 
 from langchain_core.messages import HumanMessage
 from langchain_core.tools import tool
-from langchain_openai import ChatOpenAI
 
 from src.core.config import settings
+from src.core.llm_routing import get_llm_for_task
+from src.schemas.google_places import NearbyBusiness
+from src.services.prompt_compaction import compact_json, compact_prompt, compact_text
 from src.tools.google_places_api import search_nearby_businesses
 from src.tools.web_scraper import scrape_website_content
 
+# Competitors compared in one report
+MAX_GAP_COMPETITORS = 3
+
+
+def competitor_profile(business: NearbyBusiness, farm_offerings: str, website_text: Optional[str] = None) -> dict:
+    """
+    Condenses a Places listing (and optionally text about its website) into
+    the profile the gap analysis prompt compares.
+    """
+    profile: dict[str, Any] = {
+        "name": business.name,
+        "vicinity": business.address,
+        "rating": business.rating,
+        "website": business.website,
+    }
+    if website_text:
+        # Keep the sentences most relevant to what the target farm sells
+        profile["website_snippet"] = compact_text(
+            website_text, settings.PROMPT_SCRAPED_TEXT_TOKENS, query=farm_offerings,
+        )
+    return profile
+
+
+async def generate_gap_report(farm_name: str, farm_offerings: str, competitor_profiles: List[dict]) -> dict:
+    """
+    Analyzes competitor profiles for market gaps and positioning, in one LLM call.
+
+    Returns:
+        {"market_gaps": [...], "positioning_recommendations": [...]}
+
+    Raises:
+        ValueError: If the model does not return valid JSON.
+    """
+    llm = get_llm_for_task("competitor_gap")
+
+    prompt = compact_prompt(f"""
+    You are a farm marketing strategist. You are advising "{farm_name}", which sells: "{farm_offerings}".
+    
+    Here is data on {len(competitor_profiles)} of their closest local competitors:
+    {compact_json(competitor_profiles)}
+    
+    Analyze this competitor data and provide a concise "Competitive Advantage Report" for {farm_name}. 
+    Identify gaps in the local market (e.g., poor competitor websites, low reviews, lack of specific offerings) 
+    and suggest 3 clear positioning statements {farm_name} can use to stand out.
+    
+    Return the result as a raw JSON object (without markdown wrapping) with exactly two keys:
+    "market_gaps": array of strings (e.g., "Competitor X lacks mobile website")
+    "positioning_recommendations": array of strings
+    """)
+
+    response = await llm.ainvoke([HumanMessage(content=prompt)])
+
+    # Clean markdown if generated
+    text = str(response.content).strip()
+    if text.startswith("```json"):
+        text = text[7:]
+        if text.endswith("```"):
+            text = text[:-3]
+
+    return json.loads(text.strip())
+
+
+def gap_report_result(farm_name: str, competitor_profiles: List[dict], report: dict) -> str:
+    return json.dumps({
+        "target_farm": farm_name,
+        "competitors_analyzed": len(competitor_profiles),
+        "report": report,
+        "status": "success"
+    }, indent=2)
+
 
 @tool
 async def analyze_competitor_gap(latitude: float, longitude: float, farm_name: str, farm_offerings: str) -> str:
@@ -29,90 +102,38 @@ async def analyze_competitor_gap(latitude: float, longitude: float, farm_name: s
 
     try:
         # 1. Broadly search for similar local businesses (competitors)
-        nearby_raw = await search_nearby_businesses.ainvoke({
-            "latitude": latitude,
-            "longitude": longitude,
-            "keyword": "farm fresh produce CSA",
-            "radius_meters": 25000  # ~15 miles
+        nearby = await search_nearby_businesses.ainvoke({
+            "location": f"{latitude},{longitude}",
+            "query": "farm fresh produce CSA",
+            "radius_meters": 25000,  # ~15 miles
+            "max_results": 10,
         })
 
-        try:
-            competitors = json.loads(nearby_raw)
-        except json.JSONDecodeError:
-            return json.dumps({"error": "Failed to parse Google Places response.", "status": "error"})
-
-        if not competitors or not isinstance(competitors, list):
+        if not nearby.businesses:
             return json.dumps({"status": "success", "message": "No direct local competitors found within 15 miles."})
 
         # Filter out self
-        targets = [c for c in competitors if farm_name.lower() not in c.get('name', '').lower()][:3]
+        targets = [b for b in nearby.businesses if farm_name.lower() not in b.name.lower()][:MAX_GAP_COMPETITORS]
 
         if not targets:
             return json.dumps({"status": "success", "message": "No other local competitors found."})
 
         # 2. Gather info on those competitors
         competitor_profiles = []
-        for c in targets:
-            profile = {
-                "name": c.get("name"),
-                "vicinity": c.get("vicinity"),
-                "rating": c.get("rating"),
-                "num_reviews": c.get("user_ratings_total"),
-                "website": c.get("website")
-            }
-
+        for business in targets:
+            website_text = None
             # Scrape content if they have a website
-            if profile["website"] and "http" in profile["website"]:
-                scraped_raw = await scrape_website_content.ainvoke({"url": profile["website"]})
+            if business.website and "http" in business.website:
+                scraped_raw = await scrape_website_content.ainvoke({"url": business.website})
                 try:
-                    scraped_data = json.loads(scraped_raw)
-                    if "extracted_text" in scraped_data:
-                        # Just grab a snippet
-                        profile["website_snippet"] = scraped_data["extracted_text"][:500]
-                except:
+                    website_text = json.loads(scraped_raw).get("extracted_text")
+                except (json.JSONDecodeError, AttributeError):
                     pass
-            competitor_profiles.append(profile)
+            competitor_profiles.append(competitor_profile(business, farm_offerings, website_text))
 
         # 3. Analyze differences to find the "gap"
-        llm = ChatOpenAI(
-            model=settings.OPENROUTER_DEFAULT_MODEL,
-            temperature=0.2,
-            openai_api_key=settings.OPENROUTER_API_KEY,
-            base_url=settings.OPENROUTER_BASE_URL
-        )
-
-        prompt = f"""
-        You are a farm marketing strategist. You are advising "{farm_name}", which sells: "{farm_offerings}".
-        
-        Here is data on {len(competitor_profiles)} of their closest local competitors:
-        {json.dumps(competitor_profiles, indent=2)}
-        
-        Analyze this competitor data and provide a concise "Competitive Advantage Report" for {farm_name}. 
-        Identify gaps in the local market (e.g., poor competitor websites, low reviews, lack of specific offerings) 
-        and suggest 3 clear positioning statements {farm_name} can use to stand out.
-        
-        Return the result as a raw JSON object (without markdown wrapping) with exactly two keys:
-        "market_gaps": array of strings (e.g., "Competitor X lacks mobile website")
-        "positioning_recommendations": array of strings
-        """
-
-        response = await llm.ainvoke([HumanMessage(content=prompt)])
-
-        # Clean markdown if generated
-        text = str(response.content).strip()
-        if text.startswith("```json"):
-            text = text[7:]
-            if text.endswith("```"):
-                text = text[:-3]
-
-        report = json.loads(text.strip())
-
-        return json.dumps({
-            "target_farm": farm_name,
-            "competitors_analyzed": len(competitor_profiles),
-            "report": report,
-            "status": "success"
-        }, indent=2)
+        report = await generate_gap_report(farm_name, farm_offerings, competitor_profiles)
+        return gap_report_result(farm_name, competitor_profiles, report)
 
     except Exception as e:
         return json.dumps({
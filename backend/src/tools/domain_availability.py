@@ -1,22 +1,45 @@
 import json
-import socket
+import logging
+from typing import Dict, List, Optional
 
 from langchain_core.messages import HumanMessage
 from langchain_core.tools import tool
-from langchain_openai import ChatOpenAI
 
 from src.core.config import settings
+from src.core.llm_routing import get_llm_for_task
+from src.services.domain_candidates import generate_domain_candidates
+from src.services.domain_dns import domain_resolver
 
+logger = logging.getLogger(__name__)
 
-def _domain_resolves(domain: str) -> bool:
-    """Helper to check if a domain has any DNS A/AAAA records resolving."""
-    try:
-        # If it resolves, it's taken or parked.
-        socket.gethostbyname(domain)
-        return True
-    except socket.gaierror:
-        # If we get a Name or service not known, it's likely available
-        return False
+TARGET_AVAILABLE = 3
+MAX_SUGGESTIONS = 5
+
+
+def _status(registered: Optional[bool]) -> str:
+    if registered is None:
+        return "unknown"  # DNS lookup timed out or failed
+    return "taken" if registered else "available"
+
+
+async def _llm_candidates(farm_name: str, farm_description: str) -> List[str]:
+    """Asks the LLM to brainstorm 5 creative .com names."""
+    llm = get_llm_for_task("domain_names")
+
+    prompt = f"""
+    You are an expert branding consultant. A farm named "{farm_name}" needs a new website. 
+    They specialize in: "{farm_description}".
+    
+    Please suggest exact 5 creative, short, and memorable .com domain names for them. 
+    Do not include any prefixes like https:// or www., just the domain (e.g., sunnyfarms.com).
+    Return ONLY a comma-separated list of the 5 domains, nothing else.
+    """
+
+    response = await llm.ainvoke([HumanMessage(content=prompt)])
+    raw_domains = str(response.content).strip().split(",")
+
+    # Clean up output
+    return [d.strip().lower() for d in raw_domains if ".com" in d][:5]
 
 
 @tool
@@ -24,8 +47,10 @@ async def check_domain_availability(farm_name: str, farm_description: str) -> st
     """
     Proactively proposes 3 available, catchy '.com' domain names based on the 
     farm's name and a brief description of what they sell. 
-    It generates candidates using an LLM and then verifies basic availability 
-    via DNS resolution checks.
+    Candidates are generated locally from the farm name, product keywords and
+    common prefixes/suffixes, ranked by length and pronounceability, and
+    batch-checked via concurrent, cached DNS lookups. An LLM is only asked
+    for more creative names if fewer than 3 local candidates are available.
     
     Args:
         farm_name (str): The name of the farm.
@@ -34,52 +59,41 @@ async def check_domain_availability(farm_name: str, farm_description: str) -> st
     Returns:
         str: A JSON string containing suggested domains and their availability status.
     """
-    if not settings.OPENROUTER_API_KEY:
-        return json.dumps({"error": "No OPENROUTER_API_KEY available for domain generation.", "status": "error"})
-
-    llm = ChatOpenAI(
-        model=settings.OPENROUTER_DEFAULT_MODEL,
-        temperature=0.7,
-        openai_api_key=settings.OPENROUTER_API_KEY,
-        base_url=settings.OPENROUTER_BASE_URL
-    )
-
-    prompt = f"""
-    You are an expert branding consultant. A farm named "{farm_name}" needs a new website. 
-    They specialize in: "{farm_description}".
-    
-    Please suggest exact 5 creative, short, and memorable .com domain names for them. 
-    Do not include any prefixes like https:// or www., just the domain (e.g., sunnyfarms.com).
-    Return ONLY a comma-separated list of the 5 domains, nothing else.
-    """
-
     try:
-        response = await llm.ainvoke([HumanMessage(content=prompt)])
-        raw_domains = str(response.content).strip().split(",")
+        # 1. Local combinatorial pass, checked all at once
+        local_domains = generate_domain_candidates(farm_name, farm_description, settings.DOMAIN_LOCAL_CANDIDATES)
+        registered = await domain_resolver.check_many(local_domains)
+        sources: Dict[str, str] = {domain: "local" for domain in local_domains}
+        checked = list(local_domains)
 
-        # Clean up output
-        candidate_domains = [d.strip().lower() for d in raw_domains if ".com" in d][:5]
+        available = [d for d in local_domains if registered.get(d) is False]
 
-        results = []
-        available_count = 0
+        # 2. LLM brainstorm only when the local pass comes up short
+        if len(available) < TARGET_AVAILABLE:
+            if settings.OPENROUTER_API_KEY:
+                llm_domains = [d for d in await _llm_candidates(farm_name, farm_description) if d not in sources]
+                registered.update(await domain_resolver.check_many(llm_domains))
+                sources.update({domain: "llm" for domain in llm_domains})
+                available.extend(d for d in llm_domains if registered.get(d) is False)
+                # LLM names are the more relevant fallback suggestions
+                checked = llm_domains + checked
+            else:
+                logger.info("No OPENROUTER_API_KEY; returning local domain candidates only.")
 
-        for domain in candidate_domains:
-            # Check if domain resolves
-            is_taken = _domain_resolves(domain)
-            results.append({
-                "domain": domain,
-                "status": "taken" if is_taken else "available"
-            })
-            if not is_taken:
-                available_count += 1
+        # Available names first; pad with the best unavailable ones for context
+        suggested = available[:TARGET_AVAILABLE]
+        if len(suggested) < TARGET_AVAILABLE:
+            suggested += [d for d in checked if d not in suggested][:MAX_SUGGESTIONS - len(suggested)]
 
-            # Stop early if we found 3 available domains
-            if available_count >= 3:
-                break
+        results = [
+            {"domain": domain, "status": _status(registered.get(domain)), "source": sources[domain]}
+            for domain in suggested
+        ]
 
         return json.dumps({
             "farm_name": farm_name,
             "suggestions": results,
+            "candidates_checked": len(sources),
             "status": "success"
         }, indent=2)
 
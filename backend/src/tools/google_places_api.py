@@ -13,7 +13,8 @@ Architecture rules enforced
 - Fully async  (httpx.AsyncClient + async def)
 - API key from Pydantic Settings only – never os.environ
 - Lives in backend/src/tools/ per AGENTS.md
-- Timeout + exponential-backoff retry on every outbound request
+- Timeout + exponential-backoff retry on every outbound request; the timeout
+  is capped by the agent run's time budget (src/core/deadline.py)
 """
 
 from __future__ import annotations
@@ -25,6 +26,7 @@ import httpx
 from langchain_core.tools import tool
 
 from src.core.config import settings
+from src.core.deadline import budget_timeout
 from src.schemas.google_places import NearbyBusiness, PlacesSearchResult
 
 logger = logging.getLogger(__name__)
@@ -115,7 +117,7 @@ async def _geocode_address(
         "GET",
         settings.GOOGLE_MAPS_GEOCODING_URL,
         params={"address": address, "key": settings.GOOGLE_MAPS_API_KEY},
-        timeout=REQUEST_TIMEOUT,
+        timeout=budget_timeout(REQUEST_TIMEOUT),
     )
     data: dict = response.json()
 
@@ -208,7 +210,7 @@ async def _run_text_search(
         settings.GOOGLE_PLACES_TEXT_SEARCH_URL,
         json=payload,
         headers=headers,
-        timeout=REQUEST_TIMEOUT,
+        timeout=budget_timeout(REQUEST_TIMEOUT),
     )
 
     places: list[dict] = response.json().get("places", [])
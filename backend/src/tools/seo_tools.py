@@ -2,9 +2,9 @@ import json
 
 from langchain_core.messages import HumanMessage
 from langchain_core.tools import tool
-from langchain_openai import ChatOpenAI
 
 from src.core.config import settings
+from src.core.llm_routing import get_llm_for_task
 
 
 @tool
@@ -25,12 +25,7 @@ async def fetch_local_seo_keywords(zip_code: str, farm_type: str) -> str:
     if not settings.OPENROUTER_API_KEY:
         return json.dumps({"error": "No OPENROUTER_API_KEY available for SEO generation.", "status": "error"})
 
-    llm = ChatOpenAI(
-        model=settings.OPENROUTER_DEFAULT_MODEL,
-        temperature=0.4,
-        openai_api_key=settings.OPENROUTER_API_KEY,
-        base_url=settings.OPENROUTER_BASE_URL
-    )
+    llm = get_llm_for_task("seo_keywords")
 
     prompt = f"""
     You are an expert SEO data platform. Provide a list of the top 5 highly localized 
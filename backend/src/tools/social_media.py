@@ -3,6 +3,8 @@ import json
 from langchain_core.tools import tool
 from playwright.async_api import async_playwright
 
+from src.core.deadline import budget_timeout
+
 
 @tool
 async def scrape_social_media(url: str) -> str:
@@ -24,7 +26,7 @@ async def scrape_social_media(url: str) -> str:
             page = await browser.new_page()
 
             # Navigate to the social media profile
-            await page.goto(url, wait_until="domcontentloaded", timeout=15000)
+            await page.goto(url, wait_until="domcontentloaded", timeout=budget_timeout(15) * 1000)
 
             # Extract basic text content
             text = await page.evaluate("document.body.innerText")
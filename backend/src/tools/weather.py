@@ -66,9 +66,10 @@ async def fetch_agricultural_weather(
                                "units": "imperial"}  # 3-hour intervals, 8 per day
             forecast_data = await _fetch_weather(c, "forecast", forecast_params)
 
+            # All 3-hourly entries are returned; consumers roll them up per day
+            # (see src.services.prompt_compaction.rollup_weather)
             forecasts = []
             for item in forecast_data.get("list", []):
-                # Basic parsing, might need more specific aggregation for daily summaries
                 forecasts.append(WeatherForecast(
                     temperature_min=item["main"]["temp_min"],
                     temperature_max=item["main"]["temp_max"],
@@ -80,7 +81,7 @@ async def fetch_agricultural_weather(
 
             return WeatherResult(
                 current_temp=current_data["main"]["temp"],
-                forecast=forecasts[:days],  # Simplified: usually would aggregate daily
+                forecast=forecasts,
                 location=current_data["name"],
                 zip_code=zip_code
             )
@@ -4,10 +4,11 @@ import json
 from bs4 import BeautifulSoup
 from langchain_core.messages import HumanMessage
 from langchain_core.tools import tool
-from langchain_openai import ChatOpenAI
 from playwright.async_api import async_playwright
 
 from src.core.config import settings
+from src.core.deadline import BudgetExhausted, budget_exhausted, budget_timeout
+from src.core.llm_routing import get_llm_for_task
 
 
 @tool
@@ -28,7 +29,7 @@ async def scrape_website_content(url: str) -> str:
             page = await browser.new_page()
 
             # Navigate to the URL and wait for it to load
-            await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+            await page.goto(url, wait_until="domcontentloaded", timeout=budget_timeout(30) * 1000)
 
             # Extract full HTML content
             html_content = await page.content()
@@ -80,6 +81,9 @@ async def analyze_website_visuals(url: str) -> str:
         
     Returns:
         str: A comprehensive visual critique and a generated prompt for the Website Builder agent.
+
+    Raises:
+        BudgetExhausted: If the run's time budget ran out before the analysis finished.
     """
     try:
         if not settings.OPENROUTER_API_KEY:
@@ -90,9 +94,11 @@ async def analyze_website_visuals(url: str) -> str:
             browser = await p.chromium.launch(headless=True)
             page = await browser.new_page()
 
-            # Navigate and capture a full page screenshot
-            await page.goto(url, wait_until="domcontentloaded", timeout=30000)
-            screenshot_bytes = await page.screenshot(full_page=True, type='jpeg', quality=70)
+            # Navigate and capture a full page screenshot, within the run's time budget
+            await page.goto(url, wait_until="domcontentloaded", timeout=budget_timeout(30) * 1000)
+            screenshot_bytes = await page.screenshot(
+                full_page=True, type='jpeg', quality=70, timeout=budget_timeout(30) * 1000
+            )
             await browser.close()
 
         if not screenshot_bytes:
@@ -102,12 +108,7 @@ async def analyze_website_visuals(url: str) -> str:
         base64_image = base64.b64encode(screenshot_bytes).decode('utf-8')
 
         # Use OpenRouter for multimodal analysis
-        llm = ChatOpenAI(
-            model=settings.OPENROUTER_DEFAULT_MODEL,
-            temperature=0.2,
-            openai_api_key=settings.OPENROUTER_API_KEY,
-            base_url=settings.OPENROUTER_BASE_URL
-        )
+        llm = get_llm_for_task("visual_analysis")
 
         prompt = f"""
         You are an expert web designer and developer analyzing an existing farm business website.
@@ -136,4 +137,7 @@ async def analyze_website_visuals(url: str) -> str:
         return str(response.content)
 
     except Exception as e:
+        # A Playwright timeout cut short by the budget is the budget running out
+        if isinstance(e, BudgetExhausted) or budget_exhausted():
+            raise BudgetExhausted(f"Run time budget exhausted while analyzing {url}") from e
         return f"Failed to visually analyze {url}: {str(e)}"
@@ -0,0 +1,39 @@
+"""
+Standalone agent job worker: ``python -m src.worker``.
+
+Runs JOB_WORKER_CONCURRENCY workers on the shared Postgres job queue until
+SIGINT/SIGTERM. Start as many processes, on as many hosts, as the queue
+needs; set JOB_WORKERS_IN_API=false to keep pipelines out of the API process.
+"""
+
+import asyncio
+import logging
+import signal
+
+from src.core.checkpointing import close_checkpointer, init_checkpointer
+from src.core.config import settings
+from src.core.llm import close_llm_clients, init_llm_clients
+from src.services.job_worker import JobWorkerPool
+
+
+async def main() -> None:
+    init_llm_clients()
+    await init_checkpointer()
+    pool = JobWorkerPool(settings.JOB_WORKER_CONCURRENCY)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    await pool.start()
+    try:
+        await stop.wait()
+    finally:
+        await pool.stop()
+        await close_checkpointer()
+        await close_llm_clients()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
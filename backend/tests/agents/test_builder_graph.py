@@ -0,0 +1,98 @@
+import json
+import pytest
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from src.agents.builder import build_builder_graph
+from src.core import llm_routing
+from src.core.llm_metrics import agent_run_config
+from src.core.llm_routing import LLMRoute, RoutedLLM
+from src.core.llm_scheduler import LLMPriority
+
+PERSONA = {
+    "farm_story_summary": "A family farm.",
+    "tagline": "Fresh from the creek.",
+    "target_audience": "Local families",
+    "tone_and_voice": "Warm",
+    "recommended_channels": ["Instagram"],
+}
+
+def _fake_llm(task):
+    if task == "persona":
+        return GenericFakeChatModel(messages=iter([AIMessage(content=json.dumps(PERSONA))]))
+    return GenericFakeChatModel(messages=iter([AIMessage(content="<!DOCTYPE html><html></html>")]))
+
+def _mock_dependencies(mocker):
+    mocker.patch("src.core.config.settings.BUILDER_LAYOUT_VARIANTS", 3)
+    mock_get_llm = mocker.patch("src.agents.builder.get_llm_for_task", side_effect=_fake_llm)
+    mock_domains = mocker.patch("src.agents.builder.check_domain_availability")
+    mock_domains.ainvoke = AsyncMock(return_value=json.dumps({"status": "success", "suggestions": [
+        {"domain": "oakcreek.com", "status": "available"},
+    ]}))
+    return mock_get_llm
+
+async def _run(website_mode, config=None):
+    return [
+        chunk async for chunk in build_builder_graph().astream({
+            "farm_id": "farm-1",
+            "farm_name": "Oak Creek",
+            "farm_story": "Fourth-generation farm.",
+            "inventory_data": "Eggs, honey",
+            "website_mode": website_mode,
+        }, config=config, stream_mode="updates")
+    ]
+
+@pytest.mark.asyncio
+async def test_builder_generates_layout_variants_in_parallel(mocker):
+    # Arrange
+    _mock_dependencies(mocker)
+
+    # Act
+    updates = await _run("llm")
+
+    # Assert: domains run alongside the persona, not after it
+    first_step = [node for update in updates[:3] for node in update]
+    assert {"generate_persona", "propose_domains"} <= set(first_step)
+
+    layouts = [layout for update in updates for layout in update.get("generate_website", {}).get("website_layouts", [])]
+    assert sorted(layout.variant for layout in layouts) == [0, 1, 2]
+    assert len({layout.style for layout in layouts}) == 3
+    assert all(layout.mode == "llm" for layout in layouts)
+
+@pytest.mark.asyncio
+async def test_template_mode_renders_pages_without_website_llm(mocker):
+    # Arrange
+    mock_get_llm = _mock_dependencies(mocker)
+
+    # Act
+    updates = await _run("template")
+
+    # Assert: only the persona call reaches the LLM
+    assert [call.args[0] for call in mock_get_llm.call_args_list] == ["persona"]
+    layouts = [layout for update in updates for layout in update.get("generate_website", {}).get("website_layouts", [])]
+    assert len(layouts) == 3
+    assert all(layout.mode == "template" for layout in layouts)
+    assert all("Fresh from the creek." in layout.html and "Honey" in layout.html for layout in layouts)
+
+@pytest.mark.asyncio
+async def test_website_llm_calls_keep_the_run_priority_and_farm(mocker):
+    # Arrange: routed models whose scheduler admissions are recorded
+    _mock_dependencies(mocker)
+    mocker.patch.object(llm_routing, "get_llm", side_effect=lambda model, temperature, cache: _fake_llm("website_generation"))
+    mocker.patch("src.agents.builder.get_llm_for_task", side_effect=lambda task: RoutedLLM(task, LLMRoute(hedge=False)))
+    admitted = []
+
+    @asynccontextmanager
+    async def slot(priority, farm_key):
+        admitted.append((priority, farm_key))
+        yield
+
+    mocker.patch.object(llm_routing.llm_scheduler, "slot", slot)
+    mocker.patch("src.agents.builder.generate_persona_node", AsyncMock(return_value={}))
+
+    # Act
+    await _run("llm", agent_run_config("builder", "run-1", LLMPriority.interactive, farm_id="f1"))
+
+    # Assert: the variant metadata is added to the run's, not swapped for it
+    assert admitted == [(LLMPriority.interactive, "f1")] * 3
@@ -0,0 +1,331 @@
+import asyncio
+import pytest
+import json
+import weakref
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.agents import discovery
+from langgraph.checkpoint.memory import InMemorySaver
+from src.agents.discovery import _parse_batch_scores, _score_competitors_batch
+from src.core.checkpointing import agent_checkpointer
+from src.core.config import settings
+from src.core.llm_metrics import agent_run_config
+from src.schemas.agent_discovery import DiscoveryArtifacts, places_key
+from src.schemas.google_places import NearbyBusiness, PlacesSearchResult
+from src.schemas.usda import CSAListing, CSASearchResult, FarmersMarketListing, FarmersMarketSearchResult
+from src.schemas.agent_discovery import DiscoverRequest
+from src.services.agent_runs import invoke_agent, stream_discovery
+
+def _response(content):
+    response = MagicMock()
+    response.content = content
+    return response
+
+def test_parse_batch_scores_salvages_valid_items():
+    # Second object is truncated mid-output, third has a non-numeric score
+    content = '[{"id": 0, "score": 72, "summary": "Dated"}, {"id": 1, "score": 4'
+    content_with_bad_item = '[{"id": 0, "score": 72, "summary": "Dated"}, {"id": 2, "score": "n/a"}]'
+
+    assert _parse_batch_scores(content) == {0: (72, "Dated")}
+    assert _parse_batch_scores(content_with_bad_item) == {0: (72, "Dated")}
+
+@pytest.mark.asyncio
+async def test_score_competitors_batch_falls_back_per_item():
+    # Arrange: batch response omits competitor 1, single-item fallback scores it
+    mock_llm = AsyncMock()
+    mock_llm.ainvoke.side_effect = [
+        _response(json.dumps([
+            {"id": 0, "score": 91, "summary": "Modern"},
+            {"id": 2, "score": 35, "summary": "Broken"},
+        ])),
+        _response(json.dumps({"score": 60, "summary": "Functional"})),
+    ]
+
+    # Act
+    results = await _score_competitors_batch(mock_llm, ["analysis a", "analysis b", "analysis c"])
+
+    # Assert
+    assert results == [(91, "Modern"), (60, "Functional"), (35, "Broken")]
+    assert mock_llm.ainvoke.call_count == 2
+
+def _tool(side_effect):
+    tool = MagicMock()
+    tool.ainvoke = AsyncMock(side_effect=side_effect)
+    return tool
+
+@pytest.mark.asyncio
+async def test_discovery_graph_runs_reports_alongside_competitor_pipeline():
+    # Arrange: the USDA search only returns once the SEO branch has finished
+    seo_done = asyncio.Event()
+
+    async def usda(_):
+        await asyncio.wait_for(seo_done.wait(), timeout=5)
+        return {}
+
+    async def seo(_):
+        seo_done.set()
+        return json.dumps({"keywords": ["local eggs"]})
+
+    with patch.object(discovery, "search_all_local_food", _tool(usda)), \
+            patch.object(discovery, "fetch_local_seo_keywords", _tool(seo)), \
+            patch.object(discovery, "search_nearby_businesses", _tool(RuntimeError("Places unavailable"))), \
+            patch.object(discovery, "get_llm_for_task", MagicMock()):
+        # Act
+        result = await discovery.build_discovery_graph().ainvoke({
+            "search_criteria": {"zip_code": "19103", "state": "PA", "farm_name": "Oak Creek", "farm_offerings": "Eggs"},
+        })
+
+    # Assert: a sequential graph would time out waiting for the SEO branch
+    assert result["seo_report"] == {"keywords": ["local eggs"]}
+    assert result["audited_competitors"] == []
+    assert result["errors"] == []
+
+@pytest.mark.asyncio
+async def test_discovery_graph_collects_errors_from_every_branch():
+    with patch.object(discovery, "fetch_local_seo_keywords", _tool(RuntimeError("quota exceeded"))), \
+            patch.object(discovery, "search_nearby_businesses", _tool(RuntimeError("Places unavailable"))), \
+            patch.object(discovery, "get_llm_for_task", MagicMock()):
+        result = await discovery.build_discovery_graph().ainvoke({
+            "search_criteria": {"zip_code": "", "state": "", "farm_name": "Oak Creek", "farm_offerings": "Eggs"},
+        })
+
+    assert sorted(result["errors"]) == [
+        "Missing zip_code or state in search_criteria",
+        "SEO generation failed: quota exceeded",
+    ]
+
+def _green_acres_fixtures():
+    listing = NearbyBusiness(
+        name="Green Acres CSA", address="1 Farm Rd", rating=4.1, website="https://greenacres.example",
+        place_id="p1", latitude=40.0, longitude=-75.0,
+    )
+    # Listed twice (as a market and a CSA): one Places search, one visual audit
+    usda_tool = _tool(None)
+    usda_tool.ainvoke.return_value = {
+        "farmersmarket": FarmersMarketSearchResult(listings=[FarmersMarketListing(listing_name="Green Acres")]),
+        "csa": CSASearchResult(listings=[CSAListing(listing_name="Green Acres")]),
+    }
+    places_tool = _tool(None)
+    places_tool.ainvoke.return_value = PlacesSearchResult(
+        query="Green Acres", location_input="19103", radius_meters=5000, businesses=[listing], total_found=1,
+    )
+    visuals_tool = _tool(None)
+    visuals_tool.ainvoke.return_value = "Dated layout, no online ordering."
+    seo_tool = _tool(None)
+    seo_tool.ainvoke.return_value = json.dumps({"keywords": ["local eggs"]})
+    gap_report = AsyncMock(return_value={"market_gaps": ["No online ordering"], "positioning_recommendations": []})
+    scoring_llm = AsyncMock()
+    scoring_llm.ainvoke.return_value = _response(json.dumps([
+        {"id": 0, "score": 40, "summary": "Dated"},
+    ]))
+    return usda_tool, places_tool, visuals_tool, seo_tool, gap_report, scoring_llm
+
+DISCOVERY_INPUT = {
+    "search_criteria": {"zip_code": "19103", "state": "PA", "farm_name": "Oak Creek", "farm_offerings": "Eggs"},
+}
+
+@pytest.mark.asyncio
+async def test_market_gap_reuses_pipeline_artifacts():
+    # Arrange: the competitor pipeline fetches once, market gap only calls the LLM
+    usda_tool, places_tool, visuals_tool, seo_tool, gap_report, scoring_llm = _green_acres_fixtures()
+
+    with patch.object(discovery, "search_all_local_food", usda_tool), \
+            patch.object(discovery, "search_nearby_businesses", places_tool), \
+            patch.object(discovery, "analyze_website_visuals", visuals_tool), \
+            patch.object(discovery, "fetch_local_seo_keywords", seo_tool), \
+            patch.object(discovery, "generate_gap_report", gap_report), \
+            patch.object(discovery, "get_llm_for_task", return_value=scoring_llm):
+        # Act
+        result = await discovery.build_discovery_graph().ainvoke(DISCOVERY_INPUT)
+
+    # Assert
+    assert places_tool.ainvoke.await_count == 1
+    assert visuals_tool.ainvoke.await_count == 1
+    assert scoring_llm.ainvoke.await_count == 1
+    assert result["artifacts"].places[places_key("Green Acres", "19103")].place_id == "p1"
+    assert [c.digital_health_score for c in result["audited_competitors"]] == [40, 40]
+    profile = gap_report.await_args.args[2][0]
+    assert profile["name"] == "Green Acres CSA"
+    assert profile["website_snippet"] == "Dated layout, no online ordering."
+    assert profile["digital_health_score"] == 40
+    assert result["market_gap_report"]["competitors_analyzed"] == 1
+    assert result["market_gap_report"]["report"]["market_gaps"] == ["No online ordering"]
+
+@pytest.mark.asyncio
+async def test_discovery_reuses_seeded_website_audits():
+    # Arrange: a cache refresh seeds the audit of the unchanged website
+    usda_tool, places_tool, visuals_tool, seo_tool, gap_report, scoring_llm = _green_acres_fixtures()
+    seeded = DiscoveryArtifacts(
+        visual_analyses={"https://greenacres.example": "Modern storefront."},
+        site_scores={"https://greenacres.example": (85, "Modern")},
+    )
+
+    with patch.object(discovery, "search_all_local_food", usda_tool), \
+            patch.object(discovery, "search_nearby_businesses", places_tool), \
+            patch.object(discovery, "analyze_website_visuals", visuals_tool), \
+            patch.object(discovery, "fetch_local_seo_keywords", seo_tool), \
+            patch.object(discovery, "generate_gap_report", gap_report), \
+            patch.object(discovery, "get_llm_for_task", return_value=scoring_llm):
+        result = await discovery.build_discovery_graph().ainvoke({**DISCOVERY_INPUT, "artifacts": seeded})
+
+    # Assert: the listing is looked up again, the website is not re-audited
+    assert places_tool.ainvoke.await_count == 1
+    visuals_tool.ainvoke.assert_not_awaited()
+    scoring_llm.ainvoke.assert_not_awaited()
+    assert [c.digital_health_score for c in result["audited_competitors"]] == [85, 85]
+
+@pytest.mark.asyncio
+async def test_each_step_leaves_the_previous_competitor_list_unchanged():
+    # Arrange
+    usda_tool, places_tool, visuals_tool, seo_tool, gap_report, scoring_llm = _green_acres_fixtures()
+
+    with patch.object(discovery, "search_all_local_food", usda_tool), \
+            patch.object(discovery, "search_nearby_businesses", places_tool), \
+            patch.object(discovery, "analyze_website_visuals", visuals_tool), \
+            patch.object(discovery, "fetch_local_seo_keywords", seo_tool), \
+            patch.object(discovery, "generate_gap_report", gap_report), \
+            patch.object(discovery, "get_llm_for_task", return_value=scoring_llm):
+        # Act
+        result = await discovery.build_discovery_graph().ainvoke(DISCOVERY_INPUT)
+
+    # Assert: enrichment and audit update copies, not the competitors already in state
+    assert [c.website_url for c in result["raw_competitors"]] == [None, None]
+    assert [c.website_url for c in result["enriched_competitors"]] == ["https://greenacres.example"] * 2
+    assert [c.digital_health_score for c in result["enriched_competitors"]] == [None, None]
+    assert [c.digital_health_score for c in result["audited_competitors"]] == [40, 40]
+
+@pytest.mark.asyncio
+async def test_website_audits_and_lookups_are_capped_per_process():
+    # Arrange: 40 listings with their own websites, every call yields to the others
+    names = [f"Farm {i}" for i in range(40)]
+    usda_tool = _tool(None)
+    usda_tool.ainvoke.return_value = {
+        "farmersmarket": FarmersMarketSearchResult(listings=[FarmersMarketListing(listing_name=n) for n in names]),
+        "csa": CSASearchResult(listings=[]),
+    }
+    running = {"lookup": 0, "audit": 0}
+    peak = {"lookup": 0, "audit": 0}
+
+    async def tracked(kind, result):
+        running[kind] += 1
+        peak[kind] = max(peak[kind], running[kind])
+        await asyncio.sleep(0.01)
+        running[kind] -= 1
+        return result
+
+    async def places(args):
+        business = NearbyBusiness(
+            name=args["query"], address="1 Farm Rd", website=f"https://{args['query'].replace(' ', '')}.example",
+            place_id=args["query"], latitude=40.0, longitude=-75.0,
+        )
+        return await tracked("lookup", PlacesSearchResult(
+            query=args["query"], location_input=args["location"], radius_meters=5000,
+            businesses=[business], total_found=1,
+        ))
+
+    async def visuals(args):
+        return await tracked("audit", f"Analysis of {args['url']}")
+
+    _, _, _, seo_tool, gap_report, scoring_llm = _green_acres_fixtures()
+    scoring_llm.ainvoke.return_value = _response(json.dumps([{"id": i, "score": 50, "summary": "ok"} for i in range(10)]))
+
+    with patch.object(discovery, "search_all_local_food", usda_tool), \
+            patch.object(discovery, "search_nearby_businesses", _tool(places)), \
+            patch.object(discovery, "analyze_website_visuals", _tool(visuals)), \
+            patch.object(discovery, "fetch_local_seo_keywords", seo_tool), \
+            patch.object(discovery, "generate_gap_report", gap_report), \
+            patch.object(discovery, "get_llm_for_task", return_value=scoring_llm), \
+            patch.object(discovery, "_audit_slots", weakref.WeakKeyDictionary()), \
+            patch.object(discovery, "_lookup_slots", weakref.WeakKeyDictionary()), \
+            patch.object(settings, "DISCOVERY_MAX_CONCURRENT_AUDITS", 3), \
+            patch.object(settings, "DISCOVERY_MAX_CONCURRENT_LOOKUPS", 5):
+        # Act
+        result = await discovery.build_discovery_graph().ainvoke(DISCOVERY_INPUT)
+
+    # Assert: concurrent, but never more than the caps at once
+    assert peak == {"lookup": 5, "audit": 3}
+    assert [c.digital_health_score for c in result["audited_competitors"]] == [50] * 40
+
+@pytest.mark.asyncio
+async def test_hanging_website_audit_is_skipped_within_its_deadline():
+    # Arrange: the screenshot of the only website never finishes
+    usda_tool, places_tool, visuals_tool, seo_tool, gap_report, scoring_llm = _green_acres_fixtures()
+    async def hang(_):
+        await asyncio.sleep(30)
+
+    visuals_tool.ainvoke.side_effect = hang
+
+    with patch.object(discovery, "search_all_local_food", usda_tool), \
+            patch.object(discovery, "search_nearby_businesses", places_tool), \
+            patch.object(discovery, "analyze_website_visuals", visuals_tool), \
+            patch.object(discovery, "fetch_local_seo_keywords", seo_tool), \
+            patch.object(discovery, "generate_gap_report", gap_report), \
+            patch.object(discovery, "get_llm_for_task", return_value=scoring_llm), \
+            patch.object(settings, "DISCOVERY_SITE_AUDIT_DEADLINE_SECONDS", 0.1):
+        # Act
+        result = await asyncio.wait_for(discovery.build_discovery_graph().ainvoke(DISCOVERY_INPUT), timeout=5)
+
+    # Assert: the run completes, the competitor is unscored rather than scored as broken
+    scoring_llm.ainvoke.assert_not_awaited()
+    assert [c.digital_health_score for c in result["audited_competitors"]] == [None, None]
+    assert result["audited_competitors"][0].audit_notes == "Audit skipped: ran out of time."
+    assert result["errors"] == ["Audit skipped for 1 websites: out of time"]
+    assert result["market_gap_report"]["competitors_analyzed"] == 1
+
+@pytest.mark.asyncio
+async def test_resumed_discovery_run_skips_completed_work():
+    # Arrange: the run dies after every site was audited and scored
+    usda_tool, places_tool, visuals_tool, seo_tool, gap_report, scoring_llm = _green_acres_fixtures()
+    saver = InMemorySaver()
+    config = agent_run_config("discovery", "run-resume")
+
+    with patch.object(agent_checkpointer, "saver", saver), \
+            patch.object(discovery, "search_all_local_food", usda_tool), \
+            patch.object(discovery, "search_nearby_businesses", places_tool), \
+            patch.object(discovery, "analyze_website_visuals", visuals_tool), \
+            patch.object(discovery, "fetch_local_seo_keywords", seo_tool), \
+            patch.object(discovery, "generate_gap_report", gap_report), \
+            patch.object(discovery, "get_llm_for_task", return_value=scoring_llm):
+        with patch.object(discovery, "audit_competitors_node", AsyncMock(side_effect=RuntimeError("worker died"))):
+            with pytest.raises(RuntimeError):
+                await invoke_agent(discovery.build_discovery_graph(agent_checkpointer), DISCOVERY_INPUT, config)
+
+        # Act: the retried job invokes the same run again
+        result = await invoke_agent(discovery.build_discovery_graph(agent_checkpointer), DISCOVERY_INPUT, config)
+
+        # Assert: nothing completed before the crash ran twice, and the finished run is discarded
+        assert usda_tool.ainvoke.await_count == 1
+        assert places_tool.ainvoke.await_count == 1
+        assert visuals_tool.ainvoke.await_count == 1
+        assert scoring_llm.ainvoke.await_count == 1
+        assert seo_tool.ainvoke.await_count == 1
+        assert [c.digital_health_score for c in result["audited_competitors"]] == [40, 40]
+        assert result["seo_report"] == {"keywords": ["local eggs"]}
+        assert await saver.aget_tuple(config) is None
+
+@pytest.mark.asyncio
+async def test_stream_discovery_reports_progress_before_completion():
+    usda_tool, places_tool, visuals_tool, seo_tool, gap_report, scoring_llm = _green_acres_fixtures()
+
+    with patch("src.core.config.settings.DISCOVERY_CACHE_ENABLED", False), \
+            patch.object(discovery, "search_all_local_food", usda_tool), \
+            patch.object(discovery, "search_nearby_businesses", places_tool), \
+            patch.object(discovery, "analyze_website_visuals", visuals_tool), \
+            patch.object(discovery, "fetch_local_seo_keywords", seo_tool), \
+            patch.object(discovery, "generate_gap_report", gap_report), \
+            patch.object(discovery, "get_llm_for_task", return_value=scoring_llm):
+        events = [e async for e in stream_discovery(DiscoverRequest(**DISCOVERY_INPUT["search_criteria"]), "run-stream")]
+
+    names = [name for name, _ in events]
+    assert names[-1] == "complete"
+    assert events[-1][1]["leads"][0].digital_health_score == 40
+    assert dict(events)["competitors_found"] == {"count": 2}
+    assert names.count("competitor") == 2
+    assert dict(events)["site_scored"] == {
+        "url": "https://greenacres.example", "digital_health_score": 40, "audit_notes": "Dated",
+    }
+    assert {data["kind"] for name, data in events if name == "report"} == {"market_gap", "generate_seo"}
+    audits = [data for name, data in events if name == "node_end" and data["node"] == "competitors/audit_site"]
+    assert len(audits) == 1 and audits[0]["error"] is None and audits[0]["duration_ms"] >= 0
+    # Scores arrive before the market gap report that depends on them
+    market_gap = next(i for i, (name, data) in enumerate(events) if name == "report" and data["kind"] == "market_gap")
+    assert names.index("site_scored") < market_gap
@@ -0,0 +1,168 @@
+import json
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.agents import discovery
+from src.core.config import settings
+from src.schemas.agent_discovery import BatchDiscoverRequest, DiscoverRequest
+from src.schemas.google_places import NearbyBusiness, PlacesSearchResult
+from src.schemas.usda import CSAListing, CSASearchResult, FarmersMarketListing, FarmersMarketSearchResult
+from src.services.agent_runs import run_batch_discovery
+
+def _response(content):
+    response = MagicMock()
+    response.content = content
+    return response
+
+def _tool(side_effect):
+    tool = MagicMock()
+    tool.ainvoke = AsyncMock(side_effect=side_effect)
+    return tool
+
+# Two neighbouring zip codes whose searches overlap on Green Acres
+USDA_LISTINGS = {
+    "19103": ["Green Acres", "Hilltop Orchard"],
+    "19104": ["Green Acres", "Valley Dairy"],
+}
+
+async def _usda(args):
+    names = USDA_LISTINGS[args["zip_code"]]
+    return {
+        "farmersmarket": FarmersMarketSearchResult(listings=[FarmersMarketListing(listing_name=n) for n in names]),
+        "csa": CSASearchResult(listings=[]),
+    }
+
+async def _places(args):
+    slug = args["query"].lower().replace(" ", "")
+    business = NearbyBusiness(
+        name=args["query"], address="1 Farm Rd", rating=4.0, website=f"https://{slug}.example",
+        place_id=slug, latitude=40.0, longitude=-75.0,
+    )
+    return PlacesSearchResult(
+        query=args["query"], location_input=args["location"], radius_meters=5000, businesses=[business], total_found=1,
+    )
+
+@pytest.mark.asyncio
+async def test_batch_discovery_audits_each_unique_competitor_once():
+    # Arrange: three farms in two regions; Green Acres is both a farm and a competitor
+    body = BatchDiscoverRequest(farms=[
+        DiscoverRequest(farm_name="Oak Creek", farm_offerings="Eggs", zip_code="19103", state="PA"),
+        DiscoverRequest(farm_name="Green Acres", farm_offerings="Eggs", zip_code="19103", state="PA"),
+        DiscoverRequest(farm_name="Riverbend", farm_offerings="Eggs", zip_code="19104", state="PA"),
+    ])
+    usda_tool, places_tool = _tool(_usda), _tool(_places)
+    visuals_tool = _tool(lambda args: f"Analysis of {args['url']}")
+    seo_tool = _tool(lambda args: json.dumps({"keywords": [f"eggs {args['zip_code']}"]}))
+    gap_report = AsyncMock(return_value={"market_gaps": ["No online ordering"], "positioning_recommendations": []})
+    scoring_llm = AsyncMock()
+    scoring_llm.ainvoke.return_value = _response(json.dumps([
+        {"id": i, "score": 40 + i, "summary": "Dated"} for i in range(3)
+    ]))
+
+    with patch.object(discovery, "search_all_local_food", usda_tool), \
+            patch.object(discovery, "search_nearby_businesses", places_tool), \
+            patch.object(discovery, "analyze_website_visuals", visuals_tool), \
+            patch.object(discovery, "fetch_local_seo_keywords", seo_tool), \
+            patch.object(discovery, "generate_gap_report", gap_report), \
+            patch.object(discovery, "get_llm_for_task", return_value=scoring_llm), \
+            patch.object(settings, "DISCOVERY_CACHE_ENABLED", False):
+        # Act
+        result = await run_batch_discovery(body, "batch-run")
+
+    # Assert: one search per region, one lookup and audit per unique competitor
+    assert usda_tool.ainvoke.await_count == 2
+    assert places_tool.ainvoke.await_count == 3
+    assert visuals_tool.ainvoke.await_count == 3
+    assert scoring_llm.ainvoke.await_count == 1
+    assert seo_tool.ainvoke.await_count == 2
+    assert gap_report.await_count == 3
+    assert result["regions"] == 2
+    assert result["unique_competitors"] == 3
+    assert result["errors"] == []
+
+    oak_creek, green_acres, riverbend = result["farms"]
+    assert [lead.farm_name for lead in oak_creek["leads"]] == ["Green Acres", "Hilltop Orchard"]
+    # A farm is never its own competitor
+    assert [lead.farm_name for lead in green_acres["leads"]] == ["Hilltop Orchard"]
+    assert green_acres["total_found"] == 1
+    assert [lead.farm_name for lead in riverbend["leads"]] == ["Green Acres", "Valley Dairy"]
+    # Shared competitors carry the same audit in every farm's view
+    assert oak_creek["leads"][0].digital_health_score == riverbend["leads"][0].digital_health_score
+    assert oak_creek["seo_report"] == green_acres["seo_report"] == {"keywords": ["eggs 19103"]}
+    assert riverbend["seo_report"] == {"keywords": ["eggs 19104"]}
+    assert all(farm["market_gap_report"] is not None for farm in result["farms"])
+
+@pytest.mark.asyncio
+async def test_batch_discovery_accepts_farms_with_only_a_zip_code():
+    # Arrange: _validate_batch accepts a zip code or a state alone
+    body = BatchDiscoverRequest(farms=[
+        DiscoverRequest(farm_name="Oak Creek", farm_offerings="Eggs", zip_code="19103"),
+    ])
+    scoring_llm = AsyncMock()
+    scoring_llm.ainvoke.return_value = _response(json.dumps([{"id": i, "score": 50, "summary": "Ok"} for i in range(2)]))
+
+    with patch.object(discovery, "search_all_local_food", _tool(_usda)), \
+            patch.object(discovery, "search_nearby_businesses", _tool(_places)), \
+            patch.object(discovery, "analyze_website_visuals", _tool(lambda args: "Analysis")), \
+            patch.object(discovery, "fetch_local_seo_keywords", _tool(lambda args: json.dumps({"keywords": []}))), \
+            patch.object(discovery, "generate_gap_report", AsyncMock(return_value={"market_gaps": []})), \
+            patch.object(discovery, "get_llm_for_task", return_value=scoring_llm), \
+            patch.object(settings, "DISCOVERY_CACHE_ENABLED", False):
+        # Act
+        result = await run_batch_discovery(body, "batch-zip-only")
+
+    # Assert
+    assert result["errors"] == []
+    [oak_creek] = result["farms"]
+    assert [lead.farm_name for lead in oak_creek["leads"]] == ["Green Acres", "Hilltop Orchard"]
+    assert all(lead.location_state == "Unknown" for lead in oak_creek["leads"])
+
+@pytest.mark.asyncio
+async def test_state_only_farms_in_different_states_get_their_own_seo_report():
+    # Arrange: same offerings, no zip codes
+    body = BatchDiscoverRequest(farms=[
+        DiscoverRequest(farm_name="Coastal", farm_offerings="Eggs", state="CA"),
+        DiscoverRequest(farm_name="Prairie", farm_offerings="Eggs", state="TX"),
+    ])
+    seo_tool = _tool(lambda args: json.dumps({"keywords": [f"eggs {args['zip_code']}"]}))
+
+    with patch.object(discovery, "search_all_local_food", _tool(lambda args: {})), \
+            patch.object(discovery, "fetch_local_seo_keywords", seo_tool), \
+            patch.object(discovery, "generate_gap_report", AsyncMock(return_value={"market_gaps": []})), \
+            patch.object(settings, "DISCOVERY_CACHE_ENABLED", False):
+        # Act
+        result = await run_batch_discovery(body, "batch-state-only")
+
+    # Assert: one report per state, each localized to the farm's own state
+    assert seo_tool.ainvoke.await_count == 2
+    coastal, prairie = result["farms"]
+    assert coastal["seo_report"] == {"keywords": ["eggs CA"]}
+    assert prairie["seo_report"] == {"keywords": ["eggs TX"]}
+
+@pytest.mark.asyncio
+async def test_zip_only_regions_keep_same_named_listings_apart():
+    # Arrange: both zips list a "Green Acres"; without a state they may be different farms
+    body = BatchDiscoverRequest(farms=[
+        DiscoverRequest(farm_name="Oak Creek", farm_offerings="Eggs", zip_code="19103"),
+        DiscoverRequest(farm_name="Riverbend", farm_offerings="Eggs", zip_code="19104"),
+    ])
+    places_tool = _tool(_places)
+    scoring_llm = AsyncMock()
+    scoring_llm.ainvoke.return_value = _response(json.dumps([{"id": i, "score": 50, "summary": "Ok"} for i in range(4)]))
+
+    with patch.object(discovery, "search_all_local_food", _tool(_usda)), \
+            patch.object(discovery, "search_nearby_businesses", places_tool), \
+            patch.object(discovery, "analyze_website_visuals", _tool(lambda args: "Analysis")), \
+            patch.object(discovery, "fetch_local_seo_keywords", _tool(lambda args: json.dumps({"keywords": []}))), \
+            patch.object(discovery, "generate_gap_report", AsyncMock(return_value={"market_gaps": []})), \
+            patch.object(discovery, "get_llm_for_task", return_value=scoring_llm), \
+            patch.object(settings, "DISCOVERY_CACHE_ENABLED", False):
+        # Act
+        result = await run_batch_discovery(body, "batch-zip-regions")
+
+    # Assert: each Green Acres is looked up in its own zip
+    assert result["unique_competitors"] == 4
+    lookups = sorted((call.args[0]["query"], call.args[0]["location"]) for call in places_tool.ainvoke.await_args_list)
+    assert ("Green Acres", "19103") in lookups and ("Green Acres", "19104") in lookups
+    oak_creek, riverbend = result["farms"]
+    assert [lead.location_zip for lead in oak_creek["leads"]] == ["19103", "19103"]
+    assert [lead.location_zip for lead in riverbend["leads"]] == ["19104", "19104"]
@@ -0,0 +1,93 @@
+import asyncio
+import json
+import uuid
+import weakref
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.agents import sdr
+from src.core.config import settings
+from src.models.outreach import OutreachEmail
+from src.schemas.google_places import NearbyBusiness, PlacesSearchResult
+
+def _tool(side_effect):
+    tool = MagicMock()
+    tool.ainvoke = AsyncMock(side_effect=side_effect)
+    return tool
+
+class _FakeSession:
+    """Records how sessions are used instead of talking to the database."""
+    open = 0
+    added = []
+    commits = 0
+
+    def __init__(self, engine):
+        pass
+
+    async def __aenter__(self):
+        _FakeSession.open += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        _FakeSession.open -= 1
+
+    def add_all(self, rows):
+        _FakeSession.added.append(list(rows))
+
+    async def commit(self):
+        _FakeSession.commits += 1
+
+@pytest.mark.asyncio
+async def test_drafts_run_concurrently_capped_and_are_saved_in_one_commit():
+    # Arrange: eight matching restaurants; the drafting LLM records its concurrency
+    businesses = [
+        NearbyBusiness(
+            name=f"Bistro {i}", address=f"{i} Main St", place_id=f"p{i}", latitude=40.0, longitude=-75.0,
+            website=f"https://bistro{i}.example",
+        )
+        for i in range(8)
+    ]
+    places_result = PlacesSearchResult(
+        query="restaurant", location_input="40.0,-75.0", radius_meters=5000, businesses=businesses, total_found=8,
+    )
+    running, peak, sessions_open_during_llm = 0, 0, []
+
+    async def draft(messages, config=None):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        sessions_open_during_llm.append(_FakeSession.open)
+        await asyncio.sleep(0.01)
+        running -= 1
+        response = MagicMock()
+        response.content = json.dumps({"subject": "Fresh kale", "body": "Hello"})
+        return response
+
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(side_effect=draft)
+    _FakeSession.open, _FakeSession.added, _FakeSession.commits = 0, [], 0
+
+    with patch.object(sdr, "fetch_farm_context_node", AsyncMock(return_value={
+                "farm_name": "Oak Creek", "farm_inventory": ["kale"],
+            })), \
+            patch.object(sdr, "AsyncSession", _FakeSession), \
+            patch.object(sdr, "search_nearby_businesses", _tool(lambda args: places_result)), \
+            patch.object(sdr, "analyze_restaurant_reviews", _tool(RuntimeError("no reviews"))), \
+            patch.object(sdr, "scrape_website_content", _tool(lambda args: json.dumps({"extracted_text": "kale salad"}))), \
+            patch.object(sdr, "find_decision_maker_email", _tool(lambda args: MagicMock(contacts=[]))), \
+            patch.object(sdr, "get_llm_for_task", return_value=llm), \
+            patch.object(sdr, "_draft_slots", weakref.WeakKeyDictionary()), \
+            patch.object(settings, "SDR_MAX_CONCURRENT_DRAFTS", 3):
+        # Act
+        result = await sdr.build_sdr_graph().ainvoke({
+            "search_criteria": {"farm_id": uuid.uuid4(), "latitude": 40.0, "longitude": -75.0},
+        })
+
+    # Assert: concurrent but capped, no session held across LLM calls, one batched write
+    assert llm.ainvoke.await_count == 8
+    assert peak == 3
+    assert sessions_open_during_llm == [0] * 8
+    assert len(_FakeSession.added) == 1 and _FakeSession.commits == 1
+    rows = _FakeSession.added[0]
+    assert all(isinstance(row, OutreachEmail) for row in rows)
+    assert sorted(row.restaurant_name for row in rows) == [f"Bistro {i}" for i in range(8)]
+    assert len(result["email_drafts"]) == 8
@@ -0,0 +1,46 @@
+import asyncio
+import pytest
+from src.core.deadline import BudgetExhausted, budget_timeout, run_deadline, time_left, within_budget
+
+def test_nested_deadline_never_extends_the_outer_one():
+    with run_deadline(1):
+        with run_deadline(60):
+            assert time_left() <= 1
+        with run_deadline(0.5):
+            assert time_left() <= 0.5
+    assert time_left() is None
+
+def test_budget_timeout_is_capped_by_the_time_left():
+    assert budget_timeout(30) == 30
+    with run_deadline(2):
+        assert budget_timeout(30) <= 2
+        assert budget_timeout(1) == 1
+    with run_deadline(0):
+        with pytest.raises(BudgetExhausted):
+            budget_timeout(30)
+
+@pytest.mark.asyncio
+async def test_within_budget_cancels_calls_that_outlive_the_deadline():
+    cancelled = asyncio.Event()
+
+    async def hang():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with run_deadline(0.05):
+        with pytest.raises(BudgetExhausted):
+            await within_budget(hang())
+    assert cancelled.is_set()
+
+@pytest.mark.asyncio
+async def test_deadline_is_inherited_by_tasks_started_in_the_run():
+    async def remaining():
+        return time_left()
+
+    with run_deadline(5):
+        left = await asyncio.create_task(remaining())
+
+    assert left is not None and left <= 5
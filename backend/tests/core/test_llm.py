@@ -0,0 +1,31 @@
+import pytest
+from src.core import llm as llm_provider
+from src.core.llm import get_llm
+
+@pytest.fixture(autouse=True)
+def fresh_llm_pool(mocker):
+    mocker.patch("src.core.config.settings.OPENROUTER_API_KEY", "test_key")
+    mocker.patch.object(llm_provider, "_clients", {})
+    mocker.patch.object(llm_provider, "_http_client", None)
+
+def test_get_llm_reuses_pooled_client():
+    # Act
+    first = get_llm("test/model", temperature=0.2)
+    second = get_llm("test/model", temperature=0.2)
+    other = get_llm("test/model", temperature=0.7)
+
+    # Assert
+    assert first is second
+    assert first is not other
+
+def test_get_llm_shares_http_client():
+    # Act
+    first = get_llm("test/model-a", temperature=0)
+    second = get_llm("test/model-b", temperature=0)
+
+    # Assert: both chat models ride the same connection pool
+    assert llm_provider._http_client is not None
+    assert first.bound.http_async_client is llm_provider._http_client
+    assert second.bound.http_async_client is llm_provider._http_client
+    # Retries are owned by the provider, not the OpenAI SDK
+    assert first.bound.max_retries == 0
@@ -0,0 +1,91 @@
+import pytest
+from unittest.mock import patch
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import HumanMessage
+from src.core import llm_cache
+from src.core.llm_cache import InMemoryLLMCacheBackend, LLMResponseCache, PostgresLLMCacheBackend, make_cache_key
+
+class _FakeSession:
+    """Records executed SQL instead of talking to the database."""
+    statements = []
+
+    def __init__(self, engine):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def exec(self, statement, params=None):
+        _FakeSession.statements.append(str(statement).split()[0])
+
+    async def commit(self):
+        pass
+
+@pytest.mark.asyncio
+async def test_in_memory_backend_evicts_least_recently_used():
+    # Arrange
+    backend = InMemoryLLMCacheBackend(max_entries=2, ttl_seconds=60)
+    await backend.set("a", "1")
+    await backend.set("b", "2")
+    await backend.get("a")  # "b" becomes least recently used
+
+    # Act
+    await backend.set("c", "3")
+
+    # Assert
+    assert await backend.get("a") == "1"
+    assert await backend.get("b") is None
+    assert await backend.get("c") == "3"
+
+@pytest.mark.asyncio
+async def test_in_memory_backend_expires_entries():
+    backend = InMemoryLLMCacheBackend(max_entries=10, ttl_seconds=0)
+    await backend.set("a", "1")
+
+    assert await backend.get("a") is None
+
+@pytest.mark.asyncio
+async def test_postgres_backend_trims_periodically_not_on_every_insert():
+    # Arrange
+    backend = PostgresLLMCacheBackend(max_entries=10, ttl_seconds=60, trim_interval_seconds=60)
+    _FakeSession.statements = []
+    clock = [1000.0]
+
+    with patch.object(llm_cache, "AsyncSession", _FakeSession), \
+            patch.object(llm_cache.time, "monotonic", lambda: clock[0]):
+        # Act: three inserts within one interval, then one after it
+        for key in ("a", "b", "c"):
+            await backend.set(key, "1")
+        clock[0] += 61
+        await backend.set("d", "1")
+
+    # Assert: the first insert and the one after the interval trim
+    assert _FakeSession.statements == ["INSERT", "DELETE", "INSERT", "INSERT", "INSERT", "DELETE"]
+
+def test_cache_key_ignores_prompt_indentation():
+    llm_string = "model=test,temperature=0"
+
+    indented = make_cache_key('[{"content": "\\n    Score this site:\\n    ok\\n    "}]', llm_string)
+    reindented = make_cache_key('[{"content": "\\n        Score this site:\\n\\n        ok\\n"}]', llm_string)
+
+    assert indented == reindented
+    assert make_cache_key('[{"content": "\\n    Score this site:\\n    ok\\n    "}]', "model=other") != indented
+
+@pytest.mark.asyncio
+async def test_repeated_prompt_is_served_from_cache():
+    # Arrange
+    cache = LLMResponseCache(InMemoryLLMCacheBackend(max_entries=10, ttl_seconds=60))
+    llm = FakeListChatModel(responses=["first", "second"], cache=cache)
+
+    # Act
+    first = await llm.ainvoke([HumanMessage(content="Score this site")])
+    second = await llm.ainvoke([HumanMessage(content="Score this site")])
+
+    # Assert
+    assert first.content == "first"
+    assert second.content == "first"
+    assert cache.hits == 1
+    assert cache.misses == 1
@@ -0,0 +1,51 @@
+import pytest
+from typing import Dict, Any
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import HumanMessage
+from langgraph.graph import StateGraph, END
+from pydantic import BaseModel
+from src.core.llm_metrics import (
+    LLMMetricsCallbackHandler,
+    LLMMetricsRegistry,
+    agent_run_config,
+    estimate_cost_usd,
+)
+
+class _State(BaseModel):
+    answer: str = ""
+
+@pytest.mark.asyncio
+async def test_llm_calls_are_tagged_with_graph_node_and_run():
+    # Arrange
+    registry = LLMMetricsRegistry(max_records=100, max_runs=10)
+    llm = FakeListChatModel(responses=["ok"], callbacks=[LLMMetricsCallbackHandler(registry)])
+
+    async def ask_node(state: _State) -> Dict[str, Any]:
+        response = await llm.ainvoke([HumanMessage(content="hello")])
+        return {"answer": response.content}
+
+    workflow = StateGraph(_State)
+    workflow.add_node("ask", ask_node)
+    workflow.set_entry_point("ask")
+    workflow.add_edge("ask", END)
+    graph = workflow.compile()
+
+    # Act
+    await graph.ainvoke({}, config=agent_run_config("test_graph", "run-1"))
+
+    # Assert
+    summary = registry.run_summary("run-1")
+    assert summary is not None
+    assert summary.graph == "test_graph"
+    assert summary.totals.calls == 1
+    assert summary.by_node[0].node == "ask"
+    assert registry.run_summary("unknown-run") is None
+
+def test_estimate_cost_usd(mocker):
+    mocker.patch(
+        "src.core.config.settings.LLM_PRICING_PER_MILLION_TOKENS",
+        {"test/model": (1.0, 2.0)},
+    )
+
+    assert estimate_cost_usd("test/model", 1_000_000, 500_000) == pytest.approx(2.0)
+    assert estimate_cost_usd("unknown/model", 1_000, 1_000) == 0.0
@@ -0,0 +1,91 @@
+import time
+import httpx
+import pytest
+from src.core import llm as llm_provider
+from src.core.config import settings
+from src.core.llm_metrics import agent_run_config
+from src.core.llm_routing import get_llm_for_task, hedge_budget, resolve_route
+from scripts.fake_llm_server import create_app, fake_reply
+
+PRIMARY = "fake/slow-primary"
+FALLBACK = "fake/fast-fallback"
+
+def _use_fake_server(mocker, **server_kwargs):
+    app = create_app(**server_kwargs)
+    mocker.patch.object(
+        llm_provider, "_http_client", httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+    )
+
+@pytest.fixture(autouse=True)
+def routed_settings(mocker):
+    mocker.patch("src.core.config.settings.OPENROUTER_API_KEY", "test_key")
+    mocker.patch("src.core.config.settings.OPENROUTER_BASE_URL", "http://fake-llm")
+    mocker.patch("src.core.config.settings.LLM_MAX_RETRIES", 0)
+    mocker.patch("src.core.config.settings.LLM_HEDGE_MIN_DELAY_SECONDS", 0.05)
+    mocker.patch("src.core.config.settings.LLM_HEDGE_DEFAULT_DELAY_SECONDS", 0.05)
+    mocker.patch(
+        "src.core.config.settings.LLM_ROUTE_OVERRIDES",
+        # temperature above LLM_CACHE_MAX_TEMPERATURE so the response cache stays out of the way
+        {"test_task": {"primary": PRIMARY, "fallback": FALLBACK, "temperature": 0.5}},
+    )
+    mocker.patch.object(llm_provider, "_clients", {})
+    hedge_budget.reset()
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_with_fallback(mocker):
+    # Arrange
+    _use_fake_server(mocker, latencies={PRIMARY: 2.0, FALLBACK: 0.0})
+    llm = get_llm_for_task("test_task")
+
+    # Act
+    started = time.perf_counter()
+    response = await llm.ainvoke("hello", config=agent_run_config("test_graph", "run-hedge"))
+
+    # Assert
+    assert response.content == fake_reply(FALLBACK)
+    assert time.perf_counter() - started < 1.0
+    assert hedge_budget.remaining("run-hedge") == 2  # default budget of 3, one used
+
+@pytest.mark.asyncio
+async def test_hedging_respects_run_budget(mocker):
+    # Arrange
+    mocker.patch("src.core.config.settings.LLM_HEDGE_BUDGET_PER_RUN", 0)
+    _use_fake_server(mocker, latencies={PRIMARY: 0.2, FALLBACK: 0.0})
+    llm = get_llm_for_task("test_task")
+
+    # Act
+    response = await llm.ainvoke("hello", config=agent_run_config("test_graph", "run-no-budget"))
+
+    # Assert: no budget left, so the primary's answer is awaited
+    assert response.content == fake_reply(PRIMARY)
+
+@pytest.mark.asyncio
+async def test_failed_primary_fails_over_to_fallback(mocker):
+    # Arrange
+    _use_fake_server(mocker, failing_models=[PRIMARY])
+    llm = get_llm_for_task("test_task")
+
+    # Act: outside an agent run, so no hedging, only failover
+    response = await llm.ainvoke("hello")
+
+    # Assert
+    assert response.content == fake_reply(FALLBACK)
+
+def test_resolve_route_applies_defaults_and_overrides(mocker):
+    mocker.patch("src.core.config.settings.OPENROUTER_DEFAULT_MODEL", "test/default")
+    mocker.patch("src.core.config.settings.OPENROUTER_FALLBACK_MODEL", "test/fallback")
+
+    persona = resolve_route("persona")
+    assert (persona.primary, persona.fallback, persona.temperature) == ("test/default", "test/fallback", 0.7)
+    assert resolve_route("website_generation").hedge is False
+    with pytest.raises(ValueError):
+        resolve_route("not_a_task")
+
+def test_generative_website_routes_bypass_the_response_cache():
+    # Both run at temperature 0.2, where caching would otherwise default on
+    for task in ("website_generation", "website_section"):
+        llm = get_llm_for_task(task)
+        assert resolve_route(task).temperature <= settings.LLM_CACHE_MAX_TEMPERATURE
+        assert llm.primary.bound.cache is False
+        assert llm.fallback.bound.cache is False
+    assert get_llm_for_task("competitor_scoring").primary.bound.cache is not False
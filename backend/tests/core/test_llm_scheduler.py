@@ -0,0 +1,74 @@
+import asyncio
+import pytest
+from src.core.llm_scheduler import LLMPriority, LLMScheduler
+
+def _scheduler(max_concurrency=1, interactive=1, batch=1):
+    return LLMScheduler(max_concurrency, {LLMPriority.interactive: interactive, LLMPriority.batch: batch})
+
+async def _run(scheduler, priority, farm, order, hold=0.01):
+    async with scheduler.slot(priority, farm):
+        order.append(f"{priority.value}:{farm}")
+        await asyncio.sleep(hold)
+
+@pytest.mark.asyncio
+async def test_interactive_calls_go_before_queued_batch_calls():
+    # Arrange: one slot, held by a batch call, with more batch work queued
+    scheduler = _scheduler()
+    order = []
+    tasks = [asyncio.create_task(_run(scheduler, LLMPriority.batch, "farm-a", order)) for _ in range(3)]
+    await asyncio.sleep(0)
+
+    # Act: an interactive call arrives after the batch backlog
+    tasks.append(asyncio.create_task(_run(scheduler, LLMPriority.interactive, "farm-b", order)))
+    await asyncio.gather(*tasks)
+
+    # Assert: it runs as soon as the first batch call releases its slot
+    assert order[:2] == ["batch:farm-a", "interactive:farm-b"]
+
+@pytest.mark.asyncio
+async def test_batch_calls_are_shared_round_robin_across_farms():
+    scheduler = _scheduler()
+    order = []
+    tasks = [asyncio.create_task(_run(scheduler, LLMPriority.batch, "farm-a", order)) for _ in range(3)]
+    tasks.append(asyncio.create_task(_run(scheduler, LLMPriority.batch, "farm-b", order)))
+
+    await asyncio.gather(*tasks)
+
+    # farm-b does not wait behind farm-a's whole backlog
+    assert order.index("batch:farm-b") == 1
+
+@pytest.mark.asyncio
+async def test_batch_cap_leaves_headroom_and_stats_report_queue():
+    # Arrange: 2 slots total, batch capped at 1
+    scheduler = _scheduler(max_concurrency=2, interactive=2, batch=1)
+    order = []
+    batch = [asyncio.create_task(_run(scheduler, LLMPriority.batch, "farm-a", order, hold=0.05)) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    stats = {s.priority: s for s in scheduler.stats()}
+    assert (stats[LLMPriority.batch].running, stats[LLMPriority.batch].queued) == (1, 1)
+
+    # Act: the free slot is still available to interactive calls
+    await asyncio.wait_for(_run(scheduler, LLMPriority.interactive, "farm-b", order), timeout=0.04)
+    await asyncio.gather(*batch)
+
+    # Assert
+    stats = {s.priority: s for s in scheduler.stats()}
+    assert stats[LLMPriority.batch].granted == 2
+    assert stats[LLMPriority.batch].max_wait_ms > 0
+    assert stats[LLMPriority.interactive].running == 0
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_gives_up_its_place():
+    scheduler = _scheduler()
+    order = []
+    holder = asyncio.create_task(_run(scheduler, LLMPriority.batch, "farm-a", order, hold=0.02))
+    waiter = asyncio.create_task(_run(scheduler, LLMPriority.batch, "farm-b", order))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    await holder
+    await _run(scheduler, LLMPriority.batch, "farm-c", order)
+
+    assert order == ["batch:farm-a", "batch:farm-c"]
+    assert scheduler.stats()[1].queued == 0
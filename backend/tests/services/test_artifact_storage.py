@@ -0,0 +1,27 @@
+import gzip
+from src.services.artifact_storage import build_blob, encode_json, etag, etag_matches, select_encoding
+
+def test_equal_content_gets_equal_hash_and_deterministic_gzip():
+    first = build_blob(encode_json({"b": 1, "a": [1, 2]}), "application/json")
+    second = build_blob(encode_json({"a": [1, 2], "b": 1}), "application/json")
+
+    assert first.content_hash == second.content_hash
+    assert first.gzip_content == second.gzip_content
+    assert gzip.decompress(first.gzip_content) == b'{"a":[1,2],"b":1}'
+
+def test_etag_matching():
+    blob = build_blob(b"<html></html>", "text/html; charset=utf-8")
+
+    assert etag_matches(etag(blob), blob)
+    assert etag_matches(f'"other", W/{etag(blob)}', blob)
+    assert etag_matches("*", blob)
+    assert not etag_matches('"other"', blob)
+    assert not etag_matches(None, blob)
+
+def test_select_encoding_prefers_stored_compression():
+    blob = build_blob(b"<html>" + b"x" * 1000 + b"</html>", "text/html; charset=utf-8")
+    blob.brotli_content = b"brotli-bytes"
+
+    assert select_encoding("gzip, deflate, br", blob) == ("br", b"brotli-bytes")
+    assert select_encoding("gzip, br;q=0", blob) == ("gzip", blob.gzip_content)
+    assert select_encoding(None, blob) == (None, b"<html>" + b"x" * 1000 + b"</html>")
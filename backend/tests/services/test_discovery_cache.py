@@ -0,0 +1,100 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+from src.models.discovery_cache import DiscoveryCacheEntry
+from src.schemas.agent_discovery import CompetitorFarm, DiscoverRequest, DiscoveryArtifacts
+from src.services import discovery_cache
+from src.services.discovery_cache import CacheStatus, cache_status, discovery_cache_key
+
+BODY = DiscoverRequest(farm_name="Oak Creek", farm_offerings="Eggs, honey", zip_code="19103", state="PA")
+
+def _entry(age: timedelta, **fields):
+    return DiscoveryCacheEntry(
+        key=discovery_cache_key(BODY), zip_code="19103", state="PA", radius_miles=20, profile_hash="h",
+        result={"leads": [], "errors": []}, refreshed_at=datetime.now(timezone.utc) - age, **fields,
+    )
+
+@pytest.fixture
+def cache_settings(mocker):
+    mocker.patch("src.core.config.settings.DISCOVERY_CACHE_ENABLED", True)
+    mocker.patch("src.core.config.settings.DISCOVERY_CACHE_TTL_SECONDS", 3600)
+    mocker.patch("src.core.config.settings.DISCOVERY_CACHE_MAX_STALE_SECONDS", 86400)
+    mocker.patch("src.core.config.settings.DISCOVERY_CACHE_MAX_AUDIT_AGE_SECONDS", 7 * 86400)
+
+def test_cache_key_ignores_case_and_whitespace_but_not_radius():
+    same = BODY.model_copy(update={"farm_name": " oak  creek ", "farm_offerings": "EGGS, Honey"})
+    wider = BODY.model_copy(update={"radius_miles": 50})
+
+    assert discovery_cache_key(same) == discovery_cache_key(BODY)
+    assert discovery_cache_key(wider) != discovery_cache_key(BODY)
+
+def test_cache_status_by_age(cache_settings):
+    assert cache_status(None) == CacheStatus.miss
+    assert cache_status(_entry(timedelta(minutes=5))) == CacheStatus.fresh
+    assert cache_status(_entry(timedelta(hours=5))) == CacheStatus.stale
+    assert cache_status(_entry(timedelta(days=2))) == CacheStatus.miss
+
+@pytest.mark.asyncio
+async def test_stale_hit_is_served_and_queues_one_refresh(cache_settings, mocker):
+    mocker.patch.object(discovery_cache.crud, "get_discovery_cache", AsyncMock(return_value=_entry(timedelta(hours=5))))
+    claim = mocker.patch.object(discovery_cache.crud, "claim_discovery_refresh", AsyncMock(side_effect=[True, False]))
+    create_job = mocker.patch.object(discovery_cache.crud, "create_job", AsyncMock(return_value=MagicMock(id="job-1")))
+
+    first = await discovery_cache.cached_discovery(MagicMock(), BODY)
+    second = await discovery_cache.cached_discovery(MagicMock(), BODY)
+
+    assert first["cache"]["status"] == "stale" and first["cache"]["refreshing"] is True
+    assert second["leads"] == []
+    assert claim.await_count == 2
+    assert create_job.await_count == 1
+    assert create_job.await_args.kwargs["payload"]["zip_code"] == "19103"
+
+@pytest.mark.asyncio
+async def test_refresh_reuses_recent_audits_only(cache_settings, mocker):
+    recent = datetime.now(timezone.utc).isoformat()
+    expired = (datetime.now(timezone.utc) - timedelta(days=30)).isoformat()
+    entry = _entry(timedelta(hours=5), artifacts={
+        "visual_analyses": {"https://a.example": "Modern", "https://b.example": "Dated"},
+        "site_scores": {"https://a.example": [90, "Modern"], "https://b.example": [30, "Dated"]},
+        "audited_at": {"https://a.example": recent, "https://b.example": expired},
+    })
+    mocker.patch.object(discovery_cache.crud, "get_discovery_cache", AsyncMock(return_value=entry))
+
+    artifacts, audited_at = await discovery_cache.reusable_audits(BODY)
+
+    assert artifacts.site_scores == {"https://a.example": (90, "Modern")}
+    assert list(artifacts.visual_analyses) == ["https://a.example"]
+    assert audited_at == {"https://a.example": recent}
+
+@pytest.mark.asyncio
+async def test_store_keeps_audits_of_listed_websites(cache_settings, mocker):
+    save = mocker.patch.object(discovery_cache.crud, "save_discovery_cache", AsyncMock())
+    reused_at = "2026-10-01T00:00:00+00:00"
+    response = {
+        "leads": [CompetitorFarm(
+            farm_name="A", location_state="PA", location_zip="19103", source="usda_csa",
+            website_url="https://a.example", digital_health_score=90,
+        )],
+        "errors": [],
+    }
+    artifacts = DiscoveryArtifacts(
+        visual_analyses={"https://a.example": "Modern", "https://gone.example": "Old"},
+        site_scores={"https://a.example": (90, "Modern"), "https://gone.example": (10, "Old")},
+    )
+
+    await discovery_cache.store_discovery(BODY, response, artifacts, {"https://a.example": reused_at})
+
+    stored = save.await_args.kwargs
+    assert stored["result"]["leads"][0]["website_url"] == "https://a.example"
+    assert stored["artifacts"]["site_scores"] == {"https://a.example": [90, "Modern"]}
+    assert stored["artifacts"]["audited_at"] == {"https://a.example": reused_at}
+
+@pytest.mark.asyncio
+async def test_failed_runs_are_not_cached(cache_settings, mocker):
+    save = mocker.patch.object(discovery_cache.crud, "save_discovery_cache", AsyncMock())
+    release = mocker.patch.object(discovery_cache.crud, "release_discovery_refresh", AsyncMock())
+
+    await discovery_cache.store_discovery(BODY, {"leads": [], "errors": ["SEO failed"]}, DiscoveryArtifacts(), {})
+
+    save.assert_not_awaited()
+    release.assert_awaited_once()
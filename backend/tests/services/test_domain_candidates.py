@@ -0,0 +1,22 @@
+from src.services.domain_candidates import generate_domain_candidates, rank_score
+
+def test_candidates_combine_name_products_and_lexicon():
+    # Act
+    candidates = generate_domain_candidates("Oak Creek Heritage Farm", "Pasture-raised pork and eggs", limit=50)
+
+    # Assert
+    assert len(candidates) == len(set(candidates)) <= 50
+    assert all(c.endswith(".com") for c in candidates)
+    assert "oakcreek.com" in candidates
+    assert "oakcreekfarm.com" in candidates
+    assert "oakcreekpork.com" in candidates
+    assert "getoakcreek.com" in candidates
+    assert not any("farmfarm" in c for c in candidates)
+
+def test_candidates_are_ranked_short_and_pronounceable_first():
+    candidates = generate_domain_candidates("Sunny Acres", "Organic heirloom tomatoes", limit=10)
+
+    assert candidates[0] == "sunny.com"
+    assert rank_score("sunnyfarm") < rank_score("sunnyfarmproduce")
+    # Consonant clusters are harder to say than their length suggests
+    assert rank_score("strngthfrm") > rank_score("sunnyacres")
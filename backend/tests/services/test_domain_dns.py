@@ -0,0 +1,89 @@
+import asyncio
+import socket
+import time
+import pytest
+from src.services.domain_dns import DomainResolver
+
+def _resolver(**overrides):
+    options = dict(
+        timeout_seconds=0.1, ttl_seconds=60, negative_ttl_seconds=60,
+        max_entries=100, max_concurrency=20, check_nameservers=False,
+    )
+    options.update(overrides)
+    return DomainResolver(**options)
+
+def _fake_getaddrinfo(registered, delay=0.0):
+    calls = []
+
+    async def getaddrinfo(host, port, *args, **kwargs):
+        calls.append(host)
+        await asyncio.sleep(delay)
+        if host in registered:
+            return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("1.2.3.4", 0))]
+        raise socket.gaierror(socket.EAI_NONAME, "Name or service not known")
+
+    return getaddrinfo, calls
+
+@pytest.mark.asyncio
+async def test_check_many_runs_lookups_concurrently(mocker):
+    # Arrange: every lookup takes 50ms
+    getaddrinfo, _ = _fake_getaddrinfo({"taken.com"}, delay=0.05)
+    mocker.patch.object(asyncio.get_running_loop(), "getaddrinfo", getaddrinfo)
+    domains = ["taken.com"] + [f"free{i}.com" for i in range(9)]
+
+    # Act
+    started = time.perf_counter()
+    results = await _resolver().check_many(domains)
+
+    # Assert: 10 lookups in about the time of one
+    assert time.perf_counter() - started < 0.3
+    assert results["taken.com"] is True
+    assert results["free0.com"] is False
+
+@pytest.mark.asyncio
+async def test_results_are_cached(mocker):
+    getaddrinfo, calls = _fake_getaddrinfo({"taken.com"})
+    mocker.patch.object(asyncio.get_running_loop(), "getaddrinfo", getaddrinfo)
+    resolver = _resolver()
+
+    assert await resolver.is_registered("taken.com") is True
+    assert await resolver.is_registered("Taken.com.") is True
+    assert calls == ["taken.com"]
+
+@pytest.mark.asyncio
+async def test_timeout_is_unknown_and_not_cached(mocker):
+    getaddrinfo, calls = _fake_getaddrinfo(set(), delay=1.0)
+    mocker.patch.object(asyncio.get_running_loop(), "getaddrinfo", getaddrinfo)
+    resolver = _resolver(timeout_seconds=0.01)
+
+    assert await resolver.is_registered("slow.com") is None
+    assert await resolver.is_registered("slow.com") is None
+    assert len(calls) == 2
+
+@pytest.mark.asyncio
+async def test_temporary_resolver_failure_is_unknown_and_not_cached(mocker):
+    # Arrange: the resolver cannot answer right now (EAI_AGAIN), which says nothing about the domain
+    calls = []
+
+    async def getaddrinfo(host, port, *args, **kwargs):
+        calls.append(host)
+        raise socket.gaierror(socket.EAI_AGAIN, "Temporary failure in name resolution")
+
+    mocker.patch.object(asyncio.get_running_loop(), "getaddrinfo", getaddrinfo)
+    resolver = _resolver()
+
+    # Act / Assert: unknown rather than available, and retried on the next call
+    assert await resolver.is_registered("flaky.com") is None
+    assert await resolver.is_registered("flaky.com") is None
+    assert len(calls) == 2
+
+@pytest.mark.asyncio
+async def test_nameserver_check_catches_parked_domains(mocker):
+    # Arrange: no address records, but the apex has NS records
+    getaddrinfo, _ = _fake_getaddrinfo(set())
+    mocker.patch.object(asyncio.get_running_loop(), "getaddrinfo", getaddrinfo)
+    resolver = _resolver(check_nameservers=True)
+    mocker.patch.object(resolver, "_has_nameservers", return_value=True)
+
+    # Act / Assert
+    assert await resolver.is_registered("parked.com") is True
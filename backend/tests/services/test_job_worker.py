@@ -0,0 +1,84 @@
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, patch
+from langgraph.graph import END, StateGraph
+from pydantic import BaseModel
+from sqlalchemy.dialects import postgresql
+from typing_extensions import TypedDict
+from src.crud.agent_job import claimable_jobs_query
+from src.models.agent_job import AgentJob, JobKind, JobStatus
+from src.services import job_worker
+from src.services.agent_runs import invoke_agent
+from src.services.job_worker import JobWorkerPool, retry_delay_seconds
+
+class _Result(BaseModel):
+    insights: list[str]
+
+def _claimed_job(attempts=1):
+    return AgentJob(kind=JobKind.analytics, payload={"county": "Sonoma"}, status=JobStatus.running, attempts=attempts)
+
+def test_claim_query_skips_locked_rows():
+    sql = str(claimable_jobs_query(datetime.now(timezone.utc), [JobKind.discovery]).compile(dialect=postgresql.dialect()))
+
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert "ORDER BY agentjob.available_at" in sql
+    assert "LIMIT" in sql
+
+def test_retry_backoff_doubles(mocker):
+    mocker.patch("src.services.job_worker.settings.JOB_RETRY_BACKOFF_SECONDS", 10.0)
+
+    assert [retry_delay_seconds(n) for n in (1, 2, 3)] == [10.0, 20.0, 40.0]
+
+@pytest.mark.asyncio
+async def test_run_job_records_progress_and_json_result():
+    # Arrange
+    async def handler(payload, run_id, on_progress):
+        await on_progress("fetch_usda_pricing")
+        await on_progress("run_analytics")
+        return _Result(insights=[payload["county"]])
+
+    job = _claimed_job()
+    with patch.dict(job_worker.JOB_HANDLERS, {JobKind.analytics: handler}), \
+            patch("src.crud.record_job_progress", AsyncMock(return_value=True)) as progress, \
+            patch("src.crud.complete_job", AsyncMock(return_value=True)) as complete, \
+            patch("src.crud.fail_job", AsyncMock()) as fail:
+        # Act
+        await JobWorkerPool(1, lease_seconds=60).run_job(job, "host:1/0")
+
+    # Assert
+    assert [c.kwargs["step"] for c in progress.await_args_list] == ["fetch_usda_pricing", "run_analytics"]
+    assert complete.await_args.kwargs["result"] == {"insights": ["Sonoma"]}
+    assert complete.await_args.kwargs["worker_id"] == "host:1/0"
+    fail.assert_not_awaited()
+
+@pytest.mark.asyncio
+async def test_run_job_failure_is_retried_with_backoff(mocker):
+    mocker.patch("src.services.job_worker.settings.JOB_RETRY_BACKOFF_SECONDS", 5.0)
+    handler = AsyncMock(side_effect=RuntimeError("USDA API down"))
+
+    with patch.dict(job_worker.JOB_HANDLERS, {JobKind.analytics: handler}), \
+            patch("src.crud.complete_job", AsyncMock()) as complete, \
+            patch("src.crud.fail_job", AsyncMock(return_value=True)) as fail:
+        await JobWorkerPool(1, lease_seconds=60).run_job(_claimed_job(attempts=2), "host:1/0")
+
+    complete.assert_not_awaited()
+    assert fail.await_args.kwargs["error"] == "USDA API down"
+    assert fail.await_args.kwargs["retry_delay_seconds"] == 10.0
+
+@pytest.mark.asyncio
+async def test_invoke_agent_reports_each_completed_node():
+    class State(TypedDict):
+        steps: list[str]
+
+    workflow = StateGraph(State)
+    workflow.add_node("first", lambda state: {"steps": state["steps"] + ["first"]})
+    workflow.add_node("second", lambda state: {"steps": state["steps"] + ["second"]})
+    workflow.set_entry_point("first")
+    workflow.add_edge("first", "second")
+    workflow.add_edge("second", END)
+    progress = AsyncMock()
+
+    final_state = await invoke_agent(workflow.compile(), {"steps": []}, {}, progress)
+
+    assert final_state == {"steps": ["first", "second"]}
+    assert [c.args[0] for c in progress.await_args_list] == ["first", "second"]
@@ -0,0 +1,80 @@
+import json
+from src.services.prompt_compaction import (
+    compact_events,
+    compact_json,
+    compact_prompt,
+    compact_text,
+    estimate_tokens,
+    rollup_weather,
+)
+
+SCRAPED_PAGE = "\n".join(
+    ["Home", "About Us", "Shop", "Contact"] * 5
+    + [f"Our team has been serving the valley community since {1990 + i}." for i in range(20)]
+    + [
+        "We grow certified organic heirloom tomatoes and pasture-raised eggs.",
+        "Our CSA boxes are delivered every Saturday from June through October.",
+    ]
+    + [f"Cookie notice {i}: this site uses cookies to improve your experience." for i in range(20)]
+)
+
+def test_compact_text_fits_budget_and_keeps_query_sentences():
+    # Act
+    compacted = compact_text(SCRAPED_PAGE, max_tokens=60, query="organic eggs, CSA boxes")
+
+    # Assert
+    assert estimate_tokens(compacted) <= 60
+    assert "pasture-raised eggs" in compacted
+    assert "CSA boxes are delivered" in compacted
+    # Repeated navigation is deduplicated
+    assert compacted.count("About Us") <= 1
+
+def test_compact_text_returns_short_text_unchanged():
+    assert compact_text("  Fresh   eggs\n daily. ", max_tokens=50) == "Fresh eggs daily."
+
+def test_rollup_weather_aggregates_three_hourly_entries_per_day():
+    # Arrange: two days of 3-hourly forecasts
+    forecast = [
+        {
+            "temperature_min": 50 + hour, "temperature_max": 60 + hour, "precipitation_mm": 1.0,
+            "humidity": 70, "description": "light rain", "date": f"2025-06-0{day} {hour:02d}:00:00",
+        }
+        for day in (1, 2) for hour in range(0, 24, 3)
+    ]
+    weather = {"current_temp": 55.0, "location": "Portland", "forecast": forecast, "zip_code": "97201"}
+
+    # Act
+    rollup = rollup_weather(weather)
+
+    # Assert
+    assert [d["date"] for d in rollup["daily"]] == ["2025-06-01", "2025-06-02"]
+    day = rollup["daily"][0]
+    assert (day["temp_min_f"], day["temp_max_f"], day["precip_mm"]) == (50, 81, 8.0)
+    assert day["conditions"] == "light rain"
+    assert estimate_tokens(compact_json(rollup)) < estimate_tokens(json.dumps(weather)) / 4
+
+def test_compact_events_limits_count_and_drops_links():
+    events = {
+        "events": [
+            {"title": f"Market {i}", "date": "Sat", "location": "Main St", "link": "https://example.com",
+             "description": "A very long description. " * 20}
+            for i in range(10)
+        ],
+        "count": 10,
+    }
+
+    compacted = compact_events(events, max_events=3, description_tokens=10)
+
+    assert len(compacted) == 3
+    assert "link" not in compacted[0]
+    assert estimate_tokens(compacted[0]["description"]) <= 10
+    assert compact_events(None, max_events=3, description_tokens=10) is None
+
+def test_compact_prompt_strips_indentation():
+    prompt = """
+        First line.
+
+            Second line.
+        """
+
+    assert compact_prompt(prompt) == "First line.\nSecond line."
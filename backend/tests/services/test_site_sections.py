@@ -0,0 +1,76 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from src.schemas.agent_builder import WebsiteCopy
+from src.services.site_sections import clean_section_html, regenerate_section, replace_section, split_sections
+from src.services.site_templates import render_site
+
+PAGE = render_site(
+    "Oak Creek",
+    WebsiteCopy(headline="Eggs worth waking up for", subheadline="Pasture-raised.", about_text="A family farm."),
+    "Eggs, honey",
+    "rustic",
+)
+
+def test_split_sections_finds_top_level_sections_in_order():
+    sections = split_sections(PAGE)
+
+    assert [s.name for s in sections] == ["hero", "story", "inventory", "contact"]
+    assert all(PAGE[s.start:s.end] == s.html for s in sections)
+    assert sections[2].html.startswith('<section data-section="inventory"')
+    assert sections[2].html.endswith("</section>")
+
+def test_nested_markup_and_void_elements_do_not_end_a_section_early():
+    page = '<body>\r\n<div data-section="hero"><div><img src="a.png"><br></div><p>Hi</p></div>\n<footer data-section="contact">x</footer></body>'
+
+    sections = split_sections(page)
+
+    assert [s.html for s in sections] == [
+        '<div data-section="hero"><div><img src="a.png"><br></div><p>Hi</p></div>',
+        '<footer data-section="contact">x</footer>',
+    ]
+
+def test_omitted_end_tags_do_not_swallow_later_sections():
+    page = (
+        '<section data-section="hero"><ul><li>a<li>b</ul></section>'
+        '<section data-section="story"><p>x</section>'
+        '<div data-section="contact"><div>nested</div><p>y</div>'
+    )
+
+    sections = split_sections(page)
+
+    assert [s.html for s in sections] == [
+        '<section data-section="hero"><ul><li>a<li>b</ul></section>',
+        '<section data-section="story"><p>x</section>',
+        '<div data-section="contact"><div>nested</div><p>y</div>',
+    ]
+
+def test_replace_section_leaves_the_rest_of_the_page_untouched():
+    hero = split_sections(PAGE)[0]
+
+    edited = replace_section(PAGE, hero, '<section data-section="hero">New</section>')
+
+    assert edited == PAGE[:hero.start] + '<section data-section="hero">New</section>' + PAGE[hero.end:]
+    assert [s.name for s in split_sections(edited)] == ["hero", "story", "inventory", "contact"]
+
+def test_clean_section_html_strips_fences_and_scripts_and_forces_name():
+    raw = '```html\n<section data-section="header" class="p-4">Hi<script>alert(1)</script></section>\n```'
+
+    assert clean_section_html(raw, "hero") == '<section class="p-4" data-section="hero">Hi</section>'
+    assert clean_section_html("Sorry, I can't do that.", "hero") is None
+
+@pytest.mark.asyncio
+async def test_regenerate_section_prompts_with_only_that_section(mocker):
+    # Arrange
+    mock_llm = AsyncMock()
+    mock_llm.ainvoke.return_value = MagicMock(content='<section data-section="hero">Goat cheese!</section>')
+    mocker.patch("src.services.site_sections.get_llm_for_task", return_value=mock_llm)
+    hero = split_sections(PAGE)[0]
+
+    # Act
+    new_html = await regenerate_section(hero, "Mention our goat cheese", "Oak Creek")
+
+    # Assert
+    prompt = mock_llm.ainvoke.await_args.args[0][0].content
+    assert 'data-section="hero"' in prompt and "Mention our goat cheese" in prompt
+    assert 'data-section="story"' not in prompt
+    assert new_html == '<section data-section="hero">Goat cheese!</section>'
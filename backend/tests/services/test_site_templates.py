@@ -0,0 +1,42 @@
+import re
+from src.schemas.agent_builder import BrandPersona, WebsiteCopy
+from src.services.site_templates import SECTION_ORDER, default_copy, parse_inventory, render_site, theme_for
+
+COPY = WebsiteCopy(
+    headline="Eggs worth waking up for",
+    subheadline="Pasture-raised on Oak Creek.",
+    about_text="Four generations of <family> farming.",
+    accent_color="Rose",
+)
+
+def test_parse_inventory_splits_and_dedupes():
+    assert parse_inventory("eggs, honey and kale; Eggs\n- raw milk") == ["Eggs", "Honey", "Kale", "Raw milk"]
+
+def test_render_site_has_every_section_and_escapes_copy():
+    html = render_site("Oak Creek", COPY, "Eggs, honey", "modern")
+
+    assert html.startswith("<!DOCTYPE html>")
+    assert re.findall(r'data-section="(\w+)"', html) == list(SECTION_ORDER)
+    assert "&lt;family&gt;" in html and "<family>" not in html
+    assert "bg-rose-500" in html  # LLM-picked accent replaces the theme's
+    assert "$" not in html
+
+def test_inventory_section_is_omitted_without_items():
+    html = render_site("Oak Creek", COPY, " , ", "rustic")
+
+    assert 'data-section="inventory"' not in html
+
+def test_theme_for_rejects_unknown_colors_and_styles():
+    assert theme_for("modern", "url(evil)")["accent"] == "emerald"
+    assert theme_for("no-such-style")["primary"] == theme_for("rustic")["primary"]
+
+def test_default_copy_uses_persona():
+    persona = BrandPersona(
+        farm_story_summary="A family farm.", tagline="Fresh from the creek.",
+        target_audience="Families", tone_and_voice="Warm", recommended_channels=[],
+    )
+
+    copy = default_copy("Oak Creek", persona)
+
+    assert copy.headline == "Fresh from the creek."
+    assert copy.about_text == "A family farm."
@@ -0,0 +1,62 @@
+from src.services.tailwind_compiler import compile_classes, compile_page
+
+PAGE = """<!DOCTYPE html>
+<html><head><title>Farm</title>
+<script src="https://cdn.tailwindcss.com"></script>
+<script>tailwind.config = {theme: {extend: {}}}</script>
+</head>
+<body class="bg-stone-50 antialiased">
+<div class="group md:grid-cols-2 p-4 px-6 hover:bg-amber-600 bg-black/50 w-1/2 -mt-4"></div>
+</body></html>"""
+
+def test_compile_page_inlines_css_and_removes_cdn():
+    html, weight = compile_page(PAGE)
+
+    assert "cdn.tailwindcss.com" not in html
+    assert "tailwind.config" not in html
+    assert html.index("<style") < html.index("</head>")
+    assert ".bg-stone-50{background-color:#fafaf9}" in html
+    assert weight.cdn_removed is True
+    assert weight.unresolved_classes == []
+    assert weight.class_count == 10
+    assert weight.css_bytes < weight.html_bytes
+
+def test_unresolved_classes_keep_the_cdn_and_config():
+    html, weight = compile_page(PAGE.replace("-mt-4", "-mt-4 ring-2 ring-green-600 backdrop-blur-md"))
+
+    # The CDN styles what the compiler could not; the inlined CSS still styles the first paint
+    assert weight.unresolved_classes == ["backdrop-blur-md", "ring-2", "ring-green-600"]
+    assert weight.cdn_removed is False
+    assert "cdn.tailwindcss.com" in html
+    assert "tailwind.config" in html
+    assert ".bg-stone-50{background-color:#fafaf9}" in html
+
+def test_variants_opacity_fractions_and_negatives():
+    css, unresolved = compile_classes({"md:grid-cols-2", "hover:bg-amber-600", "bg-black/50", "w-1/2", "-mt-4"})
+
+    assert unresolved == []
+    assert "@media (min-width:768px){\n.md\\:grid-cols-2{grid-template-columns:repeat(2,minmax(0,1fr))}\n}" in css
+    assert ".hover\\:bg-amber-600:hover{background-color:#d97706}" in css
+    assert ".bg-black\\/50{background-color:rgb(0 0 0 / 0.5)}" in css
+    assert ".w-1\\/2{width:50%}" in css
+    assert ".-mt-4{margin-top:-1rem}" in css
+
+def test_later_utilities_override_earlier_ones():
+    # px-6 must come after p-4 in the stylesheet, like in Tailwind
+    css, _ = compile_classes({"px-6", "p-4"})
+
+    assert css.index(".p-4{") < css.index(".px-6{")
+
+def test_unknown_variants_are_unresolved():
+    _, unresolved = compile_classes({"dark:bg-black", "bg-opacity-50", "bg-white"})
+
+    assert unresolved == ["bg-opacity-50", "dark:bg-black"]
+
+def test_recompiling_replaces_the_inlined_stylesheet():
+    html, _ = compile_page(PAGE)
+
+    recompiled, weight = compile_page(html.replace("bg-stone-50", "bg-rose-50"))
+
+    assert recompiled.count("<style") == 1
+    assert ".bg-rose-50{" in recompiled and ".bg-stone-50{" not in recompiled
+    assert weight.cdn_removed is False
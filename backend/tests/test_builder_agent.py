@@ -49,7 +49,7 @@ async def main():
         layouts = result.get("website_layouts", [])
         print("\n=== EVALUATION: Website Layout ===")
         if layouts and len(layouts) > 0:
-            layout_code = layouts[0]
+            layout_code = layouts[0].html
             print(f"SUCCESS: Generated React Component ({len(layout_code)} characters).")
             
             # Save the layout to a file for the user to inspect
@@ -1,6 +1,7 @@
 import pytest
 import json
 from unittest.mock import AsyncMock, MagicMock
+from src.schemas.google_places import NearbyBusiness, PlacesSearchResult
 from src.tools.competitor_analysis import analyze_competitor_gap
 
 @pytest.fixture
@@ -10,10 +11,15 @@ def mock_competitor_dependencies(mocker):
     
     # Mock search_nearby_businesses tool
     mock_search = AsyncMock()
-    mock_search.ainvoke.return_value = json.dumps([
-        {"name": "Competitor Farm 1", "vicinity": "Nearby", "rating": 4.5, "user_ratings_total": 10, "website": "http://comp1.com"},
-        {"name": "Competitor Farm 2", "vicinity": "Far away", "rating": 3.0, "user_ratings_total": 5, "website": "http://comp2.com"}
-    ])
+    mock_search.ainvoke.return_value = PlacesSearchResult(
+        query="farm fresh produce CSA", location_input="37.7749,-122.4194", radius_meters=25000, total_found=2,
+        businesses=[
+            NearbyBusiness(name="Competitor Farm 1", address="Nearby", rating=4.5, website="http://comp1.com",
+                           place_id="p1", latitude=37.7, longitude=-122.4),
+            NearbyBusiness(name="Competitor Farm 2", address="Far away", rating=3.0, website="http://comp2.com",
+                           place_id="p2", latitude=37.8, longitude=-122.5),
+        ],
+    )
     mocker.patch("src.tools.competitor_analysis.search_nearby_businesses", mock_search)
     
     # Mock scrape_website_content tool
@@ -21,7 +27,7 @@ def mock_competitor_dependencies(mocker):
     mock_scrape.ainvoke.return_value = json.dumps({"extracted_text": "Competitor content snippet..."})
     mocker.patch("src.tools.competitor_analysis.scrape_website_content", mock_scrape)
     
-    # Mock ChatOpenAI
+    # Mock the shared LLM client
     mock_llm = AsyncMock()
     mock_response = MagicMock()
     mock_response.content = json.dumps({
@@ -29,7 +35,8 @@ def mock_competitor_dependencies(mocker):
         "positioning_recommendations": ["Rec 1"]
     })
     mock_llm.ainvoke.return_value = mock_response
-    mocker.patch("src.tools.competitor_analysis.ChatOpenAI", return_value=mock_llm)
+    mocker.patch("src.tools.competitor_analysis.get_llm_for_task", return_value=mock_llm)
+    return mock_search
 
 @pytest.mark.asyncio
 async def test_analyze_competitor_gap_success(mock_competitor_dependencies):
@@ -48,3 +55,8 @@ async def test_analyze_competitor_gap_success(mock_competitor_dependencies):
     assert result["target_farm"] == "My Farm"
     assert "report" in result
     assert result["report"]["market_gaps"] == ["Gap 1"]
+    assert result["competitors_analyzed"] == 2
+    # Called with the tool's actual signature
+    search_args = mock_competitor_dependencies.ainvoke.call_args.args[0]
+    assert search_args["location"] == "37.7749,-122.4194"
+    assert search_args["query"] == "farm fresh produce CSA"
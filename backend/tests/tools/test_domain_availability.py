@@ -2,53 +2,77 @@ import pytest
 import json
 from unittest.mock import AsyncMock, MagicMock
 from src.tools.domain_availability import check_domain_availability
-import socket
 
 @pytest.fixture
 def mock_domain_dependencies(mocker):
     # Mock settings
     mocker.patch("src.core.config.settings.OPENROUTER_API_KEY", "test_key")
-    
-    # Mock ChatOpenAI
+
+    # Mock the shared LLM client
     mock_llm = AsyncMock()
     mock_response = MagicMock()
     mock_response.content = "farm1.com, farm2.com, farm3.com, farm4.com, farm5.com"
     mock_llm.ainvoke.return_value = mock_response
-    mocker.patch("src.tools.domain_availability.ChatOpenAI", return_value=mock_llm)
-    
-    # Mock socket.gethostbyname
-    mock_socket = mocker.patch("src.tools.domain_availability.socket.gethostbyname")
-    return mock_socket
+    mocker.patch("src.tools.domain_availability.get_llm_for_task", return_value=mock_llm)
+
+    # Mock the async DNS resolver: domains not listed in `statuses` are taken
+    statuses = {}
+    mock_check_many = mocker.patch(
+        "src.tools.domain_availability.domain_resolver.check_many",
+        new_callable=AsyncMock,
+        side_effect=lambda domains: {d: statuses.get(d, True) for d in domains},
+    )
+    return statuses, mock_check_many, mock_llm
 
 @pytest.mark.asyncio
-async def test_check_domain_availability_success(mock_domain_dependencies):
-    # Arrange
-    # Simulate first domain taken (raises nothing), second available (raises gaierror)
-    mock_domain_dependencies.side_effect = [
-        "1.2.3.4",          # farm1.com resolves -> taken
-        socket.gaierror,    # farm2.com fails -> available
-        "1.2.3.4",          # farm3.com -> taken
-        socket.gaierror,    # farm4.com -> available
-        socket.gaierror     # farm5.com -> available
-    ]
-    
+async def test_check_domain_availability_falls_back_to_llm(mock_domain_dependencies):
+    # Arrange: every local candidate is taken
+    statuses, _, mock_llm = mock_domain_dependencies
+    statuses.update({
+        "farm1.com": True,    # farm1.com resolves -> taken
+        "farm2.com": False,   # farm2.com fails -> available
+        "farm3.com": True,    # farm3.com -> taken
+        "farm4.com": False,   # farm4.com -> available
+        "farm5.com": None     # farm5.com -> lookup timed out
+    })
+
     # Act
     result_json = await check_domain_availability.ainvoke({
         "farm_name": "My Farm",
         "farm_description": "Organic"
     })
-    
+
     result = json.loads(result_json)
-    
+
     # Assert
     assert result["status"] == "success"
+    mock_llm.ainvoke.assert_awaited_once()
     suggestions = result["suggestions"]
-    assert len(suggestions) >= 3 # Tool stops after finding 3 available? No, stops after checking 5 or finding 3 available.
-    
-    # farm1 -> taken
-    assert suggestions[0]["domain"] == "farm1.com"
-    assert suggestions[0]["status"] == "taken"
-    
-    # farm2 -> available
-    assert suggestions[1]["domain"] == "farm2.com"
-    assert suggestions[1]["status"] == "available"
+    assert len(suggestions) == 5
+
+    # Available LLM names first, then the remaining LLM names for context
+    assert [s["domain"] for s in suggestions] == ["farm2.com", "farm4.com", "farm1.com", "farm3.com", "farm5.com"]
+    assert suggestions[0]["status"] == "available"
+    assert suggestions[0]["source"] == "llm"
+    assert suggestions[2]["status"] == "taken"
+    assert suggestions[4]["status"] == "unknown"
+
+@pytest.mark.asyncio
+async def test_check_domain_availability_skips_llm_when_local_names_suffice(mock_domain_dependencies):
+    # Arrange
+    statuses, mock_check_many, mock_llm = mock_domain_dependencies
+    statuses.update({"myfarmco.com": False, "getmyfarm.com": False, "myfarmfresh.com": False})
+
+    # Act
+    result = json.loads(await check_domain_availability.ainvoke({
+        "farm_name": "My Farm",
+        "farm_description": "Organic heirloom tomatoes"
+    }))
+
+    # Assert: one batched DNS check, no LLM call
+    assert result["status"] == "success"
+    mock_llm.ainvoke.assert_not_called()
+    mock_check_many.assert_awaited_once()
+    assert len(mock_check_many.await_args.args[0]) > 10
+    assert {s["domain"] for s in result["suggestions"]} == set(statuses)
+    assert all(s["source"] == "local" for s in result["suggestions"])
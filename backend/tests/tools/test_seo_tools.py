@@ -8,7 +8,7 @@ def mock_seo_dependencies(mocker):
     # Mock settings
     mocker.patch("src.core.config.settings.OPENROUTER_API_KEY", "test_key")
     
-    # Mock ChatOpenAI
+    # Mock the shared LLM client
     mock_llm = AsyncMock()
     mock_response = MagicMock()
     mock_response.content = json.dumps({
@@ -19,7 +19,7 @@ def mock_seo_dependencies(mocker):
         ]
     })
     mock_llm.ainvoke.return_value = mock_response
-    mocker.patch("src.tools.seo_tools.ChatOpenAI", return_value=mock_llm)
+    mocker.patch("src.tools.seo_tools.get_llm_for_task", return_value=mock_llm)
 
 @pytest.mark.asyncio
 async def test_fetch_local_seo_keywords_success(mock_seo_dependencies):
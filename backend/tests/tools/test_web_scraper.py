@@ -44,13 +44,13 @@ def mock_openai_settings(mocker):
 
 @pytest.mark.asyncio
 async def test_analyze_website_visuals_success(mock_playwright, mocker):
-    # Mock ChatOpenAI
+    # Mock the shared LLM client
     mock_llm = AsyncMock()
     mock_response = MagicMock()
     mock_response.content = "Visual analysis result"
     mock_llm.ainvoke.return_value = mock_response
     
-    mocker.patch("src.tools.web_scraper.ChatOpenAI", return_value=mock_llm)
+    mocker.patch("src.tools.web_scraper.get_llm_for_task", return_value=mock_llm)
     
     # Act
     result = await analyze_website_visuals.ainvoke({"url": "http://example.com"})
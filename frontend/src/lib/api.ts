@@ -38,6 +38,15 @@ export interface DiscoveryResponse {
   leads: CompetitorFarm[];
   market_gap_report: Record<string, any> | null;
   seo_report: Record<string, any> | null;
+  errors: string[];
+  duration_ms: number;
+  // Only on /farms/discover: "stale" results are served while a background job refreshes them
+  cache?: {
+    status: 'fresh' | 'stale' | 'miss';
+    refreshed_at?: string;
+    age_seconds?: number;
+    refreshing: boolean;
+  };
 }
 
 export async function fetchDiscovery(params: {
@@ -45,6 +54,7 @@ export async function fetchDiscovery(params: {
   farm_offerings: string;
   zip_code: string;
   state: string;
+  radius_miles?: number;
 }): Promise<DiscoveryResponse> {
   const res = await fetch(`${API_BASE}/api/v1/farms/discover`, {
     method: 'POST',
@@ -58,6 +68,142 @@ export async function fetchDiscovery(params: {
   return res.json();
 }
 
+export interface DiscoveryParams {
+  farm_name: string;
+  farm_offerings: string;
+  zip_code: string;
+  state: string;
+  radius_miles?: number;
+}
+
+export interface BatchDiscoveryResponse {
+  message: string;
+  run_id: string;
+  regions: number;
+  // Competitors looked up and audited once for the whole batch
+  unique_competitors: number;
+  // One per requested farm, in request order
+  farms: (DiscoveryResponse & { farm_name: string })[];
+  errors: string[];
+  duration_ms: number;
+}
+
+/** Queues discovery for many farms at once; competitors shared between them are audited once. */
+export async function submitBatchDiscoveryJob(farms: DiscoveryParams[]): Promise<AgentJob<BatchDiscoveryResponse>> {
+  const res = await fetch(`${API_BASE}/api/v1/farms/discover/batch/jobs`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ farms }),
+  });
+  if (!res.ok) {
+    const text = await res.text();
+    throw new Error(text || `${res.status}`);
+  }
+  return res.json();
+}
+
+export type DiscoveryStreamEvent =
+  | { event: 'run'; data: { run_id: string } }
+  | { event: 'node_start'; data: { node: string; task_id: string; elapsed_ms: number } }
+  | { event: 'node_end'; data: { node: string; task_id: string; elapsed_ms: number; duration_ms: number; error: string | null } }
+  | { event: 'competitors_found'; data: { count: number } }
+  | { event: 'competitor'; data: { competitor: CompetitorFarm } }
+  | { event: 'site_scored'; data: { url: string; digital_health_score: number; audit_notes: string } }
+  | { event: 'site_audit_failed'; data: { url: string; error: string } }
+  | { event: 'site_audit_skipped'; data: { url: string; reason: string } }
+  | { event: 'report'; data: { kind: 'market_gap' | 'generate_seo'; report: Record<string, any> | null } }
+  | { event: 'complete'; data: DiscoveryResponse }
+  | { event: 'error'; data: { detail: string } };
+
+/**
+ * Runs discovery over Server-Sent Events, calling `onEvent` as results arrive.
+ * Resolves with the final response (the `complete` event).
+ */
+export async function streamDiscovery(
+  params: { farm_name: string; farm_offerings: string; zip_code: string; state: string; radius_miles?: number },
+  onEvent: (event: DiscoveryStreamEvent) => void,
+  signal?: AbortSignal,
+): Promise<DiscoveryResponse> {
+  // EventSource cannot POST, so the stream is read and split into frames by hand
+  const res = await fetch(`${API_BASE}/api/v1/farms/discover/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(params),
+    signal,
+  });
+  if (!res.ok || !res.body) {
+    const text = await res.text();
+    throw new Error(text || `${res.status}`);
+  }
+
+  const reader = res.body.pipeThrough(new TextDecoderStream()).getReader();
+  let buffer = '';
+  for (;;) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += value;
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const frame = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      const event = frame.match(/^event: (.*)$/m)?.[1];
+      const data = frame.match(/^data: (.*)$/m)?.[1];
+      if (!event || data === undefined) continue;
+      const parsed = { event, data: JSON.parse(data) } as DiscoveryStreamEvent;
+      onEvent(parsed);
+      if (parsed.event === 'complete') return parsed.data;
+      if (parsed.event === 'error') throw new Error(parsed.data.detail);
+    }
+  }
+  throw new Error('Discovery stream ended before completing');
+}
+
+// --- Agent jobs ---
+
+export type JobStatus = 'queued' | 'running' | 'succeeded' | 'failed';
+
+export interface AgentJob<T = unknown> {
+  id: string;
+  kind: 'discovery' | 'analytics' | 'builder' | 'batch_discovery';
+  farm_id: string | null;
+  status: JobStatus;
+  progress: string | null;
+  steps_completed: number;
+  attempts: number;
+  max_attempts: number;
+  run_id: string;
+  result: T | null;
+  error: string | null;
+  started_at: string | null;
+  finished_at: string | null;
+  created_at: string;
+  updated_at: string;
+}
+
+export async function submitDiscoveryJob(params: {
+  farm_name: string;
+  farm_offerings: string;
+  zip_code: string;
+  state: string;
+}): Promise<AgentJob<DiscoveryResponse>> {
+  const res = await fetch(`${API_BASE}/api/v1/farms/discover/jobs`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(params),
+  });
+  if (!res.ok) {
+    const text = await res.text();
+    throw new Error(text || `${res.status}`);
+  }
+  return res.json();
+}
+
+export async function fetchJob<T = unknown>(jobId: string): Promise<AgentJob<T>> {
+  const res = await fetch(`${API_BASE}/api/v1/jobs/${encodeURIComponent(jobId)}`);
+  if (!res.ok) throw new Error(`Failed to fetch job: ${res.status}`);
+  return res.json();
+}
+
 // --- Phase 2: Builder ---
 
 export interface BrandPersona {
@@ -68,6 +214,32 @@ export interface BrandPersona {
   recommended_channels: string[];
 }
 
+export interface PageWeight {
+  source_bytes: number;
+  html_bytes: number;
+  css_bytes: number;
+  gzip_bytes: number;
+  class_count: number;
+  unresolved_classes: string[];
+  cdn_removed: boolean;
+}
+
+export interface WebsiteLayout {
+  variant: number;
+  style: string;
+  mode: 'template' | 'llm';
+  html: string;
+  page_weight: PageWeight | null;
+}
+
+export interface SiteArtifact {
+  kind: 'persona' | 'domains' | 'layout';
+  variant: number;
+  style: string | null;
+  content_hash: string;
+  url: string;
+}
+
 export interface BuilderResponse {
   status: string;
   data: {
@@ -75,15 +247,60 @@ export interface BuilderResponse {
     farm_name: string;
     brand_persona: BrandPersona;
     suggested_domains: string[];
+    website_mode: 'template' | 'llm';
     website_layout: string;
+    website_layouts: WebsiteLayout[];
+    version: number | null;
+    artifacts: SiteArtifact[];
+  };
+}
+
+/** URL of the newest stored layout for a farm; served with an ETag, so re-previews do not regenerate it. */
+export function latestLayoutUrl(farmId: string, variant = 0): string {
+  return `${API_BASE}/api/v1/builder/sites/${encodeURIComponent(farmId)}/latest/layout?variant=${variant}`;
+}
+
+export interface SectionEditResponse {
+  status: string;
+  run_id: string;
+  data: {
+    version: number;
+    variant: number;
+    section: string;
+    section_html: string;
+    content_hash: string;
+    url: string;
+    page_weight: PageWeight | null;
   };
 }
 
+export async function regenerateSiteSection(
+  farmId: string,
+  section: string,
+  instruction: string,
+  variant = 0
+): Promise<SectionEditResponse> {
+  const res = await fetch(
+    `${API_BASE}/api/v1/builder/sites/${encodeURIComponent(farmId)}/sections/${encodeURIComponent(section)}`,
+    {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ instruction, variant }),
+    }
+  );
+  if (!res.ok) {
+    const detail = await res.text();
+    throw new Error(detail || `${res.status}`);
+  }
+  return res.json();
+}
+
 export async function buildFarmWebsite(
   farmId: string,
   farmName: string,
   farmStory: string,
-  inventoryData: string
+  inventoryData: string,
+  websiteMode: 'template' | 'llm' = 'template'
 ): Promise<BuilderResponse> {
   const res = await fetch(`${API_BASE}/api/v1/builder/build/${encodeURIComponent(farmId)}`, {
     method: 'POST',
@@ -92,6 +309,7 @@ export async function buildFarmWebsite(
       farm_name: farmName,
       farm_story: farmStory,
       inventory_data: inventoryData,
+      website_mode: websiteMode,
     }),
   });
   if (!res.ok) {